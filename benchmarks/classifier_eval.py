@@ -0,0 +1,127 @@
+"""
+로컬 카테고리/토픽 분류기(services.classifier) 평가 - 정확도, 확신도 임계값별 적용 비율, 예측 지연
+
+- 카테고리 정확도, 토픽 정확도(카테고리/토픽 조합이 모두 맞아야 정답)
+- 임계값별: 확신도(min(카테고리 확률, 토픽 확률))가 임계값 이상인 비율(coverage)과 그 안에서의 정확도
+  → preclassify 모드의 CLASSIFIER_THRESHOLD 정하는 데 사용
+- 예측 1건당 지연 p50/p99 (특징 추출 포함)
+
+--synthetic N이면 실제 데이터 대신 합성 코퍼스(토픽별 어휘 + 공통 잡음 어휘)로 학습 후 평가합니다.
+
+사용법:
+    python -m benchmarks.classifier_eval --model cache/classifier/model.npz --examples holdout.jsonl
+    python -m benchmarks.classifier_eval --synthetic 3000
+"""
+import argparse
+import random
+import time
+from typing import Dict, List
+
+from benchmarks.dedup_bench import _word
+from services.classifier import CLASSIFIER_MODEL, Example, TopicClassifier, read_examples
+from services.summarizer import CATEGORY_MAP
+
+THRESHOLDS = (0.5, 0.7, 0.85, 0.9, 0.95)
+
+
+def make_corpus(count: int, seed: int = 0, taxonomy: Dict[str, List[str]] = CATEGORY_MAP,
+                label_noise: float = 0.03) -> List[Example]:
+    """합성 코퍼스: 글마다 토픽 어휘 / 카테고리 어휘 / 공통 잡음 어휘를 섞어 생성"""
+    rng = random.Random(seed)
+    noise = [_word(rng) for _ in range(400)]
+    category_words = {c: [_word(rng) for _ in range(20)] for c in taxonomy}
+    topic_words = {(c, t): [t] + [_word(rng) for _ in range(30)] for c in taxonomy for t in taxonomy[c]}
+    pairs = list(topic_words)
+
+    def words(c, t, n):
+        out = []
+        for _ in range(n):
+            r = rng.random()
+            pool = topic_words[(c, t)] if r < 0.1 else category_words[c] if r < 0.2 else noise
+            out.append(rng.choice(pool))
+        return " ".join(out)
+
+    corpus = []
+    for _ in range(count):
+        c, t = rng.choice(pairs)
+        example = Example(title=words(c, t, 6), content=words(c, t, rng.randint(20, 120)), category=c, topic=t)
+        if rng.random() < label_noise:
+            # Gemini 분류도 틀릴 수 있으므로 일부 라벨은 무작위
+            example.category, example.topic = rng.choice(pairs)
+        corpus.append(example)
+    return corpus
+
+
+def split(examples: List[Example], holdout: float, seed: int = 0):
+    shuffled = list(examples)
+    random.Random(seed).shuffle(shuffled)
+    cut = int(len(shuffled) * (1 - holdout))
+    return shuffled[:cut], shuffled[cut:]
+
+
+def evaluate(model: TopicClassifier, examples: List[Example]) -> dict:
+    results, latencies = [], []
+    for example in examples:
+        start = time.perf_counter()
+        prediction = model.predict(example.title, example.content)
+        latencies.append((time.perf_counter() - start) * 1000)
+        results.append((
+            prediction.confidence,
+            prediction.category == example.category,
+            (prediction.category, prediction.topic) == (example.category, example.topic),
+        ))
+
+    total = len(results)
+    latencies.sort()
+    report = {
+        "examples": total,
+        "category_accuracy": sum(r[1] for r in results) / total,
+        "topic_accuracy": sum(r[2] for r in results) / total,
+        "latency_ms_p50": latencies[total // 2],
+        "latency_ms_p99": latencies[min(total - 1, int(total * 0.99))],
+        "thresholds": {},
+    }
+    for threshold in THRESHOLDS:
+        confident = [r for r in results if r[0] >= threshold]
+        report["thresholds"][threshold] = {
+            "coverage": len(confident) / total,
+            "topic_accuracy": sum(r[2] for r in confident) / len(confident) if confident else None,
+        }
+    return report
+
+
+def print_report(report: dict):
+    print(f"examples {report['examples']}: category accuracy {report['category_accuracy']:.3f}, "
+          f"topic accuracy {report['topic_accuracy']:.3f}")
+    print(f"latency per prediction: p50 {report['latency_ms_p50']:.2f}ms, p99 {report['latency_ms_p99']:.2f}ms")
+    print()
+    print(f"{'threshold':>9} {'coverage':>8} {'topic_acc':>9}")
+    for threshold, row in report["thresholds"].items():
+        accuracy = f"{row['topic_accuracy']:.3f}" if row["topic_accuracy"] is not None else "-"
+        print(f"{threshold:>9} {row['coverage']:>8.3f} {accuracy:>9}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="로컬 카테고리/토픽 분류기 평가")
+    parser.add_argument("--model", default=CLASSIFIER_MODEL)
+    parser.add_argument("--examples", help="평가용 JSONL (title, content, category, topic)")
+    parser.add_argument("--synthetic", type=int, help="합성 코퍼스 N건으로 학습(80%%) 후 나머지로 평가")
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args()
+
+    if args.synthetic:
+        train, test = split(make_corpus(args.synthetic, args.seed), holdout=0.2, seed=args.seed)
+        model = TopicClassifier(CATEGORY_MAP)
+        start = time.perf_counter()
+        model.fit(train, seed=args.seed)
+        print(f"trained on {len(train)} synthetic examples in {time.perf_counter() - start:.1f}s")
+    else:
+        if not args.examples:
+            parser.error("--examples or --synthetic is required")
+        model = TopicClassifier.load(args.model)
+        test = read_examples(args.examples)
+    print_report(evaluate(model, test))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,100 @@
+"""
+로컬 카테고리/토픽 분류기(services.classifier) 오프라인 학습
+
+학습 데이터 (여러 개를 함께 사용 가능):
+- --examples: 서버가 누적한 Gemini 분류 결과 JSONL (CLASSIFIER_EXAMPLES, 기본 cache/classifier/examples.jsonl)
+- --harvest: 아티팩트 저장소(ARTIFACT_DIR)의 추출 결과로 요약 프롬프트를 다시 만들어
+  공유 캐시(summary 이름공간)에 남아 있는 지난 Gemini 결과를 찾아 라벨로 사용
+  (서버와 같은 CACHE_BACKEND / CACHE_URL / GEMINI_MODEL 설정으로 실행해야 캐시 키가 일치)
+
+--holdout 비율만큼 떼어 평가(benchmarks.classifier_eval)한 뒤 전체 데이터로 다시 학습해 저장합니다.
+서버는 시작 시 CLASSIFIER_MODEL 경로의 모델을 읽으므로 저장 후 재시작하면 적용됩니다.
+
+사용법:
+    python -m benchmarks.classifier_train --examples cache/classifier/examples.jsonl
+    python -m benchmarks.classifier_train --harvest --out cache/classifier/model.npz
+"""
+import argparse
+import logging
+import time
+from typing import List
+
+from benchmarks.classifier_eval import evaluate, print_report, split
+from services import cache
+from services.artifact_store import ArtifactStore
+from services.classifier import CLASSIFIER_EXAMPLES, CLASSIFIER_MODEL, Example, TopicClassifier, read_examples
+from services.extractors import VIDEO
+from services.model_router import CONTENT, ModelRouter
+from services.summarizer import CARD_PROMPTS, CATEGORY_MAP, CONTENT_PROMPTS, is_valid_topic
+from services.tiers import METADATA
+
+
+def harvest(store: ArtifactStore) -> List[Example]:
+    """아티팩트 + 공유 캐시의 지난 Gemini 결과 → 학습 예시 (메모 없는 요청의 결과만 찾을 수 있음)"""
+    summaries = cache.get_cache(cache.SUMMARY)
+    router = ModelRouter()
+    examples = []
+    for artifact in store.scan():
+        data = artifact.data
+        if artifact.kind == VIDEO:
+            if data.get("tier") == METADATA:
+                continue
+            # main.youtube_summary_input과 같은 입력
+            content = (data.get("description") or "") + "\n" + (data.get("transcript") or "")
+        else:
+            content = data.get("content") or ""
+        model = router.choose(CONTENT, len(content), artifact.kind).models[0]
+
+        for templates in (CONTENT_PROMPTS, CARD_PROMPTS):
+            found = None
+            for template in templates.values():
+                prompt = template.render(title=data["title"], content=content)
+                result = summaries.get(prompt.digest(model))
+                if result is not None and is_valid_topic(result):
+                    found = result
+                    break
+            if found is not None:
+                examples.append(Example(data["title"], content, found["category"], found["topic"]))
+                break
+    return examples
+
+
+def main():
+    parser = argparse.ArgumentParser(description="로컬 카테고리/토픽 분류기 학습")
+    parser.add_argument("--examples", action="append", default=[],
+                        help=f"학습 예시 JSONL (여러 번 지정 가능, 예: {CLASSIFIER_EXAMPLES})")
+    parser.add_argument("--harvest", action="store_true", help="아티팩트 저장소 + 공유 캐시에서 지난 Gemini 결과 수집")
+    parser.add_argument("--out", default=CLASSIFIER_MODEL)
+    parser.add_argument("--holdout", type=float, default=0.2, help="평가용으로 떼어 둘 비율 (0이면 평가 생략)")
+    parser.add_argument("--epochs", type=int, default=8)
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args()
+
+    logging.basicConfig(level=logging.WARNING)
+    examples = []
+    for path in args.examples:
+        examples.extend(read_examples(path))
+    if args.harvest:
+        harvested = harvest(ArtifactStore())
+        print(f"harvested {len(harvested)} examples from artifacts + summary cache")
+        examples.extend(harvested)
+    if not examples:
+        parser.error("no training examples (use --examples and/or --harvest)")
+
+    if args.holdout > 0:
+        train, test = split(examples, args.holdout, args.seed)
+        model = TopicClassifier(CATEGORY_MAP)
+        model.fit(train, epochs=args.epochs, seed=args.seed)
+        print(f"holdout evaluation ({len(train)} train / {len(test)} test):")
+        print_report(evaluate(model, test))
+        print()
+
+    model = TopicClassifier(CATEGORY_MAP)
+    start = time.perf_counter()
+    used = model.fit(examples, epochs=args.epochs, seed=args.seed)
+    model.save(args.out)
+    print(f"trained on {used}/{len(examples)} examples in {time.perf_counter() - start:.1f}s → {args.out}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,323 @@
+"""
+엔드투엔드 부하 테스트 - 외부 서비스 없이 /api/v1/summarize/* 전체 경로 실행
+
+실제 uvicorn 서버를 띄우고 로컬 대역(benchmarks.stubs)으로 Gemini / YouTube / 웹 페이지를 대신합니다.
+- Gemini: 지연 시간(--gemini-latency ± --gemini-jitter)을 흉내 내는 가짜 클라이언트
+- 네이버 뉴스 / Tistory / 일반 웹: 페이지 레이아웃 픽스처(benchmarks/fixtures)를 로컬 HTTP 서버로 서빙
+- YouTube: 자막 있는 영상(youtube-captions)과 음성 인식이 필요한 영상(youtube-whisper)
+  Whisper 경로는 픽스처 WAV를 "다운로드"하고, 기본은 가짜 모델(--whisper-rtf 실시간 배율)로 인식
+  --whisper real이면 실제 faster-whisper tiny 모델 사용 (모델 다운로드 필요)
+
+엔드포인트 혼합 비율만큼 요청을 만들어 동시 실행 수(--concurrency)로 보내고
+처리량(req/s)과 엔드포인트별 p50/p95/p99, 상태 코드 분포를 출력합니다.
+--repeat-ratio만큼은 이미 보낸 URL을 다시 보내 캐시/중복 재사용 경로도 포함합니다.
+공유 캐시 백엔드는 --cache로 고르며, redis는 로컬 RESP 대역(FakeRedisServer)을 띄워 사용합니다.
+--background-ratio를 주면 그 비율은 X-Priority: background, 나머지는 interactive로 보내고 등급별로 따로 집계합니다.
+--two-phase면 2단계 요약(카드 먼저 응답, 뉴스레터 본문은 백그라운드)으로 보냅니다.
+  가짜 Gemini의 출력 길이별 생성 시간(--gemini-output-rate)을 함께 주어야 응답 지연 차이가 드러납니다.
+--prefix-cache로 프롬프트 고정 지시문 전송 방식(services.prompts, inline / system / explicit)을 고릅니다.
+  캐시되지 않은 입력 토큰 처리 시간(--gemini-prefill-rate)을 함께 주면 입력 토큰/지연 차이가 드러납니다.
+
+사용법:
+    python -m benchmarks.load_test --concurrency 32 --requests 500
+    python -m benchmarks.load_test --mix "naver-news=1,youtube-whisper=1" --whisper real --json result.json
+    python -m benchmarks.load_test --cache redis --repeat-ratio 0.5
+    python -m benchmarks.load_test --gemini-output-rate 200 --two-phase
+    python -m benchmarks.load_test --prefix-cache explicit --gemini-prefill-rate 2000
+"""
+import argparse
+import asyncio
+import json
+import logging
+import os
+import random
+import socket
+import sys
+import tempfile
+import threading
+import time
+from collections import Counter, defaultdict
+
+DEFAULT_MIX = "naver-news=4,tistory=2,youtube-captions=2,youtube-whisper=1,url=1,generic=1,collection=1"
+
+
+def parse_mix(text: str) -> dict:
+    mix = {}
+    for part in text.split(","):
+        name, _, weight = part.strip().partition("=")
+        if name not in SCENARIOS:
+            raise ValueError(f"Unknown scenario: {name} (choose from {', '.join(SCENARIOS)})")
+        mix[name] = float(weight or 1)
+    return mix
+
+
+# --- 요청 생성 (시나리오 이름 → (경로, 본문)) ---
+
+def _naver_url(i: int) -> str:
+    return f"https://n.news.naver.com/mnews/article/{i % 900 + 1:03d}/{i:010d}"
+
+
+def _tistory_url(i: int) -> str:
+    return f"https://bench{i % 20}.tistory.com/{i}"
+
+
+def _youtube_url(prefix: str, i: int) -> str:
+    return f"https://www.youtube.com/watch?v={prefix}{i:08d}"
+
+
+SCENARIOS = {
+    "naver-news": lambda i: ("/api/v1/summarize/naver-news", {"url": _naver_url(i), "user_memo": "부하 테스트"}),
+    "tistory": lambda i: ("/api/v1/summarize/tistory", {"url": _tistory_url(i)}),
+    "youtube-captions": lambda i: ("/api/v1/summarize/youtube", {"url": _youtube_url("cap", i)}),
+    "youtube-whisper": lambda i: ("/api/v1/summarize/youtube", {"url": _youtube_url("asr", i)}),
+    "url": lambda i: ("/api/v1/summarize/url", {"url": f"https://www.example.com/posts/{i}"}),
+    "generic": lambda i: ("/api/v1/summarize/generic", {
+        "title": f"부하 테스트 글 {i}",
+        "content": "직접 전달한 본문입니다. " * 200,
+    }),
+    "collection": lambda i: ("/api/v1/summarize/collection", {
+        "newsletters": [f"뉴스레터 {i}-{k}: 생산성 도구 요약" for k in range(5)],
+    }),
+}
+
+
+def build_plan(mix: dict, total: int, repeat_ratio: float, seed: int) -> list:
+    """(시나리오, 경로, 본문) 목록 - repeat_ratio만큼은 이전 요청을 그대로 반복"""
+    rng = random.Random(seed)
+    names = list(mix)
+    weights = [mix[n] for n in names]
+    plan = []
+    for i in range(total):
+        if plan and rng.random() < repeat_ratio:
+            plan.append(rng.choice(plan))
+            continue
+        name = rng.choices(names, weights)[0]
+        plan.append((name, *SCENARIOS[name](i)))
+    return plan
+
+
+def assign_priorities(plan: list, background_ratio: float, seed: int) -> list:
+    """요청마다 X-Priority 헤더 지정 (시나리오 이름에 @등급을 붙여 따로 집계)"""
+    rng = random.Random(seed + 1)
+    assigned = []
+    for name, path, body in plan:
+        priority = "background" if rng.random() < background_ratio else "interactive"
+        assigned.append((f"{name}@{priority}", path, body, {"X-Priority": priority}))
+    return assigned
+
+
+def percentile(values: list, q: float) -> float:
+    if not values:
+        return 0.0
+    ordered = sorted(values)
+    index = min(len(ordered) - 1, max(0, round(q / 100 * len(ordered) + 0.5) - 1))
+    return ordered[index]
+
+
+# --- 서버 기동 ---
+
+def _free_port() -> int:
+    with socket.socket() as s:
+        s.bind(("127.0.0.1", 0))
+        return s.getsockname()[1]
+
+
+def serve(app):
+    """uvicorn을 스레드로 실행 → (base_url, 종료 함수)"""
+    import uvicorn
+
+    port = _free_port()
+    server = uvicorn.Server(uvicorn.Config(app, host="127.0.0.1", port=port, log_level="warning"))
+    thread = threading.Thread(target=server.run, daemon=True)
+    thread.start()
+    while not server.started:
+        time.sleep(0.05)
+
+    def stop():
+        server.should_exit = True
+        thread.join(timeout=10)
+
+    return f"http://127.0.0.1:{port}", stop
+
+
+def start_app(args, workdir: str):
+    """대역을 설치한 뒤 main을 import하고 서버 실행 → (base_url, main 모듈, 종료 함수)"""
+    from benchmarks import stubs
+
+    os.environ.setdefault("GEMINI_API_KEY", "load-test")
+    os.environ.setdefault("HTTP_CACHE_DIR", os.path.join(workdir, "http_cache"))
+
+    redis_server = None
+    os.environ["CACHE_BACKEND"] = args.cache
+    os.environ["TWO_PHASE"] = "1" if args.two_phase else "0"
+    os.environ["PROMPT_PREFIX_CACHE"] = args.prefix_cache
+    if args.cache == "sqlite":
+        os.environ["CACHE_URL"] = os.path.join(workdir, "shared.sqlite3")
+    elif args.cache == "redis":
+        redis_server = stubs.FakeRedisServer()
+        os.environ["CACHE_URL"] = redis_server.url
+
+    if args.whisper == "fake":
+        import faster_whisper
+        import services.youtube
+
+        stubs.FakeWhisperModel.realtime_factor = args.whisper_rtf
+        faster_whisper.WhisperModel = stubs.FakeWhisperModel
+        services.youtube.WhisperModel = stubs.FakeWhisperModel
+
+    audio = os.path.join(workdir, "fixture.wav")
+    stubs.make_wav(audio, args.audio_seconds)
+    stubs.install_youtube_stubs(audio, duration=int(args.audio_seconds))
+
+    fixtures = stubs.FixtureServer(latency=args.page_latency)
+    stubs.route_to_fixture_server(fixtures.base_url)
+
+    # yt-dlp 다운로드 경로(downloads/)가 작업 디렉터리에 생기도록
+    os.chdir(workdir)
+    import main
+
+    main.summarizer.client = stubs.FakeGeminiClient(
+        latency=args.gemini_latency, jitter=args.gemini_jitter, output_rate=args.gemini_output_rate,
+        prefill_rate=args.gemini_prefill_rate,
+    )
+    base_url, stop_server = serve(main.app)
+
+    def stop():
+        stop_server()
+        fixtures.close()
+        if redis_server is not None:
+            redis_server.close()
+
+    return base_url, main, stop
+
+
+# --- 부하 생성 ---
+
+async def drive(base_url: str, plan: list, concurrency: int, timeout: float) -> list:
+    import httpx
+
+    semaphore = asyncio.Semaphore(concurrency)
+    results = []
+
+    async with httpx.AsyncClient(base_url=base_url, timeout=timeout,
+                                 limits=httpx.Limits(max_connections=concurrency)) as client:
+        async def one(name, path, body, headers=None):
+            async with semaphore:
+                start = time.perf_counter()
+                try:
+                    response = await client.post(path, json=body, headers=headers)
+                    status = response.status_code
+                except httpx.HTTPError as e:
+                    status = type(e).__name__
+                results.append((name, status, time.perf_counter() - start))
+
+        await asyncio.gather(*(one(*item) for item in plan))
+    return results
+
+
+def summarize_results(results: list, elapsed: float, cpu: float) -> dict:
+    by_scenario = defaultdict(list)
+    statuses = defaultdict(Counter)
+    for name, status, latency in results:
+        by_scenario[name].append(latency)
+        statuses[name][str(status)] += 1
+
+    def row(latencies, counter):
+        ok = counter.get("200", 0)
+        return {
+            "count": len(latencies),
+            "errors": len(latencies) - ok,
+            "status": dict(counter),
+            "p50_ms": round(percentile(latencies, 50) * 1000, 1),
+            "p95_ms": round(percentile(latencies, 95) * 1000, 1),
+            "p99_ms": round(percentile(latencies, 99) * 1000, 1),
+        }
+
+    all_latencies = [latency for _, _, latency in results]
+    total_status = sum(statuses.values(), Counter())
+    return {
+        "requests": len(results),
+        "elapsed_s": round(elapsed, 2),
+        # 서버와 부하 생성기가 같은 프로세스이므로 둘을 합친 CPU 시간
+        "cpu_s": round(cpu, 2),
+        "throughput_rps": round(len(results) / elapsed, 2) if elapsed else 0.0,
+        "overall": row(all_latencies, total_status),
+        "scenarios": {name: row(by_scenario[name], statuses[name]) for name in sorted(by_scenario)},
+    }
+
+
+def print_report(report: dict, title: str):
+    print(f"\n=== {title} ===")
+    print(f"소요 {report['elapsed_s']:.2f}s, CPU {report['cpu_s']:.2f}s, 처리량 {report['throughput_rps']:.2f} req/s")
+    print(f"{'scenario':<28}{'count':>7}{'errors':>8}{'p50(ms)':>10}{'p95(ms)':>10}{'p99(ms)':>10}  status")
+    rows = list(report["scenarios"].items()) + [("(all)", report["overall"])]
+    for name, r in rows:
+        print(f"{name:<28}{r['count']:>7}{r['errors']:>8}{r['p50_ms']:>10.1f}{r['p95_ms']:>10.1f}{r['p99_ms']:>10.1f}  {r['status']}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="archiveat 엔드투엔드 부하 테스트 (로컬 대역 사용)")
+    parser.add_argument("--concurrency", type=int, default=16)
+    parser.add_argument("--requests", type=int, default=200)
+    parser.add_argument("--mix", default=DEFAULT_MIX, help=f"시나리오=가중치 목록 (기본: {DEFAULT_MIX})")
+    parser.add_argument("--repeat-ratio", type=float, default=0.1, help="이미 보낸 요청을 반복하는 비율")
+    parser.add_argument("--gemini-latency", type=float, default=1.0, help="가짜 Gemini 응답 지연(초)")
+    parser.add_argument("--gemini-jitter", type=float, default=0.2)
+    parser.add_argument("--gemini-output-rate", type=float, default=0.0,
+                        help="가짜 Gemini 출력 생성 속도(초당 글자 수, 0이면 출력 길이와 무관)")
+    parser.add_argument("--gemini-prefill-rate", type=float, default=0.0,
+                        help="가짜 Gemini의 캐시되지 않은 입력 토큰 처리 속도(토큰/초, 0이면 입력 길이와 무관)")
+    parser.add_argument("--prefix-cache", choices=["inline", "system", "explicit"], default="system",
+                        help="프롬프트 고정 지시문 전송 방식 (PROMPT_PREFIX_CACHE)")
+    parser.add_argument("--page-latency", type=float, default=0.05, help="픽스처 웹 서버 응답 지연(초)")
+    parser.add_argument("--whisper", choices=["fake", "real"], default="fake")
+    parser.add_argument("--whisper-rtf", type=float, default=0.05, help="가짜 Whisper 실시간 배율 (인식 시간 / 오디오 길이)")
+    parser.add_argument("--audio-seconds", type=float, default=30, help="Whisper 경로 픽스처 오디오 길이(초)")
+    parser.add_argument("--cache", choices=["memory", "sqlite", "redis", "off"], default="memory",
+                        help="공유 캐시 백엔드 (redis는 로컬 대역 서버)")
+    parser.add_argument("--background-ratio", type=float, default=0.0,
+                        help="X-Priority: background로 보낼 비율 (0보다 크면 나머지는 interactive)")
+    parser.add_argument("--two-phase", action="store_true",
+                        help="2단계 요약 (카드 먼저 응답, 뉴스레터 본문은 백그라운드 작업)")
+    parser.add_argument("--timeout", type=float, default=600, help="요청별 클라이언트 타임아웃(초)")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--json", help="결과를 JSON 파일로 저장")
+    args = parser.parse_args()
+
+    logging.basicConfig(level=logging.WARNING)
+    plan = build_plan(parse_mix(args.mix), args.requests, args.repeat_ratio, args.seed)
+    if args.background_ratio > 0:
+        plan = assign_priorities(plan, args.background_ratio, args.seed)
+
+    with tempfile.TemporaryDirectory(prefix="archiveat-load-") as workdir:
+        cwd = os.getcwd()
+        base_url, app_module, stop = start_app(args, workdir)
+        # main 모듈이 INFO 로그를 설정하므로 측정 중에는 줄임
+        logging.getLogger().setLevel(logging.WARNING)
+        try:
+            start, cpu_start = time.perf_counter(), time.process_time()
+            results = asyncio.run(drive(base_url, plan, args.concurrency, args.timeout))
+            elapsed, cpu = time.perf_counter() - start, time.process_time() - cpu_start
+        finally:
+            stop()
+            os.chdir(cwd)
+
+    report = summarize_results(results, elapsed, cpu)
+    report["config"] = {k: v for k, v in vars(args).items() if k != "json"}
+    client = app_module.summarizer.client
+    report["gemini_calls"] = client.calls
+    report["gemini_prompt_tokens"] = client.prompt_tokens
+    report["gemini_cached_tokens"] = client.cached_tokens
+    print_report(report, f"부하 테스트: {report['requests']}건, 동시 {args.concurrency}, "
+                         f"Gemini {args.gemini_latency:.2f}s, Whisper {args.whisper}, 캐시 {args.cache}")
+    cached_share = client.cached_tokens / client.prompt_tokens if client.prompt_tokens else 0.0
+    print(f"Gemini 호출 {report['gemini_calls']}회, 입력 토큰 {client.prompt_tokens} (캐시 {client.cached_tokens}, {cached_share:.0%})")
+
+    if args.json:
+        with open(args.json, "w", encoding="utf-8") as f:
+            json.dump(report, f, ensure_ascii=False, indent=2)
+        print(f"결과 저장: {args.json}")
+
+
+if __name__ == "__main__":
+    sys.exit(main())
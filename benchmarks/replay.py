@@ -0,0 +1,86 @@
+"""
+카세트 재생 - 운영에서 기록한 트래픽(services.cassette)을 오프라인으로 다시 보내 프로파일 비교
+
+운영 서버를 CASSETTE_MODE=record로 실행해 카세트 디렉터리를 모은 뒤,
+변경 전/후 빌드에서 각각 이 스크립트를 실행해 처리량, CPU 시간, 엔드포인트별 p50/p95/p99를 비교합니다.
+서버는 CASSETTE_MODE=replay로 실행되어 웹 페이지, yt-dlp, 자막, 음성 인식, Gemini 호출을 모두 기록으로 대체합니다.
+(기록이 없는 외부 호출은 네트워크로 나가지 않고 실패 → 응답 상태 코드로 집계)
+
+사용법:
+    python -m benchmarks.replay --cassette-dir cassettes --concurrency 16 --json after.json
+    python -m benchmarks.replay --cassette-dir cassettes --replay-latency   # 기록된 외부 호출 시간만큼 대기
+"""
+import argparse
+import asyncio
+import json
+import logging
+import os
+import sys
+import tempfile
+import time
+
+
+def load_traffic(directory: str, limit: int = 0) -> list:
+    """traffic.jsonl → (시나리오, 경로, 본문, 헤더) 목록 (기록 순서 유지, 요청마다 자기 카세트 지정)"""
+    from services.cassette import TRAFFIC_LOG
+
+    plan = []
+    with open(os.path.join(directory, TRAFFIC_LOG), encoding="utf-8") as f:
+        for line in f:
+            if not line.strip():
+                continue
+            entry = json.loads(line)
+            plan.append((entry["path"].rsplit("/", 1)[-1], entry["path"], entry["body"], {"X-Cassette": entry["cassette"]}))
+            if limit and len(plan) >= limit:
+                break
+    return plan
+
+
+def main():
+    parser = argparse.ArgumentParser(description="archiveat 카세트 재생 (오프라인 트래픽 재현)")
+    parser.add_argument("--cassette-dir", default="cassettes")
+    parser.add_argument("--concurrency", type=int, default=16)
+    parser.add_argument("--limit", type=int, default=0, help="앞에서부터 재생할 요청 수 (0이면 전체)")
+    parser.add_argument("--replay-latency", action="store_true", help="기록된 외부 호출 시간만큼 대기")
+    parser.add_argument("--timeout", type=float, default=600)
+    parser.add_argument("--json", help="결과를 JSON 파일로 저장")
+    args = parser.parse_args()
+
+    cassette_dir = os.path.abspath(args.cassette_dir)
+    # services import 전에 재생 모드 지정 (모듈 상수로 읽음)
+    os.environ["CASSETTE_MODE"] = "replay"
+    os.environ["CASSETTE_DIR"] = cassette_dir
+    os.environ["CASSETTE_REPLAY_LATENCY"] = "1" if args.replay_latency else "0"
+    os.environ.setdefault("GEMINI_API_KEY", "replay")
+    plan = load_traffic(cassette_dir, args.limit)
+
+    from benchmarks.load_test import drive, print_report, serve, summarize_results
+
+    logging.basicConfig(level=logging.WARNING)
+    with tempfile.TemporaryDirectory(prefix="archiveat-replay-") as workdir:
+        # 로컬 HTTP 캐시 상태가 결과에 섞이지 않도록 빈 캐시로 시작
+        os.environ.setdefault("HTTP_CACHE_DIR", os.path.join(workdir, "http_cache"))
+        os.environ.setdefault("ARTIFACT_DIR", os.path.join(workdir, "artifacts"))
+        import main as app_module
+
+        logging.getLogger().setLevel(logging.WARNING)
+        base_url, stop = serve(app_module.app)
+        try:
+            start, cpu_start = time.perf_counter(), time.process_time()
+            results = asyncio.run(drive(base_url, plan, args.concurrency, args.timeout))
+            elapsed, cpu = time.perf_counter() - start, time.process_time() - cpu_start
+        finally:
+            stop()
+
+    report = summarize_results(results, elapsed, cpu)
+    report["config"] = {k: v for k, v in vars(args).items() if k != "json"}
+    print_report(report, f"카세트 재생: {report['requests']}건, 동시 {args.concurrency} ({cassette_dir})")
+
+    if args.json:
+        with open(args.json, "w", encoding="utf-8") as f:
+            json.dump(report, f, ensure_ascii=False, indent=2)
+        print(f"결과 저장: {args.json}")
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,94 @@
+"""
+응답 직렬화 / Gemini 출력 파싱 벤치마크 (응답 1건당 시간)
+
+- 응답 직렬화: pydantic model_dump_json / json.dumps(model_dump) / orjson (services.serialization)
+  카드 요약(2단계 1단계), 전체 요약, 긴 뉴스레터 본문 응답 크기별
+- Gemini 출력 파싱: 예전 방식(json.loads + .get() 기본값으로 Analysis 재구성)과
+  services.llm_output.parse(model_validate_json 한 번), 코드 블록/잘린 JSON 복구 경로
+
+사용법: python -m benchmarks.serialization_bench --iterations 20000
+"""
+import argparse
+import json
+import time
+
+from models import Analysis, ArticleInfo, NewsletterSummaryBlock, PythonSummaryResponse
+from services import llm_output, serialization
+
+
+def make_response(blocks: int, paragraph: int) -> PythonSummaryResponse:
+    return PythonSummaryResponse(
+        article_info=ArticleInfo(title="연봉 1억 개발자가 말하는 업무 생산성 도구 TOP 3", content_url="https://example.com/a/1",
+                                 word_count=4200),
+        analysis=Analysis(
+            category="생활",
+            topic="업무 생산성",
+            small_card_summary="개발자의 생산성 도구 3가지",
+            medium_card_summary="노션, 슬랙, 리니어로 프로젝트를 관리하는 방법과 협업 효율을 높이는 습관을 소개합니다.",
+            newsletter_summary=[
+                NewsletterSummaryBlock(title=f"소제목{i}", content="효율적인 협업은 조직의 성장에 필수적입니다. " * paragraph)
+                for i in range(blocks)
+            ],
+        ),
+        timings={"fetch": 120.4, "parse": 8.1, "llm": 2410.7},
+        artifact_id="a1b2c3d4e5f6",
+    )
+
+
+def legacy_analysis(text: str) -> Analysis:
+    """예전 방식: json.loads → 엔드포인트에서 .get() 기본값으로 다시 구성"""
+    result = json.loads(text)
+    return Analysis(
+        category=result.get("category", "기타"),
+        topic=result.get("topic", "기타"),
+        small_card_summary=result.get("small_card_summary", ""),
+        medium_card_summary=result.get("medium_card_summary", ""),
+        newsletter_summary=[
+            NewsletterSummaryBlock(title=block.get("title", ""), content=block.get("content", ""))
+            for block in result.get("newsletter_summary", []) if isinstance(block, dict)
+        ],
+    )
+
+
+def per_call_us(fn, iterations: int) -> float:
+    fn()
+    start = time.perf_counter()
+    for _ in range(iterations):
+        fn()
+    return (time.perf_counter() - start) * 1e6 / iterations
+
+
+def run(iterations: int):
+    encoders = {
+        "pydantic": serialization.dumps_pydantic,
+        "json.dumps": lambda model: json.dumps(model.model_dump(mode="json"), ensure_ascii=False).encode("utf-8"),
+    }
+    if serialization.orjson is not None:
+        encoders["orjson"] = serialization.dumps_orjson
+    print(f"response serialization (us per response, default: {serialization.JSON_ENCODER})")
+    print(f"{'response':<12} {'bytes':>6} " + " ".join(f"{name:>10}" for name in encoders))
+    for name, response in (("cards", make_response(0, 0)), ("full", make_response(3, 8)), ("long", make_response(6, 60))):
+        size = len(serialization.dumps(response))
+        times = [per_call_us(lambda: encode(response), iterations) for encode in encoders.values()]
+        print(f"{name:<12} {size:>6} " + " ".join(f"{t:>10.1f}" for t in times))
+
+    analysis = make_response(3, 8).analysis
+    text = analysis.model_dump_json()
+    fenced = f"```json\n{text}\n```"
+    truncated = text[:-len(analysis.newsletter_summary[-1].content) // 2]
+    print()
+    print("Gemini output parsing (us per response)")
+    print(f"{'legacy json.loads + .get()':<32} {per_call_us(lambda: legacy_analysis(text), iterations):>8.1f}")
+    print(f"{'llm_output.parse (valid)':<32} {per_call_us(lambda: llm_output.parse(Analysis, text), iterations):>8.1f}")
+    print(f"{'llm_output.parse (code block)':<32} {per_call_us(lambda: llm_output.parse(Analysis, fenced), iterations):>8.1f}")
+    _, missing, _ = llm_output.parse(Analysis, truncated)
+    print(f"{'llm_output.parse (truncated)':<32} "
+          f"{per_call_us(lambda: llm_output.parse(Analysis, truncated), max(1, iterations // 10)):>8.1f}"
+          f"  → re-request {missing or '-'}")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Response serialization / LLM output parsing benchmark")
+    parser.add_argument("--iterations", type=int, default=20000)
+    args = parser.parse_args()
+    run(args.iterations)
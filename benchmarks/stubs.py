@@ -0,0 +1,421 @@
+"""
+부하 테스트용 로컬 대역(stand-in) - 외부 서비스 없이 전체 파이프라인 실행
+
+- FakeGeminiClient: 스키마에 맞는 JSON을 지정한 지연 시간 후 반환 (genai.Client.models.generate_content 대역)
+  system_instruction / client.caches.create로 만든 cached_content의 지시문도 프롬프트로 취급하고,
+  캐시된 지시문(또는 같은 모델에 다시 온 system_instruction = 암묵적 캐시)은 usage의 cached 토큰으로 보고
+  prefill_rate(초당 입력 토큰)를 주면 캐시되지 않은 입력 토큰에 비례한 처리 시간을 더함 (접두어 캐시 비교용)
+  throttled에 넣은 모델은 429 오류(FakeThrottled)를 내서 대체 모델 경로를 확인할 수 있음
+  output_rate(초당 글자 수)를 주면 출력 길이에 비례한 생성 시간을 더함 (2단계 요약 비교용)
+- FixtureServer: 네이버 뉴스/Tistory 페이지 레이아웃(fixtures/*.html)에 기사 ID별 본문을 채워 서빙
+  route_to_fixture_server()로 크롤러의 요청(requests / urllib)을 이 서버로 돌림
+- FakeYoutubeDL / fake_official_transcript: yt-dlp 정보 추출, 오디오 다운로드(픽스처 WAV), 공식 자막 대역
+  영상 ID가 "cap"으로 시작하면 자막 있음, 그 외는 Whisper 경로
+- FakeWhisperModel: 오디오 길이 × 실시간 배율만큼 세그먼트를 천천히 생성 (--whisper real이면 실제 모델)
+- FakeRedisServer: 공유 캐시(services.cache) redis 백엔드용 RESP 서버 (GET/SET/DEL 등 일부 명령만)
+
+main을 import하기 전에 install_youtube_stubs()/FakeWhisperModel 패치를 적용해야 합니다. (benchmarks.load_test 참고)
+"""
+import hashlib
+import json
+import math
+import os
+import random
+import shutil
+import socketserver
+import struct
+import threading
+import time
+import types
+import urllib.request
+import wave
+from collections import Counter
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import urlparse
+
+import requests
+
+from benchmarks.dedup_bench import make_article
+
+FIXTURE_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), "fixtures")
+
+# 로컬 서버로 돌릴 호스트 (그 외 요청은 그대로 통과)
+_ROUTED_SUFFIXES = ("news.naver.com", ".tistory.com", "example.com")
+
+
+# --- Gemini ---
+
+class FakeThrottled(Exception):
+    """google.genai.errors.APIError(429 RESOURCE_EXHAUSTED) 대역"""
+
+    code = 429
+
+
+class FakeGeminiClient:
+    """genai.Client 대역: client.models.generate_content(model=, contents=, config=), client.caches.create(model=, config=)"""
+
+    def __init__(self, latency: float = 1.0, jitter: float = 0.2, seed: int = 0, throttled=(),
+                 output_rate: float = 0.0, prefill_rate: float = 0.0, min_cache_chars: int = 0):
+        self.models = self
+        self.caches = self
+        # client.caches.create: 이 길이보다 짧은 지시문은 거절 (실제 API의 최소 토큰 수 대역)
+        self.min_cache_chars = min_cache_chars
+        self.cached_contents = {}
+        self._seen_instructions = set()
+        self.last_prompt = None
+        self.latency = latency
+        self.jitter = jitter
+        self.output_rate = output_rate
+        self.prefill_rate = prefill_rate
+        self.calls = 0
+        # 입력 토큰 합계 / 그중 캐시된 토큰 합계
+        self.prompt_tokens = 0
+        self.cached_tokens = 0
+        # 모델별 호출 수 (할당량 초과로 거절한 호출 포함)
+        self.calls_by_model = Counter()
+        self.throttled = set(throttled)
+        self._rng = random.Random(seed)
+        self._lock = threading.Lock()
+
+    def create(self, model, config):
+        """client.caches.create 대역 → CachedContent(name=)"""
+        instruction = config["system_instruction"]
+        if len(instruction) < self.min_cache_chars:
+            raise ValueError(f"400 INVALID_ARGUMENT: cached content is too small ({len(instruction)} chars)")
+        with self._lock:
+            name = f"cachedContents/{len(self.cached_contents) + 1}"
+            self.cached_contents[name] = (model, instruction)
+        return types.SimpleNamespace(name=name, model=model)
+
+    def generate_content(self, model, contents, config=None):
+        with self._lock:
+            self.calls += 1
+            self.calls_by_model[model] += 1
+            delay = max(0.0, self.latency + self._rng.uniform(-self.jitter, self.jitter))
+        if model in self.throttled:
+            raise FakeThrottled(f"429 RESOURCE_EXHAUSTED: {model}")
+
+        config = config or {}
+        cached_tokens = None
+        instruction = config.get("system_instruction")
+        if config.get("cached_content"):
+            if config["cached_content"] not in self.cached_contents:
+                raise ValueError(f"404 NOT_FOUND: {config['cached_content']}")
+            _, instruction = self.cached_contents[config["cached_content"]]
+            cached_tokens = len(instruction) // 2
+        elif instruction:
+            with self._lock:
+                if (model, instruction) in self._seen_instructions:
+                    cached_tokens = len(instruction) // 2
+                self._seen_instructions.add((model, instruction))
+        prompt = contents if isinstance(contents, str) else json.dumps(contents, ensure_ascii=False, default=str)
+        if instruction:
+            prompt = f"{instruction}\n{prompt}"
+        self.last_prompt = prompt
+        if '"summary"' in prompt:
+            # 계층 컬렉션 요약의 부분 요약
+            payload = {"summary": "생산성 도구와 업무 습관을 다룬 뉴스레터 묶음입니다."}
+        elif "컬렉션" in prompt:
+            payload = {"small_card_summary": "개발자 생산성 모음", "medium_card_summary": "실무에 바로 쓰는 도구와 습관을 모았습니다."}
+        else:
+            # 프롬프트가 요구한 필드만 반환 (2단계 요약: 카드 / 뉴스레터 본문 프롬프트)
+            payload = {}
+            if '"category"' in prompt:
+                payload.update({
+                    "category": "IT/과학",
+                    "topic": "인공지능",
+                    "small_card_summary": "부하 테스트용 요약",
+                    "medium_card_summary": "로컬 대역 Gemini가 반환한 요약입니다. 실제 모델 호출은 없습니다.",
+                })
+            if '"newsletter_summary"' in prompt:
+                payload["newsletter_summary"] = [
+                    {"title": f"소제목{i}", "content": "로컬 대역이 만든 뉴스레터 문단입니다. " * 8} for i in range(1, 4)
+                ]
+        text = json.dumps(payload, ensure_ascii=False)
+        if self.output_rate:
+            delay += len(text) / self.output_rate
+        if self.prefill_rate:
+            delay += (len(prompt) // 2 - (cached_tokens or 0)) / self.prefill_rate
+        with self._lock:
+            self.prompt_tokens += len(prompt) // 2
+            self.cached_tokens += cached_tokens or 0
+        time.sleep(delay)
+        usage = types.SimpleNamespace(
+            prompt_token_count=len(prompt) // 2,
+            candidates_token_count=len(text) // 2,
+            cached_content_token_count=cached_tokens,
+            total_token_count=(len(prompt) + len(text)) // 2,
+        )
+        return types.SimpleNamespace(text=text, parsed=payload, usage_metadata=usage)
+
+
+# --- 웹 페이지 ---
+
+def _load_fixture(name: str) -> str:
+    with open(os.path.join(FIXTURE_DIR, name), encoding="utf-8") as f:
+        return f.read()
+
+
+def render_page(host: str, path: str) -> str:
+    """호스트별 레이아웃에 경로(기사 ID)로 결정되는 본문을 채운 HTML"""
+    template = _load_fixture("tistory_post.html" if host.endswith(".tistory.com") else "naver_news.html")
+    rng = random.Random(int(hashlib.md5(f"{host}{path}".encode()).hexdigest()[:8], 16))
+    paragraphs = make_article(rng, sentences=30).split("\n")
+    title = " ".join(paragraphs[0].split()[:6])
+    body = "\n".join(f"<p>{p}</p>" if host.endswith(".tistory.com") else f"{p}<br><br>" for p in paragraphs)
+    return (template.replace("{{TITLE}}", title)
+            .replace("{{LEAD}}", paragraphs[1][:80])
+            .replace("{{BODY}}", body))
+
+
+class _FixtureHandler(BaseHTTPRequestHandler):
+    def do_GET(self):
+        # 경로 형식: /{원래 호스트}/{원래 경로}
+        _, host, rest = self.path.split("/", 2)
+        body = render_page(host, "/" + rest).encode("utf-8")
+        etag = '"%s"' % hashlib.md5(body).hexdigest()
+        if self.headers.get("If-None-Match") == etag:
+            self.send_response(304)
+            self.send_header("ETag", etag)
+            self.end_headers()
+            return
+        self.send_response(200)
+        self.send_header("Content-Type", "text/html; charset=utf-8")
+        self.send_header("Content-Length", str(len(body)))
+        self.send_header("ETag", etag)
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, *args):
+        pass
+
+
+class FixtureServer:
+    def __init__(self, latency: float = 0.0):
+        handler = type("Handler", (_FixtureHandler,), {})
+        if latency:
+            base_get = handler.do_GET
+
+            def do_GET(self):
+                time.sleep(latency)
+                base_get(self)
+            handler.do_GET = do_GET
+        self._server = ThreadingHTTPServer(("127.0.0.1", 0), handler)
+        self._server.daemon_threads = True
+        self.base_url = f"http://127.0.0.1:{self._server.server_address[1]}"
+        threading.Thread(target=self._server.serve_forever, daemon=True).start()
+
+    def close(self):
+        self._server.shutdown()
+        self._server.server_close()
+
+
+def _rewrite(url: str, base_url: str) -> str:
+    parsed = urlparse(url)
+    host = (parsed.hostname or "").lower()
+    if not host.endswith(_ROUTED_SUFFIXES):
+        return url
+    path = parsed.path + (f"?{parsed.query}" if parsed.query else "")
+    return f"{base_url}/{host}{path}"
+
+
+def route_to_fixture_server(base_url: str):
+    """크롤러의 requests.Session / urllib.request.urlopen 요청을 FixtureServer로 돌림"""
+    session_request = requests.Session.request
+
+    def request(self, method, url, *args, **kwargs):
+        return session_request(self, method, _rewrite(url, base_url), *args, **kwargs)
+
+    requests.Session.request = request
+
+    urlopen = urllib.request.urlopen
+
+    def routed_urlopen(req, *args, **kwargs):
+        if isinstance(req, urllib.request.Request):
+            req.full_url = _rewrite(req.full_url, base_url)
+        else:
+            req = _rewrite(req, base_url)
+        return urlopen(req, *args, **kwargs)
+
+    urllib.request.urlopen = routed_urlopen
+
+
+# --- YouTube / Whisper ---
+
+def make_wav(path: str, seconds: float, sample_rate: int = 16000):
+    """Whisper 경로용 픽스처 오디오 (440Hz 사인파, 16kHz mono)"""
+    with wave.open(path, "wb") as w:
+        w.setnchannels(1)
+        w.setsampwidth(2)
+        w.setframerate(sample_rate)
+        frames = bytearray()
+        for i in range(int(seconds * sample_rate)):
+            frames += struct.pack("<h", int(8000 * math.sin(2 * math.pi * 440 * i / sample_rate)))
+        w.writeframes(bytes(frames))
+
+
+def wav_seconds(path: str) -> float:
+    try:
+        with wave.open(path, "rb") as w:
+            return w.getnframes() / w.getframerate()
+    except (wave.Error, EOFError):
+        return 0.0
+
+
+def video_info(video_id: str, duration: int) -> dict:
+    """yt-dlp extract_info 결과 형태의 영상 정보"""
+    return {
+        "id": video_id,
+        "title": f"부하 테스트 영상 {video_id}",
+        "duration": duration,
+        "description": "로컬 대역 영상 설명입니다.\n00:00 인트로\n00:10 본론",
+        "thumbnail": f"https://i.ytimg.com/vi/{video_id}/maxresdefault.jpg",
+        "uploader": "archiveat-bench",
+        "chapters": [{"start_time": 0, "end_time": 10, "title": "인트로"},
+                     {"start_time": 10, "end_time": duration, "title": "본론"}],
+    }
+
+
+class FakeYoutubeDL:
+    """yt_dlp.YoutubeDL 대역 (audio_fixture: download() 시 복사할 WAV)"""
+
+    audio_fixture = ""
+    duration = 30
+
+    def __init__(self, opts=None):
+        self.opts = opts or {}
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        return False
+
+    @staticmethod
+    def _video_id(url: str) -> str:
+        from services.canonical import canonicalize
+        return canonicalize(url).key.split(":", 1)[1]
+
+    def extract_info(self, url, download=False):
+        return video_info(self._video_id(url), self.duration)
+
+    def download(self, urls):
+        for url in urls:
+            video_id = self._video_id(url)
+            target = self.opts["outtmpl"].replace("%(id)s", video_id).replace("%(ext)s", "mp3")
+            shutil.copyfile(self.audio_fixture, target)
+            for hook in self.opts.get("progress_hooks", []):
+                hook({"status": "finished", "filename": target})
+        return 0
+
+
+def fake_official_transcript(self, video_id):
+    """YouTubeProcessor._get_official_transcript 대역: "cap"으로 시작하는 ID만 자막 있음"""
+    if video_id.startswith("cap"):
+        return " ".join(make_article(random.Random(video_id), sentences=40).split("\n"))
+    return None
+
+
+class FakeWhisperModel:
+    """faster_whisper.WhisperModel 대역: 오디오 길이 × realtime_factor초 동안 5초 단위 세그먼트 생성"""
+
+    realtime_factor = 0.05
+
+    def __init__(self, *args, **kwargs):
+        pass
+
+    def transcribe(self, audio_path, clip_timestamps="0", **kwargs):
+        duration = wav_seconds(audio_path)
+        factor = self.realtime_factor
+        # clip_timestamps=[0, max_seconds]이면 그 구간만 인식 (partial 단계 비용)
+        end = duration if clip_timestamps == "0" else min(duration, clip_timestamps[-1])
+
+        def segments():
+            start = 0.0
+            while start < end:
+                time.sleep(min(5.0, end - start) * factor)
+                yield types.SimpleNamespace(start=start, end=min(start + 5, end), text="음성 인식 결과 문장입니다.")
+                start += 5.0
+
+        info = types.SimpleNamespace(language="ko", language_probability=0.99, duration=duration)
+        return segments(), info
+
+
+def install_youtube_stubs(audio_fixture: str, duration: int):
+    """yt-dlp / 공식 자막 대역 설치 (services.youtube import 이후 호출 가능)"""
+    import services.youtube as youtube
+
+    FakeYoutubeDL.audio_fixture = audio_fixture
+    FakeYoutubeDL.duration = duration
+    youtube.yt_dlp = types.SimpleNamespace(YoutubeDL=FakeYoutubeDL)
+    youtube.YouTubeProcessor._get_official_transcript = fake_official_transcript
+
+
+# --- Redis (공유 캐시) ---
+
+class _RedisHandler(socketserver.StreamRequestHandler):
+    def _read_command(self):
+        line = self.rfile.readline()
+        if not line.startswith(b"*"):
+            return None
+        args = []
+        for _ in range(int(line[1:-2])):
+            length = int(self.rfile.readline()[1:-2])
+            args.append(self.rfile.read(length + 2)[:-2])
+        return args
+
+    def handle(self):
+        server = self.server
+        while True:
+            args = self._read_command()
+            if not args:
+                return
+            name = args[0].upper().decode()
+            with server.lock:
+                server.commands += 1
+                self.wfile.write(server.execute(name, args[1:]))
+
+
+class FakeRedisServer(socketserver.ThreadingTCPServer):
+    """메모리 dict 기반 Redis 대역 (PING, GET, SET [EX|PX], DEL, SELECT, AUTH, FLUSHDB)"""
+
+    daemon_threads = True
+    allow_reuse_address = True
+
+    def __init__(self):
+        super().__init__(("127.0.0.1", 0), _RedisHandler)
+        self.data = {}
+        self.lock = threading.Lock()
+        self.commands = 0
+        self.url = f"redis://127.0.0.1:{self.server_address[1]}/0"
+        threading.Thread(target=self.serve_forever, daemon=True).start()
+
+    def execute(self, name: str, args: list) -> bytes:
+        if name == "PING":
+            return b"+PONG\r\n"
+        if name in ("SELECT", "AUTH"):
+            return b"+OK\r\n"
+        if name == "FLUSHDB":
+            self.data.clear()
+            return b"+OK\r\n"
+        if name == "GET":
+            entry = self.data.get(args[0])
+            if entry is None or (entry[1] is not None and entry[1] <= time.time()):
+                self.data.pop(args[0], None)
+                return b"$-1\r\n"
+            return b"$%d\r\n%s\r\n" % (len(entry[0]), entry[0])
+        if name == "SET":
+            expires_at = None
+            if len(args) >= 4:
+                unit = args[2].upper()
+                expires_at = time.time() + int(args[3]) / (1000 if unit == b"PX" else 1)
+            self.data[args[0]] = (args[1], expires_at)
+            return b"+OK\r\n"
+        if name == "DEL":
+            removed = sum(1 for key in args if self.data.pop(key, None) is not None)
+            return b":%d\r\n" % removed
+        return b"-ERR unknown command '%s'\r\n" % name.encode()
+
+    def close(self):
+        self.shutdown()
+        self.server_close()
@@ -2,6 +2,7 @@ import asyncio # [추가] 비동기 처리를 위한 모듈
 import os
 import logging
 import sys
+from typing import Optional
 
 # 로깅 설정
 # Uvicorn 실행 시 로그가 보이지 않는 문제 해결을 위해 stdout 핸들러 명시적 추가
@@ -104,26 +105,68 @@ def setup_cookies():
 setup_cookies()
 
 
-from fastapi import FastAPI, HTTPException
+import functools
+import time
+from typing import Callable, List, Tuple
+
+from fastapi import Depends, FastAPI, HTTPException, Request, Response
 from fastapi.middleware.cors import CORSMiddleware
+from fastapi.responses import JSONResponse, StreamingResponse
+from pydantic import BaseModel
 from models import (
     SummarizeYoutubeRequest,
     SummarizeGenericRequest,
     SummarizeNaverNewsRequest,
     SummarizeTistoryRequest,
     SummarizeCollectionRequest,
+    SummarizeUrlRequest,
+    ReanalyzeRequest,
     PythonSummaryResponse,
     CollectionSummaryResponse,
+    NewsletterJobResponse,
     HealthResponse,
     VideoInfo,
     ArticleInfo,
     Analysis,
-    NewsletterSummaryBlock
+    InputBudget,
 )
-from services.youtube import YouTubeProcessor
-from services.summarizer import GeminiSummarizer
+from services.youtube import YouTubeProcessor, record_transcription, transcribe_file
+from services.summarizer import CARD_PROMPTS, CONTENT_PROMPTS, MEMO_PREFIX, PROMPT_VERSION, GeminiSummarizer
 from services.naver_news import NaverNewsProcessor
 from services.tistory import TistoryProcessor
+from services.http_cache import HttpCache
+from services.artifact_store import ArtifactStore
+from services.canonical import canonicalize
+from services.coalesce import RequestCoalescer
+from services.dedup import NearDuplicateIndex, simhash
+from services.newsletter_jobs import NewsletterJobs
+from services.canonical import NAVER_NEWS, TISTORY, YOUTUBE
+from services import (
+    cache, cancellation, cassette, classifier, collection, executors, llm_output, metrics, profiling, scheduler,
+    serialization, tiers, tokens,
+)
+from services.cancellation import PipelineCancelled
+from services.transcription_server import WHISPER_SERVER_SOCKET, RemoteTranscriber, TranscriptionServerUnavailable
+from services.admission import (
+    ADMISSION_DOWNGRADE, ARTICLE as ARTICLE_COST, CAPTIONS, DEFAULT_AUDIO_SECONDS, WHISPER,
+    AdmissionRejected, default_controller, record_shed,
+)
+from services.extractors import (
+    ARTICLE,
+    CHEAP_HTML,
+    EXPENSIVE_AUDIO,
+    VIDEO,
+    Extractor,
+    ExtractorRegistry,
+)
+
+# Server-Timing 헤더/응답 timings 필드를 모든 요청에 붙일지 여부 (기본: X-Server-Timing 헤더로 요청 시에만)
+SERVER_TIMING_ENABLED = os.getenv("SERVER_TIMING", "0") == "1"
+# 요청에서 two_phase를 지정하지 않았을 때 2단계 요약(카드 먼저, 뉴스레터 본문은 백그라운드) 사용 여부
+TWO_PHASE_ENABLED = os.getenv("TWO_PHASE", "0") == "1"
+# 뉴스레터 작업 롱 폴링(?wait=) 최대 대기 시간, SSE keep-alive 주기 (초)
+NEWSLETTER_MAX_WAIT = 30
+NEWSLETTER_SSE_KEEPALIVE = 15
 
 # 외부 라이브러리(httpx 등) 로그가 너무 시끄러우면 레벨 조정
 logging.getLogger("httpx").setLevel(logging.WARNING)
@@ -145,10 +188,544 @@ app.add_middleware(
 
 # 서비스 초기화
 # Whisper tiny 모델: 가장 빠른 음성 인식 (정확도는 낮지만 속도 우선)
-yt_processor = YouTubeProcessor(model_size="tiny")
-summarizer = GeminiSummarizer()
-naver_processor = NaverNewsProcessor()
-tistory_processor = TistoryProcessor()
+# 음성 인식을 공유 모델 서버(WHISPER_SERVER_SOCKET)나 프로세스 풀에서 할 때는 이 프로세스에 모델을 올리지 않음
+remote_transcriber = RemoteTranscriber(WHISPER_SERVER_SOCKET) if WHISPER_SERVER_SOCKET else None
+yt_processor = YouTubeProcessor(
+    model_size="tiny",
+    load_model=remote_transcriber is None and not executors.TRANSCRIPTION_USE_PROCESSES,
+)
+# 요약/음성 인식/크롤링 결과 공유 캐시 (CACHE_BACKEND: memory / sqlite / redis / off)
+# 로컬 카테고리/토픽 분류기 (CLASSIFIER_MODE, 모델 파일이 없으면 Gemini만 사용) + 학습 예시 기록
+summarizer = GeminiSummarizer(
+    cache=cache.get_cache(cache.SUMMARY),
+    topic_classifier=classifier.load_default(),
+    examples=classifier.ExampleLog() if classifier.CLASSIFIER_MODE != classifier.OFF else None,
+)
+transcript_cache = cache.get_cache(cache.TRANSCRIPT)
+crawl_cache = cache.get_cache(cache.CRAWL)
+# 크롤러 공용 조건부 GET 캐시 (같은 URL 재아카이브 시 재다운로드/재파싱 생략)
+http_cache = HttpCache()
+naver_processor = NaverNewsProcessor(http_cache=http_cache)
+tistory_processor = TistoryProcessor(http_cache=http_cache)
+# 같은 콘텐츠(정규화 키 기준)에 대한 동시 추출 요청은 한 번만 실행
+extract_coalescer = RequestCoalescer()
+# 재배포/교차 게시된 유사 기사는 기존 요약 재사용
+dedup_index = NearDuplicateIndex()
+# 추출 결과(본문/자막) 보관 → 메모/프롬프트만 바꾼 재분석은 Gemini 단계만 실행
+artifact_store = ArtifactStore()
+# 2단계 요약의 뉴스레터 본문 백그라운드 작업 (끝난 결과는 공유 캐시에도 저장)
+newsletter_jobs = NewsletterJobs(cache=cache.get_cache(cache.NEWSLETTER))
+
+# 비용 등급별 동시 처리 한도 (초과 시 503 + Retry-After)
+admission = default_controller()
+
+# 운영 트래픽 기록/오프라인 재생 (CASSETTE_MODE, 기본 off)
+cassette_store = cassette.default_store()
+
+# URL 도메인/패턴 → 전용 추출기 라우팅 (/api/v1/summarize/url)
+extractor_registry = ExtractorRegistry()
+extractor_registry.register(Extractor(
+    name="youtube", cost_class=EXPENSIVE_AUDIO, kind=VIDEO, process=yt_processor.extract,
+    canonical_kinds=frozenset({YOUTUBE}),
+))
+extractor_registry.register(Extractor(
+    name="naver-news", cost_class=CHEAP_HTML, kind=ARTICLE, process=naver_processor.process,
+    canonical_kinds=frozenset({NAVER_NEWS}), domains=frozenset({"news.naver.com"}),
+))
+extractor_registry.register(Extractor(
+    name="tistory", cost_class=CHEAP_HTML, kind=ARTICLE, process=tistory_processor.process,
+    canonical_kinds=frozenset({TISTORY}), domains=frozenset({"tistory.com"}),
+))
+# 그 외 사이트는 readability 기반 일반 파서 (NaverNewsProcessor의 일반 웹 경로 재사용)
+extractor_registry.register(Extractor(
+    name="readability", cost_class=CHEAP_HTML, kind=ARTICLE, process=naver_processor.process,
+), fallback=True)
+
+
+def extract_cached(extractor: Extractor, url: str, key: str) -> dict:
+    """공유 캐시에 있으면 재사용, 없으면 추출 후 성공한 결과만 저장 (카세트 기록 중에는 외부 호출이 기록되도록 항상 추출)"""
+    cached = None if cassette.recording() else crawl_cache.get(key)
+    if cached is not None:
+        return cached
+    result = extractor.process(url)
+    if not result.get("error"):
+        crawl_cache.set(key, result)
+    return result
+
+
+async def run_extractor(extractor: Extractor, url: str) -> dict:
+    """추출기 실행 (같은 콘텐츠에 대한 동시 요청은 병합)"""
+    logger.info(f"Extracting with '{extractor.name}' ({extractor.cost_class} -> {extractor.executor}): {url}")
+    key = f"{extractor.name}|{canonicalize(url).key}"
+    # [수정] 비용 등급별 전용 실행기에서 실행 (html은 crawl, yt-dlp는 media - 서로/Whisper/LLM 작업 뒤에서 대기하지 않음)
+    if cassette.recording():
+        # 기록 중인 요청은 다른 요청의 결과를 받아 쓰면 카세트에 html/youtube_info 기록이 남지 않음
+        return await executors.run(extractor.executor, extract_cached, extractor, url, key)
+    return await extract_coalescer.run(
+        key,
+        lambda: executors.run(extractor.executor, extract_cached, extractor, url, key)
+    )
+
+
+async def store_artifact(extractor: Extractor, url: str, data: dict) -> Optional[str]:
+    """추출 결과를 아티팩트 저장소에 보관 → 아티팩트 ID (저장 실패는 요약을 막지 않음)"""
+    try:
+        return await executors.run(
+            executors.CRAWL, artifact_store.put, canonicalize(url).key, url, extractor.name, extractor.kind, data
+        )
+    except PipelineCancelled:
+        raise
+    except Exception as e:
+        logger.warning(f"Failed to store artifact for {url}: {e}")
+        return None
+
+
+async def transcribe_youtube(url: str, video_data: dict, max_seconds: Optional[float] = None) -> str:
+    """공식 자막이 없는 영상: 오디오 다운로드(media) → Whisper 음성 인식(transcription, max_seconds: 앞부분만)"""
+    cache_key = f"{yt_processor.model_size}|{video_data['video_id']}|{max_seconds}"
+
+    async def cached_transcribe():
+        # 다른 레플리카가 이미 인식한 영상이면 공유 캐시에서 재사용
+        cached = await executors.run(executors.CRAWL, transcript_cache.get, cache_key)
+        if cached is not None:
+            return cached
+        text = await download_and_transcribe()
+        await executors.run(executors.CRAWL, transcript_cache.set, cache_key, text)
+        return text
+
+    async def download_and_transcribe():
+        audio_path = await executors.run(executors.MEDIA, yt_processor.download_audio, url, video_data["video_id"], max_seconds)
+        if remote_transcriber is not None:
+            # 전역 대기열은 모델 서버가 관리, 여기서는 응답 대기 스레드만 점유
+            result = await executors.run(executors.TRANSCRIPTION, remote_transcriber.transcribe, audio_path, max_seconds)
+            record_transcription(result)
+            return result["text"]
+        if executors.TRANSCRIPTION_USE_PROCESSES:
+            result = await executors.run(
+                executors.TRANSCRIPTION, transcribe_file, audio_path, yt_processor.model_size, max_seconds
+            )
+            record_transcription(result)
+            return result["text"]
+        result = await executors.run(executors.TRANSCRIPTION, yt_processor.transcribe, audio_path, max_seconds)
+        return result["text"]
+
+    # 카세트 재생 시에는 오디오 다운로드/음성 인식 대신 기록된 결과 사용
+    # (기록은 캐시/병합 바깥에서 하므로 캐시 적중이나 다른 요청과 병합된 결과도 이 요청의 카세트에 남음)
+    return await cassette.acall(
+        "transcript", f"{video_data['video_id']}|{max_seconds}",
+        lambda: extract_coalescer.run(f"whisper|{max_seconds}|{canonicalize(url).key}", cached_transcribe),
+    )
+
+
+async def transcribe_with_tier(url: str, video_data: dict, requested_tier: Optional[str]):
+    """
+    요청 단계(또는 자동 선택)에 맞춰 자막 텍스트 준비 → (사용한 단계, 텍스트)
+
+    자동 선택은 full → partial → metadata 순으로, 음성 인식 한도를 넘거나
+    남은 마감 시간 안에 끝나지 않을 것으로 예상되면 다음 단계로 내려갑니다.
+    요청에서 단계를 직접 지정했는데 한도를 넘으면 503입니다.
+    """
+    duration = video_data.get("duration") or DEFAULT_AUDIO_SECONDS
+    candidates = tiers.candidate_tiers(requested_tier, duration, ADMISSION_DOWNGRADE)
+    token = cancellation.current()
+
+    for i, tier in enumerate(candidates):
+        if tier == tiers.METADATA:
+            logger.warning(f"Summarizing from metadata only: {url}")
+            return tier, ""
+
+        audio_seconds = tiers.transcription_seconds(tier, duration)
+        is_last = i == len(candidates) - 1
+        remaining = token.remaining() if token else None
+        if not is_last and remaining is not None and admission.estimate_seconds(WHISPER, audio_seconds) > remaining:
+            # 마감 시간 안에 끝나지 않을 단계는 시작하지 않음
+            record_shed(WHISPER, "downgraded")
+            logger.warning(f"Tier '{tier}' would exceed deadline ({remaining:.0f}s left), downgrading: {url}")
+            continue
+
+        with admission.admit(WHISPER, audio_seconds, downgrade=not is_last) as can_transcribe:
+            if not can_transcribe:
+                logger.warning(f"Whisper capacity exceeded for tier '{tier}', downgrading: {url}")
+                continue
+            max_seconds = tiers.PARTIAL_TRANSCRIPTION_SECONDS if tier == tiers.PARTIAL else None
+            return tier, await transcribe_youtube(url, video_data, max_seconds)
+
+    # candidate_tiers의 마지막 단계는 거절 시 예외를 던지므로 도달하지 않음
+    raise RuntimeError("No transcription tier available")
+
+
+def youtube_summary_input(video_data: dict, tier: str) -> str:
+    """YouTube 요약 입력: 설명 + 자막 (metadata 단계는 메타데이터만)"""
+    if tier == tiers.METADATA:
+        return tiers.metadata_text(video_data)
+    return (video_data.get("description") or "") + "\n" + (video_data.get("transcript") or "")
+
+
+def with_memo(content: str, user_memo: Optional[str]) -> str:
+    """사용자 메모를 본문 앞에 붙임 (분류 우선순위에 활용)"""
+    if not user_memo:
+        return content
+    logger.info(f"User memo provided: {user_memo}")
+    return f"{MEMO_PREFIX} {user_memo}]\n\n{content}"
+
+
+def split_memo(content: str) -> Tuple[str, str]:
+    """with_memo 결과 → (메모 머리말, 본문) (메모가 없으면 머리말은 빈 문자열)"""
+    if not content.startswith(MEMO_PREFIX):
+        return "", content
+    head, separator, body = content.partition("]\n\n")
+    return head + separator, body
+
+
+def build_analysis(analysis_result: dict) -> Analysis:
+    """
+    Gemini 분석 결과 → 응답 모델 (2단계 요약의 카드 결과면 newsletter_summary는 빈 목록)
+    [수정] 요약기가 스키마(models.Analysis / CardSummary)로 검증한 결과이므로 .get() 기본값 없이 그대로 변환
+    """
+    return Analysis.model_validate({"newsletter_summary": [], **analysis_result})
+
+
+def use_two_phase(requested: Optional[bool], prompt_version: Optional[str] = None) -> bool:
+    """
+    2단계 요약 여부 (요청의 two_phase > TWO_PHASE 설정)
+
+    카세트 기록/재생 중인 요청(응답 후 호출은 기록되지 않음)이나
+    2단계 프롬프트가 없는 버전이면 단일 호출로 처리합니다.
+    """
+    two_phase = TWO_PHASE_ENABLED if requested is None else requested
+    if not two_phase or cassette.current() is not None:
+        return False
+    return (prompt_version or PROMPT_VERSION) in CARD_PROMPTS
+
+
+def check_analysis(analysis_result: dict):
+    """Gemini 분석 실패 → 500 (복구/재요청 후에도 스키마에 맞지 않는 출력이면 502)"""
+    if "error" in analysis_result:
+        logger.error(f"Gemini analysis error: {analysis_result['error']}")
+        if analysis_result.get("kind") == llm_output.INVALID_OUTPUT:
+            raise HTTPException(status_code=502, detail=f"LLM returned invalid output: {analysis_result['error']}")
+        raise HTTPException(status_code=500, detail=f"LLM analysis failed: {analysis_result['error']}")
+
+
+async def prepare_content(title: str, content: str, content_type: Optional[str] = None) -> Tuple[str, InputBudget]:
+    """
+    Gemini 입력 예산 계획(services.tokens) → (요약에 넣을 본문, 계획)
+
+    예산을 크게 넘는 본문(chunked)은 조각별 요점을 LLM 실행기에서 동시에 정리하고 요점 모음을 본문 대신 사용합니다.
+    사용자 메모는 조각에 섞지 않고 본문 앞에 다시 붙입니다.
+    """
+    memo, body = split_memo(content)
+    # 긴 자막은 정리/자르기/조각 나누기에 수백 ms가 걸리므로 이벤트 루프 밖에서 계획
+    plan = await executors.run(executors.CRAWL, tokens.plan, body)
+    metrics.record_input_plan(plan.action, plan.tokens)
+    if plan.action == tokens.CHUNKED:
+        logger.info(f"Content over token budget ({plan.tokens} tokens), summarizing {len(plan.chunks)} chunks first")
+        partials = await asyncio.gather(*(
+            executors.run(
+                executors.LLM, summarizer.summarize_content_chunk, title, chunk, index, len(plan.chunks),
+                content_type=content_type
+            )
+            for index, chunk in enumerate(plan.chunks, 1)
+        ))
+        for partial in partials:
+            check_analysis(partial)
+        body = "\n".join(
+            f"[{index}/{len(partials)}번째 조각 요약] {partial['summary']}" for index, partial in enumerate(partials, 1)
+        )
+    elif plan.action != tokens.AS_IS:
+        logger.info(f"Content over token budget ({plan.tokens} tokens), plan: {plan.action}")
+        body = plan.text
+    return memo + body, InputBudget(plan=plan.action, estimated_tokens=plan.tokens, sent_tokens=tokens.estimate(body))
+
+
+async def run_analysis(
+    title: str,
+    content: str,
+    content_type: Optional[str] = None,
+    prompt_version: Optional[str] = None,
+    two_phase: bool = False,
+    on_complete: Optional[Callable[[dict], None]] = None,
+) -> Tuple[dict, Optional[str], Optional[InputBudget]]:
+    """
+    Gemini 분석 → (분석 결과, 뉴스레터 작업 ID, 입력 예산 계획)
+
+    two_phase면 분류 + 카드 요약만 받아 바로 반환하고, 뉴스레터 본문은 백그라운드 작업으로 생성합니다.
+    on_complete(전체 분석 결과): 뉴스레터 본문까지 끝났을 때 호출 (유사 중복 색인 등록 등)
+    [수정] 호출 전에 입력 예산에 맞춰 본문을 정리/축약 (카드 요약과 뉴스레터 본문 모두 같은 본문 사용)
+    """
+    content, input_budget = await prepare_content(title, content, content_type)
+    if not two_phase:
+        # [수정] LLM 전용 실행기에서 실행
+        analysis_result = await executors.run(
+            executors.LLM, summarizer.summarize_content, title, content, prompt_version, content_type=content_type
+        )
+        check_analysis(analysis_result)
+        if on_complete is not None:
+            on_complete(analysis_result)
+        return analysis_result, None, input_budget
+
+    cards = await executors.run(
+        executors.LLM, summarizer.summarize_cards, title, content, prompt_version, content_type=content_type
+    )
+    check_analysis(cards)
+    # 카드 결과에 본문 블록이 섞여 와도 응답에는 싣지 않음 (뉴스레터 작업 결과로만 전달)
+    cards = {key: value for key, value in cards.items() if key != "newsletter_summary"}
+
+    async def generate_newsletter() -> List[dict]:
+        result = await executors.run(
+            executors.LLM, summarizer.summarize_newsletter, title, content, cards, prompt_version,
+            content_type=content_type
+        )
+        if "error" in result:
+            raise RuntimeError(result["error"])
+        blocks = result["newsletter_summary"]
+        if on_complete is not None:
+            on_complete({**cards, "newsletter_summary": blocks})
+        return blocks
+
+    job = newsletter_jobs.submit(generate_newsletter)
+    logger.info(f"Card summary ready, newsletter job {job.id} started")
+    return cards, job.id, input_budget
+
+
+async def analyze_article(url: str, crawl_result: dict, user_memo: Optional[str],
+                          two_phase: bool = False) -> Tuple[dict, Optional[str], Optional[InputBudget]]:
+    """
+    크롤링된 기사 본문을 Gemini로 분석 (네이버 뉴스/Tistory 공용) → (분석 결과, 뉴스레터 작업 ID, 입력 예산 계획)
+
+    이미 요약한 콘텐츠와 유사 중복이면 Gemini 호출 없이 기존 분석 결과를 재사용합니다.
+    """
+    # SimHash는 긴 본문에서 100ms 이상 걸리므로 실행기에서 한 번만 계산해 조회/등록에 같이 사용
+    fingerprint = await executors.run(executors.CRAWL, simhash, crawl_result["content"])
+    # 카세트 기록 중에는 재사용하지 않음 (재생 시 필요한 gemini 기록이 남도록)
+    duplicate = None if cassette.recording() else dedup_index.lookup(crawl_result["content"], user_memo, fingerprint)
+    metrics.record_cache("dedup", duplicate is not None)
+    if duplicate:
+        logger.info(f"Reusing analysis from near-duplicate {duplicate.key} (similarity {duplicate.similarity:.3f})")
+        return duplicate.analysis, None, None
+
+    logger.info("Starting Gemini AI analysis...")
+    # 유사 중복 색인에는 뉴스레터 본문까지 갖춘 결과만 등록
+    return await run_analysis(
+        crawl_result["title"],
+        with_memo(crawl_result["content"], user_memo),
+        content_type=ARTICLE,
+        two_phase=two_phase,
+        on_complete=lambda result: dedup_index.add(
+            canonicalize(url).key, crawl_result["content"], result, user_memo, fingerprint
+        ),
+    )
+
+
+async def reduce_collection(newsletters: List[str]) -> List[str]:
+    """
+    큰 컬렉션 계층 요약: 입력 예산(COLLECTION_PROMPT_CHARS)에 들 때까지 묶음별 부분 요약으로 줄임
+
+    묶음은 LLM 실행기에서 동시에 요약하고, 뉴스레터를 하나 추가한 컬렉션은
+    바뀐 묶음만 다시 요약합니다. (나머지는 공유 캐시의 부분 요약 재사용)
+    """
+    items = collection.prepare(newsletters)
+    level = 0
+    while collection.over_budget(items) and len(items) > 1:
+        level += 1
+        chunks = collection.chunk(items)
+        logger.info(f"Collection reduce level {level}: {len(items)} items -> {len(chunks)} chunks")
+        partials = await asyncio.gather(*(
+            executors.run(executors.LLM, summarizer.summarize_collection_chunk, chunk) for chunk in chunks
+        ))
+        for partial in partials:
+            check_analysis(partial)
+        items = [collection.partial_item(chunk, partial.get("summary", "")) for chunk, partial in zip(chunks, partials)]
+    return items
+
+
+@app.middleware("http")
+async def metrics_middleware(request: Request, call_next):
+    """엔드포인트별 지연/진행 중 요청 수 기록 + 단계 계측용 엔드포인트 라벨 지정"""
+    # 등록되지 않은 경로(404 등)는 라벨 폭증 방지를 위해 하나로 묶음
+    route_paths = {route.path for route in app.routes}
+    endpoint = request.url.path if request.url.path in route_paths else "other"
+    if endpoint == "/metrics":
+        return await call_next(request)
+
+    token = metrics.set_endpoint(endpoint)
+    # opt-in: 단계별 시간 기록 → Server-Timing 헤더 (+ 응답 body의 timings)
+    timings = None
+    if SERVER_TIMING_ENABLED or request.headers.get("x-server-timing", "").lower() in ("1", "true"):
+        timings = metrics.start_request_timings()
+
+    # opt-in: 요약 요청 프로파일링 (관리자 헤더 또는 PROFILE_SAMPLE_RATE) → X-Profile-Id
+    profile = None
+    if endpoint.startswith("/api/v1/summarize/"):
+        profile = profiling.maybe_start(endpoint, request.headers)
+
+    in_flight = metrics.REQUESTS_IN_FLIGHT.labels(endpoint)
+    in_flight.inc()
+    start = time.perf_counter()
+    status = 500
+    try:
+        response = await call_next(request)
+        status = response.status_code
+        if timings is not None:
+            response.headers["Server-Timing"] = timings.server_timing_header()
+        if profile is not None:
+            response.headers["X-Profile-Id"] = profile.id
+        return response
+    finally:
+        if profile is not None:
+            await asyncio.to_thread(profiling.finish, profile)
+        metrics.REQUEST_LATENCY.labels(endpoint, str(status)).observe(time.perf_counter() - start)
+        in_flight.dec()
+        metrics.reset_endpoint(token)
+
+
+def json_response(model: BaseModel) -> Response:
+    """
+    응답 모델 직렬화 (serialization 단계 계측 포함)
+
+    단계별 시간 기록이 켜진 요청이면 직렬화 직전까지의 timings를 응답에 채웁니다.
+    (serialization 자체 시간은 Server-Timing 헤더에만 포함)
+    """
+    timings = metrics.current_timings()
+    if timings is not None and "timings" in type(model).model_fields:
+        model.timings = timings.as_millis()
+    with metrics.stage_timer("serialization"):
+        body = serialization.dumps(model)
+    return Response(content=body, media_type="application/json")
+
+
+async def watch_disconnect(request: Request, token: cancellation.CancelToken):
+    """클라이언트 연결 종료 감시 → 취소 토큰에 반영 (본문을 다 읽은 뒤 남는 메시지는 disconnect뿐)"""
+    while True:
+        message = await request.receive()
+        if message["type"] == "http.disconnect":
+            if not token.cancelled:
+                logger.warning(f"Client disconnected, cancelling pipeline: {request.url.path}")
+                token.cancel(cancellation.DISCONNECT)
+            return
+
+
+async def request_cancellation(request: Request):
+    """
+    요청별 취소 토큰 (요약 엔드포인트 공통 의존성)
+
+    X-Request-Timeout(초) 헤더로 마감 시간을 받고, 클라이언트 연결 종료를 감시합니다.
+    (요청 본문을 읽은 뒤 실행되므로 본문 수신과 경합하지 않음)
+    """
+    timeout = None
+    header = request.headers.get("x-request-timeout")
+    if header:
+        try:
+            timeout = float(header)
+        except ValueError:
+            raise HTTPException(status_code=400, detail=f"Invalid X-Request-Timeout: {header}")
+
+    token = cancellation.start(timeout)
+    watcher = asyncio.create_task(watch_disconnect(request, token))
+    try:
+        yield token
+    finally:
+        watcher.cancel()
+
+
+async def request_cassette(request: Request):
+    """
+    카세트 기록/재생 (요약 엔드포인트 공통 의존성, CASSETTE_MODE가 off면 아무것도 하지 않음)
+
+    record: 샘플링된 요청의 외부 호출 결과를 응답 후 저장
+    replay: 기록(X-Cassette 헤더로 지정)으로 외부 호출 대체
+    """
+    if not cassette_store.enabled:
+        yield None
+        return
+
+    # 본문은 FastAPI가 이미 읽어 둔 것을 재사용
+    current = cassette_store.begin(request.url.path, await request.json(), request.headers.get("x-cassette"))
+    cassette.bind(current)
+    start = time.perf_counter()
+    try:
+        yield current
+    finally:
+        if current is not None and not current.replaying:
+            cassette_store.save(current, time.perf_counter() - start)
+
+
+async def request_priority(request: Request):
+    """
+    우선순위 등급 (요약 엔드포인트 공통 의존성): X-Priority 헤더 > 본문 priority 필드 > normal
+
+    실행기 자리 배정(services.scheduler)에 사용됩니다.
+    """
+    priority = request.headers.get("x-priority")
+    if priority is None:
+        body = await request.json()
+        priority = body.get("priority") if isinstance(body, dict) else None
+    if priority is not None and priority not in scheduler.PRIORITIES:
+        raise HTTPException(status_code=400, detail=f"Invalid priority: {priority} (choose from {', '.join(scheduler.PRIORITIES)})")
+    scheduler.set_priority(priority)
+    return priority or scheduler.NORMAL
+
+
+# 요약 파이프라인 엔드포인트 공통 의존성
+PIPELINE_DEPENDENCIES = [Depends(request_cancellation), Depends(request_cassette), Depends(request_priority)]
+
+
+@app.exception_handler(PipelineCancelled)
+async def pipeline_cancelled_handler(request: Request, exc: PipelineCancelled):
+    """취소된 요청: 마감 초과는 504, 연결 종료는 499 (받을 클라이언트는 없음)"""
+    status_code = 504 if exc.reason == cancellation.DEADLINE else 499
+    return JSONResponse(status_code=status_code, content={"detail": str(exc)})
+
+
+def admitted(cost_class: str):
+    """엔드포인트 전체를 수락 제어로 감쌈 (한도 초과 시 작업 시작 전에 503 + Retry-After)"""
+    def decorator(func):
+        @functools.wraps(func)
+        async def wrapper(*args, **kwargs):
+            with admission.admit(cost_class):
+                return await func(*args, **kwargs)
+        return wrapper
+    return decorator
+
+
+@app.exception_handler(AdmissionRejected)
+async def admission_rejected_handler(request: Request, exc: AdmissionRejected):
+    """과부하로 수락 거절 → 503 + Retry-After"""
+    return JSONResponse(
+        status_code=503,
+        content={"detail": str(exc)},
+        headers={"Retry-After": str(exc.retry_after)},
+    )
+
+
+@app.get("/metrics")
+async def prometheus_metrics():
+    """Prometheus 수집용 지표"""
+    body, content_type = metrics.render_latest()
+    return Response(content=body, media_type=content_type)
+
+
+def require_admin(request: Request):
+    """관리자 엔드포인트 인증 (X-Admin-Token == PROFILE_ADMIN_TOKEN, 미설정 시 모두 거절)"""
+    if not profiling.is_admin(request.headers.get("x-admin-token")):
+        raise HTTPException(status_code=403, detail="Admin token required")
+
+
+@app.get("/admin/profiles", dependencies=[Depends(require_admin)])
+async def list_profiles():
+    """저장된 요청 프로파일 목록 (최신순)"""
+    return {"profiles": await asyncio.to_thread(profiling.list_profiles)}
+
+
+@app.get("/admin/profiles/{profile_id}", dependencies=[Depends(require_admin)])
+async def get_profile(profile_id: str, format: str = "json"):
+    """요청 프로파일 조회 (format=folded: flamegraph용 folded stacks)"""
+    artifact = await asyncio.to_thread(profiling.load, profile_id)
+    if artifact is None:
+        raise HTTPException(status_code=404, detail=f"Profile not found: {profile_id}")
+    if format == "folded":
+        return Response(content=profiling.folded_stacks(artifact), media_type="text/plain")
+    return artifact
 
 
 @app.get("/health", response_model=HealthResponse)
@@ -160,40 +737,58 @@ async def health_check():
     )
 
 
-@app.post("/api/v1/summarize/youtube", response_model=PythonSummaryResponse)
+@app.post("/api/v1/summarize/youtube", response_model=PythonSummaryResponse, dependencies=PIPELINE_DEPENDENCIES)
+@admitted(CAPTIONS)
 async def summarize_youtube(request: SummarizeYoutubeRequest):
     """
     YouTube URL을 받아 영상 정보 추출 및 LLM 요약 수행
-    
+        
     처리 시간: 약 5-10초
     - YouTube 데이터 추출: 2-3초
     - Gemini LLM 요약: 3-7초
     """
     logger.info(f"Received YouTube summarization request: {request.url}")
-    
+        
     try:
         # 1. YouTube 데이터 추출 (Blocking -> Non-blocking)
         logger.info("Extracting YouTube data...")
-        # [수정] 동기 함수인 yt_processor.process를 별도 스레드에서 실행
-        video_data = await asyncio.to_thread(yt_processor.process, request.url)
+        # [수정] 영상 정보/자막 조회는 크롤링 실행기, 음성 인식은 전용 실행기에서 실행
+        video_data = await run_extractor(extractor_registry.get("youtube"), request.url)
         
         if "error" in video_data:
             logger.error(f"YouTube processing error: {video_data['error']}")
             raise HTTPException(status_code=400, detail=video_data["error"])
+
+        tier = tiers.CAPTIONS
+        if video_data.get("transcript") is None:
+            # 공식 자막 없음 → 요청 단계(또는 부하에 따라 자동 선택)로 음성 인식
+            try:
+                tier, transcript = await transcribe_with_tier(request.url, video_data, request.tier)
+            except (PipelineCancelled, AdmissionRejected):
+                raise
+            except TranscriptionServerUnavailable as e:
+                logger.error(f"Whisper model server error: {e}")
+                raise HTTPException(status_code=503, detail=str(e))
+            except Exception as e:
+                logger.error(f"YouTube transcription error: {e}", exc_info=True)
+                raise HTTPException(status_code=400, detail=str(e))
+            # 병합된 요청들이 같은 dict를 공유하므로 복사본에 기록
+            video_data = {**video_data, "transcript": transcript}
+
+        # 영상 정보 + 자막/음성 인식 결과 보관 (재분석 시 재인식 없이 사용)
+        artifact_id = await store_artifact(extractor_registry.get("youtube"), request.url, {**video_data, "tier": tier})
+        summary_input = youtube_summary_input(video_data, tier)
         
         # 2. Gemini AI 분석 및 요약 (Blocking -> Non-blocking)
         logger.info("Starting Gemini AI analysis...")
-        # [수정] 동기 함수인 summarizer.summarize_content를 별도 스레드에서 실행
-        analysis_result = await asyncio.to_thread(
-            summarizer.summarize_content,
+        # [수정] 동기 함수인 summarizer.summarize_content를 LLM 전용 실행기에서 실행
+        analysis_result, newsletter_job_id, input_budget = await run_analysis(
             video_data["title"],
-            (video_data.get("description") or "") + "\n" + (video_data.get("transcript") or "")
+            summary_input,
+            content_type=VIDEO,
+            two_phase=use_two_phase(request.two_phase)
         )
         
-        if "error" in analysis_result:
-            logger.error(f"Gemini analysis error: {analysis_result['error']}")
-            raise HTTPException(status_code=500, detail=f"LLM analysis failed: {analysis_result['error']}")
-        
         # 3. 응답 데이터 구성
         video_info = VideoInfo(
             title=video_data["title"],
@@ -203,39 +798,27 @@ async def summarize_youtube(request: SummarizeYoutubeRequest):
             duration=video_data["duration"]
         )
         
-        # ... (생략) ...
-        
-        # newsletter_summary를 Pydantic 모델로 변환
-        newsletter_blocks = [
-            NewsletterSummaryBlock(title=block.get("title", ""), content=block.get("content", ""))
-            for block in analysis_result.get("newsletter_summary", [])
-            if isinstance(block, dict)
-        ]
-        
-        analysis = Analysis(
-            category=analysis_result.get("category", "기타"),
-            topic=analysis_result.get("topic", "기타"),
-            small_card_summary=analysis_result.get("small_card_summary", ""),
-            medium_card_summary=analysis_result.get("medium_card_summary", ""),
-            newsletter_summary=newsletter_blocks
-        )
-        
         response = PythonSummaryResponse(
             video_info=video_info,
-            analysis=analysis
+            analysis=build_analysis(analysis_result),
+            tier=tier,
+            artifact_id=artifact_id,
+            newsletter_job_id=newsletter_job_id,
+            input_budget=input_budget
         )
         
         logger.info(f"Successfully processed YouTube URL: {request.url}")
-        return response
+        return json_response(response)
         
-    except HTTPException:
+    except (HTTPException, AdmissionRejected, PipelineCancelled):
         raise
     except Exception as e:
         logger.exception(f"Unexpected error processing YouTube URL: {request.url}")
         raise HTTPException(status_code=500, detail=f"Internal server error: {str(e)}")
 
 
-@app.post("/api/v1/summarize/generic", response_model=PythonSummaryResponse)
+@app.post("/api/v1/summarize/generic", response_model=PythonSummaryResponse, dependencies=PIPELINE_DEPENDENCIES)
+@admitted(ARTICLE_COST)
 async def summarize_generic(request: SummarizeGenericRequest):
     """
     일반 텍스트 콘텐츠 요약 (향후 확장용)
@@ -244,200 +827,240 @@ async def summarize_generic(request: SummarizeGenericRequest):
     
     try:
         # Gemini AI 분석 (Blocking -> Non-blocking)
-        # [수정] 별도 스레드 실행
-        analysis_result = await asyncio.to_thread(
-            summarizer.summarize_content,
+        # [수정] LLM 전용 실행기에서 실행
+        analysis_result, newsletter_job_id, input_budget = await run_analysis(
             request.title,
-            request.content
-        )
-        
-        if "error" in analysis_result:
-            logger.error(f"Gemini analysis error: {analysis_result['error']}")
-            raise HTTPException(status_code=500, detail=f"LLM analysis failed: {analysis_result['error']}")
-        
-        # ... (생략) ...
-        
-        # newsletter_summary를 Pydantic 모델로 변환
-        newsletter_blocks = [
-            NewsletterSummaryBlock(title=block["title"], content=block["content"])
-            for block in analysis_result.get("newsletter_summary", [])
-        ]
-        
-        analysis = Analysis(
-            category=analysis_result.get("category", "기타"),
-            topic=analysis_result.get("topic", "기타"),
-            small_card_summary=analysis_result.get("small_card_summary", ""),
-            medium_card_summary=analysis_result.get("medium_card_summary", ""),
-            newsletter_summary=newsletter_blocks
+            request.content,
+            two_phase=use_two_phase(request.two_phase)
         )
         
         response = PythonSummaryResponse(
             video_info=None,
-            analysis=analysis
+            analysis=build_analysis(analysis_result),
+            newsletter_job_id=newsletter_job_id,
+            input_budget=input_budget
         )
         
         logger.info(f"Successfully processed generic content: {request.title}")
-        return response
+        return json_response(response)
         
-    except HTTPException:
+    except (HTTPException, PipelineCancelled):
         raise
     except Exception as e:
         logger.exception(f"Unexpected error processing generic content: {request.title}")
         raise HTTPException(status_code=500, detail=f"Internal server error: {str(e)}")
 
 
-@app.post("/api/v1/summarize/naver-news", response_model=PythonSummaryResponse)
-async def summarize_naver_news(request: SummarizeNaverNewsRequest):
-    """
-    네이버 뉴스 또는 일반 웹 콘텐츠 요약
-    """
-    logger.info(f"Received Naver news summarization request: {request.url}")
-    
+async def summarize_article(extractor: Extractor, url: str, user_memo: Optional[str],
+                            two_phase: Optional[bool] = None) -> PythonSummaryResponse:
+    """기사형 콘텐츠 공통 처리 (추출기의 비용 등급에 맞는 수락 제어 아래에서 실행)"""
+    with admission.admit(extractor.admission_class):
+        return await _summarize_article(extractor, url, user_memo, two_phase)
+
+
+async def _summarize_article(extractor: Extractor, url: str, user_memo: Optional[str],
+                             two_phase: Optional[bool] = None) -> PythonSummaryResponse:
+    """크롤링 → Gemini 분석 → article_info 응답 구성"""
     try:
         # 1. 웹 크롤링 (Blocking -> Non-blocking)
-        logger.info("Crawling web content...")
-        # [수정] 별도 스레드 실행
-        crawl_result = await asyncio.to_thread(naver_processor.process, request.url)
-        
+        crawl_result = await run_extractor(extractor, url)
+
         if crawl_result.get("error"):
-            logger.error(f"Crawling error: {crawl_result['error']}")
+            logger.error(f"Crawling error ({extractor.name}): {crawl_result['error']}")
             raise HTTPException(status_code=400, detail=f"Crawling failed: {crawl_result['error']}")
-        
-        # 2. Gemini AI 분석 및 요약 (Blocking -> Non-blocking)
-        logger.info("Starting Gemini AI analysis...")
-        
-        content_with_memo = crawl_result["content"]
-        if request.user_memo:
-            content_with_memo = f"[사용자 메모: {request.user_memo}]\n\n{content_with_memo}"
-            logger.info(f"User memo provided: {request.user_memo}")
-        
-        # [수정] 별도 스레드 실행
-        analysis_result = await asyncio.to_thread(
-            summarizer.summarize_content,
-            crawl_result["title"],
-            content_with_memo
-        )
-        
-        if "error" in analysis_result:
-            logger.error(f"Gemini analysis error: {analysis_result['error']}")
-            raise HTTPException(status_code=500, detail=f"LLM analysis failed: {analysis_result['error']}")
-        
-        # ... (생략) ...
-        
-        # newsletter_summary를 Pydantic 모델로 변환
-        newsletter_blocks = [
-            NewsletterSummaryBlock(title=block["title"], content=block["content"])
-            for block in analysis_result.get("newsletter_summary", [])
-        ]
-        
-        analysis = Analysis(
-            category=analysis_result.get("category", "기타"),
-            topic=analysis_result.get("topic", "기타"),
-            small_card_summary=analysis_result.get("small_card_summary", ""),
-            medium_card_summary=analysis_result.get("medium_card_summary", ""),
-            newsletter_summary=newsletter_blocks
-        )
-        
-        # article_info 구성
+
+        # 크롤링 결과 보관 (재분석 시 재크롤링 없이 사용)
+        artifact_id = await store_artifact(extractor, url, crawl_result)
+
+        # 2. Gemini AI 분석 및 요약 (유사 중복이면 기존 결과 재사용)
+        analysis_result, newsletter_job_id, input_budget = await analyze_article(url, crawl_result, user_memo, use_two_phase(two_phase))
+
+        # 3. 응답 데이터 구성
         article_info = ArticleInfo(
             title=crawl_result["title"],
             thumbnail_url=crawl_result.get("thumbnail_url"),
-            content_url=request.url,
-            word_count=len(crawl_result["content"])
+            content_url=url,
+            word_count=len(crawl_result["content"]),
         )
-        
+
         response = PythonSummaryResponse(
             video_info=None,
             article_info=article_info,
-            analysis=analysis
+            analysis=build_analysis(analysis_result),
+            artifact_id=artifact_id,
+            newsletter_job_id=newsletter_job_id,
+            input_budget=input_budget
         )
-        
-        logger.info(f"Successfully processed Naver news: {request.url}")
-        return response
-        
-    except HTTPException:
+
+        logger.info(f"Successfully processed {extractor.name}: {url}")
+        return json_response(response)
+
+    except (HTTPException, PipelineCancelled):
         raise
     except Exception as e:
-        logger.exception(f"Unexpected error processing Naver news: {request.url}")
+        logger.exception(f"Unexpected error processing {extractor.name}: {url}")
         raise HTTPException(status_code=500, detail=f"Internal server error: {str(e)}")
 
 
-@app.post("/api/v1/summarize/tistory", response_model=PythonSummaryResponse)
+@app.post("/api/v1/summarize/naver-news", response_model=PythonSummaryResponse, dependencies=PIPELINE_DEPENDENCIES)
+async def summarize_naver_news(request: SummarizeNaverNewsRequest):
+    """
+    네이버 뉴스 또는 일반 웹 콘텐츠 요약
+    """
+    logger.info(f"Received Naver news summarization request: {request.url}")
+    return await summarize_article(extractor_registry.get("naver-news"), request.url, request.user_memo, request.two_phase)
+
+
+@app.post("/api/v1/summarize/tistory", response_model=PythonSummaryResponse, dependencies=PIPELINE_DEPENDENCIES)
 async def summarize_tistory(request: SummarizeTistoryRequest):
     """
     Tistory 블로그 URL을 받아 본문을 긁어오고 Gemini AI로 요약하여 응답
     """
     logger.info(f"Received Tistory summarization request: {request.url}")
+    return await summarize_article(extractor_registry.get("tistory"), request.url, request.user_memo, request.two_phase)
 
-    try:
-        # 1. Tistory 크롤링 (Blocking -> Non-blocking)
-        logger.info("Crawling Tistory content...")
-        # [수정] 별도 스레드 실행
-        crawl_result = await asyncio.to_thread(tistory_processor.process, request.url)
 
-        if crawl_result.get("error"):
-            logger.error(f"Tistory crawling error: {crawl_result['error']}")
-            raise HTTPException(status_code=400, detail=f"Crawling failed: {crawl_result['error']}")
+@app.post("/api/v1/summarize/url", response_model=PythonSummaryResponse, dependencies=PIPELINE_DEPENDENCIES)
+async def summarize_url(request: SummarizeUrlRequest):
+    """
+    URL 종류와 무관한 단일 요약 엔드포인트
 
-        # 2. Gemini AI 분석 및 요약 (Blocking -> Non-blocking)
-        logger.info("Starting Gemini AI analysis...")
+    도메인/패턴으로 추출기(YouTube, 네이버 뉴스, Tistory, readability)를 골라 처리합니다.
+    """
+    extractor = extractor_registry.resolve(request.url)
+    logger.info(f"Received URL summarization request: {request.url} -> {extractor.name}")
 
-        content_with_memo = crawl_result["content"]
-        if request.user_memo:
-            content_with_memo = f"[사용자 메모: {request.user_memo}]\n\n{content_with_memo}"
-            logger.info(f"User memo provided: {request.user_memo}")
+    if extractor.kind == VIDEO:
+        return await summarize_youtube(SummarizeYoutubeRequest(url=request.url, tier=request.tier, two_phase=request.two_phase))
+    return await summarize_article(extractor, request.url, request.user_memo, request.two_phase)
 
-        # [수정] 별도 스레드 실행
-        analysis_result = await asyncio.to_thread(
-            summarizer.summarize_content,
-            crawl_result["title"],
-            content_with_memo
-        )
 
-        if "error" in analysis_result:
-            logger.error(f"Gemini analysis error: {analysis_result['error']}")
-            raise HTTPException(status_code=500, detail=f"LLM analysis failed: {analysis_result['error']}")
+@app.post("/api/v1/reanalyze", response_model=PythonSummaryResponse, dependencies=PIPELINE_DEPENDENCIES)
+@admitted(ARTICLE_COST)
+async def reanalyze(request: ReanalyzeRequest):
+    """
+    저장된 추출 결과(기사 본문 / 영상 정보 + 자막)를 새 메모나 프롬프트 버전으로 다시 분석
 
-        # ... (생략) ...
+    크롤링/음성 인식 없이 Gemini 단계만 실행합니다. (유사 중복 재사용도 하지 않음)
+    """
+    if not request.artifact_id and not request.url:
+        raise HTTPException(status_code=400, detail="artifact_id or url is required")
+    if request.prompt_version and request.prompt_version not in CONTENT_PROMPTS:
+        raise HTTPException(status_code=400, detail=f"Unknown prompt version: {request.prompt_version}")
 
-        # 3. 응답 데이터 구성
-        newsletter_blocks = [
-            NewsletterSummaryBlock(title=block["title"], content=block["content"])
-            for block in analysis_result.get("newsletter_summary", [])
-        ]
-
-        analysis = Analysis(
-            category=analysis_result.get("category", "기타"),
-            topic=analysis_result.get("topic", "기타"),
-            small_card_summary=analysis_result.get("small_card_summary", ""),
-            medium_card_summary=analysis_result.get("medium_card_summary", ""),
-            newsletter_summary=newsletter_blocks
-        )
+    if request.artifact_id:
+        artifact = await executors.run(executors.CRAWL, artifact_store.get_by_id, request.artifact_id)
+    else:
+        artifact = await executors.run(executors.CRAWL, artifact_store.get, canonicalize(request.url).key)
+    if artifact is None:
+        raise HTTPException(status_code=404, detail=f"Artifact not found: {request.artifact_id or request.url}")
+    logger.info(f"Re-analyzing artifact {artifact.artifact_id} ({artifact.extractor}): {artifact.url}")
 
-        article_info = ArticleInfo(
-            title=crawl_result["title"],
-            thumbnail_url=crawl_result.get("thumbnail_url"),
-            content_url=request.url,
-            word_count=len(crawl_result["content"]),
-        )
+    data = artifact.data
+    tier = data.get("tier") if artifact.kind == VIDEO else None
+    if artifact.kind == VIDEO:
+        content = youtube_summary_input(data, tier)
+    else:
+        content = data["content"]
 
-        response = PythonSummaryResponse(
-            video_info=None,
-            article_info=article_info,
-            analysis=analysis
+    try:
+        analysis_result, newsletter_job_id, input_budget = await run_analysis(
+            data["title"],
+            with_memo(content, request.user_memo),
+            content_type=artifact.kind,
+            prompt_version=request.prompt_version,
+            two_phase=use_two_phase(request.two_phase, request.prompt_version)
         )
 
-        logger.info(f"Successfully processed Tistory: {request.url}")
-        return response
+        if artifact.kind == VIDEO:
+            response = PythonSummaryResponse(
+                video_info=VideoInfo(
+                    title=data["title"],
+                    thumbnail_url=data["thumbnail_url"],
+                    content_url=artifact.url,
+                    channel=data["channel"],
+                    duration=data["duration"]
+                ),
+                analysis=build_analysis(analysis_result),
+                tier=tier,
+                artifact_id=artifact.artifact_id,
+                newsletter_job_id=newsletter_job_id,
+                input_budget=input_budget
+            )
+        else:
+            response = PythonSummaryResponse(
+                article_info=ArticleInfo(
+                    title=data["title"],
+                    thumbnail_url=data.get("thumbnail_url"),
+                    content_url=artifact.url,
+                    word_count=len(data["content"]),
+                ),
+                analysis=build_analysis(analysis_result),
+                artifact_id=artifact.artifact_id,
+                newsletter_job_id=newsletter_job_id,
+                input_budget=input_budget
+            )
+        return json_response(response)
 
-    except HTTPException:
+    except (HTTPException, PipelineCancelled):
         raise
     except Exception as e:
-        logger.exception(f"Unexpected error processing Tistory: {request.url}")
+        logger.exception(f"Unexpected error re-analyzing artifact {artifact.artifact_id}")
         raise HTTPException(status_code=500, detail=f"Internal server error: {str(e)}")
 
 
-@app.post("/api/v1/summarize/collection", response_model=CollectionSummaryResponse)
+@app.get("/api/v1/newsletters/{job_id}", response_model=NewsletterJobResponse)
+async def get_newsletter(job_id: str, wait: float = 0):
+    """
+    2단계 요약의 뉴스레터 본문 작업 조회
+
+    wait: 작업이 끝날 때까지 기다릴 최대 시간(초, 최대 30) - 롱 폴링
+    """
+    job = newsletter_jobs.get(job_id)
+    if job is not None and wait > 0:
+        await job.wait(min(wait, NEWSLETTER_MAX_WAIT))
+    snapshot = await newsletter_jobs.lookup(job_id)
+    if snapshot is None:
+        raise HTTPException(status_code=404, detail=f"Newsletter job not found: {job_id}")
+    return json_response(NewsletterJobResponse(**snapshot))
+
+
+def sse_event(event: str, data: BaseModel) -> str:
+    return f"event: {event}\ndata: {serialization.dumps(data).decode()}\n\n"
+
+
+@app.get("/api/v1/newsletters/{job_id}/events")
+async def stream_newsletter(job_id: str):
+    """
+    뉴스레터 본문 작업 SSE 스트림
+
+    현재 상태(pending)를 먼저 보내고, 작업이 끝나면 done(또는 error) 이벤트로 결과를 보낸 뒤 종료합니다.
+    기다리는 동안에는 15초마다 keep-alive 주석을 보냅니다.
+    """
+    snapshot = await newsletter_jobs.lookup(job_id)
+    if snapshot is None:
+        raise HTTPException(status_code=404, detail=f"Newsletter job not found: {job_id}")
+    job = newsletter_jobs.get(job_id)
+
+    async def events():
+        if job is None or job.finished:
+            # 이미 끝났거나 다른 워커의 작업 (공유 캐시의 결과)
+            yield sse_event(snapshot["status"], NewsletterJobResponse(**snapshot))
+            return
+        yield sse_event(job.status, NewsletterJobResponse(**job.snapshot()))
+        while not await job.wait(NEWSLETTER_SSE_KEEPALIVE):
+            yield ": keep-alive\n\n"
+        yield sse_event(job.status, NewsletterJobResponse(**job.snapshot()))
+
+    return StreamingResponse(
+        events(),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"},
+    )
+
+
+@app.post("/api/v1/summarize/collection", response_model=CollectionSummaryResponse, dependencies=PIPELINE_DEPENDENCIES)
+@admitted(ARTICLE_COST)
 async def summarize_collection(request: SummarizeCollectionRequest):
     """
     여러 뉴스레터의 제목/요약을 입력받아 컬렉션용 타이틀(Small Card)과 설명(Medium Card)을 생성
@@ -445,26 +1068,24 @@ async def summarize_collection(request: SummarizeCollectionRequest):
     logger.info(f"Received collection summarization request for {len(request.newsletters)} items")
     
     try:
+        # [수정] 입력 예산을 넘는 큰 컬렉션은 묶음별 부분 요약으로 먼저 줄임
+        newsletters = await reduce_collection(request.newsletters)
+
         # Gemini AI 분석 (Blocking -> Non-blocking)
-        # [수정] 별도 스레드 실행
-        analysis_result = await asyncio.to_thread(
+        # [수정] LLM 전용 실행기에서 실행
+        analysis_result = await executors.run(
+            executors.LLM,
             summarizer.summarize_collection,
-            request.newsletters
+            newsletters
         )
         
-        if "error" in analysis_result:
-            logger.error(f"Gemini analysis error: {analysis_result['error']}")
-            raise HTTPException(status_code=500, detail=f"LLM analysis failed: {analysis_result['error']}")
-        
-        response = CollectionSummaryResponse(
-            small_card_summary=analysis_result.get("small_card_summary", ""),
-            medium_card_summary=analysis_result.get("medium_card_summary", "")
-        )
+        check_analysis(analysis_result)
+        response = CollectionSummaryResponse.model_validate(analysis_result)
         
         logger.info("Successfully processed collection summary")
-        return response
+        return json_response(response)
         
-    except HTTPException:
+    except (HTTPException, PipelineCancelled):
         raise
     except Exception as e:
         logger.exception("Unexpected error processing collection summary")
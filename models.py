@@ -1,30 +1,63 @@
 from pydantic import BaseModel, HttpUrl
-from typing import List, Optional
+from typing import Dict, List, Literal, Optional
+
+# YouTube 요약 품질 단계 (services.tiers), 지정하지 않으면 서버 부하에 따라 자동 선택
+YoutubeTier = Literal["full", "partial", "metadata"]
+# 처리 우선순위 등급 (services.scheduler), X-Priority 헤더로도 지정 가능 (헤더 우선)
+Priority = Literal["interactive", "normal", "background"]
 
 
 # Request Models
 class SummarizeYoutubeRequest(BaseModel):
     url: str
+    tier: Optional[YoutubeTier] = None  # 공식 자막이 없을 때의 처리 단계
+    priority: Optional[Priority] = None  # 기본 normal
+    two_phase: Optional[bool] = None  # 카드 요약 먼저 응답, 뉴스레터 본문은 나중에 (기본: 서버 설정 TWO_PHASE)
 
 
 class SummarizeGenericRequest(BaseModel):
     title: str
     content: str
+    priority: Optional[Priority] = None  # 기본 normal
+    two_phase: Optional[bool] = None  # 카드 요약 먼저 응답, 뉴스레터 본문은 나중에 (기본: 서버 설정 TWO_PHASE)
 
 
 class SummarizeNaverNewsRequest(BaseModel):
     url: str
     user_memo: Optional[str] = None  # 사용자 메모 (분류 우선순위에 활용)
+    priority: Optional[Priority] = None  # 기본 normal
+    two_phase: Optional[bool] = None  # 카드 요약 먼저 응답, 뉴스레터 본문은 나중에 (기본: 서버 설정 TWO_PHASE)
 
 
 class SummarizeTistoryRequest(BaseModel):
     url: str
     user_memo: Optional[str] = None  # 사용자 메모 (분류 우선순위에 활용)
+    priority: Optional[Priority] = None  # 기본 normal
+    two_phase: Optional[bool] = None  # 카드 요약 먼저 응답, 뉴스레터 본문은 나중에 (기본: 서버 설정 TWO_PHASE)
+
+
+class SummarizeUrlRequest(BaseModel):
+    url: str  # YouTube / 네이버 뉴스 / Tistory / 일반 웹 (서버가 도메인으로 판별)
+    user_memo: Optional[str] = None  # 사용자 메모 (기사형 콘텐츠 분류에 활용)
+    tier: Optional[YoutubeTier] = None  # YouTube일 때만 사용
+    priority: Optional[Priority] = None  # 기본 normal
+    two_phase: Optional[bool] = None  # 카드 요약 먼저 응답, 뉴스레터 본문은 나중에 (기본: 서버 설정 TWO_PHASE)
+
+
+class ReanalyzeRequest(BaseModel):
+    # 저장된 추출 결과를 지정: 요약 응답의 artifact_id 또는 요약했던 URL (둘 중 하나)
+    artifact_id: Optional[str] = None
+    url: Optional[str] = None
+    user_memo: Optional[str] = None  # 새 사용자 메모 (기사형 콘텐츠 분류에 활용)
+    prompt_version: Optional[str] = None  # 요약 프롬프트 버전 (기본: 서버 설정 PROMPT_VERSION)
+    priority: Optional[Priority] = None  # 기본 normal
+    two_phase: Optional[bool] = None  # 카드 요약 먼저 응답, 뉴스레터 본문은 나중에 (기본: 서버 설정 TWO_PHASE)
 
 
 class SummarizeCollectionRequest(BaseModel):
     # 각 뉴스레터의 제목과 요약(small_card_summary 등)을 리스트로 전달받음
-    newsletters: List[str] 
+    newsletters: List[str]
+    priority: Optional[Priority] = None  # 기본 normal
 
 
 class CollectionSummaryResponse(BaseModel):
@@ -53,18 +86,62 @@ class NewsletterSummaryBlock(BaseModel):
     content: str
 
 
-class Analysis(BaseModel):
+class CardSummary(BaseModel):
     category: str
     topic: str
     small_card_summary: str
     medium_card_summary: str
+
+
+class Analysis(CardSummary):
+    newsletter_summary: List[NewsletterSummaryBlock]
+
+
+# Gemini 출력 스키마 (services.llm_output) - Analysis / CardSummary / CollectionSummaryResponse 외
+class NewsletterSummary(BaseModel):
     newsletter_summary: List[NewsletterSummaryBlock]
 
 
+class CollectionChunkSummary(BaseModel):
+    summary: str
+
+
+class ContentChunkSummary(BaseModel):
+    summary: str
+
+
+# 입력 처리 방식 (services.tokens)
+InputPlan = Literal["as_is", "compact", "truncate", "chunked"]
+
+
+class InputBudget(BaseModel):
+    plan: InputPlan  # 그대로 / 공백·중복 줄 정리 / 앞뒤만 남김 / 조각별 요점 정리 후 요약
+    estimated_tokens: int  # 원문 추정 토큰 수
+    sent_tokens: int  # 요약 호출에 넣은 본문의 추정 토큰 수 (chunked면 요점 모음)
+
+
 class PythonSummaryResponse(BaseModel):
     video_info: Optional[VideoInfo] = None
     article_info: Optional[ArticleInfo] = None
     analysis: Analysis
+    # 단계별 소요 시간(ms) - X-Server-Timing 헤더로 요청했거나 SERVER_TIMING=1일 때만 채워짐
+    timings: Optional[Dict[str, float]] = None
+    # YouTube 요약에 사용한 단계: captions / full / partial / metadata (기사형 콘텐츠는 None)
+    tier: Optional[str] = None
+    # 저장된 추출 결과 ID - /api/v1/reanalyze로 재크롤링 없이 다시 분석할 때 사용
+    artifact_id: Optional[str] = None
+    # 2단계 요약일 때 뉴스레터 본문 작업 ID (analysis.newsletter_summary는 빈 목록)
+    # GET /api/v1/newsletters/{newsletter_job_id} 또는 .../events(SSE)로 결과 수신
+    newsletter_job_id: Optional[str] = None
+    # Gemini 입력 예산 계획 (유사 중복 결과를 재사용해 Gemini를 호출하지 않았으면 None)
+    input_budget: Optional[InputBudget] = None
+
+
+class NewsletterJobResponse(BaseModel):
+    job_id: str
+    status: Literal["pending", "done", "error"]
+    newsletter_summary: Optional[List[NewsletterSummaryBlock]] = None  # status가 done일 때만
+    error: Optional[str] = None  # status가 error일 때만
 
 
 class HealthResponse(BaseModel):
@@ -0,0 +1,146 @@
+"""
+요청 수락 제어 (admission control / load shedding)
+
+과부하 시 이미 Whisper에 CPU를 쓴 뒤 클라이언트가 타임아웃으로 떠나는 대신,
+작업 시작 전에 비용을 추정해 한도를 넘으면 바로 503 + Retry-After로 거절합니다.
+
+비용 등급별 한도 (동시에 처리 중인 비용 합계 기준):
+- article: 기사 크롤링 + LLM, 본문 직접 요약(generic), 컬렉션 요약 (요청 1건 = 1)  ADMISSION_ARTICLE_LIMIT (기본 64)
+- captions: YouTube 정보/자막 조회 + LLM (요청 1건 = 1) ADMISSION_CAPTIONS_LIMIT (기본 32)
+- whisper: 자막이 없어 음성 인식이 필요한 경우 추가 (영상 길이, 초) ADMISSION_WHISPER_AUDIO_LIMIT (기본 3600)
+
+음성 인식 한도 초과 시 ADMISSION_DOWNGRADE=1(기본)이면 거절 대신 더 싼 단계(services.tiers)로 요약합니다.
+Retry-After는 등급별 처리 시간 EWMA(비용 1단위당 초)로 한도 초과분이 빠지는 데 걸릴 시간을 추정합니다.
+"""
+import logging
+import math
+import os
+import threading
+import time
+from contextlib import contextmanager
+from typing import Dict
+
+from services.metrics import ADMISSION_IN_USE, ADMISSION_SHED
+
+logger = logging.getLogger(__name__)
+
+ARTICLE = "article"
+CAPTIONS = "captions"
+WHISPER = "whisper"
+
+ADMISSION_ARTICLE_LIMIT = float(os.getenv("ADMISSION_ARTICLE_LIMIT", "64"))
+ADMISSION_CAPTIONS_LIMIT = float(os.getenv("ADMISSION_CAPTIONS_LIMIT", "32"))
+ADMISSION_WHISPER_AUDIO_LIMIT = float(os.getenv("ADMISSION_WHISPER_AUDIO_LIMIT", "3600"))
+ADMISSION_DOWNGRADE = os.getenv("ADMISSION_DOWNGRADE", "1") == "1"
+MAX_RETRY_AFTER = int(os.getenv("ADMISSION_MAX_RETRY_AFTER", "600"))
+
+# 관측 전 초기값: 비용 1단위 처리에 걸리는 시간(초)
+_INITIAL_SECONDS_PER_UNIT = {ARTICLE: 3.0, CAPTIONS: 6.0, WHISPER: 0.3}
+_EWMA_ALPHA = 0.2
+# 길이를 알 수 없는 영상(라이브 등)의 음성 인식 비용 추정치(초)
+DEFAULT_AUDIO_SECONDS = 600
+
+
+class AdmissionRejected(Exception):
+    """한도 초과로 거절 (retry_after: 재시도까지 권장 대기 시간, 초)"""
+
+    def __init__(self, cost_class: str, retry_after: int):
+        super().__init__(f"Server is busy ({cost_class}), retry after {retry_after}s")
+        self.cost_class = cost_class
+        self.retry_after = retry_after
+
+
+class AdmissionController:
+    def __init__(self, limits: Dict[str, float]):
+        self.limits = dict(limits)
+        self._in_use = {name: 0.0 for name in limits}
+        self._tickets = {name: 0 for name in limits}
+        self._seconds_per_unit = {name: _INITIAL_SECONDS_PER_UNIT.get(name, 1.0) for name in limits}
+        self._lock = threading.Lock()
+
+    def try_acquire(self, cost_class: str, cost: float = 1.0):
+        """한도 안이면 비용 예약, 초과면 AdmissionRejected"""
+        with self._lock:
+            in_use = self._in_use[cost_class]
+            limit = self.limits[cost_class]
+            # 한도보다 큰 단일 작업(아주 긴 영상)도 다른 작업이 없으면 수락
+            if in_use > 0 and in_use + cost > limit:
+                retry_after = self._retry_after_locked(cost_class, in_use + cost - limit)
+                raise AdmissionRejected(cost_class, retry_after)
+            self._in_use[cost_class] = in_use + cost
+            self._tickets[cost_class] += 1
+        ADMISSION_IN_USE.labels(cost_class).set(in_use + cost)
+
+    def release(self, cost_class: str, cost: float, elapsed: float):
+        """예약 해제 + 처리 시간 EWMA 갱신"""
+        with self._lock:
+            self._in_use[cost_class] = max(0.0, self._in_use[cost_class] - cost)
+            self._tickets[cost_class] -= 1
+            if cost > 0:
+                previous = self._seconds_per_unit[cost_class]
+                self._seconds_per_unit[cost_class] = (1 - _EWMA_ALPHA) * previous + _EWMA_ALPHA * (elapsed / cost)
+            in_use = self._in_use[cost_class]
+        ADMISSION_IN_USE.labels(cost_class).set(in_use)
+
+    def estimate_seconds(self, cost_class: str, cost: float) -> float:
+        """비용 cost 작업의 예상 처리 시간(초, 관측 EWMA 기준)"""
+        with self._lock:
+            return self._seconds_per_unit[cost_class] * cost
+
+    def _retry_after_locked(self, cost_class: str, excess: float) -> int:
+        """초과분(excess)이 빠지는 데 걸리는 예상 시간: 단위당 처리 시간 × 초과분 ÷ 동시 처리 건수"""
+        parallel = max(1, self._tickets[cost_class])
+        seconds = self._seconds_per_unit[cost_class] * excess / parallel
+        return max(1, min(MAX_RETRY_AFTER, math.ceil(seconds)))
+
+    @contextmanager
+    def admit(self, cost_class: str, cost: float = 1.0, downgrade: bool = False):
+        """
+        비용 예약 후 작업 실행. 한도 초과 시 AdmissionRejected,
+        downgrade=True면 거절 대신 False를 넘겨 호출 측이 저비용 모드로 처리
+
+        사용 예:
+            with admission.admit(WHISPER, duration, downgrade=True) as admitted:
+                transcript = transcribe() if admitted else ""
+        """
+        try:
+            self.try_acquire(cost_class, cost)
+        except AdmissionRejected as e:
+            action = "downgraded" if downgrade else "rejected"
+            record_shed(cost_class, action)
+            logger.warning(f"Admission {action}: {cost_class} cost={cost} (retry after {e.retry_after}s)")
+            if not downgrade:
+                raise
+            yield False
+            return
+
+        start = time.perf_counter()
+        try:
+            yield True
+        finally:
+            self.release(cost_class, cost, time.perf_counter() - start)
+
+    def stats(self) -> Dict[str, dict]:
+        with self._lock:
+            return {
+                name: {
+                    "in_use": self._in_use[name],
+                    "limit": self.limits[name],
+                    "requests": self._tickets[name],
+                    "seconds_per_unit": round(self._seconds_per_unit[name], 3),
+                }
+                for name in self.limits
+            }
+
+
+def record_shed(cost_class: str, action: str):
+    """거절(rejected) / 저비용 모드 전환(downgraded) 건수"""
+    ADMISSION_SHED.labels(cost_class, action).inc()
+
+
+def default_controller() -> AdmissionController:
+    return AdmissionController({
+        ARTICLE: ADMISSION_ARTICLE_LIMIT,
+        CAPTIONS: ADMISSION_CAPTIONS_LIMIT,
+        WHISPER: ADMISSION_WHISPER_AUDIO_LIMIT,
+    })
@@ -0,0 +1,168 @@
+"""
+추출 결과 아티팩트 저장소 (재분석용)
+
+크롤링한 기사 본문, YouTube 영상 정보 + 자막/음성 인식 결과를 요청 후에도 보관해
+user_memo나 프롬프트 버전만 바꿔 다시 분석할 때 재크롤링/재인식 없이 Gemini 단계만 실행합니다.
+(POST /api/v1/reanalyze)
+
+- 본문은 내용 주소 방식: JSON(sort_keys)의 SHA-256이 아티팩트 ID, zlib 압축 파일로 저장
+  (같은 내용이 여러 URL에서 나와도 한 번만 저장)
+- 인덱스(index.sqlite3): 정규화 키(services.canonical) → 최신 아티팩트 ID, URL, 추출기, 종류
+- ARTIFACT_MAX_AGE(일, 기본 30)보다 오래된 인덱스 항목과 참조가 없어진 본문은 저장 시 정리
+"""
+import hashlib
+import json
+import logging
+import os
+import re
+import sqlite3
+import threading
+import time
+import zlib
+from dataclasses import dataclass
+from typing import Iterator, Optional
+
+logger = logging.getLogger(__name__)
+
+ARTIFACT_DIR = os.getenv("ARTIFACT_DIR", "cache/artifacts")
+ARTIFACT_MAX_AGE = float(os.getenv("ARTIFACT_MAX_AGE", "30")) * 24 * 3600
+
+_ARTIFACT_ID_RE = re.compile(r"^[0-9a-f]{64}$")
+# 정리 작업 주기 (저장 N회마다)
+_EVICT_EVERY = 100
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS artifacts (
+    key TEXT PRIMARY KEY,
+    artifact_id TEXT NOT NULL,
+    url TEXT NOT NULL,
+    extractor TEXT NOT NULL,
+    kind TEXT NOT NULL,
+    size INTEGER NOT NULL,
+    stored_at REAL NOT NULL
+)
+"""
+_INDEX = "CREATE INDEX IF NOT EXISTS artifacts_by_id ON artifacts (artifact_id)"
+
+
+@dataclass
+class Artifact:
+    artifact_id: str
+    key: str
+    url: str
+    extractor: str
+    kind: str
+    data: dict
+    stored_at: float
+
+
+def _encode(data: dict) -> bytes:
+    return json.dumps(data, ensure_ascii=False, sort_keys=True).encode("utf-8")
+
+
+class ArtifactStore:
+    """SQLite 인덱스 + 압축 본문 파일 (스레드 안전)"""
+
+    def __init__(self, directory: str = ARTIFACT_DIR, max_age: float = ARTIFACT_MAX_AGE):
+        self.directory = directory
+        self.blob_dir = os.path.join(directory, "blobs")
+        self.max_age = max_age
+        os.makedirs(self.blob_dir, exist_ok=True)
+
+        self._lock = threading.Lock()
+        self._puts = 0
+        self._conn = sqlite3.connect(os.path.join(directory, "index.sqlite3"), check_same_thread=False)
+        self._conn.execute(_SCHEMA)
+        self._conn.execute(_INDEX)
+        self._conn.commit()
+
+    def _blob_path(self, aid: str) -> str:
+        return os.path.join(self.blob_dir, aid[:2], f"{aid}.zz")
+
+    def put(self, key: str, url: str, extractor: str, kind: str, data: dict) -> str:
+        """추출 결과 저장 → 아티팩트 ID (같은 내용이면 본문은 다시 쓰지 않음)"""
+        encoded = _encode(data)
+        aid = hashlib.sha256(encoded).hexdigest()
+        path = self._blob_path(aid)
+        if not os.path.exists(path):
+            os.makedirs(os.path.dirname(path), exist_ok=True)
+            # 동시에 같은 내용을 저장해도 깨진 파일이 보이지 않도록 임시 파일 → rename
+            tmp = f"{path}.{threading.get_ident()}.tmp"
+            with open(tmp, "wb") as f:
+                f.write(zlib.compress(encoded, 6))
+            os.replace(tmp, path)
+
+        with self._lock:
+            self._conn.execute(
+                "INSERT OR REPLACE INTO artifacts (key, artifact_id, url, extractor, kind, size, stored_at) "
+                "VALUES (?, ?, ?, ?, ?, ?, ?)",
+                (key, aid, url, extractor, kind, len(encoded), time.time())
+            )
+            self._conn.commit()
+            self._puts += 1
+            if self._puts % _EVICT_EVERY == 0:
+                self._evict_locked()
+        return aid
+
+    def get(self, key: str) -> Optional[Artifact]:
+        """정규화 키로 최신 아티팩트 조회"""
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT artifact_id, key, url, extractor, kind, stored_at FROM artifacts WHERE key = ?", (key,)
+            ).fetchone()
+        return self._load(row)
+
+    def get_by_id(self, aid: str) -> Optional[Artifact]:
+        """아티팩트 ID로 조회 (같은 내용의 URL이 여러 개면 가장 최근 것)"""
+        if not _ARTIFACT_ID_RE.match(aid):
+            return None
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT artifact_id, key, url, extractor, kind, stored_at FROM artifacts "
+                "WHERE artifact_id = ? ORDER BY stored_at DESC LIMIT 1", (aid,)
+            ).fetchone()
+        return self._load(row)
+
+    def scan(self) -> Iterator[Artifact]:
+        """저장된 모든 아티팩트 (정규화 키별 최신, 오래된 순) - 오프라인 분석/학습용"""
+        with self._lock:
+            rows = self._conn.execute(
+                "SELECT artifact_id, key, url, extractor, kind, stored_at FROM artifacts ORDER BY stored_at"
+            ).fetchall()
+        for row in rows:
+            artifact = self._load(row)
+            if artifact is not None:
+                yield artifact
+
+    def _load(self, row) -> Optional[Artifact]:
+        if row is None:
+            return None
+        aid, key, url, extractor, kind, stored_at = row
+        try:
+            with open(self._blob_path(aid), "rb") as f:
+                data = json.loads(zlib.decompress(f.read()).decode("utf-8"))
+        except (OSError, zlib.error, ValueError) as e:
+            logger.warning(f"Artifact blob unreadable ({aid}): {e}")
+            return None
+        return Artifact(artifact_id=aid, key=key, url=url, extractor=extractor, kind=kind, data=data, stored_at=stored_at)
+
+    def _evict_locked(self):
+        """오래된 인덱스 항목 삭제 후 참조가 없어진 본문 파일 삭제"""
+        cutoff = time.time() - self.max_age
+        expired = [row[0] for row in self._conn.execute(
+            "SELECT DISTINCT artifact_id FROM artifacts WHERE stored_at < ?", (cutoff,)
+        ).fetchall()]
+        if not expired:
+            return
+        self._conn.execute("DELETE FROM artifacts WHERE stored_at < ?", (cutoff,))
+        self._conn.commit()
+        for aid in expired:
+            still_used = self._conn.execute(
+                "SELECT 1 FROM artifacts WHERE artifact_id = ? LIMIT 1", (aid,)
+            ).fetchone()
+            if still_used is None:
+                try:
+                    os.remove(self._blob_path(aid))
+                except OSError:
+                    pass
+        logger.info(f"Artifact store evicted {len(expired)} expired artifacts")
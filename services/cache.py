@@ -0,0 +1,361 @@
+"""
+공유 캐시 (요약 / 음성 인식 결과 / 크롤링 결과)
+
+레플리카 여러 대가 로드 밸런서 뒤에서 돌면 프로세스 안 캐시는 적중률이 낮으므로,
+백엔드를 바꿔 끼울 수 있는 캐시 하나를 두고 요약기, 음성 인식, 크롤링 계층이 같은 설정으로 사용합니다.
+
+백엔드 (CACHE_BACKEND):
+- memory (기본): 프로세스 안 LRU (CACHE_MAX_ENTRIES개)
+- sqlite: 로컬 파일 (CACHE_URL = 파일 경로, 기본 cache/shared.sqlite3) - 같은 호스트의 워커끼리 공유
+- redis: Redis 프로토콜(RESP) 서버 (CACHE_URL = redis://[:비밀번호@]호스트:포트/DB) - 노드 간 공유
+- off: 캐시 사용 안 함
+
+- 값은 JSON 직렬화, CACHE_COMPRESS_MIN_BYTES 이상이면 zlib 압축
+- 이름공간별 TTL: CACHE_TTL_SUMMARY / CACHE_TTL_TRANSCRIPT / CACHE_TTL_CRAWL / CACHE_TTL_NEWSLETTER (초)
+- 백엔드 오류(연결 실패 등)는 캐시 미스로 처리하고 요청은 계속 진행
+- 카세트 기록 중인 요청은 캐시를 읽지 않음 (외부 호출이 모두 기록되도록)
+"""
+import hashlib
+import json
+import logging
+import os
+import queue
+import socket
+import sqlite3
+import threading
+import time
+import zlib
+from collections import OrderedDict
+from typing import Any, Optional
+from urllib.parse import unquote, urlparse
+
+from services import cassette
+from services.metrics import record_cache
+
+logger = logging.getLogger(__name__)
+
+CACHE_BACKEND = os.getenv("CACHE_BACKEND", "memory")
+CACHE_URL = os.getenv("CACHE_URL", "")
+CACHE_MAX_ENTRIES = int(os.getenv("CACHE_MAX_ENTRIES", "2000"))
+CACHE_COMPRESS_MIN_BYTES = int(os.getenv("CACHE_COMPRESS_MIN_BYTES", "1024"))
+# Redis 연결/응답 대기 한도(초)
+CACHE_TIMEOUT = float(os.getenv("CACHE_TIMEOUT", "0.5"))
+
+# 이름공간
+SUMMARY = "summary"
+TRANSCRIPT = "transcript"
+CRAWL = "crawl"
+NEWSLETTER = "newsletter"
+
+DEFAULT_TTLS = {
+    SUMMARY: 7 * 24 * 3600,  # 같은 모델 + 같은 프롬프트의 Gemini 결과
+    TRANSCRIPT: 30 * 24 * 3600,  # 영상의 음성 인식 결과는 바뀌지 않음
+    CRAWL: 3600,  # 기사 본문은 수정될 수 있으므로 짧게
+    NEWSLETTER: 24 * 3600,  # 2단계 요약의 뉴스레터 작업 결과 (다른 워커에서도 조회 가능하도록)
+}
+
+_KEY_PREFIX = "archiveat"
+_PLAIN = b"j"
+_COMPRESSED = b"z"
+
+
+def encode(value: Any, compress_min_bytes: int = CACHE_COMPRESS_MIN_BYTES) -> bytes:
+    data = json.dumps(value, ensure_ascii=False, separators=(",", ":")).encode("utf-8")
+    if len(data) >= compress_min_bytes:
+        return _COMPRESSED + zlib.compress(data, 6)
+    return _PLAIN + data
+
+
+def decode(raw: bytes) -> Any:
+    marker, data = raw[:1], raw[1:]
+    if marker == _COMPRESSED:
+        data = zlib.decompress(data)
+    elif marker != _PLAIN:
+        raise ValueError(f"Unknown cache value format: {marker!r}")
+    return json.loads(data.decode("utf-8"))
+
+
+# --- 백엔드: bytes 키/값 + TTL(초, None이면 만료 없음) ---
+
+class NullBackend:
+    """CACHE_BACKEND=off"""
+
+    def get(self, key: str) -> Optional[bytes]:
+        return None
+
+    def set(self, key: str, value: bytes, ttl: Optional[float] = None):
+        pass
+
+    def delete(self, key: str):
+        pass
+
+
+class MemoryBackend:
+    """프로세스 안 LRU"""
+
+    def __init__(self, max_entries: int = CACHE_MAX_ENTRIES):
+        self.max_entries = max_entries
+        self._entries: "OrderedDict[str, tuple]" = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, key: str) -> Optional[bytes]:
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                return None
+            expires_at, value = entry
+            if expires_at is not None and expires_at <= time.time():
+                del self._entries[key]
+                return None
+            self._entries.move_to_end(key)
+            return value
+
+    def set(self, key: str, value: bytes, ttl: Optional[float] = None):
+        expires_at = time.time() + ttl if ttl else None
+        with self._lock:
+            self._entries[key] = (expires_at, value)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+
+    def delete(self, key: str):
+        with self._lock:
+            self._entries.pop(key, None)
+
+
+class SqliteBackend:
+    """로컬 SQLite 파일 (WAL 모드, 같은 호스트의 여러 프로세스가 공유 가능)"""
+
+    # 만료 항목 정리 주기 (저장 N회마다)
+    _PURGE_EVERY = 200
+
+    def __init__(self, path: str):
+        directory = os.path.dirname(path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        self._lock = threading.Lock()
+        self._sets = 0
+        self._conn = sqlite3.connect(path, timeout=5, check_same_thread=False)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute(
+            "CREATE TABLE IF NOT EXISTS entries (key TEXT PRIMARY KEY, value BLOB NOT NULL, expires_at REAL)"
+        )
+        self._conn.commit()
+
+    def get(self, key: str) -> Optional[bytes]:
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT value FROM entries WHERE key = ? AND (expires_at IS NULL OR expires_at > ?)",
+                (key, time.time())
+            ).fetchone()
+        return row[0] if row else None
+
+    def set(self, key: str, value: bytes, ttl: Optional[float] = None):
+        expires_at = time.time() + ttl if ttl else None
+        with self._lock:
+            self._conn.execute(
+                "INSERT OR REPLACE INTO entries (key, value, expires_at) VALUES (?, ?, ?)",
+                (key, value, expires_at)
+            )
+            self._sets += 1
+            if self._sets % self._PURGE_EVERY == 0:
+                self._conn.execute("DELETE FROM entries WHERE expires_at IS NOT NULL AND expires_at <= ?", (time.time(),))
+            self._conn.commit()
+
+    def delete(self, key: str):
+        with self._lock:
+            self._conn.execute("DELETE FROM entries WHERE key = ?", (key,))
+            self._conn.commit()
+
+
+class RedisError(Exception):
+    """Redis 서버가 돌려준 오류 응답"""
+
+
+class _RedisConnection:
+    def __init__(self, host: str, port: int, timeout: float):
+        self.sock = socket.create_connection((host, port), timeout=timeout)
+        self.reader = self.sock.makefile("rb")
+
+    def close(self):
+        try:
+            self.reader.close()
+            self.sock.close()
+        except OSError:
+            pass
+
+    def command(self, *args):
+        parts = [b"*%d\r\n" % len(args)]
+        for arg in args:
+            if isinstance(arg, str):
+                arg = arg.encode("utf-8")
+            elif isinstance(arg, int):
+                arg = str(arg).encode()
+            parts.append(b"$%d\r\n%s\r\n" % (len(arg), arg))
+        self.sock.sendall(b"".join(parts))
+        return self._read_reply()
+
+    def _read_reply(self):
+        line = self.reader.readline()
+        if not line.endswith(b"\r\n"):
+            raise ConnectionError("Redis connection closed")
+        kind, payload = line[:1], line[1:-2]
+        if kind == b"+":
+            return payload.decode()
+        if kind == b"-":
+            raise RedisError(payload.decode())
+        if kind == b":":
+            return int(payload)
+        if kind == b"$":
+            length = int(payload)
+            if length < 0:
+                return None
+            data = self.reader.read(length + 2)
+            if len(data) != length + 2:
+                raise ConnectionError("Redis connection closed")
+            return data[:-2]
+        if kind == b"*":
+            count = int(payload)
+            return None if count < 0 else [self._read_reply() for _ in range(count)]
+        raise ConnectionError(f"Unexpected Redis reply: {line[:20]!r}")
+
+
+class RedisBackend:
+    """
+    Redis 프로토콜(RESP) 클라이언트 (GET / SET PX / DEL만 사용, 추가 의존성 없음)
+
+    연결은 풀에 보관해 재사용하고, 오류가 난 연결은 버립니다.
+    """
+
+    def __init__(self, url: str, timeout: float = CACHE_TIMEOUT, max_idle: int = 16):
+        parsed = urlparse(url)
+        if parsed.scheme != "redis":
+            raise ValueError(f"Unsupported cache URL: {url}")
+        self.host = parsed.hostname or "localhost"
+        self.port = parsed.port or 6379
+        self.password = unquote(parsed.password) if parsed.password else None
+        self.db = int(parsed.path.lstrip("/") or 0)
+        self.timeout = timeout
+        self._idle: "queue.LifoQueue[_RedisConnection]" = queue.LifoQueue(maxsize=max_idle)
+
+    def _connect(self) -> _RedisConnection:
+        conn = _RedisConnection(self.host, self.port, self.timeout)
+        try:
+            if self.password:
+                conn.command("AUTH", self.password)
+            if self.db:
+                conn.command("SELECT", self.db)
+        except Exception:
+            conn.close()
+            raise
+        return conn
+
+    def _command(self, *args):
+        try:
+            conn = self._idle.get_nowait()
+        except queue.Empty:
+            conn = self._connect()
+        try:
+            reply = conn.command(*args)
+        except RedisError:
+            # 명령 오류는 연결 상태와 무관
+            self._release(conn)
+            raise
+        except Exception:
+            conn.close()
+            raise
+        self._release(conn)
+        return reply
+
+    def _release(self, conn: _RedisConnection):
+        try:
+            self._idle.put_nowait(conn)
+        except queue.Full:
+            conn.close()
+
+    def get(self, key: str) -> Optional[bytes]:
+        return self._command("GET", key)
+
+    def set(self, key: str, value: bytes, ttl: Optional[float] = None):
+        if ttl:
+            self._command("SET", key, value, "PX", int(ttl * 1000))
+        else:
+            self._command("SET", key, value)
+
+    def delete(self, key: str):
+        self._command("DEL", key)
+
+
+def create_backend(name: str = CACHE_BACKEND, url: str = CACHE_URL):
+    if name == "memory":
+        return MemoryBackend()
+    if name == "sqlite":
+        return SqliteBackend(url or os.path.join("cache", "shared.sqlite3"))
+    if name == "redis":
+        return RedisBackend(url or "redis://localhost:6379/0")
+    if name == "off":
+        return NullBackend()
+    raise ValueError(f"Unknown CACHE_BACKEND: {name}")
+
+
+# --- 이름공간 단위 캐시 (JSON 값) ---
+
+class Cache:
+    """백엔드 위의 이름공간 캐시: 직렬화/압축, TTL, 적중률 지표, 오류 격리"""
+
+    def __init__(self, backend, namespace: str, ttl: Optional[float] = None,
+                 compress_min_bytes: int = CACHE_COMPRESS_MIN_BYTES):
+        self.backend = backend
+        self.namespace = namespace
+        self.ttl = ttl
+        self.compress_min_bytes = compress_min_bytes
+
+    def _key(self, key: str) -> str:
+        # 키가 길면(프롬프트 등) 해시로 줄임
+        if len(key) > 200:
+            key = hashlib.sha256(key.encode("utf-8")).hexdigest()
+        return f"{_KEY_PREFIX}:{self.namespace}:{key}"
+
+    def get(self, key: str) -> Optional[Any]:
+        if cassette.recording():
+            return None
+        try:
+            raw = self.backend.get(self._key(key))
+            value = decode(raw) if raw is not None else None
+        except Exception as e:
+            logger.warning(f"Cache get failed ({self.namespace}): {e}")
+            value = None
+        record_cache(self.namespace, value is not None)
+        return value
+
+    def set(self, key: str, value: Any, ttl: Optional[float] = None):
+        try:
+            self.backend.set(self._key(key), encode(value, self.compress_min_bytes), ttl or self.ttl)
+        except Exception as e:
+            logger.warning(f"Cache set failed ({self.namespace}): {e}")
+
+    def delete(self, key: str):
+        try:
+            self.backend.delete(self._key(key))
+        except Exception as e:
+            logger.warning(f"Cache delete failed ({self.namespace}): {e}")
+
+
+_backend = None
+_backend_lock = threading.Lock()
+
+
+def default_backend():
+    """CACHE_BACKEND/CACHE_URL 설정의 공용 백엔드 (프로세스당 하나)"""
+    global _backend
+    with _backend_lock:
+        if _backend is None:
+            _backend = create_backend()
+            logger.info(f"Shared cache backend: {CACHE_BACKEND}")
+        return _backend
+
+
+def get_cache(namespace: str) -> Cache:
+    """이름공간 캐시 (TTL: CACHE_TTL_<이름공간> 환경 변수, 없으면 DEFAULT_TTLS)"""
+    ttl = os.getenv(f"CACHE_TTL_{namespace.upper()}")
+    return Cache(default_backend(), namespace, float(ttl) if ttl else DEFAULT_TTLS.get(namespace))
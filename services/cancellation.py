@@ -0,0 +1,99 @@
+"""
+요청 취소 전파 (클라이언트 연결 종료 / 마감 시간 초과)
+
+Java 클라이언트가 타임아웃으로 떠난 뒤에도 yt-dlp 다운로드, Whisper, Gemini 호출이
+계속되는 것을 막기 위해 요청마다 CancelToken을 contextvar로 전달합니다.
+(services.executors가 컨텍스트를 워커 스레드로 복사하므로 파이프라인 어디서든 조회 가능)
+
+파이프라인 단계는 중단 가능한 지점에서 check(stage)를 호출합니다.
+- 실행기 대기열에서 꺼낼 때 (취소된 요청의 크롤링/LLM 호출은 시작하지 않음)
+- Whisper 세그먼트 사이, yt-dlp 다운로드 진행 콜백, 크롤링 재시도/파싱 전
+
+마감 시간은 요청 헤더 X-Request-Timeout(초)으로 지정하며, 없으면 REQUEST_TIMEOUT(기본 0 = 없음)을 사용합니다.
+"""
+import contextvars
+import logging
+import os
+import threading
+import time
+from typing import Optional
+
+from services.metrics import CANCELLED_WORK
+
+logger = logging.getLogger(__name__)
+
+REQUEST_TIMEOUT = float(os.getenv("REQUEST_TIMEOUT", "0"))
+
+DISCONNECT = "disconnect"
+DEADLINE = "deadline"
+
+_token = contextvars.ContextVar("cancel_token", default=None)
+
+
+class PipelineCancelled(Exception):
+    """요청이 취소되어 파이프라인 단계를 중단함 (reason: disconnect / deadline)"""
+
+    def __init__(self, stage: str, reason: str):
+        super().__init__(f"Request cancelled ({reason}) before {stage}")
+        self.stage = stage
+        self.reason = reason
+
+
+class CancelToken:
+    def __init__(self, timeout: Optional[float] = None):
+        self.deadline = time.monotonic() + timeout if timeout else None
+        self._reason: Optional[str] = None
+        self._event = threading.Event()
+
+    def cancel(self, reason: str):
+        if self._reason is None:
+            self._reason = reason
+            self._event.set()
+
+    @property
+    def reason(self) -> Optional[str]:
+        """취소 사유 (취소되지 않았으면 None, 마감 시간이 지났으면 deadline)"""
+        if self._reason is None and self.deadline is not None and time.monotonic() >= self.deadline:
+            self.cancel(DEADLINE)
+        return self._reason
+
+    @property
+    def cancelled(self) -> bool:
+        return self.reason is not None
+
+    def remaining(self) -> Optional[float]:
+        """마감까지 남은 시간(초), 마감 시간이 없으면 None"""
+        if self.deadline is None:
+            return None
+        return max(0.0, self.deadline - time.monotonic())
+
+    def check(self, stage: str):
+        """취소되었으면 PipelineCancelled (단계별 중단 건수 기록)"""
+        reason = self.reason
+        if reason is not None:
+            CANCELLED_WORK.labels(stage, reason).inc()
+            logger.info(f"Cancelled ({reason}) before {stage}")
+            raise PipelineCancelled(stage, reason)
+
+
+def start(timeout: Optional[float] = None) -> CancelToken:
+    """현재 요청에 취소 토큰 지정 (timeout 없으면 REQUEST_TIMEOUT 사용)"""
+    token = CancelToken(timeout if timeout is not None else REQUEST_TIMEOUT)
+    _token.set(token)
+    return token
+
+
+def bind(token: Optional[CancelToken]):
+    """이미 만든 토큰을 현재 컨텍스트에 지정 (요청 밖에서 실행되는 작업용)"""
+    _token.set(token)
+
+
+def current() -> Optional[CancelToken]:
+    return _token.get()
+
+
+def check(stage: str):
+    """현재 요청이 취소되었으면 PipelineCancelled (토큰이 없는 호출에서는 아무것도 안 함)"""
+    token = _token.get()
+    if token is not None:
+        token.check(stage)
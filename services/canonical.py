@@ -0,0 +1,127 @@
+"""
+URL 정규화 (캐시/중복 제거용 안정 키 생성)
+
+같은 콘텐츠를 가리키는 다양한 URL 변형을 하나의 키로 모읍니다.
+- 네이버 뉴스: news.naver.com / n.news.naver.com / m.news.naver.com, read.naver?oid=&aid= 등
+  → "naver:{언론사 ID}:{기사 ID}"
+- YouTube: watch / youtu.be / shorts / embed / live, &t= 등 부가 파라미터
+  → "youtube:{영상 ID}"
+- Tistory: 모바일 /m/ 경로, /entry/ 슬러그
+  → "tistory:{블로그}:{글 ID 또는 entry/슬러그}"
+- 그 외: 트래킹 파라미터/프래그먼트 제거, 쿼리 정렬 → "web:{정규화 URL}"
+"""
+import re
+from dataclasses import dataclass
+from urllib.parse import parse_qsl, quote, unquote, urlencode, urlparse, urlunparse
+
+NAVER_NEWS = "naver_news"
+YOUTUBE = "youtube"
+TISTORY = "tistory"
+WEB = "web"
+
+_NAVER_NEWS_HOSTS = {"news.naver.com", "n.news.naver.com", "m.news.naver.com"}
+_NAVER_ARTICLE_RE = re.compile(r"/article/(?:comment/)?(\d{3})/(\d{10})")
+
+_YOUTUBE_HOSTS = {
+    "youtube.com", "www.youtube.com", "m.youtube.com", "music.youtube.com",
+    "youtube-nocookie.com", "www.youtube-nocookie.com",
+}
+_YOUTUBE_ID_RE = re.compile(r"^[A-Za-z0-9_-]{11}$")
+_YOUTUBE_PATH_RE = re.compile(r"^/(?:shorts|embed|live|v)/([A-Za-z0-9_-]{11})")
+
+_TISTORY_POST_RE = re.compile(r"^/(?:m/)?(\d+|entry/[^/]+)/?$")
+
+# 콘텐츠와 무관한 트래킹/유입 경로 파라미터
+_TRACKING_PARAMS = {"fbclid", "gclid", "igshid", "mc_cid", "mc_eid", "ref_src"}
+
+
+@dataclass(frozen=True)
+class CanonicalUrl:
+    kind: str  # NAVER_NEWS / YOUTUBE / TISTORY / WEB
+    key: str   # 캐시·중복 제거용 안정 키
+    url: str   # 실제 요청에 사용할 정규화 URL
+
+
+def canonicalize(url: str) -> CanonicalUrl:
+    """URL을 정규화하여 (종류, 안정 키, 정규 URL) 반환"""
+    parsed = urlparse(url.strip())
+    host = (parsed.hostname or "").lower()
+    scheme = (parsed.scheme or "https").lower()
+
+    if host in _NAVER_NEWS_HOSTS:
+        ids = _naver_article_ids(parsed)
+        if ids:
+            oid, aid = ids
+            return CanonicalUrl(
+                kind=NAVER_NEWS,
+                key=f"naver:{oid}:{aid}",
+                url=f"{scheme}://n.news.naver.com/mnews/article/{oid}/{aid}",
+            )
+
+    video_id = _youtube_video_id(parsed, host)
+    if video_id:
+        return CanonicalUrl(
+            kind=YOUTUBE,
+            key=f"youtube:{video_id}",
+            url=f"https://www.youtube.com/watch?v={video_id}",
+        )
+
+    if host.endswith(".tistory.com"):
+        match = _TISTORY_POST_RE.match(parsed.path)
+        if match:
+            blog = host[: -len(".tistory.com")]
+            # 슬러그는 퍼센트 인코딩 여부와 무관하게 같은 키가 되도록 디코딩 후 비교
+            post = unquote(match.group(1))
+            return CanonicalUrl(
+                kind=TISTORY,
+                key=f"tistory:{blog}:{post}",
+                url=f"{scheme}://{host}/{quote(post)}",
+            )
+
+    normalized = _normalize_web(parsed, host)
+    return CanonicalUrl(kind=WEB, key=f"web:{normalized}", url=normalized)
+
+
+def _naver_article_ids(parsed):
+    """네이버 뉴스 URL에서 (언론사 ID, 기사 ID) 추출"""
+    match = _NAVER_ARTICLE_RE.search(parsed.path)
+    if match:
+        return match.group(1), match.group(2)
+
+    # 구형 주소: /main/read.naver?oid=421&aid=0008745941 (read.nhn 포함)
+    query = dict(parse_qsl(parsed.query))
+    oid, aid = query.get("oid"), query.get("aid")
+    if oid and aid and oid.isdigit() and aid.isdigit():
+        return oid, aid
+    return None
+
+
+def _youtube_video_id(parsed, host: str):
+    """YouTube URL에서 11자리 영상 ID 추출"""
+    if host == "youtu.be":
+        candidate = parsed.path.lstrip("/").split("/")[0]
+        return candidate if _YOUTUBE_ID_RE.match(candidate) else None
+
+    if host not in _YOUTUBE_HOSTS:
+        return None
+
+    if parsed.path == "/watch":
+        candidate = dict(parse_qsl(parsed.query)).get("v", "")
+        return candidate if _YOUTUBE_ID_RE.match(candidate) else None
+
+    match = _YOUTUBE_PATH_RE.match(parsed.path)
+    return match.group(1) if match else None
+
+
+def _normalize_web(parsed, host: str) -> str:
+    """일반 URL 정규화: 소문자 호스트, 기본 포트/프래그먼트/트래킹 파라미터 제거, 쿼리 정렬"""
+    scheme = (parsed.scheme or "https").lower()
+    netloc = host
+    if parsed.port and not ((scheme == "http" and parsed.port == 80) or (scheme == "https" and parsed.port == 443)):
+        netloc = f"{host}:{parsed.port}"
+
+    query = sorted(
+        (k, v) for k, v in parse_qsl(parsed.query, keep_blank_values=True)
+        if not k.lower().startswith("utm_") and k.lower() not in _TRACKING_PARAMS
+    )
+    return urlunparse((scheme, netloc, parsed.path or "/", "", urlencode(query), ""))
@@ -0,0 +1,340 @@
+"""
+카세트 기록/재생 (운영 트래픽 프로파일링용)
+
+운영에서 생긴 성능 문제를 로컬에서 재현하기 위해, 샘플링한 요청의 외부 호출 결과를 기록(record)하고
+오프라인에서 같은 트래픽을 재생(replay)할 때 네트워크 호출 대신 기록을 돌려줍니다.
+변경 전/후 빌드에 같은 카세트를 재생해 CPU/지연 시간 프로파일을 비교할 수 있습니다. (benchmarks.replay)
+
+기록 대상 (종류, 키):
+- html: 웹 페이지 응답 (URL)
+- youtube_info: yt-dlp 영상 정보 (정규화 키, 요약에 쓰는 필드만)
+- captions: 공식 자막 (영상 ID)
+- transcript: 음성 인식 결과 (영상 ID + 인식 길이, 오디오 파일은 저장하지 않음)
+- gemini: Gemini 응답 텍스트 + 토큰 사용량 (모델 + 프롬프트 해시)
+
+CASSETTE_MODE: off(기본) / record / replay
+CASSETTE_DIR: 카세트 저장 디렉터리 (기본 cassettes)
+  {요청 키}-{번호}.json - 요청 하나의 외부 호출 기록, traffic.jsonl - 기록한 요청 순서 (재생 도구 입력)
+재생 요청의 X-Cassette 헤더로 카세트를 지정합니다. (없으면 같은 요청 키의 마지막 기록)
+CASSETTE_SAMPLE_RATE: record 모드에서 기록할 요청 비율 (기본 0.1)
+CASSETTE_REPLAY_LATENCY=1: 재생 시 기록된 외부 호출 시간만큼 대기 (지연 시간 비교용)
+
+재생 시 조회 순서: 현재 요청 카세트의 같은 (종류, 키) → 다른 요청 카세트의 같은 (종류, 키)
+(병합된 동시 요청은 한 요청에만 기록되므로) → gemini는 현재 요청 카세트의 다음 기록 (프롬프트를 바꾼 빌드 비교용)
+기록이 없으면 CassetteMiss - 재생 중에는 네트워크로 나가지 않습니다.
+기록 중인 요청(recording())은 유사 중복 재사용, 크롤링/요약 공유 캐시, 동시 추출 병합을 건너뛰어
+외부 호출이 모두 이 요청의 카세트에 남게 합니다. (음성 인식은 캐시/병합 바깥에서 결과를 기록)
+
+주의: 기록에는 요청 본문(user_memo 포함)과 원문 HTML/자막이 그대로 저장됩니다.
+"""
+import asyncio
+import contextvars
+import email
+import functools
+import glob
+import hashlib
+import io
+import json
+import logging
+import os
+import random
+import re
+import threading
+import time
+import types
+import urllib.response
+import uuid
+from typing import Callable, Dict, List, Optional, Tuple
+
+logger = logging.getLogger(__name__)
+
+OFF = "off"
+RECORD = "record"
+REPLAY = "replay"
+
+CASSETTE_MODE = os.getenv("CASSETTE_MODE", OFF).lower()
+CASSETTE_DIR = os.getenv("CASSETTE_DIR", "cassettes")
+CASSETTE_SAMPLE_RATE = float(os.getenv("CASSETTE_SAMPLE_RATE", "0.1"))
+CASSETTE_REPLAY_LATENCY = os.getenv("CASSETTE_REPLAY_LATENCY", "0") == "1"
+
+TRAFFIC_LOG = "traffic.jsonl"
+_CASSETTE_ID_RE = re.compile(r"^[0-9a-f]+-[0-9a-f]+$")
+
+# 기록 순서와 무관하게 다음 기록으로 대체해도 되는 종류 (키가 프롬프트 해시라 코드 변경 시 달라짐)
+_SEQUENTIAL_KINDS = frozenset({"gemini"})
+
+_cassette = contextvars.ContextVar("cassette", default=None)
+
+
+class CassetteMiss(Exception):
+    """재생 모드에서 외부 호출에 해당하는 기록이 없음"""
+
+    def __init__(self, kind: str, key: str):
+        super().__init__(f"No recorded {kind} for {key}")
+        self.kind = kind
+        self.key = key
+
+
+def digest(*parts) -> str:
+    data = json.dumps(parts, ensure_ascii=False, sort_keys=True, default=str)
+    return hashlib.sha1(data.encode("utf-8")).hexdigest()[:20]
+
+
+class Cassette:
+    """요청 하나의 외부 호출 기록"""
+
+    def __init__(self, store: "CassetteStore", cassette_id: str, key: str, path: str, body,
+                 interactions: Optional[List[dict]] = None):
+        self.store = store
+        self.id = cassette_id
+        self.key = key
+        self.path = path
+        self.body = body
+        self.interactions: List[dict] = interactions or []
+        self._used = set()
+        self._lock = threading.Lock()
+
+    @property
+    def replaying(self) -> bool:
+        return self.store.mode == REPLAY
+
+    def add(self, kind: str, key: str, value, elapsed: float):
+        with self._lock:
+            self.interactions.append({"kind": kind, "key": key, "value": value, "elapsed": round(elapsed, 4)})
+
+    def take(self, kind: str, key: str) -> dict:
+        """재생할 기록 (조회 순서는 모듈 설명 참고)"""
+        with self._lock:
+            entry = self._take_locked(kind, lambda e: e["key"] == key)
+        if entry is None:
+            entry = self.store.lookup(kind, key)
+        if entry is None and kind in _SEQUENTIAL_KINDS:
+            with self._lock:
+                entry = self._take_locked(kind, lambda e: True)
+        if entry is None:
+            raise CassetteMiss(kind, key)
+        return entry
+
+    def _take_locked(self, kind: str, match: Callable[[dict], bool]) -> Optional[dict]:
+        for i, entry in enumerate(self.interactions):
+            if i not in self._used and entry["kind"] == kind and match(entry):
+                self._used.add(i)
+                return entry
+        return None
+
+    def to_dict(self) -> dict:
+        return {"id": self.id, "key": self.key, "path": self.path, "body": self.body, "interactions": self.interactions}
+
+
+class CassetteStore:
+    def __init__(self, directory: str = CASSETTE_DIR, mode: str = CASSETTE_MODE,
+                 sample_rate: float = CASSETTE_SAMPLE_RATE, replay_latency: bool = CASSETTE_REPLAY_LATENCY):
+        if mode not in (OFF, RECORD, REPLAY):
+            raise ValueError(f"Invalid CASSETTE_MODE: {mode}")
+        self.directory = directory
+        self.mode = mode
+        self.sample_rate = sample_rate
+        self.replay_latency = replay_latency
+        self._index: Optional[Dict[Tuple[str, str], str]] = None
+        self._lock = threading.Lock()
+        if mode != OFF:
+            os.makedirs(directory, exist_ok=True)
+            logger.info(f"Cassette {mode} mode: {os.path.abspath(directory)}")
+
+    @property
+    def enabled(self) -> bool:
+        return self.mode != OFF
+
+    def _file(self, cassette_id: str) -> str:
+        return os.path.join(self.directory, f"{cassette_id}.json")
+
+    def _latest_file(self, key: str) -> Optional[str]:
+        files = glob.glob(os.path.join(self.directory, f"{key}-*.json"))
+        return max(files, key=os.path.getmtime) if files else None
+
+    def begin(self, path: str, body, cassette_id: Optional[str] = None) -> Optional[Cassette]:
+        """
+        요청 시작: record 모드는 샘플링된 요청만, replay 모드는 기록된 카세트(없으면 빈 카세트)
+
+        cassette_id: 재생할 카세트 (X-Cassette 헤더, 없으면 같은 요청 키의 마지막 기록)
+        """
+        key = digest(path, body)
+        if self.mode == RECORD:
+            if random.random() >= self.sample_rate:
+                return None
+            return Cassette(self, f"{key}-{uuid.uuid4().hex[:8]}", key, path, body)
+        if self.mode == REPLAY:
+            if cassette_id and _CASSETTE_ID_RE.match(cassette_id):
+                filename = self._file(cassette_id)
+            else:
+                filename = self._latest_file(key)
+            data = _load(filename) if filename else None
+            interactions = [dict(e) for e in data["interactions"]] if data else None
+            return Cassette(self, data["id"] if data else key, key, path, body, interactions)
+        return None
+
+    def save(self, cassette: Cassette, elapsed: float):
+        """기록한 요청 저장 + traffic.jsonl에 한 줄 추가"""
+        with open(self._file(cassette.id), "w", encoding="utf-8") as f:
+            json.dump(cassette.to_dict(), f, ensure_ascii=False)
+        line = json.dumps({
+            "cassette": cassette.id, "path": cassette.path, "body": cassette.body,
+            "recorded_at": time.time(), "elapsed": round(elapsed, 4),
+        }, ensure_ascii=False)
+        with self._lock, open(os.path.join(self.directory, TRAFFIC_LOG), "a", encoding="utf-8") as f:
+            f.write(line + "\n")
+
+    def lookup(self, kind: str, key: str) -> Optional[dict]:
+        """모든 카세트에서 (종류, 키) 기록 조회 (처음 호출 시 색인 생성)"""
+        with self._lock:
+            if self._index is None:
+                self._index = self._build_index()
+            filename = self._index.get((kind, key))
+        if filename is None:
+            return None
+        data = _load(filename)
+        for entry in data["interactions"] if data else []:
+            if entry["kind"] == kind and entry["key"] == key:
+                return entry
+        return None
+
+    def _build_index(self) -> Dict[Tuple[str, str], str]:
+        index = {}
+        for filename in sorted(glob.glob(os.path.join(self.directory, "*.json"))):
+            data = _load(filename)
+            for entry in data["interactions"] if data else []:
+                index[(entry["kind"], entry["key"])] = filename
+        logger.info(f"Cassette index: {len(index)} recorded calls")
+        return index
+
+
+@functools.lru_cache(maxsize=256)
+def _load(filename: str) -> Optional[dict]:
+    if not os.path.exists(filename):
+        return None
+    with open(filename, encoding="utf-8") as f:
+        return json.load(f)
+
+
+def bind(cassette: Optional[Cassette]):
+    """현재 요청(컨텍스트)에 카세트 지정"""
+    _cassette.set(cassette)
+
+
+def current() -> Optional[Cassette]:
+    return _cassette.get()
+
+
+def recording() -> bool:
+    """현재 요청을 기록 중인지 (조건부 요청을 생략해 본문 전체를 받아야 할 때 사용)"""
+    cassette = _cassette.get()
+    return cassette is not None and not cassette.replaying
+
+
+def call(kind: str, key: str, fn: Callable, encode: Optional[Callable] = None, decode: Optional[Callable] = None):
+    """
+    외부 호출 fn()의 기록/재생 지점
+
+    encode: 결과 → JSON 저장 형태, decode: 저장 형태 → 결과 (없으면 결과를 그대로 저장)
+    기록 중에는 decode(encode(결과))를 반환해 재생 때와 같은 값으로 이후 단계를 진행합니다.
+    """
+    cassette = _cassette.get()
+    if cassette is None:
+        return fn()
+    if cassette.replaying:
+        return _replay(cassette, kind, key, decode)
+    start = time.perf_counter()
+    return _record(cassette, kind, key, fn(), start, encode, decode)
+
+
+async def acall(kind: str, key: str, factory: Callable, encode: Optional[Callable] = None,
+                decode: Optional[Callable] = None):
+    """call()의 비동기 버전 (factory: awaitable을 반환하는 함수)"""
+    cassette = _cassette.get()
+    if cassette is None:
+        return await factory()
+    if cassette.replaying:
+        entry = cassette.take(kind, key)
+        if cassette.store.replay_latency and entry.get("elapsed"):
+            await asyncio.sleep(entry["elapsed"])
+        return decode(entry["value"]) if decode else entry["value"]
+    start = time.perf_counter()
+    return _record(cassette, kind, key, await factory(), start, encode, decode)
+
+
+def _replay(cassette: Cassette, kind: str, key: str, decode: Optional[Callable]):
+    entry = cassette.take(kind, key)
+    if cassette.store.replay_latency and entry.get("elapsed"):
+        time.sleep(entry["elapsed"])
+    return decode(entry["value"]) if decode else entry["value"]
+
+
+def _record(cassette: Cassette, kind: str, key: str, value, start: float,
+            encode: Optional[Callable], decode: Optional[Callable]):
+    stored = encode(value) if encode else value
+    cassette.add(kind, key, stored, time.perf_counter() - start)
+    return decode(stored) if decode else value
+
+
+# --- 외부 응답 저장 형태 ---
+
+_HEADERS_KEPT = ("Content-Type", "ETag", "Last-Modified")
+
+
+def encode_requests_response(response) -> dict:
+    return {
+        "status": response.status_code,
+        "url": response.url,
+        "headers": {h: response.headers[h] for h in _HEADERS_KEPT if h in response.headers},
+        "body": response.content.decode("utf-8", errors="replace"),
+    }
+
+
+def decode_requests_response(data: dict):
+    import requests
+    from requests.structures import CaseInsensitiveDict
+
+    response = requests.Response()
+    response.status_code = data["status"]
+    response.url = data["url"]
+    response.headers = CaseInsensitiveDict(data["headers"])
+    response._content = data["body"].encode("utf-8")
+    response.encoding = "utf-8"
+    return response
+
+
+def encode_urllib_response(response) -> dict:
+    charset = response.headers.get_content_charset() or "utf-8"
+    return {
+        "status": response.status,
+        "url": response.geturl(),
+        "headers": {h: response.headers[h] for h in _HEADERS_KEPT if h in response.headers},
+        "body": response.read().decode(charset, errors="replace"),
+    }
+
+
+def decode_urllib_response(data: dict):
+    """urlopen() 응답 대역 (본문은 UTF-8로 다시 인코딩)"""
+    headers = email.message_from_string("".join(f"{k}: {v}\n" for k, v in data["headers"].items() if k != "Content-Type"))
+    headers["Content-Type"] = "text/html; charset=utf-8"
+    return urllib.response.addinfourl(io.BytesIO(data["body"].encode("utf-8")), headers, data["url"], data["status"])
+
+
+_USAGE_FIELDS = ("prompt_token_count", "candidates_token_count", "cached_content_token_count", "total_token_count")
+
+
+def encode_gemini_response(response) -> dict:
+    usage = getattr(response, "usage_metadata", None)
+    return {
+        "text": response.text,
+        "usage": {f: getattr(usage, f, None) for f in _USAGE_FIELDS} if usage is not None else None,
+    }
+
+
+def decode_gemini_response(data: dict):
+    usage = types.SimpleNamespace(**data["usage"]) if data.get("usage") else None
+    return types.SimpleNamespace(text=data["text"], usage_metadata=usage)
+
+
+def default_store() -> CassetteStore:
+    return CassetteStore()
@@ -0,0 +1,238 @@
+"""
+로컬 카테고리/토픽 분류기 (해시 n-gram + 다항 로지스틱 회귀, CPU 수 ms)
+
+카테고리 5개 / 토픽 약 30개 분류를 매번 Gemini에 맡기고 분류 체계 전체를 프롬프트에 싣는 대신,
+지난 Gemini 분류 결과로 학습한 작은 선형 모델로 먼저 예측합니다.
+
+- 특징: 제목/본문(앞 CLASSIFIER_MAX_CHARS자)의 글자 2~3-gram + 단어 unigram을 2^16차원으로 해싱,
+  log(1 + 빈도) 후 L2 정규화 (제목은 별도 이름공간)
+- 모델: 카테고리 / 토픽(카테고리별로 허용된 토픽만) 두 개의 소프트맥스 선형 모델, SGD 학습
+- CLASSIFIER_MODE
+  - off: 사용하지 않음
+  - fallback (기본): Gemini가 분류 체계에 없는 카테고리/토픽을 내면 로컬 예측으로 대체
+  - preclassify: 확률이 CLASSIFIER_THRESHOLD(기본 0.85) 이상이면 프롬프트의 분류 체계 대신
+    예측한 카테고리/토픽 하나만 넣어 요청하고 로컬 예측을 분류로 사용
+- 학습 데이터: Gemini가 분류한 결과(사용자 메모 없는 요청)를 CLASSIFIER_EXAMPLES(JSONL)에 누적
+  학습/평가: python -m benchmarks.classifier_train, python -m benchmarks.classifier_eval
+- 모델 파일: CLASSIFIER_MODEL (기본 cache/classifier/model.npz), 없으면 분류기 없이 동작
+"""
+import json
+import logging
+import os
+import random
+import re
+import threading
+import time
+import zlib
+from dataclasses import dataclass
+from typing import Dict, Iterable, List, Optional, Tuple
+
+import numpy as np
+
+logger = logging.getLogger(__name__)
+
+CLASSIFIER_MODE = os.getenv("CLASSIFIER_MODE", "fallback")
+CLASSIFIER_MODEL = os.getenv("CLASSIFIER_MODEL", "cache/classifier/model.npz")
+CLASSIFIER_EXAMPLES = os.getenv("CLASSIFIER_EXAMPLES", "cache/classifier/examples.jsonl")
+CLASSIFIER_THRESHOLD = float(os.getenv("CLASSIFIER_THRESHOLD", "0.85"))
+CLASSIFIER_MAX_CHARS = int(os.getenv("CLASSIFIER_MAX_CHARS", "3000"))
+
+OFF = "off"
+FALLBACK = "fallback"
+PRECLASSIFY = "preclassify"
+MODES = (OFF, FALLBACK, PRECLASSIFY)
+
+FEATURE_BITS = 16
+
+_WHITESPACE_RE = re.compile(r"\s+")
+_WORD_RE = re.compile(r"\w+")
+
+
+def _ngrams(text: str, namespace: str) -> Iterable[str]:
+    text = _WHITESPACE_RE.sub(" ", text.lower()).strip()
+    for n in (2, 3):
+        for i in range(len(text) - n + 1):
+            yield f"{namespace}{n}{text[i:i + n]}"
+    for word in _WORD_RE.findall(text):
+        yield f"{namespace}w{word}"
+
+
+def features(title: str, content: str, bits: int = FEATURE_BITS) -> Tuple[np.ndarray, np.ndarray]:
+    """해시 특징 → (인덱스, 값) 희소 벡터 (L2 정규화)"""
+    mask = (1 << bits) - 1
+    counts: Dict[int, int] = {}
+    for gram in _ngrams(title or "", "t"):
+        index = zlib.crc32(gram.encode("utf-8")) & mask
+        counts[index] = counts.get(index, 0) + 1
+    for gram in _ngrams((content or "")[:CLASSIFIER_MAX_CHARS], "b"):
+        index = zlib.crc32(gram.encode("utf-8")) & mask
+        counts[index] = counts.get(index, 0) + 1
+
+    indices = np.fromiter(counts.keys(), dtype=np.int64, count=len(counts))
+    values = np.log1p(np.fromiter(counts.values(), dtype=np.float32, count=len(counts)))
+    norm = float(np.linalg.norm(values))
+    if norm:
+        values /= norm
+    return indices, values
+
+
+def _softmax(logits: np.ndarray) -> np.ndarray:
+    exp = np.exp(logits - logits.max())
+    return exp / exp.sum()
+
+
+@dataclass
+class Prediction:
+    category: str
+    topic: str
+    category_prob: float
+    topic_prob: float  # 예측한 카테고리 안에서의 토픽 확률
+
+    @property
+    def confidence(self) -> float:
+        return min(self.category_prob, self.topic_prob)
+
+
+@dataclass
+class Example:
+    title: str
+    content: str
+    category: str
+    topic: str
+
+
+class TopicClassifier:
+    """카테고리 / 토픽 두 단계 선형 분류기"""
+
+    def __init__(self, taxonomy: Dict[str, List[str]], bits: int = FEATURE_BITS,
+                 category_weights: Optional[np.ndarray] = None, topic_weights: Optional[np.ndarray] = None):
+        self.taxonomy = {category: list(topics) for category, topics in taxonomy.items()}
+        self.bits = bits
+        self.categories = list(self.taxonomy)
+        # 토픽 라벨은 "카테고리/토픽" (카테고리마다 "기타"가 따로 있음)
+        self.topics = [f"{c}/{t}" for c in self.categories for t in self.taxonomy[c]]
+        self._topic_slices = {}
+        start = 0
+        for category in self.categories:
+            self._topic_slices[category] = slice(start, start + len(self.taxonomy[category]))
+            start += len(self.taxonomy[category])
+
+        dim = 1 << bits
+        # 마지막 행은 편향(bias)
+        self.category_weights = category_weights if category_weights is not None else np.zeros((dim + 1, len(self.categories)), np.float32)
+        self.topic_weights = topic_weights if topic_weights is not None else np.zeros((dim + 1, len(self.topics)), np.float32)
+
+    def _logits(self, weights: np.ndarray, indices: np.ndarray, values: np.ndarray) -> np.ndarray:
+        return values @ weights[indices] + weights[-1]
+
+    def predict(self, title: str, content: str) -> Prediction:
+        indices, values = features(title, content, self.bits)
+        category_probs = _softmax(self._logits(self.category_weights, indices, values))
+        c = int(category_probs.argmax())
+        category = self.categories[c]
+
+        block = self._topic_slices[category]
+        topic_probs = _softmax(self._logits(self.topic_weights, indices, values)[block])
+        t = int(topic_probs.argmax())
+        return Prediction(category, self.taxonomy[category][t], float(category_probs[c]), float(topic_probs[t]))
+
+    def fit(self, examples: List[Example], epochs: int = 8, learning_rate: float = 2.0, seed: int = 0) -> int:
+        """SGD 학습 (분류 체계에 없는 라벨은 건너뜀) → 학습에 사용한 예시 수"""
+        rows = []
+        for example in examples:
+            if example.topic not in self.taxonomy.get(example.category, ()):
+                continue
+            indices, values = features(example.title, example.content, self.bits)
+            c = self.categories.index(example.category)
+            t = self.taxonomy[example.category].index(example.topic)
+            rows.append((indices, values, c, t, self._topic_slices[example.category]))
+
+        rng = random.Random(seed)
+        for epoch in range(epochs):
+            rng.shuffle(rows)
+            rate = learning_rate / (1 + epoch)
+            for indices, values, c, t, block in rows:
+                self._step(self.category_weights, indices, values, c, slice(None), rate)
+                # 토픽은 정답 카테고리 안의 토픽끼리만 경쟁
+                self._step(self.topic_weights, indices, values, t, block, rate)
+        return len(rows)
+
+    def _step(self, weights: np.ndarray, indices: np.ndarray, values: np.ndarray, label: int, block: slice, rate: float):
+        probs = _softmax(self._logits(weights[:, block], indices, values))
+        probs[label] -= 1.0
+        weights[indices, block] -= rate * np.outer(values, probs)
+        weights[-1, block] -= rate * probs
+
+    def save(self, path: str):
+        os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+        tmp = f"{path}.tmp.npz"
+        np.savez_compressed(
+            tmp,
+            taxonomy=np.array(json.dumps(self.taxonomy, ensure_ascii=False)),
+            bits=np.array(self.bits),
+            category_weights=self.category_weights,
+            topic_weights=self.topic_weights,
+        )
+        os.replace(tmp, path)
+
+    @classmethod
+    def load(cls, path: str) -> "TopicClassifier":
+        with np.load(path) as data:
+            return cls(
+                json.loads(str(data["taxonomy"])),
+                bits=int(data["bits"]),
+                category_weights=data["category_weights"],
+                topic_weights=data["topic_weights"],
+            )
+
+
+def load_default(path: str = CLASSIFIER_MODEL) -> Optional[TopicClassifier]:
+    """CLASSIFIER_MODE가 off가 아니고 모델 파일이 있으면 로드"""
+    if CLASSIFIER_MODE not in MODES:
+        raise ValueError(f"Unknown CLASSIFIER_MODE: {CLASSIFIER_MODE}")
+    if CLASSIFIER_MODE == OFF or not os.path.exists(path):
+        return None
+    start = time.perf_counter()
+    model = TopicClassifier.load(path)
+    logger.info(f"Loaded topic classifier from {path} ({CLASSIFIER_MODE}, {time.perf_counter() - start:.2f}s)")
+    return model
+
+
+# --- 학습 데이터 ---
+
+class ExampleLog:
+    """Gemini 분류 결과를 학습 예시(JSONL)로 누적 (스레드 안전)"""
+
+    def __init__(self, path: str = CLASSIFIER_EXAMPLES):
+        self.path = path
+        self._lock = threading.Lock()
+        if path:
+            os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+
+    def record(self, title: str, content: str, category: str, topic: str):
+        if not self.path:
+            return
+        line = json.dumps({
+            "title": title,
+            "content": content[:CLASSIFIER_MAX_CHARS],
+            "category": category,
+            "topic": topic,
+            "recorded_at": time.time(),
+        }, ensure_ascii=False)
+        try:
+            with self._lock, open(self.path, "a", encoding="utf-8") as f:
+                f.write(line + "\n")
+        except OSError as e:
+            logger.warning(f"Failed to record classifier example: {e}")
+
+
+def read_examples(path: str) -> List[Example]:
+    """JSONL 학습 예시 읽기 (title, content, category, topic)"""
+    examples = []
+    with open(path, encoding="utf-8") as f:
+        for line in f:
+            if not line.strip():
+                continue
+            row = json.loads(line)
+            examples.append(Example(row.get("title", ""), row.get("content", ""), row["category"], row["topic"]))
+    return examples
@@ -0,0 +1,51 @@
+"""
+요청 병합 (single-flight)
+
+같은 정규화 키(services.canonical)에 대한 작업이 동시에 여러 번 들어오면
+첫 요청만 실제로 실행하고 나머지는 그 결과를 함께 기다립니다.
+선행 요청이 취소되면(연결 종료/마감 초과/태스크 취소) 대기 중인 요청 하나가 다시 실행하고 나머지는 그 결과를 기다립니다.
+"""
+import asyncio
+from typing import Any, Awaitable, Callable, Dict
+
+from services.cancellation import PipelineCancelled
+
+
+class _LeaderCancelled(Exception):
+    """선행 요청의 태스크가 취소됨 (대기자 자신의 CancelledError와 구분하기 위한 내부 예외)"""
+
+
+class RequestCoalescer:
+    def __init__(self):
+        self._inflight: Dict[str, asyncio.Future] = {}
+
+    async def run(self, key: str, factory: Callable[[], Awaitable[Any]]) -> Any:
+        """key로 진행 중인 작업이 있으면 그 결과를 공유, 없으면 factory() 실행"""
+        future = self._inflight.get(key)
+        if future is not None:
+            # 대기 중인 요청이 취소되어도 선행 작업은 계속 진행되도록 shield
+            try:
+                return await asyncio.shield(future)
+            except (PipelineCancelled, _LeaderCancelled):
+                # 선행 요청만 취소된 것이므로 이 요청에서 다시 실행 (먼저 깨어난 대기자가 새 선행 요청이 됨)
+                return await self.run(key, factory)
+
+        future = asyncio.get_running_loop().create_future()
+        self._inflight[key] = future
+        try:
+            result = await factory()
+        except asyncio.CancelledError:
+            # 선행 요청 취소를 대기자 자신의 취소로 오해하지 않도록 내부 예외로 전달 → 대기자가 다시 실행
+            future.set_exception(_LeaderCancelled(key))
+            future.exception()
+            raise
+        except BaseException as e:
+            future.set_exception(e)
+            # 대기자가 없을 때 "exception was never retrieved" 경고 방지
+            future.exception()
+            raise
+        else:
+            future.set_result(result)
+            return result
+        finally:
+            self._inflight.pop(key, None)
@@ -0,0 +1,117 @@
+"""
+컬렉션 요약 입력 준비 (압축 인코딩 / 예산 맞춤 / 계층 요약용 묶음 나누기)
+
+뉴스레터 목록을 json.dumps(indent=2)로 통째로 넣으면 들여쓰기에 토큰을 낭비하고,
+항목 수에 비례해 지연이 늘다가 결국 입력 한도를 넘습니다.
+
+- 압축 인코딩: 항목마다 공백 정리 + COLLECTION_ITEM_CHARS(기본 300자)로 자른 한 줄 ("- " 목록)
+- 거의 같은 항목(SimHash 유사도 0.95 이상)은 하나만 남김
+- 인코딩 결과가 COLLECTION_PROMPT_CHARS(기본 8000자)를 넘으면 계층 요약 (main.reduce_collection)
+  묶음별 부분 요약 → 부분 요약끼리 다시 요약 → 예산 안에 들면 최종 컬렉션 요약
+- 묶음 나누기: 비슷한 항목끼리 가깝도록 SimHash 순으로 정렬한 뒤, 항목 내용의 해시로 경계를 정함
+  (평균 COLLECTION_CHUNK_TARGET개, 기본 12) → 뉴스레터 하나를 추가해도 그 항목이 들어간 묶음만 바뀌고
+  나머지 묶음의 프롬프트는 그대로라 부분 요약은 공유 캐시(summary)에서 재사용
+- fit(): 계층 요약 없이 한 번에 요약할 때의 안전장치 - 예산을 넘으면 고르게 표본 추출
+"""
+import hashlib
+import os
+import re
+from typing import List
+
+from services.dedup import simhash, similarity
+
+COLLECTION_ITEM_CHARS = int(os.getenv("COLLECTION_ITEM_CHARS", "300"))
+COLLECTION_PROMPT_CHARS = int(os.getenv("COLLECTION_PROMPT_CHARS", "8000"))
+COLLECTION_CHUNK_TARGET = int(os.getenv("COLLECTION_CHUNK_TARGET", "12"))
+
+# 이 이상 비슷하면 같은 항목으로 보고 하나만 남김
+_DUPLICATE_SIMILARITY = 0.95
+# 묶음 최소 항목 수 (단계마다 항목 수가 반드시 줄어들도록)
+_MIN_CHUNK = 2
+
+_WHITESPACE_RE = re.compile(r"\s+")
+_PARTIAL_RE = re.compile(r"^\[(\d+)개 묶음\] ")
+
+
+def compact(text: str, limit: int = COLLECTION_ITEM_CHARS) -> str:
+    """공백 정리 + limit자로 자르기 (잘린 경우 … 표시)"""
+    text = _WHITESPACE_RE.sub(" ", text).strip()
+    return text if len(text) <= limit else text[:limit - 1].rstrip() + "…"
+
+
+def encode(items: List[str]) -> str:
+    """프롬프트용 압축 목록 (한 줄에 한 항목)"""
+    return "\n".join(f"- {item}" for item in items)
+
+
+def prepare(newsletters: List[str], item_chars: int = COLLECTION_ITEM_CHARS) -> List[str]:
+    """항목 압축 + 빈 항목/거의 같은 항목 제거 (입력 순서 유지)"""
+    items, fingerprints = [], []
+    for newsletter in newsletters:
+        item = compact(newsletter, item_chars)
+        if not item:
+            continue
+        fingerprint = simhash(item)
+        if any(similarity(fingerprint, seen) >= _DUPLICATE_SIMILARITY for seen in fingerprints):
+            continue
+        items.append(item)
+        fingerprints.append(fingerprint)
+    return items
+
+
+def over_budget(items: List[str], budget: int = COLLECTION_PROMPT_CHARS) -> bool:
+    return len(encode(items)) > budget
+
+
+def fit(items: List[str], budget: int = COLLECTION_PROMPT_CHARS) -> List[str]:
+    """예산 안에 들도록 고르게 표본 추출 (순서 유지)"""
+    if not over_budget(items, budget):
+        return items
+    average = len(encode(items)) / len(items)
+    count = max(1, int(budget / average))
+    while count > 1:
+        step = len(items) / count
+        sample = [items[int(i * step)] for i in range(count)]
+        if not over_budget(sample, budget):
+            return sample
+        count -= 1
+    return items[:1]
+
+
+def _boundary(item: str, target: int) -> bool:
+    digest = hashlib.blake2b(item.encode("utf-8"), digest_size=8).digest()
+    return int.from_bytes(digest, "big") % target == 0
+
+
+def chunk(items: List[str], target: int = COLLECTION_CHUNK_TARGET, budget: int = COLLECTION_PROMPT_CHARS) -> List[List[str]]:
+    """계층 요약용 묶음 나누기 (비슷한 항목끼리, 항목을 추가해도 다른 묶음은 그대로)"""
+    ordered = sorted(items, key=lambda item: (simhash(item), item))
+    chunks, current = [], []
+    for item in ordered:
+        # 예산을 넘게 되면 항목 해시와 무관하게 끊음
+        if len(current) >= _MIN_CHUNK and over_budget(current + [item], budget):
+            chunks.append(current)
+            current = []
+        current.append(item)
+        if len(current) >= _MIN_CHUNK and (_boundary(item, target) or len(current) >= target * 2):
+            chunks.append(current)
+            current = []
+    if current:
+        # 마지막 자투리 한 개는 앞 묶음에 붙임
+        if len(current) < _MIN_CHUNK and chunks:
+            chunks[-1].extend(current)
+        else:
+            chunks.append(current)
+    return chunks
+
+
+def item_count(item: str) -> int:
+    """항목이 대표하는 뉴스레터 수 (부분 요약이면 묶음 크기)"""
+    match = _PARTIAL_RE.match(item)
+    return int(match.group(1)) if match else 1
+
+
+def partial_item(chunk_items: List[str], summary: str) -> str:
+    """부분 요약 → 다음 단계 입력 항목"""
+    count = sum(item_count(item) for item in chunk_items)
+    return f"[{count}개 묶음] {compact(summary)}"
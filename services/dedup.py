@@ -0,0 +1,193 @@
+"""
+유사 중복 콘텐츠 탐지 (SimHash + LSH 버킷)
+
+같은 통신사 기사가 여러 언론사로 재배포되거나 블로그 글이 교차 게시되는 경우,
+이미 요약한 콘텐츠와 충분히 비슷하면 기존 분석 결과를 재사용하여 Gemini 호출을 줄입니다.
+
+- 본문을 정규화한 뒤 단어 3-gram shingle로 64비트 SimHash 계산
+- 64비트를 8비트씩 8개 밴드로 나눠 LSH 버킷에 등록
+  (해밍 거리 7 이하는 비둘기집 원리상 최소 한 밴드가 반드시 일치, 그 이상은 확률적으로 후보가 됨)
+- 후보 중 해밍 거리가 임계값 이하인 항목을 중복으로 판단
+  (기본 10비트 ≈ 유사도 0.84, 무관한 글은 평균 32비트 차이)
+- 지표: archiveat_dedup_similarity (후보가 있었던 조회의 최고 유사도), archiveat_dedup_hit_rate
+- SimHash 계산은 긴 본문에서 100ms 이상 걸리므로 호출자가 실행기에서 한 번 계산해
+  lookup()/add()에 fingerprint로 넘길 수 있음 (main.analyze_article)
+"""
+import hashlib
+import logging
+import re
+import threading
+from collections import OrderedDict
+from dataclasses import dataclass
+from typing import Dict, Optional, Set, Tuple
+
+from services.metrics import DEDUP_HIT_RATE, DEDUP_SIMILARITY
+
+logger = logging.getLogger(__name__)
+
+SIMHASH_BITS = 64
+_BAND_BITS = 8
+_BANDS = SIMHASH_BITS // _BAND_BITS
+_BAND_MASK = (1 << _BAND_BITS) - 1
+
+# 너무 짧은 본문은 우연히 비슷해질 수 있으므로 중복 판단에서 제외
+MIN_CONTENT_CHARS = 200
+
+_NON_WORD_RE = re.compile(r"[^\w]+")
+
+
+def _shingles(text: str, size: int = 3):
+    """정규화된 단어 n-gram 목록"""
+    words = _NON_WORD_RE.sub(" ", text.lower()).split()
+    if len(words) < size:
+        return [" ".join(words)] if words else []
+    return [" ".join(words[i:i + size]) for i in range(len(words) - size + 1)]
+
+
+def simhash(text: str) -> int:
+    """64비트 SimHash"""
+    counts: Dict[str, int] = {}
+    for shingle in _shingles(text):
+        counts[shingle] = counts.get(shingle, 0) + 1
+
+    vector = [0] * SIMHASH_BITS
+    for shingle, weight in counts.items():
+        h = int.from_bytes(hashlib.blake2b(shingle.encode("utf-8"), digest_size=8).digest(), "big")
+        for i in range(SIMHASH_BITS):
+            if h >> i & 1:
+                vector[i] += weight
+            else:
+                vector[i] -= weight
+
+    value = 0
+    for i in range(SIMHASH_BITS):
+        if vector[i] > 0:
+            value |= 1 << i
+    return value
+
+
+def similarity(a: int, b: int) -> float:
+    """두 SimHash의 유사도 (1 - 해밍거리/64)"""
+    return 1.0 - bin(a ^ b).count("1") / SIMHASH_BITS
+
+
+@dataclass
+class DuplicateMatch:
+    key: str
+    similarity: float
+    analysis: dict
+
+
+@dataclass
+class _Entry:
+    fingerprint: int
+    memo: Optional[str]
+    analysis: dict
+
+
+class NearDuplicateIndex:
+    """
+    요약 완료된 콘텐츠의 SimHash 인덱스 (프로세스 내, LRU 제한)
+
+    lookup()으로 유사 콘텐츠의 분석 결과를 찾고, 새로 요약한 결과는 add()로 등록합니다.
+    """
+
+    def __init__(self, max_distance: int = 10, max_entries: int = 10000):
+        self.max_distance = max_distance
+        self.max_entries = max_entries
+        self._entries: "OrderedDict[str, _Entry]" = OrderedDict()
+        self._buckets: Dict[Tuple[int, int], Set[str]] = {}
+        self._lock = threading.Lock()
+
+        # 지표
+        self.lookups = 0
+        self.hits = 0
+        self.last_similarity = 0.0
+
+    @staticmethod
+    def _bands(fingerprint: int):
+        return [(i, fingerprint >> (i * _BAND_BITS) & _BAND_MASK) for i in range(_BANDS)]
+
+    def lookup(self, content: str, memo: Optional[str] = None,
+               fingerprint: Optional[int] = None) -> Optional[DuplicateMatch]:
+        """
+        유사 콘텐츠의 분석 결과 조회
+
+        사용자 메모는 분류에 영향을 주므로 메모가 같은 항목만 재사용합니다.
+        fingerprint: 미리 계산한 simhash(content) (없으면 여기서 계산)
+        """
+        if len(content) < MIN_CONTENT_CHARS:
+            return None
+
+        if fingerprint is None:
+            fingerprint = simhash(content)
+        with self._lock:
+            self.lookups += 1
+            candidates: Set[str] = set()
+            for band in self._bands(fingerprint):
+                candidates |= self._buckets.get(band, set())
+
+            best: Optional[DuplicateMatch] = None
+            for key in candidates:
+                entry = self._entries[key]
+                if entry.memo != memo:
+                    continue
+                score = similarity(fingerprint, entry.fingerprint)
+                if best is None or score > best.similarity:
+                    best = DuplicateMatch(key=key, similarity=score, analysis=entry.analysis)
+
+            if best is not None:
+                DEDUP_SIMILARITY.observe(best.similarity)
+            threshold = 1.0 - self.max_distance / SIMHASH_BITS
+            if best is None or best.similarity < threshold:
+                DEDUP_HIT_RATE.set(self.hit_rate)
+                return None
+
+            self.hits += 1
+            self.last_similarity = best.similarity
+            self._entries.move_to_end(best.key)
+            DEDUP_HIT_RATE.set(self.hit_rate)
+
+        logger.info(f"Near-duplicate hit: {best.key} (similarity {best.similarity:.3f}, hit rate {self.hit_rate:.2%})")
+        return best
+
+    def add(self, key: str, content: str, analysis: dict, memo: Optional[str] = None,
+            fingerprint: Optional[int] = None):
+        """요약 결과 등록 (같은 키는 덮어씀, fingerprint: 미리 계산한 simhash(content))"""
+        if len(content) < MIN_CONTENT_CHARS:
+            return
+
+        if fingerprint is None:
+            fingerprint = simhash(content)
+        with self._lock:
+            if key in self._entries:
+                self._remove_locked(key)
+            self._entries[key] = _Entry(fingerprint=fingerprint, memo=memo, analysis=analysis)
+            for band in self._bands(fingerprint):
+                self._buckets.setdefault(band, set()).add(key)
+
+            while len(self._entries) > self.max_entries:
+                oldest = next(iter(self._entries))
+                self._remove_locked(oldest)
+
+    def _remove_locked(self, key: str):
+        entry = self._entries.pop(key)
+        for band in self._bands(entry.fingerprint):
+            bucket = self._buckets.get(band)
+            if bucket:
+                bucket.discard(key)
+                if not bucket:
+                    del self._buckets[band]
+
+    @property
+    def hit_rate(self) -> float:
+        return self.hits / self.lookups if self.lookups else 0.0
+
+    def stats(self) -> dict:
+        return {
+            "entries": len(self._entries),
+            "lookups": self.lookups,
+            "hits": self.hits,
+            "hit_rate": self.hit_rate,
+            "last_similarity": self.last_similarity,
+        }
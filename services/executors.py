@@ -0,0 +1,152 @@
+"""
+작업 종류별 전용 실행기
+
+asyncio.to_thread는 이벤트 루프의 기본 실행기 하나를 모두가 공유하므로,
+몇 분씩 걸리는 Whisper 작업 몇 개가 풀을 채우면 가벼운 기사 크롤링까지 뒤에서 대기하게 됩니다.
+작업 종류별로 크기를 따로 정한 실행기를 두어 서로 막지 않게 합니다.
+
+- crawl: 웹 크롤링, 캐시/저장소 조회 (I/O 위주, 수 초 이내)
+- media: yt-dlp 정보 추출/오디오 다운로드 (I/O 위주, 수 분까지 - 가벼운 크롤링 자리를 차지하지 않게 분리)
+- llm: Gemini 호출 (I/O 대기 위주)
+- transcription: Whisper 음성 인식 (CPU 위주, TRANSCRIPTION_USE_PROCESSES=1이면 프로세스 풀)
+
+워커 자리는 우선순위 스케줄러(services.scheduler)가 요청의 등급(interactive/normal/background)에 따라
+배정하므로, 실행기 안의 FIFO 대기열에는 작업이 쌓이지 않습니다.
+대기열 길이/실행 중 작업 수는 /metrics의 archiveat_executor_* 지표로 노출됩니다.
+"""
+import asyncio
+import contextvars
+import functools
+import logging
+import multiprocessing
+import os
+import threading
+from concurrent.futures import Executor, ProcessPoolExecutor, ThreadPoolExecutor
+from typing import Dict
+
+from services import cancellation, profiling
+from services.scheduler import PriorityScheduler
+from services.metrics import EXECUTOR_ACTIVE, EXECUTOR_QUEUE_LENGTH
+
+logger = logging.getLogger(__name__)
+
+CRAWL = "crawl"
+MEDIA = "media"
+LLM = "llm"
+TRANSCRIPTION = "transcription"
+
+CRAWL_WORKERS = int(os.getenv("CRAWL_WORKERS", "16"))
+MEDIA_WORKERS = int(os.getenv("MEDIA_WORKERS", "4"))
+LLM_WORKERS = int(os.getenv("LLM_WORKERS", "8"))
+TRANSCRIPTION_WORKERS = int(os.getenv("TRANSCRIPTION_WORKERS", "2"))
+# 1이면 Whisper를 별도 프로세스에서 실행 (GIL 경합 없음, 대신 프로세스마다 모델 로드)
+TRANSCRIPTION_USE_PROCESSES = os.getenv("TRANSCRIPTION_USE_PROCESSES", "0") == "1"
+
+
+class BoundedExecutor:
+    """크기가 고정된 실행기 + 대기열 길이 추적"""
+
+    def __init__(self, name: str, executor: Executor, max_workers: int, uses_processes: bool = False):
+        self.name = name
+        self.max_workers = max_workers
+        self.uses_processes = uses_processes
+        self._executor = executor
+        self.scheduler = PriorityScheduler(name, max_workers)
+        self._outstanding = 0
+        self._lock = threading.Lock()
+
+    @property
+    def queue_length(self) -> int:
+        """아직 워커를 배정받지 못한 작업 수"""
+        return max(0, self._outstanding - self.max_workers)
+
+    @property
+    def active(self) -> int:
+        return min(self._outstanding, self.max_workers)
+
+    def _update(self, delta: int):
+        with self._lock:
+            self._outstanding += delta
+        EXECUTOR_QUEUE_LENGTH.labels(self.name).set(self.queue_length)
+        EXECUTOR_ACTIVE.labels(self.name).set(self.active)
+
+    async def run(self, fn, *args, **kwargs):
+        """fn(*args, **kwargs)를 이 실행기에서 실행하고 결과를 기다림"""
+        # 이미 취소된 요청의 작업은 제출하지 않음
+        cancellation.check(self.name)
+        if self.uses_processes:
+            # 프로세스 경계를 넘을 수 없으므로 contextvar는 전달하지 않음 (fn은 pickle 가능해야 함)
+            call = functools.partial(fn, *args, **kwargs)
+        else:
+            # asyncio.to_thread와 동일하게 현재 컨텍스트(지표 라벨, 취소 토큰 등)를 워커 스레드로 복사
+            call = functools.partial(contextvars.copy_context().run, self._call, fn, *args, **kwargs)
+
+        self._update(+1)
+        try:
+            # 우선순위 등급별로 자리를 배정받은 뒤 제출 (제출된 작업은 바로 워커에서 실행)
+            async with self.scheduler.slot():
+                return await asyncio.get_running_loop().run_in_executor(self._executor, call)
+        finally:
+            self._update(-1)
+
+    def _call(self, fn, *args, **kwargs):
+        # 대기열에서 기다리는 동안 취소되었으면 시작하지 않음
+        cancellation.check(self.name)
+        profile = profiling.current()
+        if profile is None:
+            return fn(*args, **kwargs)
+        # 프로파일링 중인 요청의 작업이면 이 워커 스레드를 샘플링 대상에 추가
+        with profile.attach():
+            return fn(*args, **kwargs)
+
+    def stats(self) -> dict:
+        return {
+            "max_workers": self.max_workers,
+            "active": self.active,
+            "queue_length": self.queue_length,
+            "waiting_by_priority": self.scheduler.waiting(),
+            "processes": self.uses_processes,
+        }
+
+    def shutdown(self):
+        self._executor.shutdown(wait=False, cancel_futures=True)
+
+
+def _thread_pool(name: str, workers: int) -> BoundedExecutor:
+    return BoundedExecutor(name, ThreadPoolExecutor(max_workers=workers, thread_name_prefix=name), workers)
+
+
+_pools: Dict[str, BoundedExecutor] = {
+    CRAWL: _thread_pool(CRAWL, CRAWL_WORKERS),
+    MEDIA: _thread_pool(MEDIA, MEDIA_WORKERS),
+    LLM: _thread_pool(LLM, LLM_WORKERS),
+    TRANSCRIPTION: (
+        # fork는 스레드가 떠 있는 서버 프로세스에서 안전하지 않으므로 spawn 사용
+        BoundedExecutor(TRANSCRIPTION,
+                        ProcessPoolExecutor(max_workers=TRANSCRIPTION_WORKERS,
+                                            mp_context=multiprocessing.get_context("spawn")),
+                        TRANSCRIPTION_WORKERS, uses_processes=True)
+        if TRANSCRIPTION_USE_PROCESSES
+        else _thread_pool(TRANSCRIPTION, TRANSCRIPTION_WORKERS)
+    ),
+}
+logger.info(f"Executors: crawl={CRAWL_WORKERS}, media={MEDIA_WORKERS}, llm={LLM_WORKERS}, "
+            f"transcription={TRANSCRIPTION_WORKERS} ({'processes' if TRANSCRIPTION_USE_PROCESSES else 'threads'})")
+
+
+def get(name: str) -> BoundedExecutor:
+    return _pools[name]
+
+
+async def run(name: str, fn, *args, **kwargs):
+    """지정한 종류의 실행기에서 blocking 함수 실행"""
+    return await _pools[name].run(fn, *args, **kwargs)
+
+
+def stats() -> Dict[str, dict]:
+    return {name: pool.stats() for name, pool in _pools.items()}
+
+
+def shutdown():
+    for pool in _pools.values():
+        pool.shutdown()
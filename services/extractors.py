@@ -0,0 +1,90 @@
+"""
+추출기(Extractor) 레지스트리
+
+URL을 도메인/패턴 기준으로 알맞은 전용 처리기(YouTube, 네이버 뉴스, Tistory, ...)로 라우팅합니다.
+어디에도 해당하지 않으면 fallback 추출기(readability)를 사용합니다.
+
+각 추출기는 비용 등급(cost_class)을 선언하고, 서버는 등급에 따라
+- 실행기(services.executors): html → crawl, audio → media (yt-dlp가 가벼운 크롤링 자리를 차지하지 않음)
+- 수락 제어 비용 등급(services.admission): html → article, audio → captions
+을 정합니다.
+"""
+from dataclasses import dataclass, field
+from typing import Callable, FrozenSet, List, Optional, Pattern
+from urllib.parse import urlparse
+
+from services import admission, executors
+from services.canonical import canonicalize
+
+# 비용 등급
+CHEAP_HTML = "html"          # HTML 한 번 받아서 파싱 (수 초 이내)
+EXPENSIVE_AUDIO = "audio"    # 오디오 다운로드 + 음성 인식 가능 (수 분까지)
+
+# 비용 등급별 추출 실행기 / 수락 제어 비용 등급
+COST_CLASS_EXECUTORS = {CHEAP_HTML: executors.CRAWL, EXPENSIVE_AUDIO: executors.MEDIA}
+COST_CLASS_ADMISSION = {CHEAP_HTML: admission.ARTICLE, EXPENSIVE_AUDIO: admission.CAPTIONS}
+
+# 결과 종류 (응답의 video_info / article_info 결정)
+ARTICLE = "article"
+VIDEO = "video"
+
+
+@dataclass
+class Extractor:
+    name: str
+    cost_class: str
+    kind: str
+    process: Callable[[str], dict]
+    # 매칭 규칙: 정규화 종류(services.canonical), 도메인(서브도메인 포함), URL 정규식 중 하나라도 맞으면 선택
+    canonical_kinds: FrozenSet[str] = field(default_factory=frozenset)
+    domains: FrozenSet[str] = field(default_factory=frozenset)
+    pattern: Optional[Pattern] = None
+
+    @property
+    def executor(self) -> str:
+        """추출(process)을 실행할 실행기 이름"""
+        return COST_CLASS_EXECUTORS[self.cost_class]
+
+    @property
+    def admission_class(self) -> str:
+        """이 추출기로 처리하는 요청의 수락 제어 비용 등급"""
+        return COST_CLASS_ADMISSION[self.cost_class]
+
+    def matches(self, url: str) -> bool:
+        if self.canonical_kinds and canonicalize(url).kind in self.canonical_kinds:
+            return True
+
+        host = (urlparse(url).hostname or "").lower()
+        if any(host == d or host.endswith("." + d) for d in self.domains):
+            return True
+
+        return bool(self.pattern and self.pattern.search(url))
+
+
+class ExtractorRegistry:
+    def __init__(self):
+        self._extractors: List[Extractor] = []
+        self._fallback: Optional[Extractor] = None
+
+    def register(self, extractor: Extractor, fallback: bool = False):
+        """추출기 등록 (먼저 등록된 것이 우선, fallback=True면 기본 추출기로 지정)"""
+        if fallback:
+            self._fallback = extractor
+        else:
+            self._extractors.append(extractor)
+
+    def get(self, name: str) -> Extractor:
+        for extractor in self._extractors + ([self._fallback] if self._fallback else []):
+            if extractor.name == name:
+                return extractor
+        raise KeyError(f"Unknown extractor: {name}")
+
+    def resolve(self, url: str) -> Extractor:
+        """URL에 맞는 추출기 선택"""
+        for extractor in self._extractors:
+            if extractor.matches(url):
+                return extractor
+        if self._fallback is None:
+            raise LookupError(f"No extractor registered for {url}")
+        return self._fallback
+
@@ -0,0 +1,202 @@
+"""
+크롤러용 로컬 HTTP 캐시
+- 응답 본문과 ETag/Last-Modified를 디스크에 저장 (인덱스는 SQLite)
+- 재요청 시 If-None-Match/If-Modified-Since 조건부 GET으로 재검증하고, 304면 캐시 본문 사용
+- 파싱 결과({title, content, thumbnail_url} 등)도 함께 저장하여 변경 없는 페이지는 파싱까지 생략
+  (검증자가 없는 서버라도 본문 해시가 같으면 파싱 결과 재사용)
+- 크기(max_bytes)와 나이(max_age) 기준으로 eviction
+"""
+import hashlib
+import json
+import logging
+import os
+import sqlite3
+import threading
+import time
+from dataclasses import dataclass
+from typing import Optional
+
+logger = logging.getLogger(__name__)
+
+# 환경 변수로 조정 가능한 기본 설정
+HTTP_CACHE_DIR = os.getenv("HTTP_CACHE_DIR", "cache/http")
+HTTP_CACHE_MAX_BYTES = int(os.getenv("HTTP_CACHE_MAX_BYTES", str(200 * 1024 * 1024)))  # 200MB
+HTTP_CACHE_MAX_AGE = int(os.getenv("HTTP_CACHE_MAX_AGE", str(7 * 24 * 3600)))  # 7일
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS entries (
+    key TEXT PRIMARY KEY,
+    url TEXT NOT NULL,
+    body_file TEXT NOT NULL,
+    size INTEGER NOT NULL,
+    body_hash TEXT NOT NULL,
+    charset TEXT,
+    etag TEXT,
+    last_modified TEXT,
+    extracted TEXT,
+    fetched_at REAL NOT NULL,
+    last_access REAL NOT NULL
+)
+"""
+
+
+@dataclass
+class CacheEntry:
+    key: str
+    url: str
+    body: bytes
+    charset: Optional[str]
+    etag: Optional[str]
+    last_modified: Optional[str]
+    extracted: Optional[dict]
+    fetched_at: float
+
+    def conditional_headers(self) -> dict:
+        """재검증용 조건부 요청 헤더"""
+        headers = {}
+        if self.etag:
+            headers["If-None-Match"] = self.etag
+        if self.last_modified:
+            headers["If-Modified-Since"] = self.last_modified
+        return headers
+
+
+class HttpCache:
+    """
+    디스크 기반 HTTP 캐시 (스레드 안전)
+
+    본문은 body 디렉터리에 파일로, 메타데이터는 index.sqlite3에 저장합니다.
+    """
+
+    def __init__(self, cache_dir: str = HTTP_CACHE_DIR,
+                 max_bytes: int = HTTP_CACHE_MAX_BYTES,
+                 max_age: int = HTTP_CACHE_MAX_AGE):
+        self.cache_dir = cache_dir
+        self.body_dir = os.path.join(cache_dir, "bodies")
+        self.max_bytes = max_bytes
+        self.max_age = max_age
+        os.makedirs(self.body_dir, exist_ok=True)
+
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(os.path.join(cache_dir, "index.sqlite3"), check_same_thread=False)
+        self._conn.execute(_SCHEMA)
+        self._conn.commit()
+
+    def _body_path(self, body_file: str) -> str:
+        return os.path.join(self.body_dir, body_file)
+
+    def get(self, key: str) -> Optional[CacheEntry]:
+        """캐시 항목 조회 (만료된 항목은 삭제 후 None)"""
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT url, body_file, charset, etag, last_modified, extracted, fetched_at "
+                "FROM entries WHERE key = ?", (key,)
+            ).fetchone()
+            if row is None:
+                return None
+
+            url, body_file, charset, etag, last_modified, extracted, fetched_at = row
+            if time.time() - fetched_at > self.max_age:
+                self._delete_locked(key, body_file)
+                return None
+
+            try:
+                with open(self._body_path(body_file), "rb") as f:
+                    body = f.read()
+            except OSError:
+                # 인덱스만 남고 본문 파일이 사라진 경우
+                self._delete_locked(key, body_file)
+                return None
+
+            self._conn.execute("UPDATE entries SET last_access = ? WHERE key = ?", (time.time(), key))
+            self._conn.commit()
+
+        return CacheEntry(
+            key=key,
+            url=url,
+            body=body,
+            charset=charset,
+            etag=etag,
+            last_modified=last_modified,
+            extracted=json.loads(extracted) if extracted else None,
+            fetched_at=fetched_at,
+        )
+
+    def store(self, key: str, url: str, body: bytes, etag: Optional[str] = None,
+              last_modified: Optional[str] = None, charset: Optional[str] = None) -> Optional[dict]:
+        """
+        새로 받은 본문 저장
+
+        Returns:
+            본문이 이전과 동일하면 기존 파싱 결과(dict), 아니면 None (파싱 결과 무효화)
+        """
+        body_file = hashlib.sha1(key.encode("utf-8")).hexdigest() + ".bin"
+        body_hash = hashlib.sha256(body).hexdigest()
+        now = time.time()
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT body_hash, extracted FROM entries WHERE key = ?", (key,)
+            ).fetchone()
+            extracted = row[1] if row and row[0] == body_hash else None
+
+            with open(self._body_path(body_file), "wb") as f:
+                f.write(body)
+            self._conn.execute(
+                "INSERT OR REPLACE INTO entries "
+                "(key, url, body_file, size, body_hash, charset, etag, last_modified, extracted, fetched_at, last_access) "
+                "VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)",
+                (key, url, body_file, len(body), body_hash, charset, etag, last_modified, extracted, now, now)
+            )
+            self._conn.commit()
+            self._evict_locked()
+
+        return json.loads(extracted) if extracted else None
+
+    def revalidated(self, key: str, etag: Optional[str] = None, last_modified: Optional[str] = None):
+        """304 응답 수신 시 신선도 갱신 (서버가 새 검증자를 준 경우 반영)"""
+        now = time.time()
+        with self._lock:
+            self._conn.execute(
+                "UPDATE entries SET fetched_at = ?, last_access = ?, "
+                "etag = COALESCE(?, etag), last_modified = COALESCE(?, last_modified) WHERE key = ?",
+                (now, now, etag, last_modified, key)
+            )
+            self._conn.commit()
+
+    def store_extracted(self, key: str, extracted: dict):
+        """파싱 결과 저장 (본문이 바뀌기 전까지 재사용)"""
+        with self._lock:
+            self._conn.execute(
+                "UPDATE entries SET extracted = ? WHERE key = ?",
+                (json.dumps(extracted, ensure_ascii=False), key)
+            )
+            self._conn.commit()
+
+    def _delete_locked(self, key: str, body_file: str):
+        self._conn.execute("DELETE FROM entries WHERE key = ?", (key,))
+        self._conn.commit()
+        try:
+            os.remove(self._body_path(body_file))
+        except OSError:
+            pass
+
+    def _evict_locked(self):
+        """나이 초과 항목 삭제 후, 총 크기가 max_bytes 이하가 될 때까지 오래 안 쓴 항목부터 삭제"""
+        cutoff = time.time() - self.max_age
+        for key, body_file in self._conn.execute(
+            "SELECT key, body_file FROM entries WHERE fetched_at < ?", (cutoff,)
+        ).fetchall():
+            self._delete_locked(key, body_file)
+
+        total = self._conn.execute("SELECT COALESCE(SUM(size), 0) FROM entries").fetchone()[0]
+        if total <= self.max_bytes:
+            return
+
+        for key, body_file, size in self._conn.execute(
+            "SELECT key, body_file, size FROM entries ORDER BY last_access ASC"
+        ).fetchall():
+            if total <= self.max_bytes:
+                break
+            self._delete_locked(key, body_file)
+            total -= size
+            logger.info(f"HTTP cache evicted: {key}")
@@ -0,0 +1,173 @@
+"""
+Gemini 구조화 출력 검증 / 부분 복구 (models.py의 Pydantic 모델을 response_schema로 사용)
+
+프롬프트에 JSON 형식을 글로 설명하는 것만으로는 필드 누락, 마크다운 코드 블록, 출력 한도에서 잘린 JSON이
+섞여 나오고, 예전에는 json.loads 실패나 엔드포인트의 .get() 기본값으로만 드러났습니다.
+
+- 생성: GenerateContentConfig.response_schema에 출력 모델을 지정 (스키마 제약 생성)
+- 검증: 응답 텍스트를 모델로 한 번에 파싱/검증 (model_validate_json)
+- 실패 시 로컬 복구: 코드 블록/앞뒤 설명 제거, 잘린 JSON은 마지막으로 완결된 값까지 살려 괄호를 닫음
+- 그래도 빠지거나 틀린 필드가 있으면: 그 필드만 담은 부분 스키마로 한 번 더 요청해 채움 (LLM_REPAIR_RETRIES, 기본 1)
+- 결과별 건수: archiveat_llm_output_total{schema, outcome=valid|repaired|retried|invalid}
+"""
+import functools
+import json
+import os
+import re
+from typing import Dict, List, Optional, Tuple, Type
+
+from pydantic import BaseModel, ValidationError, create_model
+
+from services.metrics import LLM_OUTPUTS
+
+LLM_REPAIR_RETRIES = int(os.getenv("LLM_REPAIR_RETRIES", "1"))
+
+# 검증 결과
+VALID = "valid"          # 그대로 통과
+REPAIRED = "repaired"    # 로컬 복구(코드 블록 제거 / 잘린 JSON 닫기) 후 통과
+RETRIED = "retried"      # 빠진 필드를 다시 요청해 채움
+INVALID = "invalid"      # 복구 실패
+
+# 요약 결과 dict의 error 종류 (main.check_analysis에서 502로 응답)
+INVALID_OUTPUT = "invalid_output"
+
+_FENCE_RE = re.compile(r"^\s*```(?:json)?\s*|\s*```\s*$")
+# 잘린 JSON에서 되돌아가 볼 최대 지점 수
+_MAX_CUTS = 64
+
+
+class InvalidOutput(ValueError):
+    """복구할 수 없는 Gemini 출력"""
+
+    def __init__(self, schema: Type[BaseModel], fields: List[str], text: str):
+        super().__init__(f"Invalid {schema.__name__} output (fields: {', '.join(fields) or '-'}): {text[:200]!r}")
+        self.schema = schema
+        self.fields = fields
+
+
+def _close(text: str) -> List[str]:
+    """잘린 JSON → 마지막으로 완결된 값(최상위 필드 / 배열 원소)까지 자르고 괄호를 닫은 후보들 (뒤쪽부터)"""
+    stack, cuts = [], []
+    in_string = escaped = False
+    for i, char in enumerate(text):
+        if in_string:
+            if escaped:
+                escaped = False
+            elif char == "\\":
+                escaped = True
+            elif char == '"':
+                in_string = False
+            continue
+        if char == '"':
+            in_string = True
+        elif char in "{[":
+            stack.append("}" if char == "{" else "]")
+        elif char in "}]":
+            if not stack:
+                break
+            stack.pop()
+            cuts.append((i + 1, "".join(reversed(stack))))
+        elif char == "," and (len(stack) == 1 or stack[-1] == "]"):
+            # 최상위 필드 사이 / 배열 원소 사이에서만 자름 (중첩 객체를 반쪽으로 남기지 않도록)
+            cuts.append((i, "".join(reversed(stack))))
+    candidates = [text[:cut] + closing for cut, closing in reversed(cuts[-_MAX_CUTS:])]
+    if stack and not in_string:
+        # 값 하나가 막 끝난 지점에서 잘렸으면 괄호만 닫아도 됨
+        candidates.insert(0, text + "".join(reversed(stack)))
+    return candidates
+
+
+def extract(text: str) -> Optional[dict]:
+    """응답 텍스트에서 JSON 객체 추출 (코드 블록 / 앞뒤 설명 / 출력 한도에서 잘린 경우 복구)"""
+    text = _FENCE_RE.sub("", text or "")
+    start = text.find("{")
+    if start < 0:
+        return None
+    end = text.rfind("}")
+    if end > start:
+        try:
+            data = json.loads(text[start:end + 1])
+            return data if isinstance(data, dict) else None
+        except ValueError:
+            pass
+    for candidate in _close(text[start:]):
+        try:
+            data = json.loads(candidate)
+        except ValueError:
+            continue
+        if isinstance(data, dict):
+            return data
+    return None
+
+
+def invalid_fields(schema: Type[BaseModel], data: dict) -> List[str]:
+    """검증에 실패한(빠졌거나 형식이 틀린) 최상위 필드"""
+    try:
+        schema.model_validate(data)
+        return []
+    except ValidationError as e:
+        fields = {str(error["loc"][0]) for error in e.errors() if error["loc"]}
+        return [name for name in schema.model_fields if name in fields]
+
+
+def parse(schema: Type[BaseModel], text: str) -> Tuple[dict, List[str], str]:
+    """
+    응답 텍스트 → (검증된 필드 dict, 다시 받아야 할 필드, 결과)
+    다시 받아야 할 필드가 없으면 dict는 스키마에 맞는 전체 결과
+    """
+    try:
+        return schema.model_validate_json(text).model_dump(), [], VALID
+    except ValidationError:
+        pass
+    data = extract(text)
+    if data is None:
+        return {}, list(schema.model_fields), INVALID
+    missing = invalid_fields(schema, data)
+    if not missing:
+        return schema.model_validate(data).model_dump(), [], REPAIRED
+    partial = {name: data[name] for name in schema.model_fields if name in data and name not in missing}
+    return partial, missing, INVALID
+
+
+@functools.lru_cache(maxsize=None)
+def _partial_schema(schema: Type[BaseModel], fields: Tuple[str, ...]) -> Type[BaseModel]:
+    definitions = {name: (schema.model_fields[name].annotation, ...) for name in fields}
+    return create_model(f"{schema.__name__}Repair", **definitions)
+
+
+def partial_schema(schema: Type[BaseModel], fields: List[str]) -> Type[BaseModel]:
+    """schema에서 fields만 담은 출력 모델 (부분 재요청용)"""
+    return _partial_schema(schema, tuple(fields))
+
+
+def repair_prompt(prompt: str, fields: List[str], partial: Dict[str, object]) -> str:
+    """빠진 필드만 다시 요청하는 프롬프트 (원래 지시/입력 + 이미 받은 필드)"""
+    received = json.dumps(partial, ensure_ascii=False) if partial else "(없음)"
+    return f"""{prompt}
+
+        ### 이전 응답 보완:
+        이전 응답에서 다음 필드가 빠졌거나 형식이 잘못되었습니다: {", ".join(fields)}
+        이미 받은 필드: {received}
+        위 지시에 따라 빠진 필드만 JSON으로 반환하세요.
+        """
+
+
+def generate(schema: Type[BaseModel], prompt: str, call, retries: int = LLM_REPAIR_RETRIES) -> dict:
+    """
+    call(prompt, schema) → 응답 텍스트, 스키마에 맞는 결과 dict 반환 (복구 실패 시 InvalidOutput)
+    """
+    text = call(prompt, schema)
+    result, missing, outcome = parse(schema, text)
+    attempts = 0
+    while missing and attempts < retries:
+        attempts += 1
+        repair = partial_schema(schema, missing)
+        patch, still_missing, _ = parse(repair, call(repair_prompt(prompt, missing, result), repair))
+        result = {**result, **patch}
+        missing = still_missing
+        outcome = RETRIED
+    if missing:
+        LLM_OUTPUTS.labels(schema.__name__, INVALID).inc()
+        raise InvalidOutput(schema, missing, text)
+    LLM_OUTPUTS.labels(schema.__name__, outcome).inc()
+    return schema.model_validate(result).model_dump() if outcome == RETRIED else result
@@ -0,0 +1,296 @@
+"""
+Prometheus 지표 (/metrics)
+
+- 엔드포인트별 요청 지연/진행 중 요청 수
+- 파이프라인 단계(stage)별 지연 히스토그램/진행 중 개수/에러 수
+- 캐시 적중/미스 (적중률 = hit / (hit + miss))
+- 유사 중복 탐지: 후보 유사도 분포, 적중률
+- Gemini 토큰 사용량 (응답 usage_metadata 기준), 모델 경로별 지연/오류
+- 프롬프트 템플릿/버전별 호출 수/지연/토큰 (지시문 전송 방식 inline / system / explicit 비교)
+- Gemini 입력 예산 계획별 원문 추정 토큰 수, 추정 대비 실제 입력 토큰 비율 (services.tokens)
+- Gemini 구조화 출력 검증 결과 (통과 / 로컬 복구 / 부분 재요청 / 실패)
+- 로컬 분류기 사용 결과 (사전 분류 / 대체 / Gemini 분류와 일치 여부)
+- Whisper로 처리한 오디오 길이(초)
+- 실행기 대기열, 우선순위 등급별 대기 시간, 수락 제어 거절/저비용 전환 건수
+- 클라이언트 연결 종료/마감 시간 초과로 중단한 단계 수
+
+단계 계측은 모든 처리기에서 stage_timer() 컨텍스트로 통일합니다.
+단계 이름(모든 엔드포인트 공통): fetch, parse, transcript_lookup, audio_download,
+transcription, llm, serialization
+opt-in 요청은 같은 단계 시간이 RequestTimings에도 기록되어 Server-Timing 헤더로 나갑니다.
+엔드포인트 라벨은 미들웨어가 contextvar에 넣어두며, executors.run이 제출할 때 현재 컨텍스트를
+워커 스레드로 복사하므로(contextvars.copy_context) 워커 안의 stage_timer에서도 그대로 보입니다.
+프로세스 풀(TRANSCRIPTION_USE_PROCESSES=1)에서는 컨텍스트가 넘어가지 않으므로,
+음성 인식 시간은 결과를 받은 부모 프로세스에서 services.youtube.record_transcription()으로 기록합니다.
+"""
+import contextvars
+import threading
+import time
+from contextlib import contextmanager
+from typing import Dict, Optional
+
+from prometheus_client import CONTENT_TYPE_LATEST, Counter, Gauge, Histogram, generate_latest
+
+from services import profiling
+
+# 크롤링(수십 ms) ~ Whisper(수 분)까지 포괄하는 버킷
+_LATENCY_BUCKETS = (0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10, 30, 60, 120, 300, 600)
+
+REQUEST_LATENCY = Histogram(
+    "archiveat_request_duration_seconds", "HTTP request latency",
+    ["endpoint", "status"], buckets=_LATENCY_BUCKETS,
+)
+REQUESTS_IN_FLIGHT = Gauge(
+    "archiveat_requests_in_flight", "HTTP requests currently being processed",
+    ["endpoint"],
+)
+STAGE_LATENCY = Histogram(
+    "archiveat_stage_duration_seconds", "Pipeline stage latency",
+    ["endpoint", "stage"], buckets=_LATENCY_BUCKETS,
+)
+STAGE_IN_FLIGHT = Gauge(
+    "archiveat_stage_in_flight", "Pipeline stages currently running",
+    ["endpoint", "stage"],
+)
+STAGE_ERRORS = Counter(
+    "archiveat_stage_errors_total", "Pipeline stages that raised an exception",
+    ["endpoint", "stage"],
+)
+DEDUP_SIMILARITY = Histogram(
+    "archiveat_dedup_similarity", "Best near-duplicate candidate similarity per lookup (hits and misses)",
+    buckets=(0.5, 0.6, 0.7, 0.75, 0.8, 0.84, 0.88, 0.92, 0.96, 1.0),
+)
+DEDUP_HIT_RATE = Gauge(
+    "archiveat_dedup_hit_rate", "Near-duplicate index hit rate in this process (hits / lookups)",
+)
+CACHE_LOOKUPS = Counter(
+    "archiveat_cache_lookups_total", "Cache lookups by result (hit/miss)",
+    ["cache", "result"],
+)
+GEMINI_TOKENS = Counter(
+    "archiveat_gemini_tokens_total", "Gemini token usage from response usage_metadata",
+    ["model", "kind"],
+)
+LLM_ROUTE_LATENCY = Histogram(
+    "archiveat_llm_route_duration_seconds", "Gemini call latency by route and model",
+    ["route", "model"], buckets=_LATENCY_BUCKETS,
+)
+LLM_ROUTE_ERRORS = Counter(
+    "archiveat_llm_route_errors_total", "Gemini call errors by route and model (throttled/error)",
+    ["route", "model", "kind"],
+)
+PROMPT_CALLS = Histogram(
+    "archiveat_prompt_duration_seconds", "Gemini call latency by prompt template, version and prefix mode",
+    ["template", "version", "prefix"], buckets=_LATENCY_BUCKETS,
+)
+PROMPT_TOKENS = Counter(
+    "archiveat_prompt_tokens_total", "Gemini tokens by prompt template and version (prompt / cached / candidates)",
+    ["template", "version", "kind"],
+)
+# 짧은 기사(수백 토큰) ~ 긴 영상 자막(수십만 토큰)
+_TOKEN_BUCKETS = (250, 500, 1000, 2000, 4000, 8000, 16000, 32000, 64000, 128000, 256000, 512000, 1000000)
+LLM_INPUT_TOKENS = Histogram(
+    "archiveat_llm_input_tokens", "Estimated content tokens before a Gemini call by input plan (as_is/compact/truncate/chunked)",
+    ["plan"], buckets=_TOKEN_BUCKETS,
+)
+TOKEN_ESTIMATE_RATIO = Histogram(
+    "archiveat_token_estimate_ratio", "Actual prompt_token_count / local estimate by prompt template",
+    ["template"], buckets=(0.5, 0.7, 0.8, 0.9, 1.0, 1.1, 1.25, 1.5, 2, 3),
+)
+LLM_OUTPUTS = Counter(
+    "archiveat_llm_output_total",
+    "Gemini structured output validation by schema (valid / repaired / retried / invalid)",
+    ["schema", "outcome"],
+)
+CLASSIFIER_PREDICTIONS = Counter(
+    "archiveat_classifier_predictions_total",
+    "Local topic classifier usage (preclassified / fallback / agree / disagree with Gemini)",
+    ["outcome"],
+)
+WHISPER_AUDIO_SECONDS = Counter(
+    "archiveat_whisper_audio_seconds_total", "Audio seconds transcribed by Whisper",
+)
+EXECUTOR_QUEUE_LENGTH = Gauge(
+    "archiveat_executor_queue_length", "Jobs waiting for a worker in each executor",
+    ["executor"],
+)
+EXECUTOR_ACTIVE = Gauge(
+    "archiveat_executor_active", "Jobs currently running in each executor",
+    ["executor"],
+)
+SCHEDULER_WAIT = Histogram(
+    "archiveat_scheduler_wait_seconds", "Time jobs waited for an executor slot by priority class",
+    ["executor", "priority"], buckets=_LATENCY_BUCKETS,
+)
+SCHEDULER_QUEUE_LENGTH = Gauge(
+    "archiveat_scheduler_queue_length", "Jobs waiting for an executor slot by priority class",
+    ["executor", "priority"],
+)
+ADMISSION_IN_USE = Gauge(
+    "archiveat_admission_in_use", "Admitted cost currently in flight per cost class",
+    ["cost_class"],
+)
+ADMISSION_SHED = Counter(
+    "archiveat_admission_shed_total", "Requests shed by admission control (rejected/downgraded)",
+    ["cost_class", "action"],
+)
+CANCELLED_WORK = Counter(
+    "archiveat_cancelled_work_total", "Pipeline stages skipped or aborted because the request was cancelled",
+    ["stage", "reason"],
+)
+
+_endpoint = contextvars.ContextVar("metrics_endpoint", default="-")
+_timings = contextvars.ContextVar("request_timings", default=None)
+
+
+class RequestTimings:
+    """
+    요청 하나의 단계별 소요 시간 (Server-Timing 헤더 / 응답 timings 필드용)
+
+    같은 단계가 여러 번 실행되면 누적합니다.
+    """
+
+    def __init__(self):
+        self._stages: Dict[str, float] = {}
+        self._lock = threading.Lock()
+        self._start = time.perf_counter()
+
+    def add(self, stage: str, seconds: float):
+        with self._lock:
+            self._stages[stage] = self._stages.get(stage, 0.0) + seconds
+
+    def as_millis(self) -> Dict[str, float]:
+        with self._lock:
+            return {stage: round(seconds * 1000, 1) for stage, seconds in self._stages.items()}
+
+    def server_timing_header(self) -> str:
+        """예: fetch;dur=123.4, llm;dur=3456.7, total;dur=3600.2"""
+        parts = [f"{stage};dur={ms}" for stage, ms in self.as_millis().items()]
+        parts.append(f"total;dur={round((time.perf_counter() - self._start) * 1000, 1)}")
+        return ", ".join(parts)
+
+
+def start_request_timings() -> RequestTimings:
+    """현재 요청에 단계별 시간 기록 활성화 (opt-in 요청에서만 호출)"""
+    timings = RequestTimings()
+    _timings.set(timings)
+    return timings
+
+
+def current_timings() -> Optional[RequestTimings]:
+    return _timings.get()
+
+
+def set_endpoint(endpoint: str) -> contextvars.Token:
+    """현재 요청의 엔드포인트 라벨 지정 (미들웨어에서 호출)"""
+    return _endpoint.set(endpoint)
+
+
+def reset_endpoint(token: contextvars.Token):
+    _endpoint.reset(token)
+
+
+def current_endpoint() -> str:
+    return _endpoint.get()
+
+
+@contextmanager
+def stage_timer(stage: str):
+    """
+    파이프라인 단계 계측
+
+    사용 예:
+        with stage_timer("fetch"):
+            response = session.get(url)
+    """
+    endpoint = _endpoint.get()
+    in_flight = STAGE_IN_FLIGHT.labels(endpoint, stage)
+    in_flight.inc()
+    # 프로파일링 중인 요청이면 단계별 샘플/메모리 최고치 기록
+    profile = profiling.current()
+    if profile is not None:
+        profile.stage_enter(stage)
+    start = time.perf_counter()
+    try:
+        yield
+    except BaseException:
+        STAGE_ERRORS.labels(endpoint, stage).inc()
+        raise
+    finally:
+        elapsed = time.perf_counter() - start
+        STAGE_LATENCY.labels(endpoint, stage).observe(elapsed)
+        in_flight.dec()
+        timings = _timings.get()
+        if timings is not None:
+            timings.add(stage, elapsed)
+        if profile is not None:
+            profile.stage_exit(stage, elapsed)
+
+
+def observe_stage(stage: str, seconds: float):
+    """다른 프로세스 등 stage_timer로 감쌀 수 없는 곳에서 잰 단계 시간 기록"""
+    STAGE_LATENCY.labels(_endpoint.get(), stage).observe(seconds)
+    timings = _timings.get()
+    if timings is not None:
+        timings.add(stage, seconds)
+
+
+def record_cache(cache: str, hit: bool):
+    CACHE_LOOKUPS.labels(cache, "hit" if hit else "miss").inc()
+
+
+def record_gemini_usage(model: str, response):
+    """generate_content 응답의 usage_metadata를 토큰 카운터에 반영"""
+    usage = getattr(response, "usage_metadata", None)
+    if usage is None:
+        return
+    for kind, attr in (
+        ("prompt", "prompt_token_count"),
+        ("candidates", "candidates_token_count"),
+        ("cached", "cached_content_token_count"),
+        ("total", "total_token_count"),
+    ):
+        value = getattr(usage, attr, None)
+        if value:
+            GEMINI_TOKENS.labels(model, kind).inc(value)
+
+
+def record_prompt_call(template: str, version: str, prefix: str, seconds: float):
+    PROMPT_CALLS.labels(template, version, prefix).observe(seconds)
+
+
+def record_prompt_usage(template: str, version: str, response):
+    """템플릿/버전별 토큰 (cached / prompt 비율 = 지시문 접두어 캐시 적중 정도)"""
+    usage = getattr(response, "usage_metadata", None)
+    if usage is None:
+        return
+    for kind, attr in (
+        ("prompt", "prompt_token_count"),
+        ("cached", "cached_content_token_count"),
+        ("candidates", "candidates_token_count"),
+    ):
+        value = getattr(usage, attr, None)
+        if value:
+            PROMPT_TOKENS.labels(template, version, kind).inc(value)
+
+
+def record_input_plan(plan: str, tokens: int):
+    LLM_INPUT_TOKENS.labels(plan).observe(tokens)
+
+
+def record_token_estimate(template: str, estimated: int, response):
+    """로컬 추정 토큰 수와 응답 usage_metadata.prompt_token_count 비교 (services.tokens 비율 보정용)"""
+    usage = getattr(response, "usage_metadata", None)
+    actual = getattr(usage, "prompt_token_count", None)
+    if actual and estimated:
+        TOKEN_ESTIMATE_RATIO.labels(template).observe(actual / estimated)
+
+
+def record_whisper_audio(seconds: float):
+    if seconds:
+        WHISPER_AUDIO_SECONDS.inc(seconds)
+
+
+def render_latest():
+    """(본문, Content-Type) - /metrics 응답용"""
+    return generate_latest(), CONTENT_TYPE_LATEST
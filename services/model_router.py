@@ -0,0 +1,188 @@
+"""
+Gemini 모델 라우팅
+
+200자 Tistory 글부터 2시간짜리 영상 자막, 컬렉션 제목까지 모두 같은 모델로 보내는 대신
+작업 종류 / 콘텐츠 종류(엔드포인트로 추정) / 입력 길이로 경로(route)를 고르고,
+경로마다 정해진 모델 순서와 생성 설정으로 호출합니다.
+
+경로 (기본):
+- collection: 컬렉션 제목/설명 (짧은 출력) → lite 모델, 출력 1024토큰, thinking 없음
+- short: ROUTER_SHORT_CHARS(기본 4000자) 이하 기사 → lite 모델, 출력 4096토큰, thinking 없음
+- long: ROUTER_LONG_CHARS(기본 60000자) 이상 (긴 영상 자막 등) → 기본 모델, 출력 8192토큰
+- standard: 그 외 → 기본 모델, 출력 8192토큰
+모델은 GEMINI_MODEL(기본 gemini-flash-latest), GEMINI_LITE_MODEL(기본 gemini-flash-lite-latest)
+생성 설정은 경로마다 따로 (짧은 출력 경로는 출력 한도를 낮추고 thinking을 꺼서 지연/비용 절감)
+
+- 관측 지연: 경로/모델별 지연 EWMA. 요청 마감 시간(X-Request-Timeout)이 남은 시간보다
+  첫 모델의 예상 지연이 길면 더 빠른 다음 모델을 먼저 시도
+- 대체 모델: 429(할당량 초과)/503(과부하) 응답이면 그 모델을 ROUTER_THROTTLE_COOLDOWN초(기본 30) 동안
+  건너뛰고 경로의 다음 모델로 재시도
+- 경로/모델별 지연, 오류: /metrics의 archiveat_llm_route_duration_seconds, archiveat_llm_route_errors_total
+"""
+import logging
+import os
+import threading
+import time
+from dataclasses import dataclass, field
+from typing import Callable, Dict, List, Optional, Tuple
+
+from services import cancellation, metrics
+from services.metrics import LLM_ROUTE_ERRORS, LLM_ROUTE_LATENCY
+
+logger = logging.getLogger(__name__)
+
+GEMINI_MODEL = os.getenv("GEMINI_MODEL", "gemini-flash-latest")
+GEMINI_LITE_MODEL = os.getenv("GEMINI_LITE_MODEL", "gemini-flash-lite-latest")
+ROUTER_SHORT_CHARS = int(os.getenv("ROUTER_SHORT_CHARS", "4000"))
+ROUTER_LONG_CHARS = int(os.getenv("ROUTER_LONG_CHARS", "60000"))
+ROUTER_THROTTLE_COOLDOWN = float(os.getenv("ROUTER_THROTTLE_COOLDOWN", "30"))
+
+# 작업 종류
+CONTENT = "content"
+COLLECTION = "collection"
+
+# 콘텐츠 종류 (services.extractors의 ARTICLE / VIDEO와 같은 값)
+ARTICLE = "article"
+VIDEO = "video"
+GENERIC = "generic"
+
+# 호출자가 콘텐츠 종류를 넘기지 않으면 엔드포인트로 추정
+_ENDPOINT_CONTENT_TYPES = {
+    "/api/v1/summarize/youtube": VIDEO,
+    "/api/v1/summarize/naver-news": ARTICLE,
+    "/api/v1/summarize/tistory": ARTICLE,
+    "/api/v1/summarize/generic": GENERIC,
+}
+
+# 할당량 초과 / 일시적 과부하 (다른 모델로 재시도할 오류)
+_THROTTLE_CODES = {429, 503}
+_EWMA_ALPHA = 0.2
+
+JSON_CONFIG = {"response_mime_type": "application/json"}
+# thinking 끄기 (짧은 분류/요약에는 추론 토큰이 지연만 늘림)
+NO_THINKING = {"thinking_config": {"thinking_budget": 0}}
+
+
+def route_config(max_output_tokens: int, thinking: bool = True) -> dict:
+    """경로별 생성 설정 (JSON 응답 + 출력 한도 + thinking 여부)"""
+    config = {**JSON_CONFIG, "max_output_tokens": max_output_tokens}
+    return config if thinking else {**config, **NO_THINKING}
+
+
+@dataclass
+class Route:
+    name: str
+    models: List[str]  # 시도 순서 (첫 번째가 기본)
+    config: dict = field(default_factory=lambda: dict(JSON_CONFIG))
+
+
+def default_routes() -> Dict[str, Route]:
+    return {
+        COLLECTION: Route(COLLECTION, [GEMINI_LITE_MODEL, GEMINI_MODEL], route_config(1024, thinking=False)),
+        "short": Route("short", [GEMINI_LITE_MODEL, GEMINI_MODEL], route_config(4096, thinking=False)),
+        "standard": Route("standard", [GEMINI_MODEL, GEMINI_LITE_MODEL], route_config(8192)),
+        "long": Route("long", [GEMINI_MODEL, GEMINI_LITE_MODEL], route_config(8192)),
+    }
+
+
+def is_throttled(error: Exception) -> bool:
+    """할당량 초과(429) / 과부하(503) 여부 (google.genai.errors.APIError.code 기준)"""
+    return getattr(error, "code", None) in _THROTTLE_CODES
+
+
+class ModelRouter:
+    def __init__(self, routes: Optional[Dict[str, Route]] = None,
+                 short_chars: int = ROUTER_SHORT_CHARS, long_chars: int = ROUTER_LONG_CHARS,
+                 throttle_cooldown: float = ROUTER_THROTTLE_COOLDOWN):
+        self.routes = routes or default_routes()
+        self.short_chars = short_chars
+        self.long_chars = long_chars
+        self.throttle_cooldown = throttle_cooldown
+        self._latency: Dict[Tuple[str, str], float] = {}
+        self._calls: Dict[Tuple[str, str], int] = {}
+        self._errors: Dict[Tuple[str, str], int] = {}
+        self._throttled_until: Dict[str, float] = {}
+        self._lock = threading.Lock()
+
+    def choose(self, task: str, chars: int, content_type: Optional[str] = None) -> Route:
+        """작업 종류 / 콘텐츠 종류 / 입력 길이로 경로 선택"""
+        if task == COLLECTION:
+            return self.routes[COLLECTION]
+        content_type = content_type or _ENDPOINT_CONTENT_TYPES.get(metrics.current_endpoint(), GENERIC)
+        if chars >= self.long_chars:
+            return self.routes["long"]
+        if content_type == ARTICLE and chars <= self.short_chars:
+            return self.routes["short"]
+        return self.routes["standard"]
+
+    def candidates(self, route: Route) -> List[str]:
+        """시도할 모델 순서: 할당량 초과 중인 모델은 뒤로, 마감 시간에 못 맞출 기본 모델은 빠른 모델 뒤로"""
+        now = time.monotonic()
+        with self._lock:
+            available = [m for m in route.models if self._throttled_until.get(m, 0) <= now]
+            throttled = [m for m in route.models if m not in available]
+            latency = {m: self._latency.get((route.name, m)) for m in available}
+
+        token = cancellation.current()
+        remaining = token.remaining() if token else None
+        if remaining is not None and len(available) > 1:
+            primary = available[0]
+            expected = latency[primary]
+            faster = [m for m in available[1:] if latency[m] is not None and latency[m] <= remaining]
+            if expected is not None and expected > remaining and faster:
+                logger.info(f"Route '{route.name}': {primary} expected {expected:.1f}s > {remaining:.1f}s left, "
+                            f"trying {faster[0]} first")
+                available.remove(faster[0])
+                available.insert(0, faster[0])
+        # 모두 할당량 초과 중이면 원래 순서로라도 시도
+        return available + throttled
+
+    def call(self, route: Route, fn: Callable[[str, dict], object]) -> Tuple[str, object]:
+        """fn(model, config)을 경로의 모델 순서대로 호출 → (사용한 모델, 결과)"""
+        models = self.candidates(route)
+        for i, model in enumerate(models):
+            start = time.perf_counter()
+            try:
+                result = fn(model, route.config)
+            except Exception as e:
+                throttled = is_throttled(e)
+                self.record_error(route, model, "throttled" if throttled else "error")
+                if throttled:
+                    with self._lock:
+                        self._throttled_until[model] = time.monotonic() + self.throttle_cooldown
+                    if i < len(models) - 1:
+                        logger.warning(f"Model {model} throttled on route '{route.name}', falling back to {models[i + 1]}")
+                        continue
+                raise
+            self.record_success(route, model, time.perf_counter() - start)
+            return model, result
+        raise RuntimeError(f"No model available for route '{route.name}'")
+
+    def record_success(self, route: Route, model: str, seconds: float):
+        key = (route.name, model)
+        with self._lock:
+            previous = self._latency.get(key)
+            self._latency[key] = seconds if previous is None else previous + _EWMA_ALPHA * (seconds - previous)
+            self._calls[key] = self._calls.get(key, 0) + 1
+        LLM_ROUTE_LATENCY.labels(route.name, model).observe(seconds)
+
+    def record_error(self, route: Route, model: str, kind: str):
+        key = (route.name, model)
+        with self._lock:
+            self._errors[key] = self._errors.get(key, 0) + 1
+        LLM_ROUTE_ERRORS.labels(route.name, model, kind).inc()
+
+    def stats(self) -> Dict[str, dict]:
+        """경로별 모델 호출 수 / 오류 수 / 지연 EWMA(초)"""
+        with self._lock:
+            return {
+                name: {
+                    model: {
+                        "calls": self._calls.get((name, model), 0),
+                        "errors": self._errors.get((name, model), 0),
+                        "latency_ewma_s": round(self._latency[(name, model)], 3) if (name, model) in self._latency else None,
+                    }
+                    for model in route.models
+                }
+                for name, route in self.routes.items()
+            }
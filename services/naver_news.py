@@ -1,11 +1,21 @@
 import requests
+from requests.adapters import HTTPAdapter
 from bs4 import BeautifulSoup
 from readability import Document
 from urllib.parse import urlparse
 import re
 import logging
+import os
 import random
+import threading
 import time
+from typing import Optional
+
+from services.http_cache import HttpCache
+from services.canonical import canonicalize
+from services import cancellation, cassette
+from services.cancellation import PipelineCancelled
+from services.metrics import record_cache, stage_timer
 
 logger = logging.getLogger(__name__)
 
@@ -18,6 +28,26 @@ _USER_AGENTS = [
     "Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/131.0.0.0 Safari/537.36 Edg/131.0.0.0",
 ]
 
+# 모든 요청에 공통으로 붙는 헤더 (User-Agent/Referer는 요청 단위로 지정)
+_BASE_HEADERS = {
+    "Accept": "text/html,application/xhtml+xml,application/xml;q=0.9,image/avif,image/webp,*/*;q=0.8",
+    "Accept-Language": "ko-KR,ko;q=0.9,en-US;q=0.8,en;q=0.7",
+    "Accept-Encoding": "gzip, deflate, br",
+    "Connection": "keep-alive",
+    "Upgrade-Insecure-Requests": "1",
+    "Sec-Fetch-Dest": "document",
+    "Sec-Fetch-Mode": "navigate",
+    "Sec-Fetch-Site": "none",
+    "Sec-Fetch-User": "?1",
+    "Cache-Control": "max-age=0",
+}
+
+# 스레드별 세션의 커넥션 풀 설정
+# - CRAWL_POOL_HOSTS: 세션이 유지하는 호스트별 풀 개수
+# - CRAWL_POOL_MAXSIZE: 호스트당 유지할 커넥션 수 (세션은 한 스레드만 쓰므로 작게 유지)
+CRAWL_POOL_HOSTS = int(os.getenv("CRAWL_POOL_HOSTS", "16"))
+CRAWL_POOL_MAXSIZE = int(os.getenv("CRAWL_POOL_MAXSIZE", "2"))
+
 # 429 재시도 설정
 _MAX_RETRIES = 3
 _BASE_DELAY = 2  # 초
@@ -30,41 +60,55 @@ class NaverNewsProcessor:
     네이버 뉴스는 특화된 파싱을 사용하고,
     일반 URL은 readability를 사용하여 본문 추출
     """
-    
-    def __init__(self):
-        # Session 사용 — 쿠키 자동 관리 + 커넥션 재활용
-        self.session = requests.Session()
-        self.session.headers.update({
-            "User-Agent": random.choice(_USER_AGENTS),
-            "Accept": "text/html,application/xhtml+xml,application/xml;q=0.9,image/avif,image/webp,*/*;q=0.8",
-            "Accept-Language": "ko-KR,ko;q=0.9,en-US;q=0.8,en;q=0.7",
-            "Accept-Encoding": "gzip, deflate, br",
-            "Connection": "keep-alive",
-            "Upgrade-Insecure-Requests": "1",
-            "Sec-Fetch-Dest": "document",
-            "Sec-Fetch-Mode": "navigate",
-            "Sec-Fetch-Site": "none",
-            "Sec-Fetch-User": "?1",
-            "Cache-Control": "max-age=0",
-        })
-
-    def _get_with_retry(self, url: str) -> requests.Response:
+
+    # 공용 HTTP 캐시 키 접두사 (같은 URL이라도 처리기마다 파싱 결과가 다르므로 따로 저장)
+    CACHE_NAMESPACE = "naver"
+
+    def __init__(self, http_cache: Optional[HttpCache] = None,
+                 pool_hosts: int = CRAWL_POOL_HOSTS, pool_maxsize: int = CRAWL_POOL_MAXSIZE):
+        # 조건부 GET 캐시 (None이면 캐시 없이 매번 새로 요청)
+        self.http_cache = http_cache
+
+        # Session은 스레드별로 하나씩 — 실행기(executors.run) 워커 스레드 간 헤더/쿠키/커넥션 풀 경합 방지
+        self.pool_hosts = pool_hosts
+        self.pool_maxsize = pool_maxsize
+        self._local = threading.local()
+
+    @property
+    def session(self) -> requests.Session:
+        """현재 스레드 전용 Session (쿠키 자동 관리 + 커넥션 재활용)"""
+        session = getattr(self._local, "session", None)
+        if session is None:
+            session = requests.Session()
+            adapter = HTTPAdapter(pool_connections=self.pool_hosts, pool_maxsize=self.pool_maxsize)
+            session.mount("http://", adapter)
+            session.mount("https://", adapter)
+            session.headers.update(_BASE_HEADERS)
+            self._local.session = session
+        return session
+
+    def _get_with_retry(self, url: str, conditional_headers: Optional[dict] = None) -> requests.Response:
         """429 에러 시 exponential backoff로 재시도"""
         for attempt in range(_MAX_RETRIES + 1):
-            # 매 요청마다 User-Agent 랜덤 교체
-            self.session.headers["User-Agent"] = random.choice(_USER_AGENTS)
+            # 매 요청마다 User-Agent 랜덤 교체 (세션 헤더를 바꾸지 않고 요청 단위로 지정)
+            request_headers = {"User-Agent": random.choice(_USER_AGENTS)}
+            request_headers.update(conditional_headers or {})
             # 네이버 뉴스에는 Referer 추가 (요청 단위)
-            extra_headers = {}
             if "naver.com" in url:
-                extra_headers["Referer"] = "https://search.naver.com/search.naver"
+                request_headers["Referer"] = "https://search.naver.com/search.naver"
 
-            response = self.session.get(url, timeout=15, headers=extra_headers)
+            # [수정] 카세트 기록/재생 지점 (CASSETTE_MODE)
+            response = cassette.call(
+                "html", url, lambda: self.session.get(url, timeout=15, headers=request_headers),
+                encode=cassette.encode_requests_response, decode=cassette.decode_requests_response,
+            )
 
             if response.status_code == 429:
                 if attempt < _MAX_RETRIES:
                     delay = _BASE_DELAY * (2 ** attempt) + random.uniform(0, 1)
                     logger.warning(f"429 Too Many Requests, retrying in {delay:.1f}s (attempt {attempt + 1}/{_MAX_RETRIES})")
                     time.sleep(delay)
+                    cancellation.check("fetch")
                     continue
                 else:
                     logger.error(f"429 Too Many Requests after {_MAX_RETRIES} retries: {url}")
@@ -98,16 +142,56 @@ class NaverNewsProcessor:
             if parsed.scheme not in ("http", "https"):
                 return {"type": "ERROR", "error": "Invalid URL scheme"}
 
-            response = self._get_with_retry(url)
-            response.encoding = 'utf-8'  # 명시적으로 UTF-8 인코딩 설정
-            html = response.text
-            
-            # 네이버 뉴스인지 확인
-            if "news.naver.com" in url or "n.news.naver.com" in url:
-                return self._parse_naver_news(html, url)
+            # URL 변형(모바일/트래킹 파라미터 등)이 같은 캐시 항목을 쓰도록 정규화 키 사용
+            canonical = canonicalize(url)
+            cache_key = f"{self.CACHE_NAMESPACE}|{canonical.key}"
+            cached = self.http_cache.get(cache_key) if self.http_cache else None
+            with stage_timer("fetch"):
+                # 기록 중인 요청은 본문 전체를 받아야 하므로 조건부 요청 생략
+                conditional = cached.conditional_headers() if cached and not cassette.recording() else None
+                response = self._get_with_retry(canonical.url, conditional)
+
+            if self.http_cache:
+                record_cache("http", response.status_code == 304 and cached is not None)
+
+            if response.status_code == 304 and cached:
+                # 변경 없음 → 캐시 본문 사용 (파싱 결과가 있으면 파싱도 생략)
+                logger.info(f"Not modified (304), using cached content: {url}")
+                self.http_cache.revalidated(cache_key, response.headers.get("ETag"), response.headers.get("Last-Modified"))
+                if cached.extracted:
+                    record_cache("extracted", True)
+                    return cached.extracted
+                html = cached.body.decode("utf-8", errors="replace")
             else:
-                return self._parse_general(html, url)
-                
+                response.encoding = 'utf-8'  # 명시적으로 UTF-8 인코딩 설정
+                html = response.text
+                if self.http_cache:
+                    extracted = self.http_cache.store(
+                        cache_key, canonical.url, response.content,
+                        etag=response.headers.get("ETag"),
+                        last_modified=response.headers.get("Last-Modified"),
+                        charset="utf-8",
+                    )
+                    if extracted:
+                        logger.info(f"Content unchanged, using cached extraction: {url}")
+                        record_cache("extracted", True)
+                        return extracted
+
+            cancellation.check("parse")
+            # 네이버 뉴스인지 확인
+            with stage_timer("parse"):
+                if "news.naver.com" in url or "n.news.naver.com" in url:
+                    result = self._parse_naver_news(html, url)
+                else:
+                    result = self._parse_general(html, url)
+
+            if self.http_cache and result.get("type") != "ERROR":
+                record_cache("extracted", False)
+                self.http_cache.store_extracted(cache_key, result)
+            return result
+
+        except PipelineCancelled:
+            raise
         except requests.exceptions.Timeout:
             logger.error(f"Timeout while fetching {url}")
             return {
@@ -0,0 +1,143 @@
+"""
+2단계 요약의 뉴스레터 작업 (백그라운드 생성 + 조회/스트리밍)
+
+링크 저장 직후 화면에 필요한 것은 분류와 카드 요약뿐이므로, two_phase 요청은 짧은 프롬프트로
+카드만 먼저 응답하고 긴 newsletter_summary 생성은 이 작업 저장소에서 백그라운드로 실행합니다.
+
+- 작업은 요청과 분리된 컨텍스트에서 실행 (클라이언트 연결 종료/마감 시간으로 취소되지 않음)
+  우선순위 등급은 NEWSLETTER_JOB_PRIORITY(기본 background, services.scheduler)
+- 조회: GET /api/v1/newsletters/{job_id} (?wait=초 로 완료까지 대기), 스트리밍: .../events (SSE)
+- 끝난 작업은 NEWSLETTER_JOB_TTL(초, 기본 3600) 동안 보관, 최대 NEWSLETTER_JOB_MAX(기본 1000)개
+- 공유 캐시(services.cache, newsletter 이름공간)에도 결과를 저장해 다른 워커에서도 조회 가능
+"""
+import asyncio
+import contextvars
+import logging
+import os
+import secrets
+import time
+from collections import OrderedDict
+from typing import Awaitable, Callable, List, Optional
+
+from services import metrics, scheduler
+
+logger = logging.getLogger(__name__)
+
+NEWSLETTER_JOB_TTL = float(os.getenv("NEWSLETTER_JOB_TTL", "3600"))
+NEWSLETTER_JOB_MAX = int(os.getenv("NEWSLETTER_JOB_MAX", "1000"))
+NEWSLETTER_JOB_PRIORITY = os.getenv("NEWSLETTER_JOB_PRIORITY", scheduler.BACKGROUND)
+
+# 작업 상태
+PENDING = "pending"
+DONE = "done"
+FAILED = "error"
+
+
+class NewsletterJob:
+    def __init__(self, job_id: str):
+        self.id = job_id
+        self.status = PENDING
+        self.newsletter_summary: Optional[List[dict]] = None
+        self.error: Optional[str] = None
+        self.created_at = time.time()
+        self.finished_at: Optional[float] = None
+        self.task: Optional[asyncio.Task] = None
+        self._done = asyncio.Event()
+
+    @property
+    def finished(self) -> bool:
+        return self.status != PENDING
+
+    def snapshot(self) -> dict:
+        return {
+            "job_id": self.id,
+            "status": self.status,
+            "newsletter_summary": self.newsletter_summary,
+            "error": self.error,
+        }
+
+    async def wait(self, timeout: Optional[float] = None) -> bool:
+        """완료까지 대기 (timeout 안에 끝났으면 True)"""
+        try:
+            await asyncio.wait_for(self._done.wait(), timeout)
+        except asyncio.TimeoutError:
+            pass
+        return self.finished
+
+
+class NewsletterJobs:
+    """이 프로세스의 뉴스레터 작업 (이벤트 루프 안에서만 사용)"""
+
+    def __init__(self, cache=None, ttl: float = NEWSLETTER_JOB_TTL, max_jobs: int = NEWSLETTER_JOB_MAX,
+                 priority: str = NEWSLETTER_JOB_PRIORITY):
+        if priority not in scheduler.PRIORITIES:
+            raise ValueError(f"Unknown NEWSLETTER_JOB_PRIORITY: {priority}")
+        self.cache = cache
+        self.ttl = ttl
+        self.max_jobs = max_jobs
+        self.priority = priority
+        self._jobs: "OrderedDict[str, NewsletterJob]" = OrderedDict()
+
+    def submit(self, factory: Callable[[], Awaitable[List[dict]]]) -> NewsletterJob:
+        """factory()(→ newsletter_summary 블록 목록)를 백그라운드 작업으로 시작"""
+        self._evict()
+        job = NewsletterJob(secrets.token_hex(8))
+        self._jobs[job.id] = job
+
+        # 요청의 취소 토큰/카세트/단계별 시간 기록을 물려받지 않도록 빈 컨텍스트에서 실행
+        endpoint = metrics.current_endpoint()
+        context = contextvars.Context()
+        context.run(metrics.set_endpoint, endpoint)
+        context.run(scheduler.set_priority, self.priority)
+        job.task = asyncio.get_running_loop().create_task(self._run(job, factory), context=context)
+        return job
+
+    async def _run(self, job: NewsletterJob, factory: Callable[[], Awaitable[List[dict]]]):
+        try:
+            job.newsletter_summary = await factory()
+            job.status = DONE
+        except asyncio.CancelledError:
+            # 서버 종료 등으로 중단 (공유 캐시에는 남기지 않음)
+            job.status, job.error = FAILED, "cancelled"
+            raise
+        except Exception as e:
+            logger.error(f"Newsletter job {job.id} failed: {e}")
+            job.status, job.error = FAILED, str(e)
+        finally:
+            job.finished_at = time.time()
+            job.task = None
+            job._done.set()
+
+        if self.cache is not None:
+            try:
+                await asyncio.to_thread(self.cache.set, job.id, job.snapshot())
+            except RuntimeError as e:
+                # 이벤트 루프 종료 중 (기본 스레드 풀이 이미 닫힘)
+                logger.warning(f"Newsletter job {job.id} result not shared: {e}")
+
+    def get(self, job_id: str) -> Optional[NewsletterJob]:
+        return self._jobs.get(job_id)
+
+    async def lookup(self, job_id: str) -> Optional[dict]:
+        """작업 상태 조회 (이 프로세스에 없으면 공유 캐시에서 끝난 작업 결과 조회)"""
+        job = self._jobs.get(job_id)
+        if job is not None:
+            return job.snapshot()
+        if self.cache is None:
+            return None
+        return await asyncio.to_thread(self.cache.get, job_id)
+
+    def pending(self) -> int:
+        return sum(1 for job in self._jobs.values() if not job.finished)
+
+    def _evict(self):
+        """보관 기간이 지난 작업, 개수 한도를 넘으면 오래된 끝난 작업부터 삭제"""
+        cutoff = time.time() - self.ttl
+        for job_id in [j.id for j in self._jobs.values() if j.finished and j.finished_at < cutoff]:
+            del self._jobs[job_id]
+        if len(self._jobs) < self.max_jobs:
+            return
+        for job_id in [j.id for j in self._jobs.values() if j.finished]:
+            del self._jobs[job_id]
+            if len(self._jobs) < self.max_jobs:
+                return
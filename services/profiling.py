@@ -0,0 +1,294 @@
+"""
+요청 단위 프로파일링 (opt-in)
+
+재현이 안 되는 느린 URL(파싱/요약이 비정상적으로 오래 걸리는 경우)을 운영에서 잡기 위해,
+선택된 요청 하나의 파이프라인을 샘플링 프로파일러 + tracemalloc으로 감싸고 결과를 저장합니다.
+
+활성화 (요약 엔드포인트만):
+- 요청 헤더 X-Profile: 1 + X-Admin-Token: PROFILE_ADMIN_TOKEN (토큰이 설정된 경우에만 허용)
+- PROFILE_SAMPLE_RATE (기본 0): 이 비율만큼 무작위 요청 자동 프로파일링
+
+동작:
+- 샘플러 스레드가 PROFILE_INTERVAL_MS(기본 5ms)마다 sys._current_frames()로 이 요청의 작업을 실행 중인
+  실행기 워커 스레드(services.executors)의 스택을 수집 (이벤트 루프 스레드는 다른 요청과 공유하므로 제외)
+- stage_timer 단계별 샘플 수, 소요 시간, 메모리 최고치(단계 시작 대비 증가량) 기록
+  tracemalloc은 프로세스 전체를 추적하므로 동시에 실행 중인 다른 요청의 할당도 섞일 수 있음
+- 응답 헤더 X-Profile-Id로 결과 ID를 돌려주고 PROFILE_DIR(기본 profiles)에 JSON으로 저장 (최근 PROFILE_KEEP개)
+- 관리자 엔드포인트 GET /admin/profiles, /admin/profiles/{id} (?format=folded: flamegraph용 folded stacks)
+
+비활성 시에는 contextvar 조회 외에 추가 작업이 없습니다. tracemalloc은 프로파일링 중인 요청이 있는 동안만
+켜지며 그동안 프로세스 전체의 메모리 할당이 느려지므로 샘플링 비율은 낮게 유지하세요.
+"""
+import contextvars
+import glob
+import json
+import logging
+import os
+import random
+import re
+import sys
+import threading
+import time
+import tracemalloc
+import uuid
+from collections import Counter
+from contextlib import contextmanager
+from typing import Dict, List, Optional
+
+logger = logging.getLogger(__name__)
+
+PROFILE_ADMIN_TOKEN = os.getenv("PROFILE_ADMIN_TOKEN", "")
+PROFILE_SAMPLE_RATE = float(os.getenv("PROFILE_SAMPLE_RATE", "0"))
+PROFILE_INTERVAL = float(os.getenv("PROFILE_INTERVAL_MS", "5")) / 1000
+PROFILE_DIR = os.getenv("PROFILE_DIR", "profiles")
+PROFILE_KEEP = int(os.getenv("PROFILE_KEEP", "200"))
+PROFILE_MEMORY = os.getenv("PROFILE_MEMORY", "1") == "1"
+
+_MAX_STACK_DEPTH = 128
+_TOP_FUNCTIONS = 30
+_TOP_STACKS = 500
+_PROFILE_ID_RE = re.compile(r"^[0-9a-f]{12}$")
+
+_profile = contextvars.ContextVar("request_profile", default=None)
+
+
+def _frame_label(frame) -> str:
+    code = frame.f_code
+    return f"{code.co_name} ({os.path.basename(code.co_filename)}:{code.co_firstlineno})"
+
+
+def _fold(frame) -> List[str]:
+    """바깥 → 안쪽 순서의 함수 목록"""
+    stack = []
+    while frame is not None and len(stack) < _MAX_STACK_DEPTH:
+        stack.append(_frame_label(frame))
+        frame = frame.f_back
+    stack.reverse()
+    return stack
+
+
+class RequestProfile:
+    """요청 하나의 프로파일 (샘플 스택 + 단계별 시간/메모리)"""
+
+    def __init__(self, endpoint: str, reason: str):
+        self.id = uuid.uuid4().hex[:12]
+        self.endpoint = endpoint
+        self.reason = reason
+        self.started_at = time.time()
+        self._start = time.perf_counter()
+        self.samples = 0
+        self.stacks: Counter = Counter()
+        self.stage_samples: Counter = Counter()
+        self.stages: Dict[str, dict] = {}
+        # 샘플링 대상: 이 요청의 작업을 실행 중인 워커 스레드
+        self._attached = set()
+        # 스레드별 진행 중인 단계 스택 [(단계, 시작 시 추적 메모리)]
+        self._open_stages: Dict[int, List[tuple]] = {}
+        self._lock = threading.Lock()
+
+    @contextmanager
+    def attach(self):
+        """현재 스레드를 샘플링 대상에 추가 (실행기 워커에서 작업 하나를 실행하는 동안)"""
+        ident = threading.get_ident()
+        with self._lock:
+            self._attached.add(ident)
+        try:
+            yield
+        finally:
+            with self._lock:
+                self._attached.discard(ident)
+
+    def stage_enter(self, stage: str):
+        ident = threading.get_ident()
+        memory = None
+        if tracemalloc.is_tracing():
+            memory, _ = tracemalloc.get_traced_memory()
+            tracemalloc.reset_peak()
+        with self._lock:
+            self._open_stages.setdefault(ident, []).append((stage, memory))
+
+    def stage_exit(self, stage: str, elapsed: float):
+        ident = threading.get_ident()
+        with self._lock:
+            open_stages = self._open_stages.get(ident)
+            _, memory = open_stages.pop() if open_stages else (stage, None)
+            if not open_stages:
+                self._open_stages.pop(ident, None)
+            entry = self.stages.setdefault(stage, {"calls": 0, "seconds": 0.0, "peak_memory_bytes": 0})
+            entry["calls"] += 1
+            entry["seconds"] += elapsed
+            if memory is not None and tracemalloc.is_tracing():
+                _, peak = tracemalloc.get_traced_memory()
+                entry["peak_memory_bytes"] = max(entry["peak_memory_bytes"], peak - memory)
+
+    def sample(self, frames: dict):
+        with self._lock:
+            threads = {ident: self._open_stages[ident][-1][0] if self._open_stages.get(ident) else "-"
+                       for ident in self._attached}
+        for ident, stage in threads.items():
+            frame = frames.get(ident)
+            if frame is None:
+                continue
+            stack = _fold(frame)
+            with self._lock:
+                self.samples += 1
+                self.stacks[";".join([stage] + stack)] += 1
+                self.stage_samples[stage] += 1
+
+    def artifact(self) -> dict:
+        """저장할 프로파일 결과"""
+        self_counts: Counter = Counter()
+        total_counts: Counter = Counter()
+        with self._lock:
+            for folded, count in self.stacks.items():
+                functions = folded.split(";")[1:]
+                if functions:
+                    self_counts[functions[-1]] += count
+                for function in set(functions):
+                    total_counts[function] += count
+            stages = {
+                stage: {**entry, "seconds": round(entry["seconds"], 4), "samples": self.stage_samples.get(stage, 0)}
+                for stage, entry in self.stages.items()
+            }
+            stacks = dict(self.stacks.most_common(_TOP_STACKS))
+            samples = self.samples
+
+        result = {
+            "id": self.id,
+            "endpoint": self.endpoint,
+            "reason": self.reason,
+            "started_at": self.started_at,
+            "duration_s": round(time.perf_counter() - self._start, 4),
+            "interval_ms": PROFILE_INTERVAL * 1000,
+            "samples": samples,
+            "stages": stages,
+            # 자기 자신에서 보낸 샘플(self) 순 → 실제로 시간을 쓴 함수가 위로
+            "top_functions": [
+                {"function": function, "self_samples": self_counts[function], "total_samples": total_counts[function]}
+                for function in sorted(total_counts, key=lambda f: (self_counts[f], total_counts[f]), reverse=True)[:_TOP_FUNCTIONS]
+            ],
+            "stacks": stacks,
+        }
+        if tracemalloc.is_tracing():
+            traced, _ = tracemalloc.get_traced_memory()
+            top = tracemalloc.take_snapshot().statistics("lineno")[:10]
+            result["memory"] = {
+                "traced_bytes": traced,
+                "top_allocations": [{"location": str(stat.traceback), "bytes": stat.size} for stat in top],
+            }
+        return result
+
+
+class _Sampler:
+    """프로파일링 중인 요청이 있는 동안만 도는 샘플러 스레드 (tracemalloc 켜기/끄기 포함)"""
+
+    def __init__(self):
+        self._profiles = set()
+        self._lock = threading.Lock()
+        self._thread: Optional[threading.Thread] = None
+        self._started_tracemalloc = False
+
+    def add(self, profile: RequestProfile):
+        with self._lock:
+            self._profiles.add(profile)
+            if PROFILE_MEMORY and not tracemalloc.is_tracing():
+                tracemalloc.start()
+                self._started_tracemalloc = True
+            if self._thread is None:
+                self._thread = threading.Thread(target=self._run, name="profiler", daemon=True)
+                self._thread.start()
+
+    def remove(self, profile: RequestProfile):
+        with self._lock:
+            self._profiles.discard(profile)
+            if not self._profiles and self._started_tracemalloc:
+                tracemalloc.stop()
+                self._started_tracemalloc = False
+
+    def _run(self):
+        while True:
+            with self._lock:
+                profiles = list(self._profiles)
+                if not profiles:
+                    self._thread = None
+                    return
+            frames = sys._current_frames()
+            for profile in profiles:
+                profile.sample(frames)
+            del frames
+            time.sleep(PROFILE_INTERVAL)
+
+
+_sampler = _Sampler()
+
+
+def is_admin(token: Optional[str]) -> bool:
+    return bool(PROFILE_ADMIN_TOKEN) and token == PROFILE_ADMIN_TOKEN
+
+
+def maybe_start(endpoint: str, headers) -> Optional[RequestProfile]:
+    """요청 헤더/샘플링 비율에 따라 현재 요청 프로파일링 시작 (대상이 아니면 None)"""
+    if headers.get("x-profile", "").lower() in ("1", "true"):
+        if not is_admin(headers.get("x-admin-token")):
+            return None
+        reason = "header"
+    elif PROFILE_SAMPLE_RATE and random.random() < PROFILE_SAMPLE_RATE:
+        reason = "sampled"
+    else:
+        return None
+
+    profile = RequestProfile(endpoint, reason)
+    _profile.set(profile)
+    _sampler.add(profile)
+    return profile
+
+
+def finish(profile: RequestProfile) -> dict:
+    """프로파일링 종료 + 결과 저장"""
+    artifact = profile.artifact()
+    _sampler.remove(profile)
+    save(artifact)
+    logger.info(f"Saved profile {profile.id} ({profile.endpoint}, {artifact['samples']} samples)")
+    return artifact
+
+
+def current() -> Optional[RequestProfile]:
+    return _profile.get()
+
+
+# --- 결과 저장소 ---
+
+def _path(profile_id: str) -> str:
+    return os.path.join(PROFILE_DIR, f"{profile_id}.json")
+
+
+def save(artifact: dict):
+    os.makedirs(PROFILE_DIR, exist_ok=True)
+    with open(_path(artifact["id"]), "w", encoding="utf-8") as f:
+        json.dump(artifact, f, ensure_ascii=False)
+    # 오래된 결과 정리
+    files = sorted(glob.glob(os.path.join(PROFILE_DIR, "*.json")), key=os.path.getmtime)
+    for old in files[:-PROFILE_KEEP] if PROFILE_KEEP > 0 else []:
+        os.remove(old)
+
+
+def load(profile_id: str) -> Optional[dict]:
+    if not _PROFILE_ID_RE.match(profile_id) or not os.path.exists(_path(profile_id)):
+        return None
+    with open(_path(profile_id), encoding="utf-8") as f:
+        return json.load(f)
+
+
+def list_profiles() -> List[dict]:
+    """저장된 프로파일 요약 (최신순)"""
+    summaries = []
+    for filename in sorted(glob.glob(os.path.join(PROFILE_DIR, "*.json")), key=os.path.getmtime, reverse=True):
+        with open(filename, encoding="utf-8") as f:
+            data = json.load(f)
+        summaries.append({k: data.get(k) for k in ("id", "endpoint", "reason", "started_at", "duration_s", "samples")})
+    return summaries
+
+
+def folded_stacks(artifact: dict) -> str:
+    """flamegraph.pl / speedscope 입력 형식 (단계;함수;...;함수 샘플수)"""
+    return "\n".join(f"{stack} {count}" for stack, count in artifact["stacks"].items())
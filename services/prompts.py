@@ -0,0 +1,320 @@
+"""
+요약 프롬프트 템플릿 (버전별, 미리 컴파일) + 고정 지시문 접두어 재사용
+
+예전에는 요청마다 긴 지시문 f-string을 다시 만들고 CATEGORY_MAP을 문자열로 바꿔서, 같은 지시문을 본문과 함께
+통째로 보냈습니다.
+
+- PromptTemplate: 고정 지시문(instruction: 역할 / 출력 형식 / 분류 규칙)과 요청별 입력(body)으로 나눈 템플릿
+  - 지시문은 모듈 로드 시 한 번 렌더링 (preclassify 요청처럼 분류 선택지가 다르면 선택지별로 한 번만 렌더링 후 재사용)
+  - 입력 부분은 str.format 파싱 결과를 미리 조각으로 나눠 두고 이어 붙이기만 함
+- PROMPT_PREFIX_CACHE (지시문 전송 방식)
+  - inline: 지시문 + 입력을 하나의 contents로 전송 (예전 방식)
+  - system (기본): 지시문을 system_instruction으로 전송 → 요청마다 같은 접두어라 Gemini 암묵적 캐시에 적중
+  - explicit: 모델 + 지시문별 CachedContent(client.caches.create, TTL PROMPT_CACHE_TTL초)를 만들어 cached_content로 참조
+    만들 수 없으면(최소 토큰 수 미달 등) 그 지시문은 PROMPT_CACHE_TTL 동안 system 방식으로 전송
+- 지표: 템플릿/버전/전송 방식별 호출 수와 지연, 템플릿/버전별 토큰(prompt / cached / candidates)
+  → 버전 간, 전송 방식 간 토큰/지연 비교
+"""
+import hashlib
+import logging
+import os
+import string
+import threading
+import time
+from dataclasses import dataclass
+from typing import Dict, List, Optional, Tuple
+
+from services import cassette
+
+logger = logging.getLogger(__name__)
+
+PROMPT_VERSION = os.getenv("PROMPT_VERSION", "v1")
+PROMPT_PREFIX_CACHE = os.getenv("PROMPT_PREFIX_CACHE", "system")
+PROMPT_CACHE_TTL = float(os.getenv("PROMPT_CACHE_TTL", "3600"))
+
+# 지시문 전송 방식
+INLINE = "inline"
+SYSTEM = "system"
+EXPLICIT = "explicit"
+PREFIX_MODES = (INLINE, SYSTEM, EXPLICIT)
+
+# 템플릿 이름 (지표 라벨)
+CONTENT = "content"
+CARDS = "cards"
+NEWSLETTER = "newsletter"
+COLLECTION = "collection"
+COLLECTION_CHUNK = "collection_chunk"
+CONTENT_CHUNK = "content_chunk"
+
+# CachedContent는 TTL이 끝나기 전에 새로 만듦 (만료 직전 요청이 404로 실패하지 않도록)
+_REFRESH_FRACTION = 0.9
+
+# 카테고리 → 토픽 분류 체계
+CATEGORY_MAP = {
+    "IT/과학": ["인공지능", "백엔드/인프라", "프론트/모바일", "데이터/보안", "테크 트렌드", "기타"],
+    "국제": ["지정학/외교", "미국/중국", "글로벌 비즈니스", "기후/에너지", "기타"],
+    "경제": ["주식/투자", "부동산", "가상 화폐", "창업/스타트업", "브랜드/마케팅", "거시경제", "기타"],
+    "문화": ["영화/OTT", "음악", "도서/아티클", "팝컬쳐/트렌드", "공간/플레이스", "디자인/예술", "기타"],
+    "생활": ["주니어/취업", "업무 생산성", "리더십/조직", "심리/마인드", "건강/리빙", "기타"]
+}
+
+
+@dataclass(frozen=True)
+class Prompt:
+    """렌더링된 프롬프트 (지시문은 같은 템플릿/분류 선택지면 같은 문자열 객체)"""
+    template: str
+    version: str
+    instruction: str
+    text: str
+
+    @property
+    def full(self) -> str:
+        """지시문 + 입력 (inline 전송, 공유 캐시/카세트 키)"""
+        return f"{self.instruction}\n{self.text}"
+
+    def digest(self, model: str) -> str:
+        return cassette.digest(model, self.full)
+
+
+class PromptTemplate:
+    """
+    instruction: 고정 지시문 템플릿 ({categories}, {category_map}만 사용 가능)
+    body: 요청별 입력 템플릿 (str.format, 단순 필드 이름만)
+    """
+
+    def __init__(self, name: str, version: str, instruction: str, body: str):
+        self.name = name
+        self.version = version
+        self._instruction_template = instruction
+        self._instructions: Dict[tuple, str] = {}
+        self._pieces: List[Tuple[str, Optional[str]]] = []
+        for literal, field_name, format_spec, conversion in string.Formatter().parse(body):
+            if format_spec or conversion or (field_name is not None and not field_name.isidentifier()):
+                raise ValueError(f"Prompt body field must be a plain name: {field_name!r}")
+            self._pieces.append((literal, field_name))
+        self.fields = {field_name for _, field_name in self._pieces if field_name}
+        # 기본 분류 체계의 지시문은 미리 렌더링
+        self.instruction = self.instruction_for(CATEGORY_MAP)
+
+    def instruction_for(self, category_map: Dict[str, List[str]]) -> str:
+        """분류 선택지별 지시문 (선택지마다 한 번만 렌더링)"""
+        key = tuple((category, tuple(topics)) for category, topics in category_map.items())
+        instruction = self._instructions.get(key)
+        if instruction is None:
+            instruction = self._instruction_template.format(categories=list(category_map), category_map=category_map)
+            self._instructions[key] = instruction
+        return instruction
+
+    def render(self, category_map: Optional[Dict[str, List[str]]] = None, **fields) -> Prompt:
+        """category_map: 분류 선택지 (None이면 CATEGORY_MAP)"""
+        instruction = self.instruction if category_map is None else self.instruction_for(category_map)
+        text = "".join(
+            literal + (str(fields[field_name]) if field_name is not None else "")
+            for literal, field_name in self._pieces
+        )
+        return Prompt(self.name, self.version, instruction, text)
+
+
+# 콘텐츠 입력 (본문 요약 / 카드 요약 공용)
+_CONTENT_INPUT = """
+        ### 입력 데이터:
+        [콘텐츠 제목]: {title}
+        [콘텐츠 원문]: {content}
+        """
+
+# 본문 요약 프롬프트 (버전별) - 재분석(/api/v1/reanalyze)에서 버전을 지정해 다시 요약할 수 있음
+# [수정 포인트] 지시문은 str.format 템플릿이므로 JSON 예시는 중괄호 2개({{ }}) 사용, 변수는 1개({ }) 사용
+CONTENT_PROMPTS = {
+    "v1": PromptTemplate(CONTENT, "v1", """
+        당신은 전문 콘텐츠 분석가입니다. 제공된 콘텐츠의 제목과 내용을 분석하여 다음 JSON 형식으로만 답변하세요.
+        서론이나 마크다운(```json) 없이 순수 JSON만 반환하세요.
+
+        ### ★필수 반환 필드 및 포맷 (정확히 지킬 것)★:
+        {{
+            "category": "아래 분류 규칙의 카테고리 중 하나",
+            "topic": "아래 분류 규칙의 토픽 중 하나",
+            "small_card_summary": "20자 내외의 아주 짧은 한 줄 요약",
+            "medium_card_summary": "핵심 내용 위주의 2~3문장 요약",
+            "newsletter_summary": [
+                {{
+                    "title": "소제목1",
+                    "content": "문단 내용1"
+                }},
+                {{
+                    "title": "소제목2",
+                    "content": "문단 내용2"
+                }},
+                {{
+                    "title": "소제목3",
+                    "content": "문단 내용3"
+                }}
+            ]
+        }}
+
+        ### 분류 규칙:
+        1. 카테고리 선택지: {categories}
+        2. 토픽 선택지: {category_map} (해당 카테고리에 맞는 토픽 선택)
+        """, _CONTENT_INPUT),
+}
+# 2단계 요약 (two_phase) - 1단계: 분류 + 카드 요약만 (출력이 짧아 빠르게 응답)
+CARD_PROMPTS = {
+    "v1": PromptTemplate(CARDS, "v1", """
+        당신은 전문 콘텐츠 분석가입니다. 제공된 콘텐츠의 제목과 내용을 분석하여 다음 JSON 형식으로만 답변하세요.
+        서론이나 마크다운(```json) 없이 순수 JSON만 반환하세요.
+
+        ### ★필수 반환 필드 및 포맷 (정확히 지킬 것)★:
+        {{
+            "category": "아래 분류 규칙의 카테고리 중 하나",
+            "topic": "아래 분류 규칙의 토픽 중 하나",
+            "small_card_summary": "20자 내외의 아주 짧은 한 줄 요약",
+            "medium_card_summary": "핵심 내용 위주의 2~3문장 요약"
+        }}
+
+        ### 분류 규칙:
+        1. 카테고리 선택지: {categories}
+        2. 토픽 선택지: {category_map} (해당 카테고리에 맞는 토픽 선택)
+        """, _CONTENT_INPUT),
+}
+
+# 2단계 요약 - 2단계: 뉴스레터 본문 블록 (1단계 결과를 이어받아 분류/요지가 어긋나지 않도록)
+NEWSLETTER_PROMPTS = {
+    "v1": PromptTemplate(NEWSLETTER, "v1", """
+        당신은 전문 뉴스레터 에디터입니다. 제공된 콘텐츠를 뉴스레터 본문으로 정리하여 다음 JSON 형식으로만 답변하세요.
+        서론이나 마크다운(```json) 없이 순수 JSON만 반환하세요.
+        입력의 '이미 정해진 분류와 요약'과 일관되게 작성하세요.
+
+        ### ★필수 반환 필드 및 포맷 (정확히 지킬 것)★:
+        {{
+            "newsletter_summary": [
+                {{
+                    "title": "소제목1",
+                    "content": "문단 내용1"
+                }},
+                {{
+                    "title": "소제목2",
+                    "content": "문단 내용2"
+                }},
+                {{
+                    "title": "소제목3",
+                    "content": "문단 내용3"
+                }}
+            ]
+        }}
+        """, """
+        ### 이미 정해진 분류와 요약 (이 내용과 일관되게 작성):
+        - 카테고리/토픽: {category} / {topic}
+        - 요약: {medium_card_summary}
+""" + _CONTENT_INPUT),
+}
+
+# 컬렉션 요약 (뉴스레터 목록은 services.collection.encode의 한 줄 목록)
+_COLLECTION_INPUT = """
+        ### 입력 데이터(뉴스레터 {total}개, 한 줄에 하나):
+{items}
+        """
+
+COLLECTION_PROMPTS = {
+    "v1": PromptTemplate(COLLECTION, "v1", """
+        당신은 전문 에디터입니다. 아래 제공된 뉴스레터 요약본들을 바탕으로, 이들을 하나로 묶는 컬렉션(모음집)의 제목과 설명을 작성해주세요.
+        '[N개 묶음]'으로 시작하는 줄은 뉴스레터 N개를 미리 묶어 요약한 것입니다.
+
+        ### ★필수 반환 필드 및 조건 (정확히 지킬 것)★:
+        JSON 형식으로만 응답하세요.
+
+        {{
+            "small_card_summary": "컬렉션의 실질적인 제목 역할. 3~4단어로 핵심을 관통하는 문구 (예: '생산성을 높이는 툴', '개발자 커리어 조언')",
+            "medium_card_summary": "어떤 뉴스레터들을 위주로 모았는지, 이 컬렉션이 독자에게 어떤 가치를 주는지 설명하는 1개의 자연스러운 문장 (예: '실무에서 바로 쓸 수 있는 생산성 도구들과 활용법을 모았습니다.')"
+        }}
+        """, _COLLECTION_INPUT),
+}
+
+# 계층 컬렉션 요약의 부분 요약 (묶음 하나)
+COLLECTION_CHUNK_PROMPTS = {
+    "v1": PromptTemplate(COLLECTION_CHUNK, "v1", """
+        당신은 전문 에디터입니다. 입력은 하나의 컬렉션(모음집)에 들어갈 뉴스레터 요약본 중 일부입니다.
+        이 묶음의 공통 주제와 핵심 내용을 정리해주세요.
+        '[N개 묶음]'으로 시작하는 줄은 뉴스레터 N개를 미리 묶어 요약한 것입니다.
+
+        ### ★필수 반환 필드 및 조건 (정확히 지킬 것)★:
+        JSON 형식으로만 응답하세요.
+
+        {{
+            "summary": "이 묶음의 공통 주제와 핵심 내용을 담은 1~2문장"
+        }}
+        """, _COLLECTION_INPUT),
+}
+
+# 입력 예산(services.tokens)을 크게 넘는 긴 콘텐츠의 부분 요약 (조각 하나, main.prepare_content)
+CONTENT_CHUNK_PROMPTS = {
+    "v1": PromptTemplate(CONTENT_CHUNK, "v1", """
+        당신은 전문 콘텐츠 분석가입니다. 입력은 긴 콘텐츠(영상 자막, 기사 등)를 순서대로 나눈 조각 중 하나입니다.
+        조각별 요점을 모아 나중에 전체를 요약하므로, 이 조각의 핵심 주장과 사실, 수치를 빠짐없이 정리해주세요.
+
+        ### ★필수 반환 필드 및 조건 (정확히 지킬 것)★:
+        JSON 형식으로만 응답하세요.
+
+        {{
+            "summary": "이 조각의 핵심 내용을 담은 3~5문장"
+        }}
+        """, """
+        ### 입력 데이터:
+        [콘텐츠 제목]: {title}
+        [콘텐츠 원문 {index}/{total}번째 조각]: {content}
+        """),
+}
+
+
+# --- 지시문 전송 방식 ---
+
+class PrefixCache:
+    """지시문 전송 방식 결정 + explicit 모드의 (모델, 지시문)별 CachedContent 관리 (스레드 안전)"""
+
+    def __init__(self, mode: str = PROMPT_PREFIX_CACHE, ttl: float = PROMPT_CACHE_TTL):
+        if mode not in PREFIX_MODES:
+            raise ValueError(f"Unknown PROMPT_PREFIX_CACHE: {mode}")
+        self.mode = mode
+        self.ttl = ttl
+        # (모델, 지시문 해시) → (CachedContent 이름, 새로 만들 시각) - 이름이 None이면 생성 실패 (system으로 전송)
+        self._entries: Dict[Tuple[str, str], Tuple[Optional[str], float]] = {}
+        self._lock = threading.Lock()
+
+    def request(self, client, model: str, prompt: Prompt, config: dict) -> Tuple[str, dict, str]:
+        """→ (contents, config, 전송 방식)"""
+        if self.mode == INLINE:
+            return prompt.full, config, INLINE
+        if self.mode == EXPLICIT:
+            name = self._cached_content(client, model, prompt.instruction)
+            if name is not None:
+                return prompt.text, {**config, "cached_content": name}, EXPLICIT
+        return prompt.text, {**config, "system_instruction": prompt.instruction}, SYSTEM
+
+    def invalidate(self, model: str, instruction: str):
+        """CachedContent를 쓸 수 없게 됨 (서버에서 만료/삭제) → 다음 요청에서 새로 만듦"""
+        with self._lock:
+            self._entries.pop((model, _instruction_key(instruction)), None)
+
+    def _cached_content(self, client, model: str, instruction: str) -> Optional[str]:
+        key = (model, _instruction_key(instruction))
+        now = time.monotonic()
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None and entry[1] > now:
+                return entry[0]
+            # 생성은 드물고 짧으므로 잠금 안에서 (같은 지시문을 동시에 여러 번 만들지 않도록)
+            try:
+                cached = client.caches.create(model=model, config={
+                    "system_instruction": instruction,
+                    "ttl": f"{int(self.ttl)}s",
+                    "display_name": f"archiveat-{key[1]}",
+                })
+                name = cached.name
+                logger.info(f"Created cached prompt prefix {name} for {model} ({len(instruction)} chars)")
+            except Exception as e:
+                logger.warning(f"Prompt prefix cache unavailable for {model}, sending system instruction: {e}")
+                name = None
+            self._entries[key] = (name, now + self.ttl * _REFRESH_FRACTION)
+            return name
+
+
+def _instruction_key(instruction: str) -> str:
+    return hashlib.sha256(instruction.encode("utf-8")).hexdigest()[:16]
@@ -0,0 +1,184 @@
+"""
+우선순위 스케줄러 (대화형 요청 vs 백그라운드 작업)
+
+사용자가 방금 저장한 링크 요약(interactive)과 백필/컬렉션 재생성 같은 대량 작업(background)이
+Gemini/Whisper 실행기 자리를 같은 FIFO 대기열에서 다투지 않도록, 실행기(services.executors) 앞에서
+작업 시작 순서를 정합니다.
+
+- 우선순위 등급: interactive / normal / background
+  요청 헤더 X-Priority 또는 요청 본문 priority 필드로 지정 (없으면 normal)
+- 가중 공정 분배: 대기 중인 등급끼리 SCHEDULER_WEIGHTS(기본 interactive=8,normal=4,background=1) 비율로 자리 배정
+  (stride 방식: 자리를 받을 때마다 등급의 가상 시간이 1/가중치씩 늘고, 가상 시간이 가장 작은 등급이 다음 차례)
+- 기아 방지: SCHEDULER_MAX_WAIT(초, 기본 30)보다 오래 기다린 작업은 등급과 무관하게 먼저 배정
+- 대기 중에도 요청 취소(연결 종료/마감 시간)를 확인해 자리를 받기 전에 빠짐
+- 등급별 대기 시간/대기열 길이: /metrics의 archiveat_scheduler_wait_seconds, archiveat_scheduler_queue_length
+"""
+import asyncio
+import contextvars
+import logging
+import os
+import threading
+import time
+from collections import deque
+from contextlib import asynccontextmanager
+from typing import Deque, Dict, Optional
+
+from services import cancellation
+from services.metrics import SCHEDULER_QUEUE_LENGTH, SCHEDULER_WAIT
+
+logger = logging.getLogger(__name__)
+
+INTERACTIVE = "interactive"
+NORMAL = "normal"
+BACKGROUND = "background"
+PRIORITIES = (INTERACTIVE, NORMAL, BACKGROUND)
+
+
+def parse_weights(text: str) -> Dict[str, float]:
+    """"interactive=8,normal=4,background=1" → {등급: 가중치}"""
+    weights = {INTERACTIVE: 8.0, NORMAL: 4.0, BACKGROUND: 1.0}
+    for part in filter(None, (p.strip() for p in text.split(","))):
+        name, _, value = part.partition("=")
+        if name not in weights or float(value) <= 0:
+            raise ValueError(f"Invalid SCHEDULER_WEIGHTS entry: {part}")
+        weights[name] = float(value)
+    return weights
+
+
+SCHEDULER_WEIGHTS = parse_weights(os.getenv("SCHEDULER_WEIGHTS", ""))
+SCHEDULER_MAX_WAIT = float(os.getenv("SCHEDULER_MAX_WAIT", "30"))
+
+# 대기 중 취소 확인 주기(초)
+_CANCEL_POLL_INTERVAL = 0.5
+
+_priority = contextvars.ContextVar("request_priority", default=NORMAL)
+
+
+def set_priority(priority: Optional[str]):
+    """현재 요청의 우선순위 등급 지정 (None이면 normal)"""
+    if priority is not None and priority not in PRIORITIES:
+        raise ValueError(f"Unknown priority: {priority}")
+    _priority.set(priority or NORMAL)
+
+
+def current() -> str:
+    return _priority.get()
+
+
+class _Waiter:
+    __slots__ = ("priority", "enqueued_at", "loop", "future", "granted")
+
+    def __init__(self, priority: str, loop: asyncio.AbstractEventLoop):
+        self.priority = priority
+        self.enqueued_at = time.monotonic()
+        self.loop = loop
+        self.future = loop.create_future()
+        self.granted = False
+
+
+def _resolve(future: asyncio.Future):
+    if not future.done():
+        future.set_result(None)
+
+
+class PriorityScheduler:
+    """실행기 하나의 자리(capacity개)를 우선순위 등급별 가중치로 배정"""
+
+    def __init__(self, name: str, capacity: int, weights: Optional[Dict[str, float]] = None,
+                 max_wait: float = SCHEDULER_MAX_WAIT):
+        self.name = name
+        self.capacity = capacity
+        self.weights = dict(weights or SCHEDULER_WEIGHTS)
+        self.max_wait = max_wait
+        self._queues: Dict[str, Deque[_Waiter]] = {p: deque() for p in PRIORITIES}
+        self._virtual = {p: 0.0 for p in PRIORITIES}
+        # 마지막으로 배정한 시점의 가상 시간 (쉬다가 들어온 등급이 밀린 몫을 몰아 받지 않도록)
+        self._clock = 0.0
+        self._in_use = 0
+        self._lock = threading.Lock()
+
+    @property
+    def in_use(self) -> int:
+        return self._in_use
+
+    def waiting(self) -> Dict[str, int]:
+        with self._lock:
+            return {p: len(q) for p, q in self._queues.items()}
+
+    async def acquire(self, priority: str = NORMAL) -> float:
+        """자리 하나 확보 (대기한 시간(초) 반환)"""
+        with self._lock:
+            if self._in_use < self.capacity and not any(self._queues.values()):
+                self._in_use += 1
+                waiter = None
+            else:
+                waiter = _Waiter(priority, asyncio.get_running_loop())
+                queue = self._queues[priority]
+                if not queue:
+                    self._virtual[priority] = max(self._virtual[priority], self._clock)
+                queue.append(waiter)
+        if waiter is None:
+            SCHEDULER_WAIT.labels(self.name, priority).observe(0.0)
+            return 0.0
+
+        self._update_gauge(priority)
+        try:
+            while True:
+                cancellation.check(self.name)
+                done, _ = await asyncio.wait({waiter.future}, timeout=_CANCEL_POLL_INTERVAL)
+                if done:
+                    break
+        except BaseException:
+            with self._lock:
+                if waiter.granted:
+                    # 자리를 받은 직후 취소됨 → 반납
+                    self._in_use -= 1
+                    self._dispatch_locked()
+                else:
+                    self._queues[priority].remove(waiter)
+            raise
+        finally:
+            self._update_gauge(priority)
+
+        waited = time.monotonic() - waiter.enqueued_at
+        SCHEDULER_WAIT.labels(self.name, priority).observe(waited)
+        return waited
+
+    def release(self):
+        with self._lock:
+            self._in_use -= 1
+            self._dispatch_locked()
+
+    @asynccontextmanager
+    async def slot(self, priority: Optional[str] = None):
+        await self.acquire(priority or current())
+        try:
+            yield
+        finally:
+            self.release()
+
+    def _dispatch_locked(self):
+        while self._in_use < self.capacity:
+            priority = self._pick_locked()
+            if priority is None:
+                return
+            waiter = self._queues[priority].popleft()
+            self._clock = self._virtual[priority]
+            self._virtual[priority] += 1.0 / self.weights[priority]
+            self._in_use += 1
+            waiter.granted = True
+            waiter.loop.call_soon_threadsafe(_resolve, waiter.future)
+
+    def _pick_locked(self) -> Optional[str]:
+        active = [p for p in PRIORITIES if self._queues[p]]
+        if not active:
+            return None
+        # 기아 방지: 가장 오래 기다린 작업이 한도를 넘었으면 먼저
+        oldest = min(active, key=lambda p: self._queues[p][0].enqueued_at)
+        if time.monotonic() - self._queues[oldest][0].enqueued_at >= self.max_wait:
+            return oldest
+        # 가상 시간이 같으면 높은 등급 먼저 (PRIORITIES 순서)
+        return min(active, key=lambda p: (self._virtual[p], PRIORITIES.index(p)))
+
+    def _update_gauge(self, priority: str):
+        SCHEDULER_QUEUE_LENGTH.labels(self.name, priority).set(len(self._queues[priority]))
@@ -0,0 +1,34 @@
+"""
+응답 JSON 직렬화 (json_response / SSE 이벤트 공용)
+
+- orjson이 설치되어 있으면 model_dump() 결과를 orjson으로 인코딩 (UTF-8 bytes를 바로 생성)
+- 없으면 pydantic의 model_dump_json()
+- JSON_ENCODER=pydantic으로 orjson 사용을 끌 수 있음
+응답 1건당 직렬화 시간 비교: python -m benchmarks.serialization_bench
+"""
+import os
+
+from pydantic import BaseModel
+
+try:
+    import orjson
+except ImportError:  # 선택 의존성
+    orjson = None
+
+JSON_ENCODER = os.getenv("JSON_ENCODER", "orjson" if orjson is not None else "pydantic")
+
+if JSON_ENCODER not in ("orjson", "pydantic"):
+    raise ValueError(f"Unknown JSON_ENCODER: {JSON_ENCODER}")
+if JSON_ENCODER == "orjson" and orjson is None:
+    raise ValueError("JSON_ENCODER=orjson requires the orjson package")
+
+
+def dumps_pydantic(model: BaseModel) -> bytes:
+    return model.model_dump_json().encode("utf-8")
+
+
+def dumps_orjson(model: BaseModel) -> bytes:
+    return orjson.dumps(model.model_dump(mode="json"))
+
+
+dumps = dumps_orjson if JSON_ENCODER == "orjson" else dumps_pydantic
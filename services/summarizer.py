@@ -1,112 +1,262 @@
 import os
+import logging
+import time
+from dataclasses import replace
 from google import genai
 from dotenv import load_dotenv
-import json
 
+# .env 설정(PROMPT_VERSION, GEMINI_MODEL 등)을 읽는 서비스 모듈보다 먼저 로드
 load_dotenv()
 
+from models import (
+    Analysis, CardSummary, CollectionChunkSummary, CollectionSummaryResponse, ContentChunkSummary, NewsletterSummary,
+)
+from services import cassette, classifier, collection, llm_output, prompts, tokens
+from services.model_router import COLLECTION, CONTENT, ModelRouter, is_throttled
+from services.metrics import (
+    CLASSIFIER_PREDICTIONS, record_gemini_usage, record_input_plan, record_prompt_call, record_prompt_usage,
+    record_token_estimate, stage_timer,
+)
+# 프롬프트 템플릿 / 분류 체계 (services.prompts)
+from services.prompts import (
+    CARD_PROMPTS, CATEGORY_MAP, COLLECTION_CHUNK_PROMPTS, COLLECTION_PROMPTS, CONTENT_CHUNK_PROMPTS, CONTENT_PROMPTS,
+    NEWSLETTER_PROMPTS, PROMPT_VERSION,
+)
+
+logger = logging.getLogger(__name__)
+
+
+# 사용자 메모를 붙인 본문의 시작 (main.with_memo) - 메모가 분류 의도를 바꿀 수 있으므로 로컬 분류기를 쓰지 않음
+MEMO_PREFIX = "[사용자 메모:"
+
+
+def is_valid_topic(result):
+    """분류 체계(CATEGORY_MAP)에 있는 카테고리/토픽 조합인지"""
+    return result.get("topic") in CATEGORY_MAP.get(result.get("category"), ())
+
+
+def error_result(error):
+    """예외 → {"error": ...} (복구하지 못한 Gemini 출력이면 kind=invalid_output)"""
+    result = {"error": str(error)}
+    if isinstance(error, llm_output.InvalidOutput):
+        result["kind"] = llm_output.INVALID_OUTPUT
+    return result
+
+
 class GeminiSummarizer:
-    def __init__(self):
+    def __init__(self, cache=None, router=None, topic_classifier=None, examples=None, prefix_cache=None):
         api_key = os.getenv("GEMINI_API_KEY")
         if not api_key:
             raise ValueError(".env 파일에 GEMINI_API_KEY가 설정되지 않았습니다.")
             
         self.client = genai.Client(api_key=api_key)
-        self.model_id = "gemini-flash-latest" # 모델명 명시 (flash-latest보다 안정적일 수 있음)
+        # 입력 길이/콘텐츠 종류별 모델 선택 + 할당량 초과 시 대체 모델 (services.model_router)
+        self.router = router or ModelRouter()
+        # 공유 캐시 (services.cache, 같은 모델 + 같은 프롬프트의 결과 재사용)
+        self.cache = cache
+        # 로컬 카테고리/토픽 분류기 (services.classifier, CLASSIFIER_MODE) + Gemini 분류 결과 학습 예시 기록
+        self.topic_classifier = topic_classifier
+        self.examples = examples
+        # 고정 지시문 전송 방식 (services.prompts, PROMPT_PREFIX_CACHE: inline / system / explicit)
+        self.prefix_cache = prefix_cache or prompts.PrefixCache()
 
-    def summarize_content(self, title, content):
+    def _generate(self, prompt, model, config):
+        """Gemini 호출 (카세트 기록/재생 지점, prompt: services.prompts.Prompt)"""
+        return cassette.call(
+            "gemini", prompt.digest(model),
+            lambda: self._send(prompt, model, config),
+            encode=cassette.encode_gemini_response, decode=cassette.decode_gemini_response,
+        )
+
+    def _send(self, prompt, model, config):
+        """지시문 전송 방식에 맞춰 generate_content 호출 (CachedContent를 못 쓰게 되면 system_instruction으로 한 번 더)"""
+        contents, request_config, prefix = self.prefix_cache.request(self.client, model, prompt, config)
+        start = time.perf_counter()
+        try:
+            response = self.client.models.generate_content(model=model, contents=contents, config=request_config)
+        except Exception as e:
+            if prefix != prompts.EXPLICIT or is_throttled(e):
+                raise
+            logger.warning(f"Cached prompt prefix failed on {model}, retrying with system instruction: {e}")
+            self.prefix_cache.invalidate(model, prompt.instruction)
+            prefix = prompts.SYSTEM
+            request_config = {**config, "system_instruction": prompt.instruction}
+            start = time.perf_counter()
+            response = self.client.models.generate_content(model=model, contents=prompt.text, config=request_config)
+        record_prompt_call(prompt.template, prompt.version, prefix, time.perf_counter() - start)
+        return response
+
+    def _generate_json(self, prompt, route, schema, on_generated=None):
         """
-        [범용 모듈] 제목과 본문을 입력받아 서비스 규격에 맞는 JSON을 반환합니다.
+        Gemini 호출 → schema(models.py)로 검증한 결과 dict (공유 캐시에 있으면 호출 생략)
+        [수정] response_schema로 출력 형식을 제약하고, 빠진 필드는 services.llm_output이 복구/재요청
+        (재요청은 같은 지시문에 입력만 덧붙이므로 지시문 접두어를 그대로 재사용)
+        on_generated(result): 캐시가 아닌 새 호출 결과일 때만 호출
+        카세트 기록 중에는 캐시를 읽지 않음 (재생 시 필요한 gemini 기록이 남도록)
         """
-        category_map = {
-            "IT/과학": ["인공지능", "백엔드/인프라", "프론트/모바일", "데이터/보안", "테크 트렌드", "기타"],
-            "국제": ["지정학/외교", "미국/중국", "글로벌 비즈니스", "기후/에너지", "기타"],
-            "경제": ["주식/투자", "부동산", "가상 화폐", "창업/스타트업", "브랜드/마케팅", "거시경제", "기타"],
-            "문화": ["영화/OTT", "음악", "도서/아티클", "팝컬쳐/트렌드", "공간/플레이스", "디자인/예술", "기타"],
-            "생활": ["주니어/취업", "업무 생산성", "리더십/조직", "심리/마인드", "건강/리빙", "기타"]
-        }
-
-        # [수정 포인트] f-string 내에서 JSON 예시는 중괄호 2개({{ }}) 사용, 변수는 1개({ }) 사용
-        prompt = f"""
-        당신은 전문 콘텐츠 분석가입니다. 제공된 콘텐츠의 제목과 내용을 분석하여 다음 JSON 형식으로만 답변하세요.
-        서론이나 마크다운(```json) 없이 순수 JSON만 반환하세요.
-        
-        ### ★필수 반환 필드 및 포맷 (정확히 지킬 것)★:
-        {{
-            "category": "아래 분류 규칙의 카테고리 중 하나",
-            "topic": "아래 분류 규칙의 토픽 중 하나",
-            "small_card_summary": "20자 내외의 아주 짧은 한 줄 요약",
-            "medium_card_summary": "핵심 내용 위주의 2~3문장 요약",
-            "newsletter_summary": [
-                {{
-                    "title": "소제목1",
-                    "content": "문단 내용1"
-                }},
-                {{
-                    "title": "소제목2",
-                    "content": "문단 내용2"
-                }},
-                {{
-                    "title": "소제목3",
-                    "content": "문단 내용3"
-                }}
-            ]
-        }}
-
-        ### 분류 규칙:
-        1. 카테고리 선택지: {list(category_map.keys())}
-        2. 토픽 선택지: {category_map} (해당 카테고리에 맞는 토픽 선택)
-
-        ### 입력 데이터:
-        [콘텐츠 제목]: {title}
-        [콘텐츠 원문]: {content}
+        key = prompt.digest(route.models[0])
+        if self.cache is not None and not cassette.recording():
+            cached = self.cache.get(key)
+            # 스키마에 맞지 않는 예전 결과는 다시 생성
+            if cached is not None and not llm_output.invalid_fields(schema, cached):
+                return cached
+
+        def call(text, output_schema):
+            request = replace(prompt, text=text)
+            with stage_timer("llm"):
+                model, response = self.router.call(
+                    route, lambda m, config: self._generate(request, m, {**config, "response_schema": output_schema})
+                )
+            record_gemini_usage(model, response)
+            record_prompt_usage(prompt.template, prompt.version, response)
+            record_token_estimate(prompt.template, tokens.estimate(request.full), response)
+            return response.text
+
+        result = llm_output.generate(schema, prompt.text, call)
+        if on_generated is not None:
+            on_generated(result)
+
+        if self.cache is not None:
+            self.cache.set(key, result)
+        return result
+
+    def _summarize(self, templates, schema, prompt_version, content, content_type, on_generated=None,
+                   category_map=None, **fields):
         """
+        버전별 템플릿(미리 렌더링한 지시문 + 입력)으로 프롬프트 구성 → schema에 맞는 Gemini 결과 (실패 시 {"error": ...})
+        category_map: 분류 선택지 (None이면 CATEGORY_MAP)
+        """
+        template = templates.get(prompt_version or PROMPT_VERSION)
+        if template is None:
+            return {"error": f"Unknown prompt version: {prompt_version or PROMPT_VERSION}"}
+        if not tokens.fits(content):
+            # 입력 예산 안전장치: 엔드포인트는 main.prepare_content에서 미리 맞춰 보내므로 직접 호출한 경우만 해당
+            plan = tokens.plan(content, allow_chunked=False)
+            logger.warning(f"Content over token budget ({plan.tokens} tokens), plan: {plan.action}")
+            record_input_plan(plan.action, plan.tokens)
+            content = plan.text
+        prompt = template.render(category_map, content=content, **fields)
 
+        route = self.router.choose(CONTENT, len(content), content_type)
         try:
-            response = self.client.models.generate_content(
-                model=self.model_id,
-                contents=prompt,
-                config={
-                    'response_mime_type': 'application/json'
-                }
-            )
-            return json.loads(response.text)
+            return self._generate_json(prompt, route, schema, on_generated)
         except Exception as e:
             # 에러 발생 시 로그 출력
-            print(f"Gemini API Error: {str(e)}")
-            return {"error": str(e)}
+            logger.error(f"Gemini API error: {e}")
+            return error_result(e)
+
+    def _classify(self, templates, schema, prompt_version, title, content, content_type):
+        """
+        분류가 포함된 요약 (summarize_content / summarize_cards 공용)
+
+        - preclassify 모드에서 로컬 분류기가 확신하면 분류 체계 대신 예측 하나만 선택지로 넣고 그 예측을 사용
+        - 그 외에는 Gemini가 분류하고, 분류 체계에 없는 값이면 로컬 예측으로 대체 (fallback)
+        - Gemini가 분류한 새 결과(메모 없는 요청)는 학습 예시로 기록
+        """
+        has_memo = content.startswith(MEMO_PREFIX)
+        prediction = None
+        if self.topic_classifier is not None and not has_memo:
+            prediction = self.topic_classifier.predict(title, content)
+
+        if (prediction is not None and classifier.CLASSIFIER_MODE == classifier.PRECLASSIFY
+                and prediction.confidence >= classifier.CLASSIFIER_THRESHOLD):
+            result = self._summarize(
+                templates, schema, prompt_version, content, content_type,
+                category_map={prediction.category: [prediction.topic]}, title=title,
+            )
+            if "error" not in result:
+                CLASSIFIER_PREDICTIONS.labels("preclassified").inc()
+                result = {**result, "category": prediction.category, "topic": prediction.topic}
+            return result
+
+        def record_example(result):
+            if not has_memo and self.examples is not None and is_valid_topic(result):
+                self.examples.record(title, content, result["category"], result["topic"])
+
+        result = self._summarize(
+            templates, schema, prompt_version, content, content_type, on_generated=record_example, title=title,
+        )
+        if "error" in result or prediction is None:
+            return result
+        if not is_valid_topic(result):
+            logger.warning(f"Gemini returned unknown category/topic ({result.get('category')}/{result.get('topic')}), "
+                           f"using local prediction {prediction.category}/{prediction.topic}")
+            CLASSIFIER_PREDICTIONS.labels("fallback").inc()
+            return {**result, "category": prediction.category, "topic": prediction.topic}
+        agree = (result["category"], result["topic"]) == (prediction.category, prediction.topic)
+        CLASSIFIER_PREDICTIONS.labels("agree" if agree else "disagree").inc()
+        return result
+
+    def summarize_content(self, title, content, prompt_version=None, content_type=None):
+        """
+        [범용 모듈] 제목과 본문을 입력받아 서비스 규격에 맞는 JSON을 반환합니다.
+        prompt_version: CONTENT_PROMPTS의 키 (None이면 PROMPT_VERSION)
+        content_type: article / video / generic (모델 선택용, None이면 엔드포인트로 추정)
+        """
+        return self._classify(CONTENT_PROMPTS, Analysis, prompt_version, title, content, content_type)
+
+    def summarize_cards(self, title, content, prompt_version=None, content_type=None):
+        """
+        2단계 요약의 1단계: 분류 + 카드 요약 (category, topic, small/medium_card_summary)
+        newsletter_summary는 summarize_newsletter로 따로 생성합니다.
+        """
+        return self._classify(CARD_PROMPTS, CardSummary, prompt_version, title, content, content_type)
+
+    def summarize_newsletter(self, title, content, cards, prompt_version=None, content_type=None):
+        """
+        2단계 요약의 2단계: summarize_cards 결과(cards)에 맞춘 뉴스레터 본문 블록
+        반환: {"newsletter_summary": [{"title", "content"}, ...]}
+        """
+        return self._summarize(
+            NEWSLETTER_PROMPTS, NewsletterSummary, prompt_version, content, content_type,
+            title=title,
+            category=cards.get("category", "기타"),
+            topic=cards.get("topic", "기타"),
+            medium_card_summary=cards.get("medium_card_summary", ""),
+        )
+
+    def summarize_content_chunk(self, title, content, index, total, content_type=None):
+        """
+        입력 예산을 크게 넘는 긴 콘텐츠의 부분 요약: 조각 하나(index/total번째)의 요점 → {"summary": ...}
+        같은 조각이면 프롬프트가 같으므로 공유 캐시에서 재사용됩니다.
+        """
+        return self._summarize(
+            CONTENT_CHUNK_PROMPTS, ContentChunkSummary, None, content, content_type,
+            title=title, index=index, total=total,
+        )
 
     def summarize_collection(self, newsletters):
         """
         뉴스레터 목록(제목+요약)을 입력받아 컬렉션용 요약(Small/Medium Card)을 생성합니다.
+        [수정] 한 줄에 한 항목인 압축 목록으로 전달, 입력 예산(COLLECTION_PROMPT_CHARS)을 넘으면 고르게 표본 추출
+        (큰 컬렉션은 main.reduce_collection에서 묶음별 부분 요약으로 먼저 줄여서 전달)
         """
-        prompt = f"""
-        당신은 전문 에디터입니다. 아래 제공된 {len(newsletters)}개의 뉴스레터 요약본들을 바탕으로, 이들을 하나로 묶는 컬렉션(모음집)의 제목과 설명을 작성해주세요.
-        
-        ### 입력 데이터(뉴스레터 목록):
-        {json.dumps(newsletters, ensure_ascii=False, indent=2)}
+        items = collection.prepare(newsletters)
+        total = sum(collection.item_count(item) for item in items)
+        items = collection.fit(items)
+        prompt = COLLECTION_PROMPTS[PROMPT_VERSION].render(total=total, items=collection.encode(items))
 
-        ### ★필수 반환 필드 및 조건 (정확히 지킬 것)★:
-        JSON 형식으로만 응답하세요.
+        route = self.router.choose(COLLECTION, len(prompt.full))
+        try:
+            return self._generate_json(prompt, route, CollectionSummaryResponse)
+        except Exception as e:
+            logger.error(f"Gemini API error (collection): {e}")
+            return error_result(e)
 
-        {{
-            "small_card_summary": "컬렉션의 실질적인 제목 역할. 3~4단어로 핵심을 관통하는 문구 (예: '생산성을 높이는 툴', '개발자 커리어 조언')",
-            "medium_card_summary": "어떤 뉴스레터들을 위주로 모았는지, 이 컬렉션이 독자에게 어떤 가치를 주는지 설명하는 1개의 자연스러운 문장 (예: '실무에서 바로 쓸 수 있는 생산성 도구들과 활용법을 모았습니다.')"
-        }}
+    def summarize_collection_chunk(self, items):
         """
+        계층 컬렉션 요약의 부분 요약: 묶음 하나(압축 항목 목록)의 공통 주제 → {"summary": ...}
+        같은 묶음이면 프롬프트가 같으므로 공유 캐시에서 재사용됩니다.
+        """
+        total = sum(collection.item_count(item) for item in items)
+        prompt = COLLECTION_CHUNK_PROMPTS[PROMPT_VERSION].render(total=total, items=collection.encode(items))
 
+        route = self.router.choose(COLLECTION, len(prompt.full))
         try:
-            response = self.client.models.generate_content(
-                model=self.model_id,
-                contents=prompt,
-                config={
-                    'response_mime_type': 'application/json'
-                }
-            )
-            return json.loads(response.text)
+            return self._generate_json(prompt, route, CollectionChunkSummary)
         except Exception as e:
-            print(f"Gemini API Error (Collection): {str(e)}")
-            return {"error": str(e)}
+            logger.error(f"Gemini API error (collection chunk): {e}")
+            return error_result(e)
 
 if __name__ == "__main__":
     summarizer = GeminiSummarizer()
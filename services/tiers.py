@@ -0,0 +1,64 @@
+"""
+YouTube 요약 품질 단계 (tier)
+
+공식 자막이 없는 영상은 Whisper 음성 인식이 유일한 경로라 부하가 몰리면 몇 분씩 대기하게 됩니다.
+요청별로, 또는 부하/마감 시간에 따라 자동으로 더 싼 단계를 골라 지연 시간 목표를 지킵니다.
+
+- captions: 공식 자막 사용 (음성 인식 없음, 자막이 있으면 항상 이 단계)
+- full: 전체 음성 인식
+- partial: 앞 PARTIAL_TRANSCRIPTION_MINUTES분(기본 5분)만 음성 인식
+- metadata: 음성 인식 없이 제목 + 설명 + 챕터 목록으로 요약
+
+사용한 단계는 응답(PythonSummaryResponse.tier)에 기록됩니다.
+"""
+import os
+from typing import List, Optional
+
+CAPTIONS = "captions"
+FULL = "full"
+PARTIAL = "partial"
+METADATA = "metadata"
+
+PARTIAL_TRANSCRIPTION_SECONDS = float(os.getenv("PARTIAL_TRANSCRIPTION_MINUTES", "5")) * 60
+
+
+def candidate_tiers(requested: Optional[str], duration: float, allow_downgrade: bool) -> List[str]:
+    """
+    시도할 단계 목록 (앞에서부터 수락되는 첫 단계 사용)
+
+    requested가 있으면 그 단계만, 없으면(자동) full → partial → metadata 순서로 내려감
+    """
+    if requested:
+        return [requested]
+    if not allow_downgrade:
+        return [FULL]
+    if duration <= PARTIAL_TRANSCRIPTION_SECONDS:
+        # 짧은 영상은 partial이 full과 같으므로 생략
+        return [FULL, METADATA]
+    return [FULL, PARTIAL, METADATA]
+
+
+def transcription_seconds(tier: str, duration: float) -> float:
+    """단계별 음성 인식 대상 길이(초) - 수락 제어 비용으로 사용"""
+    if tier == METADATA:
+        return 0.0
+    if tier == PARTIAL:
+        return min(duration, PARTIAL_TRANSCRIPTION_SECONDS)
+    return duration
+
+
+def metadata_text(video_data: dict) -> str:
+    """metadata 단계의 요약 입력: 설명 + 챕터 목록 (제목은 별도 전달)"""
+    parts = [video_data.get("description") or ""]
+    chapters = video_data.get("chapters") or []
+    if chapters:
+        lines = [f"- {_format_time(ch.get('start_time') or 0)} {ch.get('title', '')}" for ch in chapters]
+        parts.append("[챕터]\n" + "\n".join(lines))
+    return "\n\n".join(p for p in parts if p)
+
+
+def _format_time(seconds: float) -> str:
+    seconds = int(seconds)
+    hours, rest = divmod(seconds, 3600)
+    minutes, secs = divmod(rest, 60)
+    return f"{hours}:{minutes:02d}:{secs:02d}" if hours else f"{minutes}:{secs:02d}"
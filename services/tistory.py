@@ -7,9 +7,16 @@ import urllib.request
 import re
 import html
 import logging
+from typing import Optional
 
 from bs4 import BeautifulSoup
 
+from services.http_cache import HttpCache
+from services.canonical import canonicalize
+from services import cancellation, cassette
+from services.cancellation import PipelineCancelled
+from services.metrics import record_cache, stage_timer
+
 logger = logging.getLogger(__name__)
 
 # ---- utils ----
@@ -58,7 +65,12 @@ class TistoryProcessor:
     링크를 받아 본문을 추출하고, 기존 응답 형식(article_info + analysis)에 맞게 반환
     """
 
-    def __init__(self):
+    # 공용 HTTP 캐시 키 접두사 (같은 URL이라도 처리기마다 파싱 결과가 다르므로 따로 저장)
+    CACHE_NAMESPACE = "tistory"
+
+    def __init__(self, http_cache: Optional[HttpCache] = None):
+        # 조건부 GET 캐시 (None이면 캐시 없이 매번 새로 요청)
+        self.http_cache = http_cache
         self.headers = {"User-Agent": "Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 "
                                      "(KHTML, like Gecko) Chrome/120.0.0.0 Safari/537.36"}
 
@@ -79,34 +91,80 @@ class TistoryProcessor:
         try:
             logger.info(f"Fetching Tistory content from: {url}")
 
-            req = urllib.request.Request(url, headers=self.headers)
-            resp = urllib.request.urlopen(req, timeout=10)
-            raw = resp.read()
-
-            charset = resp.headers.get_content_charset() or "utf-8"
-            html_text = raw.decode(charset, errors="replace")
-            soup = BeautifulSoup(html_text, "html.parser")
-
-            # 메타 정보 추출
-            title = self._get_meta_content(soup, "og:title")
-            description = self._get_meta_content(soup, "og:description")
-            thumbnail_url = self._get_meta_content(soup, "og:image")
-            published_time = self._get_meta_content(soup, "article:published_time")
-
-            # 본문 추출 (Tistory 레이아웃 다양성 대응)
-            content = self._extract_content(soup)
+            # /m/ 모바일 경로 등 URL 변형이 같은 캐시 항목을 쓰도록 정규화 키 사용
+            canonical = canonicalize(url)
+            cache_key = f"{self.CACHE_NAMESPACE}|{canonical.key}"
+            cached = self.http_cache.get(cache_key) if self.http_cache else None
+            headers = dict(self.headers)
+            # 기록 중인 요청은 본문 전체를 받아야 하므로 조건부 요청 생략
+            if cached and not cassette.recording():
+                headers.update(cached.conditional_headers())
+
+            req = urllib.request.Request(canonical.url, headers=headers)
+            try:
+                with stage_timer("fetch"):
+                    resp = cassette.call(
+                        "html", canonical.url, lambda: urllib.request.urlopen(req, timeout=10),
+                        encode=cassette.encode_urllib_response, decode=cassette.decode_urllib_response,
+                    )
+                    raw = resp.read()
+            except urllib.error.HTTPError as e:
+                # urllib은 304를 HTTPError로 던짐 → 캐시 본문 사용
+                if e.code != 304 or not cached:
+                    raise
+                logger.info(f"Not modified (304), using cached content: {url}")
+                record_cache("http", True)
+                self.http_cache.revalidated(cache_key, e.headers.get("ETag"), e.headers.get("Last-Modified"))
+                if cached.extracted:
+                    record_cache("extracted", True)
+                    return cached.extracted
+                raw, charset = cached.body, cached.charset or "utf-8"
+            else:
+                charset = resp.headers.get_content_charset() or "utf-8"
+                if self.http_cache:
+                    record_cache("http", False)
+                    extracted = self.http_cache.store(
+                        cache_key, canonical.url, raw,
+                        etag=resp.headers.get("ETag"),
+                        last_modified=resp.headers.get("Last-Modified"),
+                        charset=charset,
+                    )
+                    if extracted:
+                        logger.info(f"Content unchanged, using cached extraction: {url}")
+                        record_cache("extracted", True)
+                        return extracted
+
+            cancellation.check("parse")
+            with stage_timer("parse"):
+                html_text = raw.decode(charset, errors="replace")
+                soup = BeautifulSoup(html_text, "html.parser")
+
+                # 메타 정보 추출
+                title = self._get_meta_content(soup, "og:title")
+                description = self._get_meta_content(soup, "og:description")
+                thumbnail_url = self._get_meta_content(soup, "og:image")
+                published_time = self._get_meta_content(soup, "article:published_time")
+
+                # 본문 추출 (Tistory 레이아웃 다양성 대응)
+                content = self._extract_content(soup)
 
             if not content:
                 logger.warning(f"Content area not found for {url}")
 
-            return {
+            result = {
                 "title": title or "제목 없음",
                 "content": content or "본문을 찾을 수 없습니다.",
                 "thumbnail_url": thumbnail_url or None,
                 "description": description or "",
                 "published_time": published_time or "",
             }
+            if self.http_cache:
+                record_cache("extracted", False)
+                self.http_cache.store_extracted(cache_key, result)
+            return result
 
+        except PipelineCancelled:
+            raise
         except urllib.error.URLError as e:
             logger.error(f"URL error for {url}: {e}")
             return {
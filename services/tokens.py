@@ -0,0 +1,207 @@
+"""
+로컬 토큰 수 추정 + Gemini 입력 예산 계획
+
+파이프라인이 보낼 입력의 토큰 수를 몰라서, 2시간짜리 영상 자막이나 아주 긴 기사도 그대로 Gemini에 보냈습니다.
+(ArticleInfo.word_count도 글자 수일 뿐 토큰 수와는 한글/영문 비율에 따라 크게 다름)
+
+- estimate(text): 문자 종류별 비율로 Gemini 토큰 수 추정 (API count_tokens 왕복 없이 UTF-8 바이트 종류만 셈)
+  한글 음절 TOKENS_PER_HANGUL(기본 0.7), 영문 TOKENS_PER_LATIN(기본 0.25, 약 4자당 1토큰),
+  숫자 1자당 1토큰(자릿수마다 나뉨), 공백 0.1, 그 외 문장 부호/한자/이모지 1자당 1토큰
+- plan(text): Gemini 호출 전에 입력 처리 방식 결정 (예산 LLM_INPUT_TOKEN_BUDGET, 기본 32000토큰)
+  - as_is: 예산 안 → 그대로
+  - compact: 공백/빈 줄/연속 중복 줄(자동 자막의 반복 줄 등) 정리만으로 예산 안에 듦
+  - truncate: 정리 후에도 넘지만 예산의 TOKEN_TRUNCATE_RATIO배(기본 1.5) 이하 → 앞부분 3/4 + 끝부분 1/4만 남김
+  - chunked: 그보다 길면 예산 크기 조각별 요점 정리 → 요점 모음을 요약 (main.prepare_content)
+- 지표: archiveat_llm_input_tokens{plan} (원문 추정 토큰 수),
+  archiveat_token_estimate_ratio{template} (실제 prompt_token_count / 추정, 비율 보정용)
+"""
+import math
+import os
+import re
+from dataclasses import dataclass, field
+from typing import List, Optional
+
+LLM_INPUT_TOKEN_BUDGET = int(os.getenv("LLM_INPUT_TOKEN_BUDGET", "32000"))
+TOKEN_TRUNCATE_RATIO = float(os.getenv("TOKEN_TRUNCATE_RATIO", "1.5"))
+TOKENS_PER_HANGUL = float(os.getenv("TOKENS_PER_HANGUL", "0.7"))
+TOKENS_PER_LATIN = float(os.getenv("TOKENS_PER_LATIN", "0.25"))
+_TOKENS_PER_DIGIT = 1.0
+_TOKENS_PER_SPACE = 0.1
+_TOKENS_PER_OTHER = 1.0
+# 글자당 최대 토큰 수 - 글자 수가 예산 이하이면 세어보지 않아도 예산 안
+_MAX_TOKENS_PER_CHAR = max(TOKENS_PER_HANGUL, TOKENS_PER_LATIN, _TOKENS_PER_DIGIT, _TOKENS_PER_SPACE, _TOKENS_PER_OTHER)
+# 글자당 최소 토큰 수 - 예산 안에 드는 앞부분은 budget / 이 값 글자를 넘을 수 없음
+_MIN_TOKENS_PER_CHAR = min(TOKENS_PER_HANGUL, TOKENS_PER_LATIN, _TOKENS_PER_DIGIT, _TOKENS_PER_SPACE, _TOKENS_PER_OTHER)
+
+# 입력 처리 방식
+AS_IS = "as_is"
+COMPACT = "compact"
+TRUNCATE = "truncate"
+CHUNKED = "chunked"
+PLANS = (AS_IS, COMPACT, TRUNCATE, CHUNKED)
+
+# 잘라낸 자리 표시 (truncate)
+TRUNCATION_MARK = "\n…(중략)…\n"
+# truncate에서 남길 앞부분 비율 (나머지는 끝부분 - 결론/정리)
+_HEAD_FRACTION = 0.75
+# _prefix에서 길이를 고쳐 보는 최대 횟수
+_PREFIX_STEPS = 8
+
+# UTF-8 첫 바이트 EA~ED = U+A000~U+DFFF (한글 음절 U+AC00~U+D7A3 포함, 같은 범위의 다른 문자는 드묾)
+_HANGUL_LEAD_BYTES = bytes(range(0xEA, 0xEE))
+_LATIN_BYTES = bytes(range(ord("A"), ord("Z") + 1)) + bytes(range(ord("a"), ord("z") + 1))
+_DIGIT_BYTES = b"0123456789"
+_SPACE_BYTES = b" \t\n\r\x0b\x0c"
+_INLINE_SPACE_RE = re.compile(r"[ \t\f\v\u00a0\u3000]+")
+
+
+def _count(data: bytes, kinds: bytes) -> int:
+    """data에서 kinds에 속한 바이트 수 (bytes.translate로 지운 길이 차이, 문자 단위 정규식보다 10배 이상 빠름)"""
+    return len(data) - len(data.translate(None, kinds))
+
+
+def _raw(text: str) -> float:
+    data = text.encode("utf-8")
+    # 한글 음절은 3바이트 중 첫 바이트만 셈
+    hangul = _count(data, _HANGUL_LEAD_BYTES)
+    latin = _count(data, _LATIN_BYTES)
+    digits = _count(data, _DIGIT_BYTES)
+    spaces = _count(data, _SPACE_BYTES)
+    other = len(text) - hangul - latin - digits - spaces
+    return (hangul * TOKENS_PER_HANGUL + latin * TOKENS_PER_LATIN + digits * _TOKENS_PER_DIGIT
+            + spaces * _TOKENS_PER_SPACE + other * _TOKENS_PER_OTHER)
+
+
+def estimate(text: str) -> int:
+    """Gemini 입력 토큰 수 추정 (한국어/영어 혼합 텍스트)"""
+    return math.ceil(_raw(text)) if text else 0
+
+
+def fits(text: str, budget: int = LLM_INPUT_TOKEN_BUDGET) -> bool:
+    """추정 토큰이 budget 이하인지 (짧은 텍스트는 글자 수만 보고 판단)"""
+    return len(text) * _MAX_TOKENS_PER_CHAR <= budget or _raw(text) <= budget
+
+
+def compact(text: str) -> str:
+    """줄마다 공백 정리 + 빈 줄/바로 앞 줄과 같은 줄 제거 (줄 구분은 유지)"""
+    lines, previous = [], None
+    for line in text.splitlines():
+        line = _INLINE_SPACE_RE.sub(" ", line).strip()
+        if not line or line == previous:
+            continue
+        lines.append(line)
+        previous = line
+    return "\n".join(lines)
+
+
+def _prefix(text: str, budget: int) -> str:
+    """
+    추정 토큰이 budget 이하인 앞부분
+    반드시 드는 길이(budget / 글자당 최대 토큰)에서 시작해 지금까지의 글자당 토큰 비율로 길이를 고쳐 나감
+    (아주 긴 한 줄도 예산 근처 길이만 몇 번 세므로 조각마다 일정한 비용)
+    """
+    if budget <= 0:
+        return ""
+    limit = min(len(text), int(budget / _MIN_TOKENS_PER_CHAR) + 1)
+    end, best = min(limit, int(budget / _MAX_TOKENS_PER_CHAR)), 0
+    for _ in range(_PREFIX_STEPS):
+        tokens = _raw(text[:end])
+        if tokens <= budget:
+            best = end
+            if end == limit or tokens >= budget * 0.98:
+                break
+            end = min(limit, int(end * budget / max(tokens, 1.0) * 0.99))
+            if end <= best:
+                break
+        else:
+            end = max(best, int(end * budget / tokens * 0.99))
+            if end == best:
+                break
+    return text[:best]
+
+
+def _cut(line: str, budget: int) -> str:
+    """_prefix와 같되 가능하면 단어 경계에서 자름"""
+    head = _prefix(line, budget)
+    if len(head) < len(line):
+        space = head.rfind(" ")
+        if space > len(head) // 2:
+            return head[:space + 1]
+    return head
+
+
+def truncate(text: str, budget: int = LLM_INPUT_TOKEN_BUDGET) -> str:
+    """앞부분 3/4 + 끝부분 1/4만 남김 (추정 토큰이 budget 이하)"""
+    if _raw(text) <= budget:
+        return text
+    available = budget - estimate(TRUNCATION_MARK)
+    head = _prefix(text, int(available * _HEAD_FRACTION))
+    # 끝부분은 뒤집어서 앞부분과 같은 방식으로 자름
+    tail = _prefix(text[len(head):][::-1], available - math.ceil(_raw(head)))[::-1]
+    return head.rstrip() + TRUNCATION_MARK + tail.lstrip()
+
+
+def _line_tokens(line: str, budget: int) -> Optional[float]:
+    """줄의 추정 토큰 수 (+ 줄바꿈), 세어보지 않아도 budget을 넘는 긴 줄이면 None"""
+    if len(line) * _MIN_TOKENS_PER_CHAR > budget:
+        return None
+    return _raw(line) + _TOKENS_PER_SPACE
+
+
+def split(text: str, budget: int = LLM_INPUT_TOKEN_BUDGET) -> List[str]:
+    """줄 단위로 이어 붙여 추정 토큰이 budget 이하인 조각들 (한 줄이 budget을 넘으면 단어 경계에서 자름)"""
+    chunks, current, size = [], [], 0.0
+    for line in text.splitlines():
+        tokens = _line_tokens(line, budget)
+        while tokens is None or tokens > budget:
+            head = _cut(line, budget)
+            if not head:
+                tokens = _raw(line) + _TOKENS_PER_SPACE
+                break
+            if current:
+                chunks.append("\n".join(current))
+                current, size = [], 0.0
+            chunks.append(head)
+            line = line[len(head):]
+            tokens = _line_tokens(line, budget)
+        if current and size + tokens > budget:
+            chunks.append("\n".join(current))
+            current, size = [], 0.0
+        if line:
+            current.append(line)
+            size += tokens
+    if current:
+        chunks.append("\n".join(current))
+    return chunks
+
+
+@dataclass(frozen=True)
+class InputPlan:
+    """
+    action: as_is / compact / truncate / chunked
+    tokens: 원문 추정 토큰 수
+    text: 보낼 입력 (chunked면 정리된 원문 - 요약에는 조각별 요점 모음을 대신 사용)
+    chunks: chunked일 때 조각 목록
+    """
+    action: str
+    tokens: int
+    text: str
+    chunks: List[str] = field(default_factory=list)
+
+
+def plan(text: str, budget: int = LLM_INPUT_TOKEN_BUDGET, truncate_ratio: float = TOKEN_TRUNCATE_RATIO,
+         allow_chunked: bool = True) -> InputPlan:
+    """
+    Gemini 호출 전 입력 처리 방식 결정
+    allow_chunked: False면 예산을 얼마나 넘든 truncate (조각별 요약을 할 수 없는 호출 지점의 안전장치)
+    """
+    tokens = estimate(text)
+    if tokens <= budget:
+        return InputPlan(AS_IS, tokens, text)
+    compacted = compact(text)
+    compacted_tokens = estimate(compacted)
+    if compacted_tokens <= budget:
+        return InputPlan(COMPACT, tokens, compacted)
+    if compacted_tokens <= budget * truncate_ratio or not allow_chunked:
+        return InputPlan(TRUNCATE, tokens, truncate(compacted, budget))
+    return InputPlan(CHUNKED, tokens, compacted, split(compacted, budget))
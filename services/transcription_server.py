@@ -0,0 +1,269 @@
+"""
+공유 Whisper 모델 서버 (uvicorn 다중 워커 배포용)
+
+`uvicorn main:app --workers N`으로 실행하면 워커마다 Whisper 모델을 올리므로 메모리가 N배가 되고
+음성 인식 동시 실행 수도 워커별로 따로 잡힙니다.
+이 서버를 하나 띄우고 WHISPER_SERVER_SOCKET을 지정하면 HTTP 워커는 모델을 로드하지 않고
+Unix 소켓으로 오디오 파일 경로를 넘겨 음성 인식을 요청합니다.
+
+- 서버가 모델 복제본(WHISPER_SERVER_REPLICAS개)과 전역 대기열을 관리
+- 프로토콜: 4바이트 길이(big-endian) + JSON 메시지, 연결 하나에 요청 하나
+  요청 {"op": "transcribe", "audio_path": ..., "max_seconds": (선택)} → transcribe_audio() 결과 또는 {"error": ...}
+  요청 {"op": "stats"} → 대기열/복제본 상태
+- 클라이언트가 연결을 끊으면(요청 취소) 대기 중인 작업은 건너뛰고, 실행 중이면 세그먼트 사이에서 중단
+- 인식이 끝나면 오디오 파일을 삭제하므로, 다운로드 폴더(DOWNLOAD_DIR) 밖의 경로는 거절하고 소켓은 0600으로 만듦
+
+실행:
+    WHISPER_SERVER_SOCKET=/tmp/archiveat-whisper.sock python -m services.transcription_server
+    WHISPER_SERVER_SOCKET=/tmp/archiveat-whisper.sock uvicorn main:app --workers 4
+"""
+import contextvars
+import json
+import logging
+import os
+import queue
+import select
+import socket
+import socketserver
+import struct
+import threading
+import time
+from typing import Optional
+
+from services import cancellation
+from services.cancellation import CancelToken, PipelineCancelled
+
+logger = logging.getLogger(__name__)
+
+WHISPER_SERVER_SOCKET = os.getenv("WHISPER_SERVER_SOCKET", "")
+WHISPER_SERVER_REPLICAS = int(os.getenv("WHISPER_SERVER_REPLICAS", "1"))
+WHISPER_MODEL_SIZE = os.getenv("WHISPER_MODEL_SIZE", "tiny")
+# 서버 응답 대기 한도(초): 대기열 + 인식 시간을 모두 포함
+WHISPER_SERVER_TIMEOUT = float(os.getenv("WHISPER_SERVER_TIMEOUT", "1800"))
+
+_HEADER = struct.Struct(">I")
+_MAX_MESSAGE_BYTES = 64 * 1024 * 1024
+
+
+class TranscriptionServerUnavailable(Exception):
+    """모델 서버에 연결할 수 없음"""
+
+
+def send_message(sock: socket.socket, payload: dict):
+    data = json.dumps(payload, ensure_ascii=False).encode("utf-8")
+    sock.sendall(_HEADER.pack(len(data)) + data)
+
+
+def recv_message(sock: socket.socket) -> Optional[dict]:
+    """메시지 하나 수신 (상대가 연결을 닫았으면 None)"""
+    header = _recv_exact(sock, _HEADER.size)
+    if header is None:
+        return None
+    (length,) = _HEADER.unpack(header)
+    if length > _MAX_MESSAGE_BYTES:
+        raise ValueError(f"Message too large: {length} bytes")
+    body = _recv_exact(sock, length)
+    if body is None:
+        return None
+    return json.loads(body.decode("utf-8"))
+
+
+def _recv_exact(sock: socket.socket, size: int) -> Optional[bytes]:
+    chunks = []
+    while size:
+        chunk = sock.recv(size)
+        if not chunk:
+            return None
+        chunks.append(chunk)
+        size -= len(chunk)
+    return b"".join(chunks)
+
+
+class _Job:
+    def __init__(self, audio_path: str, max_seconds: Optional[float] = None):
+        self.audio_path = audio_path
+        self.max_seconds = max_seconds
+        self.token = CancelToken()
+        self.enqueued_at = time.perf_counter()
+        self.done = threading.Event()
+        self.result: Optional[dict] = None
+
+
+class TranscriptionServer(socketserver.ThreadingMixIn, socketserver.UnixStreamServer):
+    """모델 복제본 스레드 + 전역 대기열 (CTranslate2는 인식 중 GIL을 놓으므로 스레드로 병렬 실행)"""
+
+    daemon_threads = True
+
+    def __init__(self, socket_path: str, model_size: str = WHISPER_MODEL_SIZE, replicas: int = WHISPER_SERVER_REPLICAS,
+                 model_factory=None, audio_dir: Optional[str] = None):
+        if os.path.exists(socket_path):
+            os.remove(socket_path)
+        super().__init__(socket_path, _Handler)
+        # 같은 사용자(HTTP 워커)만 연결할 수 있게
+        os.chmod(socket_path, 0o600)
+        self.socket_path = socket_path
+        if audio_dir is None:
+            from services.youtube import DOWNLOAD_DIR as audio_dir
+        self.audio_dir = os.path.realpath(audio_dir)
+        self.jobs: "queue.Queue[_Job]" = queue.Queue()
+        self.replicas = replicas
+        self.busy = 0
+        self.completed = 0
+        self._lock = threading.Lock()
+
+        if model_factory is None:
+            from faster_whisper import WhisperModel
+
+            def model_factory():
+                return WhisperModel(model_size, device="cpu", compute_type="int8")
+
+        for i in range(replicas):
+            logger.info(f"--- 모델 서버: Faster Whisper {model_size} 복제본 {i + 1}/{replicas} 로드 중 ---")
+            model = model_factory()
+            threading.Thread(target=self._replica_loop, args=(model,), name=f"whisper-{i}", daemon=True).start()
+
+    def _replica_loop(self, model):
+        from services.youtube import transcribe_audio
+
+        while True:
+            job = self.jobs.get()
+            queued = time.perf_counter() - job.enqueued_at
+            if job.token.cancelled:
+                # 대기 중 클라이언트가 떠난 작업은 실행하지 않음
+                if os.path.exists(job.audio_path):
+                    os.remove(job.audio_path)
+                job.result = {"error": "cancelled", "cancelled": True}
+                job.done.set()
+                continue
+
+            with self._lock:
+                self.busy += 1
+            try:
+                # 이 작업 전용 컨텍스트에서 실행 → transcribe_audio의 세그먼트별 취소 확인이 job.token을 봄
+                ctx = contextvars.Context()
+                ctx.run(cancellation.bind, job.token)
+                result = ctx.run(transcribe_audio, model, job.audio_path, job.max_seconds)
+                result["queued"] = queued
+                job.result = result
+            except PipelineCancelled:
+                job.result = {"error": "cancelled", "cancelled": True}
+            except Exception as e:
+                logger.exception(f"Transcription failed: {job.audio_path}")
+                job.result = {"error": str(e)}
+            finally:
+                with self._lock:
+                    self.busy -= 1
+                    self.completed += 1
+                job.done.set()
+
+    def resolve_audio_path(self, audio_path: str) -> Optional[str]:
+        """다운로드 폴더 안의 파일이면 실제 경로, 아니면 None (인식 후 삭제하므로 임의 파일 삭제 방지)"""
+        path = os.path.realpath(audio_path)
+        if os.path.commonpath([path, self.audio_dir]) != self.audio_dir or path == self.audio_dir:
+            return None
+        return path
+
+    def stats(self) -> dict:
+        with self._lock:
+            return {
+                "replicas": self.replicas,
+                "busy": self.busy,
+                "queue_length": self.jobs.qsize(),
+                "completed": self.completed,
+            }
+
+    def server_close(self):
+        super().server_close()
+        if os.path.exists(self.socket_path):
+            os.remove(self.socket_path)
+
+
+class _Handler(socketserver.BaseRequestHandler):
+    def handle(self):
+        server: TranscriptionServer = self.server
+        request = recv_message(self.request)
+        if request is None:
+            return
+
+        op = request.get("op")
+        if op == "stats":
+            send_message(self.request, server.stats())
+            return
+        if op != "transcribe" or not request.get("audio_path"):
+            send_message(self.request, {"error": f"Invalid request: {op}"})
+            return
+
+        audio_path = server.resolve_audio_path(request["audio_path"])
+        if audio_path is None:
+            logger.warning(f"Rejected audio path outside {server.audio_dir}: {request['audio_path']}")
+            send_message(self.request, {"error": "audio_path must be inside the download directory"})
+            return
+
+        job = _Job(audio_path, request.get("max_seconds"))
+        server.jobs.put(job)
+        # 결과를 기다리는 동안 클라이언트 연결 종료(= 요청 취소) 감시
+        while not job.done.wait(0.5):
+            readable, _, _ = select.select([self.request], [], [], 0)
+            if readable and not self.request.recv(1, socket.MSG_PEEK):
+                job.token.cancel(cancellation.DISCONNECT)
+                job.done.wait()
+                return
+        send_message(self.request, job.result)
+
+
+class RemoteTranscriber:
+    """HTTP 워커 쪽 클라이언트: transcribe_audio()와 같은 결과 dict 반환"""
+
+    def __init__(self, socket_path: str = WHISPER_SERVER_SOCKET, timeout: float = WHISPER_SERVER_TIMEOUT):
+        self.socket_path = socket_path
+        self.timeout = timeout
+
+    def _request(self, payload: dict) -> dict:
+        sock = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+        try:
+            try:
+                sock.connect(self.socket_path)
+            except OSError as e:
+                raise TranscriptionServerUnavailable(f"Whisper model server unavailable ({self.socket_path}): {e}")
+            send_message(sock, payload)
+
+            # 응답을 기다리며 현재 요청 취소 여부 확인 (취소 시 연결을 닫아 서버에 전달)
+            deadline = time.monotonic() + self.timeout
+            while True:
+                cancellation.check("transcription")
+                readable, _, _ = select.select([sock], [], [], 0.5)
+                if readable:
+                    break
+                if time.monotonic() > deadline:
+                    raise TimeoutError(f"Whisper model server did not respond within {self.timeout}s")
+            response = recv_message(sock)
+        finally:
+            sock.close()
+
+        if response is None:
+            raise TranscriptionServerUnavailable("Whisper model server closed the connection")
+        return response
+
+    def transcribe(self, audio_path: str, max_seconds: Optional[float] = None) -> dict:
+        result = self._request({
+            "op": "transcribe",
+            "audio_path": os.path.abspath(audio_path),
+            "max_seconds": max_seconds,
+        })
+        if "error" in result:
+            raise RuntimeError(f"Remote transcription failed: {result['error']}")
+        return result
+
+    def stats(self) -> dict:
+        return self._request({"op": "stats"})
+
+
+if __name__ == "__main__":
+    logging.basicConfig(level=logging.INFO, format="%(asctime)s - %(name)s - %(levelname)s - %(message)s")
+    socket_path = WHISPER_SERVER_SOCKET or "/tmp/archiveat-whisper.sock"
+    server = TranscriptionServer(socket_path)
+    logger.info(f"✅ Whisper 모델 서버 시작: {socket_path} (복제본 {server.replicas}개)")
+    try:
+        server.serve_forever()
+    finally:
+        server.server_close()
@@ -1,34 +1,48 @@
 import yt_dlp
 from faster_whisper import WhisperModel
+from yt_dlp.utils import download_range_func
 import os
 import shutil
 from youtube_transcript_api import YouTubeTranscriptApi
 import logging
+import time
+
+from services import cancellation, cassette
+from services.canonical import canonicalize
+from services.cancellation import PipelineCancelled
+from services.metrics import observe_stage, record_whisper_audio, stage_timer
 
 
 logger = logging.getLogger(__name__)
 
+# 오디오 다운로드 폴더 (공유 모델 서버도 이 폴더 안의 파일만 인식/삭제)
+DOWNLOAD_DIR = os.getenv("DOWNLOAD_DIR", "downloads")
 
 
 class YouTubeProcessor:
-    def __init__(self, model_size="base"):
+    def __init__(self, model_size="base", load_model=True):
         """
         Faster Whisper 모델 초기화
+
+        load_model=False면 이 프로세스에는 모델을 올리지 않음 (음성 인식을 별도 프로세스에서 할 때)
         """
         logger.info(f"--- 시스템 초기화: Faster Whisper {model_size} 모델 로드 중 ---")
         
         # 다운로드 폴더 생성
-        self.download_dir = "downloads"
+        self.download_dir = DOWNLOAD_DIR
         os.makedirs(self.download_dir, exist_ok=True)
 
 
         # 모델 로드 (CPU 최적화 설정)
-        self.model = WhisperModel(
-            model_size, 
-            device="cpu", 
-            compute_type="int8"
-        )
-        logger.info(f"✅ Faster Whisper {model_size} 모델 로드 완료!")
+        self.model_size = model_size
+        self.model = None
+        if load_model:
+            self.model = WhisperModel(
+                model_size, 
+                device="cpu", 
+                compute_type="int8"
+            )
+            logger.info(f"✅ Faster Whisper {model_size} 모델 로드 완료!")
         
         # [수정 1] FFmpeg 경로 명시 (환경 변수 문제 방지)
         ffmpeg_path = os.environ.get('FFMPEG_PATH') or shutil.which('ffmpeg')
@@ -57,7 +71,9 @@ class YouTubeProcessor:
 
             'no_continue': True, # 이어받기 금지 (오류 방지)
             'overwrites': True,   # 덮어쓰기 허용
-            'cachedir': False     # [수정 4] 캐시 사용 안 함 (포맷 오류 방지)
+            'cachedir': False,    # [수정 4] 캐시 사용 안 함 (포맷 오류 방지)
+            # 다운로드 진행 중 요청이 취소되면 예외로 중단
+            'progress_hooks': [_abort_if_cancelled],
         }
         
         # [디버깅] 쿠키 파일 경로 및 존재 여부 확인
@@ -79,117 +95,239 @@ class YouTubeProcessor:
         except Exception:
             return None
 
-    def process(self, url):
+    def extract(self, url):
+        """
+        영상 정보 추출 + 공식 자막 조회 (오디오 다운로드/음성 인식 X)
+
+        Returns:
+            dict: title, duration, description, thumbnail_url, channel, video_id,
+                  transcript (공식 자막이 없으면 None → download_audio + transcribe 필요)
+                  실패 시 {"error": ...}
+        """
         logger.info(f"Processing YouTube URL: {url}")
+        try:
+            return self._extract(url)
+        except PipelineCancelled:
+            raise
+        except Exception as e:
+            logger.error(f"Error processing YouTube video: {e}", exc_info=True)
+            return {"error": str(e)}
 
+    def _fetch_info(self, url):
+        """yt-dlp 영상 정보 추출 (다운로드 X)"""
+        # [수정 5] 포맷 오류 시 재시도 로직 추가
+        video_info = None
         try:
-            # 1. 영상 정보 추출 (다운로드 X)
-            # [수정 5] 포맷 오류 시 재시도 로직 추가
-            video_info = None
-            try:
-                with yt_dlp.YoutubeDL(self.ydl_opts) as ydl:
+            with yt_dlp.YoutubeDL(self.ydl_opts) as ydl:
+                video_info = ydl.extract_info(url, download=False)
+        except Exception as e:
+            # "Requested format is not available" 오류 발생 시, 포맷 제한을 풀고 재시도
+            if "Requested format is not available" in str(e):
+                logger.warning("⚠️ 지정된 포맷(bestaudio)을 찾을 수 없어, 기본 포맷(best)으로 재시도합니다.")
+                fallback_opts = self.ydl_opts.copy()
+                fallback_opts['format'] = 'best' # 포맷 제한 해제
+                with yt_dlp.YoutubeDL(fallback_opts) as ydl:
                     video_info = ydl.extract_info(url, download=False)
+            else:
+                raise e
+        return video_info
+
+    def _extract(self, url):
+        # 1. 영상 정보 추출 (다운로드 X)
+        with stage_timer("fetch"):
+            # [수정] 카세트 기록/재생 지점 (요약에 쓰는 필드만 저장)
+            video_info = cassette.call(
+                "youtube_info", canonicalize(url).key, lambda: self._fetch_info(url), encode=_recorded_info
+            )
+
+        if not video_info:
+            raise Exception("Failed to extract video info")
+
+        video_id = video_info.get('id')
+        
+        video_data = {
+            "title": video_info.get('title'),
+            "duration": video_info.get('duration'),
+            "description": video_info.get('description'),
+            "thumbnail_url": video_info.get('thumbnail'),
+            "channel": video_info.get('uploader'),
+            "video_id": video_id,
+            # metadata 단계 요약용 챕터 [{start_time, end_time, title}, ...]
+            "chapters": video_info.get('chapters') or [],
+        }
+
+        # 2. 공식 자막 우선 시도
+        logger.info(f"--- '{video_data['title']}' 공식 자막 확인 중 ---")
+        cancellation.check("transcript_lookup")
+        with stage_timer("transcript_lookup"):
+            official_text = cassette.call("captions", video_id, lambda: self._get_official_transcript(video_id))
+
+        if official_text:
+            logger.info("✅ 공식 자막 추출 성공!")
+        else:
+            logger.warning("⚠️ 공식 자막 없음/차단됨. Faster Whisper 음성 인식이 필요합니다.")
+        video_data["transcript"] = official_text
+        return video_data
+
+    def download_audio(self, url, video_id, max_seconds=None):
+        """
+        오디오 다운로드 후 파일 절대 경로 반환 (max_seconds: 앞부분 구간만 다운로드, partial 단계)
+
+        인식이 끝나면 파일을 삭제하므로, 같은 영상의 full/partial 단계가 동시에 실행되어도
+        서로의 파일을 지우지 않도록 단계마다 파일 이름을 따로 씀 ("영상ID.mp3" / "영상ID.partial60.mp3")
+        """
+        logger.info(f"Downloading audio for video {video_id}...")
+        stem = video_id if max_seconds is None else f"{video_id}.partial{int(max_seconds)}"
+        opts = {**self.ydl_opts, 'outtmpl': os.path.join(self.download_dir, f"{stem}.%(ext)s")}
+        if max_seconds is not None:
+            opts['download_ranges'] = download_range_func(None, [(0, max_seconds)])
+        
+        # 다운로드 시에도 동일하게 재시도 로직 적용 필요할 수 있음
+        # 하지만 일단 기존 옵션으로 시도 (오디오 필요하므로)
+        # 만약 위에서 fallback으로 넘어갔다면, 여기서도 fallback 옵션을 써야 할 수도 있음.
+        # 하지만 extract_info(download=False)는 모든 포맷을 보지만, download=True는 포맷을 지정해야 함.
+        
+        with stage_timer("audio_download"), yt_dlp.YoutubeDL(opts) as ydl:
+            try:
+                ydl.download([url])
             except Exception as e:
-                # "Requested format is not available" 오류 발생 시, 포맷 제한을 풀고 재시도
+                # progress hook에서 던진 취소 예외는 yt-dlp가 DownloadError로 감쌀 수 있음
+                cancellation.check("audio_download")
                 if "Requested format is not available" in str(e):
-                    logger.warning("⚠️ 지정된 포맷(bestaudio)을 찾을 수 없어, 기본 포맷(best)으로 재시도합니다.")
-                    fallback_opts = self.ydl_opts.copy()
-                    fallback_opts['format'] = 'best' # 포맷 제한 해제
-                    with yt_dlp.YoutubeDL(fallback_opts) as ydl:
-                        video_info = ydl.extract_info(url, download=False)
+                     logger.warning("⚠️ 다운로드 중 포맷 오류. 기본 포맷(best)으로 재시도 (오디오가 없을 수 있음)")
+                     fallback_opts = opts.copy()
+                     fallback_opts['format'] = 'best'
+                     with yt_dlp.YoutubeDL(fallback_opts) as fallback_ydl:
+                         fallback_ydl.download([url])
                 else:
                     raise e
+        
+        # [수정 3] 파일 경로 동적 계산 (temp_audio.mp3 사용 안 함)
+        # yt-dlp는 다운로드 후 .mp3로 변환하므로 파일명 예측
+        filename = f"{stem}.mp3"
+        file_path = os.path.join(self.download_dir, filename)
+        abs_file_path = os.path.abspath(file_path)
 
-            if not video_info:
-                raise Exception("Failed to extract video info")
-
-            video_id = video_info.get('id')
-            
-            video_data = {
-                "title": video_info.get('title'),
-                "duration": video_info.get('duration'),
-                "description": video_info.get('description'),
-                "thumbnail_url": video_info.get('thumbnail'),
-                "channel": video_info.get('uploader'),
-                "video_id": video_id,
-            }
-
-            # 2. 공식 자막 우선 시도
-            logger.info(f"--- '{video_data['title']}' 공식 자막 확인 중 ---")
-            official_text = self._get_official_transcript(video_id)
-
-            if official_text:
-                logger.info("✅ 공식 자막 추출 성공!")
-                video_data["transcript"] = official_text
+        # 파일 존재 확인
+        if not os.path.exists(abs_file_path):
+            # 만약 .mp3가 아니라 원본 포맷(예: .m4a, .webm)으로 받아졌을 수 있음 (fallback 시)
+            # 다운로드 폴더 내의 같은 이름(확장자만 다른) 파일을 찾아봄
+            found_files = [f for f in os.listdir(self.download_dir) if os.path.splitext(f)[0] == stem]
+            if found_files:
+                logger.info(f"⚠️ mp3 변환이 안 되었을 수 있음. 발견된 파일 사용: {found_files[0]}")
+                abs_file_path = os.path.abspath(os.path.join(self.download_dir, found_files[0]))
             else:
-                # 3. 자막 없으면 Whisper 실행
-                logger.warning("⚠️ 공식 자막 없음/차단됨. Faster Whisper 음성 인식을 시작합니다...")
-                
-                # 오디오 다운로드 실행
-                logger.info(f"Downloading audio for video {video_id}...")
-                
-                # 다운로드 시에도 동일하게 재시도 로직 적용 필요할 수 있음
-                # 하지만 일단 기존 옵션으로 시도 (오디오 필요하므로)
-                # 만약 위에서 fallback으로 넘어갔다면, 여기서도 fallback 옵션을 써야 할 수도 있음.
-                # 하지만 extract_info(download=False)는 모든 포맷을 보지만, download=True는 포맷을 지정해야 함.
-                
-                with yt_dlp.YoutubeDL(self.ydl_opts) as ydl:
-                    try:
-                        ydl.download([url])
-                    except Exception as e:
-                        if "Requested format is not available" in str(e):
-                             logger.warning("⚠️ 다운로드 중 포맷 오류. 기본 포맷(best)으로 재시도 (오디오가 없을 수 있음)")
-                             fallback_opts = self.ydl_opts.copy()
-                             fallback_opts['format'] = 'best'
-                             with yt_dlp.YoutubeDL(fallback_opts) as fallback_ydl:
-                                 fallback_ydl.download([url])
-                        else:
-                            raise e
-                
-                # [수정 3] 파일 경로 동적 계산 (temp_audio.mp3 사용 안 함)
-                # yt-dlp는 다운로드 후 .mp3로 변환하므로 파일명 예측
-                filename = f"{video_id}.mp3"
-                file_path = os.path.join(self.download_dir, filename)
-                abs_file_path = os.path.abspath(file_path)
-
-                # 파일 존재 확인
-                if not os.path.exists(abs_file_path):
-                    # 만약 .mp3가 아니라 원본 포맷(예: .m4a, .webm)으로 받아졌을 수 있음 (fallback 시)
-                    # 다운로드 폴더 내의 해당 video_id로 시작하는 파일을 찾아봄
-                    found_files = [f for f in os.listdir(self.download_dir) if f.startswith(video_id)]
-                    if found_files:
-                        logger.info(f"⚠️ mp3 변환이 안 되었을 수 있음. 발견된 파일 사용: {found_files[0]}")
-                        abs_file_path = os.path.join(self.download_dir, found_files[0])
-                    else:
-                        logger.error(f"Audio file not found at {abs_file_path}")
-                        raise FileNotFoundError(f"오디오 파일을 찾을 수 없습니다: {abs_file_path}")
-
-                # Faster Whisper transcribe
-                logger.info("Starting Whisper transcription...")
-
-                try:
-                    segments, info = self.model.transcribe(
-                        abs_file_path, # 절대 경로 사용
-                        language="ko",
-                        beam_size=5,
-                        vad_filter=True,
-                    )
-                    
-                    transcript_text = " ".join([segment.text for segment in segments])
-                    video_data["transcript"] = transcript_text
-                    
-                    logger.info(f"✅ 음성 인식 완료! (언어: {info.language}, 확률: {info.language_probability:.2f})")
-
-                finally:
-                    if os.path.exists(abs_file_path):
-                        os.remove(abs_file_path)
+                logger.error(f"Audio file not found at {abs_file_path}")
+                raise FileNotFoundError(f"오디오 파일을 찾을 수 없습니다: {abs_file_path}")
+
+        return abs_file_path
+
+    def transcribe(self, audio_path, max_seconds=None):
+        """이 프로세스에 로드된 모델로 음성 인식 (완료 후 오디오 파일 삭제, max_seconds: 앞부분만 인식)"""
+        result = transcribe_audio(self.model, audio_path, max_seconds)
+        record_transcription(result)
+        return result
+
+    def process(self, url):
+        """정보 추출 → (자막 없으면) 다운로드 + 음성 인식까지 한 번에 실행 (에러 시 {"error": ...})"""
+        video_data = self.extract(url)
+        if "error" in video_data or video_data["transcript"] is not None:
+            return video_data
 
+        try:
+            audio_path = self.download_audio(url, video_data["video_id"])
+            video_data["transcript"] = self.transcribe(audio_path)["text"]
             return video_data
 
+        except PipelineCancelled:
+            raise
         except Exception as e:
             logger.error(f"Error processing YouTube video: {e}", exc_info=True)
             return {"error": str(e)}
 
+
+_RECORDED_INFO_FIELDS = ("id", "title", "duration", "description", "thumbnail", "uploader", "chapters")
+
+
+def _recorded_info(video_info):
+    """카세트에 저장할 영상 정보 (formats 등 큰 필드 제외)"""
+    if not video_info:
+        return video_info
+    return {k: video_info.get(k) for k in _RECORDED_INFO_FIELDS}
+
+
+def _abort_if_cancelled(progress):
+    """yt-dlp progress hook: 요청이 취소되었으면 다운로드 중단"""
+    cancellation.check("audio_download")
+
+
+def transcribe_audio(model, audio_path, max_seconds=None):
+    """
+    Faster Whisper 음성 인식 (완료 후 오디오 파일 삭제)
+
+    max_seconds를 주면 앞 max_seconds초 구간만 인식 (partial 단계, clip_timestamps)
+    - Whisper 디코딩은 그 구간만 하고 VAD는 건너뜀 (faster-whisper는 클립 지정 시 VAD를 적용하지 않음)
+    - 파일 전체를 읽어 멜 스펙트로그램을 만드는 비용은 남으므로, 다운로드도 앞부분만 받음 (download_audio)
+
+    Returns:
+        dict: text, language, language_probability, duration(인식한 오디오 길이, 초), elapsed(소요 시간, 초)
+    """
+    logger.info("Starting Whisper transcription...")
+    start = time.perf_counter()
+    try:
+        options = {"clip_timestamps": [0, max_seconds]} if max_seconds is not None else {}
+        segments, info = model.transcribe(
+            audio_path, # 절대 경로 사용
+            language="ko",
+            beam_size=5,
+            vad_filter=True,
+            **options,
+        )
+        # segments는 지연 생성(generator)이므로 순회가 끝나야 인식 완료
+        # 세그먼트 사이마다 요청 취소 여부 확인 (클라이언트가 떠났으면 나머지 인식 생략)
+        texts = []
+        duration = info.duration if max_seconds is None else min(info.duration, max_seconds)
+        for segment in segments:
+            if max_seconds is not None and segment.start >= max_seconds:
+                # 클립 경계를 넘는 세그먼트는 버림 (클립을 지원하지 않는 모델 대역에서도 앞부분만)
+                duration = max_seconds
+                break
+            texts.append(segment.text)
+            cancellation.check("transcription")
+        transcript_text = " ".join(texts)
+    finally:
+        if os.path.exists(audio_path):
+            os.remove(audio_path)
+
+    logger.info(f"✅ 음성 인식 완료! (언어: {info.language}, 확률: {info.language_probability:.2f})")
+    return {
+        "text": transcript_text,
+        "language": info.language,
+        "language_probability": info.language_probability,
+        "duration": duration,
+        "elapsed": time.perf_counter() - start,
+    }
+
+
+def record_transcription(result):
+    """음성 인식 결과의 소요 시간/오디오 길이를 지표에 반영 (프로세스 풀 실행 시 부모에서 호출)"""
+    observe_stage("transcription", result["elapsed"])
+    record_whisper_audio(result["duration"])
+
+
+# 프로세스 풀 워커별로 한 번만 로드하는 모델
+_worker_models = {}
+
+
+def transcribe_file(audio_path, model_size="tiny", max_seconds=None):
+    """프로세스 풀(TRANSCRIPTION_USE_PROCESSES=1) 워커 진입점 - pickle 가능한 모듈 함수"""
+    model = _worker_models.get(model_size)
+    if model is None:
+        logger.info(f"--- 워커 프로세스: Faster Whisper {model_size} 모델 로드 중 ---")
+        model = WhisperModel(model_size, device="cpu", compute_type="int8")
+        _worker_models[model_size] = model
+    return transcribe_audio(model, audio_path, max_seconds)
+
 if __name__ == "__main__":
     # 테스트 실행 시에도 로그 보이게 설정
     logging.basicConfig(level=logging.INFO)
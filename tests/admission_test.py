@@ -0,0 +1,70 @@
+"""
+수락 제어(services.admission) 테스트
+
+사용법: python -m pytest tests/admission_test.py  (또는 python tests/admission_test.py)
+"""
+import os
+import sys
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from services.admission import ARTICLE, WHISPER, AdmissionController, AdmissionRejected
+
+
+def make_controller():
+    return AdmissionController({ARTICLE: 2, WHISPER: 600})
+
+
+def test_rejects_above_limit_with_retry_after():
+    controller = make_controller()
+    controller.try_acquire(ARTICLE)
+    controller.try_acquire(ARTICLE)
+    try:
+        controller.try_acquire(ARTICLE)
+    except AdmissionRejected as e:
+        assert e.cost_class == ARTICLE
+        assert e.retry_after >= 1
+    else:
+        raise AssertionError("third request should be rejected")
+
+    controller.release(ARTICLE, 1, 1.0)
+    controller.try_acquire(ARTICLE)
+
+
+def test_whisper_cost_is_weighted_by_duration():
+    controller = make_controller()
+    controller.try_acquire(WHISPER, 400)
+    controller.try_acquire(WHISPER, 100)
+    try:
+        controller.try_acquire(WHISPER, 300)
+    except AdmissionRejected as e:
+        # 초과분 200초 × 0.3초/초 ÷ 처리 중 2건 = 30초
+        assert e.retry_after == 30
+    else:
+        raise AssertionError("should exceed the audio-seconds limit")
+
+
+def test_single_oversized_job_is_admitted_when_idle():
+    controller = make_controller()
+    controller.try_acquire(WHISPER, 5000)
+    assert controller.stats()[WHISPER]["in_use"] == 5000
+
+
+def test_downgrade_yields_false_without_reserving():
+    controller = make_controller()
+    controller.try_acquire(WHISPER, 600)
+    with controller.admit(WHISPER, 60, downgrade=True) as admitted:
+        assert admitted is False
+    assert controller.stats()[WHISPER]["in_use"] == 600
+
+    with controller.admit(ARTICLE) as admitted:
+        assert admitted is True
+        assert controller.stats()[ARTICLE]["in_use"] == 1
+    assert controller.stats()[ARTICLE]["in_use"] == 0
+
+
+if __name__ == "__main__":
+    for name, fn in list(globals().items()):
+        if name.startswith("test_"):
+            fn()
+            print(f"✅ {name}")
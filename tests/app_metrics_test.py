@@ -0,0 +1,126 @@
+"""
+/metrics 노출 테스트 - 요약 요청을 앱 전체(main.app)로 처리한 뒤
+엔드포인트별 지연 히스토그램과 단계(stage) 라벨, 수락 제어 거절 건수가 노출되는지 확인
+
+외부 호출은 대역 사용: 기사는 로컬 HTML 서버, Gemini는 benchmarks.stubs.FakeGeminiClient,
+Whisper 모델은 FakeWhisperModel (main import 시 모델 다운로드 없음)
+
+사용법: python -m pytest tests/app_metrics_test.py  (또는 python tests/app_metrics_test.py)
+"""
+import os
+import sys
+import tempfile
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+os.environ.setdefault("GEMINI_API_KEY", "test")
+
+_workdir = tempfile.mkdtemp(prefix="archiveat-metrics-test-")
+os.environ.setdefault("HTTP_CACHE_DIR", os.path.join(_workdir, "http_cache"))
+os.environ.setdefault("ARTIFACT_DIR", os.path.join(_workdir, "artifacts"))
+
+import faster_whisper
+from fastapi.testclient import TestClient
+from prometheus_client.parser import text_string_to_metric_families
+
+import services.youtube
+from benchmarks.stubs import FakeGeminiClient, FakeWhisperModel
+
+faster_whisper.WhisperModel = FakeWhisperModel
+services.youtube.WhisperModel = FakeWhisperModel
+
+import main
+from services.admission import ARTICLE
+
+ENDPOINT = "/api/v1/summarize/url"
+
+
+class _ArticleHandler(BaseHTTPRequestHandler):
+    def do_GET(self):
+        paragraphs = "".join(f"<p>지표 테스트용 기사 {i}번째 문단입니다. 생산성 도구와 협업 습관.</p>" for i in range(20))
+        body = (f"<html><head><title>Metrics Article</title></head>"
+                f"<body><article><h1>Metrics Article</h1>{paragraphs}</article></body></html>").encode("utf-8")
+        self.send_response(200)
+        self.send_header("Content-Type", "text/html; charset=utf-8")
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, format, *args):
+        pass
+
+
+def _samples(text: str, name: str):
+    """이름이 name인 샘플들의 (라벨, 값) 목록"""
+    return [
+        (sample.labels, sample.value)
+        for family in text_string_to_metric_families(text)
+        for sample in family.samples
+        if sample.name == name
+    ]
+
+
+def test_metrics_expose_endpoint_latency_and_stages():
+    server = ThreadingHTTPServer(("127.0.0.1", 0), _ArticleHandler)
+    server.daemon_threads = True
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    main.summarizer.client = FakeGeminiClient(latency=0.0, jitter=0.0)
+    try:
+        with TestClient(main.app) as client:
+            response = client.post(ENDPOINT, json={"url": f"http://127.0.0.1:{server.server_address[1]}/post/1"})
+            assert response.status_code == 200, response.text
+            assert response.json()["article_info"]["title"] == "Metrics Article"
+
+            metrics = client.get("/metrics")
+            assert metrics.status_code == 200
+            text = metrics.text
+    finally:
+        server.shutdown()
+
+    # 엔드포인트/상태 코드별 지연 히스토그램
+    counts = _samples(text, "archiveat_request_duration_seconds_count")
+    assert ({"endpoint": ENDPOINT, "status": "200"}, 1.0) in counts
+    buckets = [labels for labels, _ in _samples(text, "archiveat_request_duration_seconds_bucket")
+               if labels["endpoint"] == ENDPOINT]
+    assert any(labels["le"] == "+Inf" for labels in buckets)
+    # /metrics 자체는 기록하지 않음
+    assert all(labels["endpoint"] != "/metrics" for labels, _ in counts)
+
+    # 같은 엔드포인트 라벨로 파이프라인 단계별 지연 기록
+    stages = {labels["stage"] for labels, value in _samples(text, "archiveat_stage_duration_seconds_count")
+              if labels["endpoint"] == ENDPOINT and value >= 1}
+    assert {"fetch", "parse", "llm", "serialization"} <= stages, stages
+
+
+def test_llm_only_endpoints_are_admission_controlled():
+    # article 등급 한도를 모두 채운 상태에서는 본문 직접 요약/컬렉션 요약도 작업 전에 503
+    limit = main.admission.limits[ARTICLE]
+    main.admission.try_acquire(ARTICLE, limit)
+    try:
+        with TestClient(main.app) as client:
+            requests = [
+                ("/api/v1/summarize/generic", {"title": "제목", "content": "본문"}),
+                ("/api/v1/summarize/collection", {"newsletters": ["뉴스레터 요약"]}),
+            ]
+            for path, body in requests:
+                response = client.post(path, json=body)
+                assert response.status_code == 503, (path, response.text)
+                assert int(response.headers["Retry-After"]) >= 1
+                text = client.get("/metrics").text
+                counts = _samples(text, "archiveat_request_duration_seconds_count")
+                assert ({"endpoint": path, "status": "503"}, 1.0) in counts
+    finally:
+        # 처리 시간 추정치(EWMA)는 바꾸지 않도록 현재 추정 시간으로 반납
+        main.admission.release(ARTICLE, limit, main.admission.estimate_seconds(ARTICLE, limit))
+
+    shed = dict((labels["action"], value) for labels, value in _samples(text, "archiveat_admission_shed_total")
+                if labels["cost_class"] == ARTICLE)
+    assert shed.get("rejected", 0) >= 2
+
+
+if __name__ == "__main__":
+    for name, fn in list(globals().items()):
+        if name.startswith("test_"):
+            fn()
+            print(f"✅ {name}")
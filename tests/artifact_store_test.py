@@ -0,0 +1,70 @@
+"""
+추출 결과 아티팩트 저장소(services.artifact_store) 테스트
+
+사용법: python -m pytest tests/artifact_store_test.py  (또는 python tests/artifact_store_test.py)
+"""
+import os
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from services.artifact_store import ArtifactStore
+
+ARTICLE = {"title": "제목", "content": "본문 " * 200, "thumbnail_url": None}
+
+
+def test_put_and_get_round_trip():
+    with tempfile.TemporaryDirectory() as tmpdir:
+        store = ArtifactStore(tmpdir)
+        aid = store.put("tistory:a/1", "https://a.tistory.com/1", "tistory", "article", ARTICLE)
+
+        by_key = store.get("tistory:a/1")
+        by_id = store.get_by_id(aid)
+        assert by_key.data == ARTICLE and by_id.data == ARTICLE
+        assert by_key.artifact_id == aid and by_key.extractor == "tistory"
+        assert store.get("tistory:a/2") is None
+        assert store.get_by_id("../etc/passwd") is None
+
+
+def test_same_content_is_stored_once_and_compressed():
+    with tempfile.TemporaryDirectory() as tmpdir:
+        store = ArtifactStore(tmpdir)
+        first = store.put("k1", "https://a/1", "readability", "article", ARTICLE)
+        second = store.put("k2", "https://b/1", "readability", "article", dict(ARTICLE))
+        assert first == second
+
+        blobs = [os.path.join(root, f) for root, _, files in os.walk(store.blob_dir) for f in files]
+        assert len(blobs) == 1
+        assert os.path.getsize(blobs[0]) < len(ARTICLE["content"].encode("utf-8"))
+
+
+def test_key_points_to_latest_content():
+    with tempfile.TemporaryDirectory() as tmpdir:
+        store = ArtifactStore(tmpdir)
+        store.put("k", "https://a/1", "naver-news", "article", ARTICLE)
+        updated = {**ARTICLE, "content": "수정된 본문"}
+        aid = store.put("k", "https://a/1", "naver-news", "article", updated)
+        assert store.get("k").artifact_id == aid
+        assert store.get("k").data["content"] == "수정된 본문"
+
+
+def test_expired_artifacts_are_evicted():
+    with tempfile.TemporaryDirectory() as tmpdir:
+        store = ArtifactStore(tmpdir, max_age=0.05)
+        aid = store.put("old", "https://a/1", "tistory", "article", ARTICLE)
+        time.sleep(0.1)
+        store.put("new", "https://a/2", "tistory", "article", {"title": "t", "content": "c"})
+        with store._lock:
+            store._evict_locked()
+        assert store.get("old") is None and store.get_by_id(aid) is None
+        assert not os.path.exists(store._blob_path(aid))
+        assert store.get("new") is not None
+
+
+if __name__ == "__main__":
+    for name, fn in list(globals().items()):
+        if name.startswith("test_"):
+            fn()
+            print(f"✅ {name}")
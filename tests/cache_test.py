@@ -0,0 +1,87 @@
+"""
+공유 캐시(services.cache) 테스트 - redis 백엔드는 로컬 RESP 대역(benchmarks.stubs.FakeRedisServer) 사용
+
+사용법: python -m pytest tests/cache_test.py  (또는 python tests/cache_test.py)
+"""
+import os
+import socket
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from benchmarks.stubs import FakeRedisServer
+from services.cache import Cache, MemoryBackend, RedisBackend, SqliteBackend, decode, encode
+
+VALUE = {"title": "제목", "content": "본문 " * 500, "tags": ["a", "b"]}
+
+
+def check_backend(backend):
+    cache = Cache(backend, "crawl", ttl=60)
+    assert cache.get("k") is None
+    cache.set("k", VALUE)
+    assert cache.get("k") == VALUE
+
+    cache.set("short", "값", ttl=0.05)
+    time.sleep(0.1)
+    assert cache.get("short") is None
+
+    cache.delete("k")
+    assert cache.get("k") is None
+
+
+def test_encode_compresses_large_values():
+    small, large = encode({"a": 1}), encode(VALUE)
+    assert small[:1] == b"j" and large[:1] == b"z"
+    assert len(large) < len(VALUE["content"].encode("utf-8"))
+    assert decode(small) == {"a": 1} and decode(large) == VALUE
+
+
+def test_memory_backend():
+    check_backend(MemoryBackend())
+
+
+def test_memory_backend_evicts_least_recently_used():
+    backend = MemoryBackend(max_entries=2)
+    backend.set("a", b"1")
+    backend.set("b", b"2")
+    backend.get("a")
+    backend.set("c", b"3")
+    assert backend.get("b") is None and backend.get("a") == b"1"
+
+
+def test_sqlite_backend_is_shared_between_instances():
+    with tempfile.TemporaryDirectory() as tmpdir:
+        path = os.path.join(tmpdir, "shared.sqlite3")
+        check_backend(SqliteBackend(path))
+        Cache(SqliteBackend(path), "summary").set("p", VALUE)
+        assert Cache(SqliteBackend(path), "summary").get("p") == VALUE
+
+
+def test_redis_backend_against_stand_in():
+    server = FakeRedisServer()
+    try:
+        check_backend(RedisBackend(server.url))
+        # 다른 노드(다른 클라이언트)에서도 같은 값
+        Cache(RedisBackend(server.url), "transcript").set("vid", "자막 텍스트")
+        assert Cache(RedisBackend(server.url), "transcript").get("vid") == "자막 텍스트"
+    finally:
+        server.close()
+
+
+def test_unreachable_backend_is_a_miss():
+    # 아무도 듣지 않는 포트
+    with socket.socket() as sock:
+        sock.bind(("127.0.0.1", 0))
+        port = sock.getsockname()[1]
+    cache = Cache(RedisBackend(f"redis://127.0.0.1:{port}/0", timeout=0.2), "summary")
+    cache.set("k", VALUE)
+    assert cache.get("k") is None
+
+
+if __name__ == "__main__":
+    for name, fn in list(globals().items()):
+        if name.startswith("test_"):
+            fn()
+            print(f"✅ {name}")
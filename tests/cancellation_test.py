@@ -0,0 +1,104 @@
+"""
+요청 취소 전파(services.cancellation) 테스트
+
+사용법: python -m pytest tests/cancellation_test.py  (또는 python tests/cancellation_test.py)
+"""
+import asyncio
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from services import cancellation
+from services.cancellation import DEADLINE, DISCONNECT, CancelToken, PipelineCancelled
+from services.coalesce import RequestCoalescer
+
+
+def test_deadline_expires():
+    token = CancelToken(timeout=0.05)
+    token.check("fetch")
+    time.sleep(0.06)
+    assert token.reason == DEADLINE
+    try:
+        token.check("llm")
+    except PipelineCancelled as e:
+        assert (e.stage, e.reason) == ("llm", DEADLINE)
+    else:
+        raise AssertionError("deadline should cancel")
+
+
+def test_check_is_noop_without_token():
+    cancellation.check("fetch")
+
+
+def test_first_reason_wins():
+    token = CancelToken()
+    token.cancel(DISCONNECT)
+    token.cancel(DEADLINE)
+    assert token.cancelled and token.reason == DISCONNECT
+
+
+def test_coalesced_follower_reruns_when_leader_cancelled():
+    coalescer = RequestCoalescer()
+    calls = []
+
+    async def leader_work():
+        calls.append("leader")
+        await asyncio.sleep(0.01)
+        raise PipelineCancelled("llm", DISCONNECT)
+
+    async def follower_work():
+        calls.append("follower")
+        return "ok"
+
+    async def main():
+        leader = asyncio.create_task(coalescer.run("k", leader_work))
+        await asyncio.sleep(0)
+        follower = asyncio.create_task(coalescer.run("k", follower_work))
+        results = await asyncio.gather(leader, follower, return_exceptions=True)
+        return results
+
+    leader_result, follower_result = asyncio.run(main())
+    assert isinstance(leader_result, PipelineCancelled)
+    assert follower_result == "ok"
+    assert calls == ["leader", "follower"]
+
+
+def test_coalesced_followers_rerun_once_when_leader_task_cancelled():
+    coalescer = RequestCoalescer()
+    calls = []
+
+    async def main():
+        leader_started = asyncio.Event()
+
+        async def leader_work():
+            calls.append("leader")
+            leader_started.set()
+            await asyncio.sleep(10)
+
+        async def follower_work():
+            calls.append("follower")
+            await asyncio.sleep(0.01)
+            return "ok"
+
+        leader = asyncio.create_task(coalescer.run("k", leader_work))
+        await leader_started.wait()
+        followers = [asyncio.create_task(coalescer.run("k", follower_work)) for _ in range(3)]
+        await asyncio.sleep(0)
+        # 클라이언트 연결 종료 등으로 선행 요청의 태스크 자체가 취소됨
+        leader.cancel()
+        return await asyncio.gather(leader, *followers, return_exceptions=True)
+
+    leader_result, *follower_results = asyncio.run(main())
+    assert isinstance(leader_result, asyncio.CancelledError)
+    # 대기자는 RuntimeError(→ 500) 대신 한 번만 다시 실행된 결과를 공유
+    assert follower_results == ["ok", "ok", "ok"]
+    assert calls == ["leader", "follower"]
+
+
+if __name__ == "__main__":
+    for name, fn in list(globals().items()):
+        if name.startswith("test_"):
+            fn()
+            print(f"✅ {name}")
@@ -0,0 +1,63 @@
+"""
+URL 정규화(services.canonical) 테스트
+
+사용법: python -m pytest tests/canonical_test.py  (또는 python tests/canonical_test.py)
+"""
+import os
+import sys
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from services.canonical import NAVER_NEWS, TISTORY, WEB, YOUTUBE, canonicalize
+
+
+def test_naver_variants_share_key():
+    urls = [
+        "https://n.news.naver.com/article/421/0008745941?cds=news_media_pc&type=editn",
+        "https://n.news.naver.com/mnews/article/421/0008745941",
+        "https://news.naver.com/main/read.naver?mode=LSD&oid=421&aid=0008745941",
+        "https://m.news.naver.com/article/comment/421/0008745941",
+    ]
+    results = [canonicalize(u) for u in urls]
+    assert {r.key for r in results} == {"naver:421:0008745941"}
+    assert all(r.kind == NAVER_NEWS for r in results)
+    assert results[0].url == "https://n.news.naver.com/mnews/article/421/0008745941"
+
+
+def test_youtube_variants_share_key():
+    urls = [
+        "https://www.youtube.com/watch?v=7nvUzO_-P0I",
+        "https://youtube.com/watch?v=7nvUzO_-P0I&t=42s&list=PL123",
+        "https://youtu.be/7nvUzO_-P0I?t=10",
+        "https://m.youtube.com/shorts/7nvUzO_-P0I",
+        "https://www.youtube.com/embed/7nvUzO_-P0I",
+    ]
+    results = [canonicalize(u) for u in urls]
+    assert {r.key for r in results} == {"youtube:7nvUzO_-P0I"}
+    assert all(r.kind == YOUTUBE for r in results)
+    assert results[1].url == "https://www.youtube.com/watch?v=7nvUzO_-P0I"
+
+
+def test_tistory_mobile_and_entry():
+    assert canonicalize("https://realej.tistory.com/m/433").key == "tistory:realej:433"
+    assert canonicalize("https://realej.tistory.com/433/").key == "tistory:realej:433"
+
+    encoded = canonicalize("https://s2house.tistory.com/entry/%EC%86%90%EB%8B%98")
+    decoded = canonicalize("https://s2house.tistory.com/m/entry/손님")
+    assert encoded.kind == TISTORY
+    assert encoded.key == decoded.key == "tistory:s2house:entry/손님"
+    assert encoded.url == "https://s2house.tistory.com/entry/%EC%86%90%EB%8B%98"
+
+
+def test_web_strips_tracking_params():
+    a = canonicalize("https://Brunch.co.kr:443/@user/12?utm_source=x&b=2&a=1#top")
+    b = canonicalize("https://brunch.co.kr/@user/12?a=1&b=2&fbclid=abc")
+    assert a.kind == WEB
+    assert a.key == b.key == "web:https://brunch.co.kr/@user/12?a=1&b=2"
+
+
+if __name__ == "__main__":
+    for name, fn in list(globals().items()):
+        if name.startswith("test_"):
+            fn()
+            print(f"✅ {name}")
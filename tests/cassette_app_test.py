@@ -0,0 +1,105 @@
+"""
+카세트 기록/재생을 앱 전체(main.app)로 확인하는 테스트
+
+이미 요약한 기사(유사 중복 색인/크롤링·요약 캐시에 있음)를 기록해도 카세트에 html/gemini 호출이 남아,
+기사 서버와 Gemini 없이 재생할 수 있는지 확인합니다.
+외부 호출은 대역 사용: 기사는 로컬 HTML 서버, Gemini는 benchmarks.stubs.FakeGeminiClient, Whisper는 FakeWhisperModel
+
+사용법: python -m pytest tests/cassette_app_test.py  (또는 python tests/cassette_app_test.py)
+"""
+import os
+import sys
+import tempfile
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+os.environ.setdefault("GEMINI_API_KEY", "test")
+
+_workdir = tempfile.mkdtemp(prefix="archiveat-cassette-test-")
+os.environ.setdefault("HTTP_CACHE_DIR", os.path.join(_workdir, "http_cache"))
+os.environ.setdefault("ARTIFACT_DIR", os.path.join(_workdir, "artifacts"))
+
+import faster_whisper
+from fastapi.testclient import TestClient
+
+import services.youtube
+from benchmarks.stubs import FakeGeminiClient, FakeWhisperModel
+
+faster_whisper.WhisperModel = FakeWhisperModel
+services.youtube.WhisperModel = FakeWhisperModel
+
+import main
+from services import cache
+from services.cassette import OFF, RECORD, REPLAY, CassetteStore
+from services.dedup import NearDuplicateIndex
+
+ENDPOINT = "/api/v1/summarize/url"
+
+
+class _ArticleHandler(BaseHTTPRequestHandler):
+    def do_GET(self):
+        paragraphs = "".join(f"<p>카세트 테스트용 기사 {i}번째 문단입니다. 원격 근무와 협업 도구.</p>" for i in range(20))
+        body = (f"<html><head><title>Cassette Article</title></head>"
+                f"<body><article><h1>Cassette Article</h1>{paragraphs}</article></body></html>").encode("utf-8")
+        self.send_response(200)
+        self.send_header("Content-Type", "text/html; charset=utf-8")
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, format, *args):
+        pass
+
+
+class _OfflineModels:
+    def generate_content(self, **kwargs):
+        raise AssertionError("replay must not call Gemini")
+
+
+def test_recorded_dedup_hit_replays_offline():
+    server = ThreadingHTTPServer(("127.0.0.1", 0), _ArticleHandler)
+    server.daemon_threads = True
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    url = f"http://127.0.0.1:{server.server_address[1]}/post/cassette"
+    originals = (main.cassette_store, main.summarizer.client, main.summarizer.cache, main.dedup_index, main.crawl_cache)
+    main.summarizer.client = FakeGeminiClient(latency=0.0, jitter=0.0)
+
+    try:
+        with tempfile.TemporaryDirectory() as tmpdir, TestClient(main.app) as client:
+            # 1. 기록 없이 한 번 요약 → 유사 중복 색인/크롤링·요약 캐시에 등록
+            main.cassette_store = CassetteStore(tmpdir, OFF)
+            first = client.post(ENDPOINT, json={"url": url})
+            assert first.status_code == 200, first.text
+
+            # 2. 같은 기사를 기록: 재사용할 결과가 있어도 외부 호출을 다시 해서 카세트에 남김
+            main.cassette_store = CassetteStore(tmpdir, RECORD, sample_rate=1.0)
+            recorded = client.post(ENDPOINT, json={"url": url})
+            assert recorded.status_code == 200, recorded.text
+            files = [name for name in os.listdir(tmpdir) if name.endswith(".json")]
+            assert len(files) == 1
+            cassette_id = files[0][:-len(".json")]
+            kinds = [entry["kind"] for entry in CassetteStore(tmpdir, REPLAY).begin(
+                ENDPOINT, {"url": url}, cassette_id).interactions]
+            assert "html" in kinds and "gemini" in kinds, kinds
+
+            # 3. 새 프로세스처럼 빈 색인/캐시로, 기사 서버와 Gemini 없이 재생
+            server.shutdown()
+            main.dedup_index = NearDuplicateIndex()
+            main.crawl_cache = cache.Cache(cache.NullBackend(), cache.CRAWL)
+            main.summarizer.cache = None
+            main.summarizer.client.models = _OfflineModels()
+            main.cassette_store = CassetteStore(tmpdir, REPLAY)
+            replayed = client.post(ENDPOINT, json={"url": url}, headers={"X-Cassette": cassette_id})
+            assert replayed.status_code == 200, replayed.text
+            assert replayed.json()["article_info"]["title"] == "Cassette Article"
+    finally:
+        main.cassette_store, main.summarizer.client, main.summarizer.cache, main.dedup_index, main.crawl_cache = originals
+        server.shutdown()
+
+
+if __name__ == "__main__":
+    for name, fn in list(globals().items()):
+        if name.startswith("test_"):
+            fn()
+            print(f"✅ {name}")
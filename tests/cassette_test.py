@@ -0,0 +1,109 @@
+"""
+카세트 기록/재생(services.cassette) 테스트 - 외부 호출 대신 카운터 함수 사용
+
+사용법: python -m pytest tests/cassette_test.py  (또는 python tests/cassette_test.py)
+"""
+import contextvars
+import os
+import sys
+import tempfile
+import types
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from services import cassette
+from services.cassette import RECORD, REPLAY, CassetteMiss, CassetteStore
+
+
+def run_in(current, fn):
+    """카세트를 지정한 별도 컨텍스트에서 실행 (요청 하나에 해당)"""
+    ctx = contextvars.Context()
+    ctx.run(cassette.bind, current)
+    return ctx.run(fn)
+
+
+def record_request(directory, path, body, calls):
+    store = CassetteStore(directory, RECORD, sample_rate=1.0)
+    current = store.begin(path, body)
+    results = run_in(current, lambda: [cassette.call(kind, key, lambda v=value: v) for kind, key, value in calls])
+    store.save(current, 0.1)
+    return current, results
+
+
+def test_record_then_replay_without_calling_network():
+    with tempfile.TemporaryDirectory() as tmpdir:
+        recorded, _ = record_request(tmpdir, "/api/v1/summarize/tistory", {"url": "https://a.tistory.com/1"}, [
+            ("html", "https://a.tistory.com/1", "<html>본문</html>"),
+            ("gemini", "p1", {"text": "{}"}),
+        ])
+
+        store = CassetteStore(tmpdir, REPLAY)
+        current = store.begin("/api/v1/summarize/tistory", {"url": "https://a.tistory.com/1"}, recorded.id)
+
+        def network():
+            raise AssertionError("replay must not call the network")
+
+        html = run_in(current, lambda: cassette.call("html", "https://a.tistory.com/1", network))
+        assert html == "<html>본문</html>"
+
+
+def test_sampling_and_off_mode_pass_through():
+    with tempfile.TemporaryDirectory() as tmpdir:
+        assert CassetteStore(tmpdir, RECORD, sample_rate=0.0).begin("/x", {}) is None
+        assert CassetteStore(tmpdir, "off").begin("/x", {}) is None
+        # 카세트가 없는 컨텍스트는 그대로 호출
+        assert cassette.call("html", "k", lambda: "live") == "live"
+
+
+def test_replay_miss_raises():
+    with tempfile.TemporaryDirectory() as tmpdir:
+        current = CassetteStore(tmpdir, REPLAY).begin("/x", {"url": "u"})
+        try:
+            run_in(current, lambda: cassette.call("html", "u", lambda: "live"))
+        except CassetteMiss as e:
+            assert e.kind == "html"
+        else:
+            raise AssertionError("should raise CassetteMiss")
+
+
+def test_replay_falls_back_to_other_cassettes():
+    # 병합된 동시 요청: 외부 호출은 한 요청에만 기록됨
+    with tempfile.TemporaryDirectory() as tmpdir:
+        record_request(tmpdir, "/a", {"url": "1"}, [("captions", "vid", "자막")])
+        record_request(tmpdir, "/b", {"url": "2"}, [])
+
+        current = CassetteStore(tmpdir, REPLAY).begin("/b", {"url": "2"})
+        assert run_in(current, lambda: cassette.call("captions", "vid", lambda: None)) == "자막"
+
+
+def test_gemini_replays_in_order_when_prompt_changed():
+    with tempfile.TemporaryDirectory() as tmpdir:
+        record_request(tmpdir, "/a", {"url": "1"}, [("gemini", "old-prompt", "first"), ("gemini", "old-prompt-2", "second")])
+
+        current = CassetteStore(tmpdir, REPLAY).begin("/a", {"url": "1"})
+        results = run_in(current, lambda: [cassette.call("gemini", "new-prompt", lambda: None) for _ in range(2)])
+        assert results == ["first", "second"]
+
+
+def test_recorded_value_is_decoded_like_replay():
+    with tempfile.TemporaryDirectory() as tmpdir:
+        response = types.SimpleNamespace(
+            text='{"a": 1}',
+            usage_metadata=types.SimpleNamespace(prompt_token_count=10, candidates_token_count=2,
+                                                 cached_content_token_count=None, total_token_count=12),
+        )
+        store = CassetteStore(tmpdir, RECORD, sample_rate=1.0)
+        current = store.begin("/x", {})
+        recorded = run_in(current, lambda: cassette.call(
+            "gemini", "p", lambda: response,
+            encode=cassette.encode_gemini_response, decode=cassette.decode_gemini_response,
+        ))
+        assert recorded.text == '{"a": 1}'
+        assert recorded.usage_metadata.total_token_count == 12
+
+
+if __name__ == "__main__":
+    for name, fn in list(globals().items()):
+        if name.startswith("test_"):
+            fn()
+            print(f"✅ {name}")
@@ -0,0 +1,203 @@
+"""
+로컬 카테고리/토픽 분류기(services.classifier) 테스트 - 학습/예측, 저장/로드, 요약기 연동(대체/사전 분류/예시 기록)
+
+사용법: python -m pytest tests/classifier_test.py  (또는 python tests/classifier_test.py)
+"""
+import contextlib
+import json
+import os
+import sys
+import tempfile
+import types
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+os.environ.setdefault("GEMINI_API_KEY", "test")
+
+from benchmarks.classifier_eval import evaluate, make_corpus, split
+from benchmarks.stubs import FakeGeminiClient
+from services import classifier
+from services.artifact_store import ArtifactStore
+from services.cache import Cache, MemoryBackend
+from services.classifier import Example, ExampleLog, Prediction, TopicClassifier, features, read_examples
+from services.summarizer import CATEGORY_MAP, MEMO_PREFIX, GeminiSummarizer
+
+_MODEL = None
+
+
+def trained_model():
+    global _MODEL
+    if _MODEL is None:
+        train, _ = split(make_corpus(1500), holdout=0.2)
+        _MODEL = TopicClassifier(CATEGORY_MAP)
+        _MODEL.fit(train)
+    return _MODEL
+
+
+class FixedClassifier:
+    """항상 같은 예측을 내는 분류기 대역"""
+
+    def __init__(self, category="경제/시사", topic="금융/재테크", confidence=0.99):
+        self.prediction = Prediction(category, topic, confidence, confidence)
+        self.calls = 0
+
+    def predict(self, title, content):
+        self.calls += 1
+        return self.prediction
+
+
+class RecordingLog:
+    def __init__(self):
+        self.rows = []
+
+    def record(self, title, content, category, topic):
+        self.rows.append((title, category, topic))
+
+
+class PromptRecorder(FakeGeminiClient):
+    """보낸 프롬프트를 기록하고, topic을 바꿔서 응답할 수 있는 Gemini 대역"""
+
+    def __init__(self, topic=None):
+        super().__init__(latency=0.0, jitter=0.0)
+        self.topic = topic
+        self.prompts = []
+
+    def generate_content(self, model, contents, config=None):
+        response = super().generate_content(model, contents, config)
+        self.prompts.append(self.last_prompt)
+        if self.topic is None:
+            return response
+        payload = {**response.parsed, "topic": self.topic}
+        return types.SimpleNamespace(text=json.dumps(payload, ensure_ascii=False), parsed=payload,
+                                     usage_metadata=response.usage_metadata)
+
+
+@contextlib.contextmanager
+def classifier_mode(mode, threshold=classifier.CLASSIFIER_THRESHOLD):
+    saved = classifier.CLASSIFIER_MODE, classifier.CLASSIFIER_THRESHOLD
+    classifier.CLASSIFIER_MODE, classifier.CLASSIFIER_THRESHOLD = mode, threshold
+    try:
+        yield
+    finally:
+        classifier.CLASSIFIER_MODE, classifier.CLASSIFIER_THRESHOLD = saved
+
+
+def make_summarizer(client, topic_classifier=None, examples=None):
+    summarizer = GeminiSummarizer(cache=Cache(MemoryBackend(), "summary", ttl=60),
+                                  topic_classifier=topic_classifier, examples=examples)
+    summarizer.client = client
+    return summarizer
+
+
+def test_features_are_deterministic_and_normalized():
+    indices, values = features("제목", "본문 내용입니다 본문")
+    again, _ = features("제목", "본문 내용입니다 본문")
+    assert list(indices) == list(again)
+    assert abs(float((values ** 2).sum()) - 1.0) < 1e-5
+    assert all(0 <= i < 1 << classifier.FEATURE_BITS for i in indices)
+    # 제목과 본문은 다른 이름공간
+    assert set(features("제목", "")[0]).isdisjoint(features("", "제목")[0])
+
+
+def test_fit_predicts_taxonomy_labels_accurately():
+    _, test = split(make_corpus(1500), holdout=0.2)
+    report = evaluate(trained_model(), test)
+    assert report["category_accuracy"] > 0.85
+    assert report["topic_accuracy"] > 0.7
+    prediction = trained_model().predict(test[0].title, test[0].content)
+    assert prediction.topic in CATEGORY_MAP[prediction.category]
+    # 확신도가 높은 예측일수록 정확
+    confident = report["thresholds"][0.7]
+    assert confident["topic_accuracy"] is None or confident["topic_accuracy"] >= report["topic_accuracy"]
+
+
+def test_fit_skips_labels_outside_taxonomy():
+    model = TopicClassifier(CATEGORY_MAP)
+    examples = [Example("a", "b", "IT/과학", "인공지능"), Example("a", "b", "IT/과학", "없는 토픽"), Example("a", "b", "없음", "기타")]
+    assert model.fit(examples, epochs=1) == 1
+
+
+def test_save_load_roundtrip():
+    model = trained_model()
+    with tempfile.TemporaryDirectory() as tmp:
+        path = os.path.join(tmp, "model", "classifier.npz")
+        model.save(path)
+        loaded = TopicClassifier.load(path)
+    assert loaded.taxonomy == model.taxonomy
+    assert loaded.predict("제목", "본문 인공지능") == model.predict("제목", "본문 인공지능")
+
+
+def test_example_log_roundtrip():
+    with tempfile.TemporaryDirectory() as tmp:
+        path = os.path.join(tmp, "examples.jsonl")
+        log = ExampleLog(path)
+        log.record("제목", "본문" * 5000, "IT/과학", "인공지능")
+        log.record("제목2", "본문2", "경제/시사", "기타")
+        examples = read_examples(path)
+    assert [(e.title, e.category, e.topic) for e in examples] == [("제목", "IT/과학", "인공지능"), ("제목2", "경제/시사", "기타")]
+    assert len(examples[0].content) == classifier.CLASSIFIER_MAX_CHARS
+
+
+def test_fallback_replaces_unknown_topic():
+    examples = RecordingLog()
+    summarizer = make_summarizer(PromptRecorder(topic="없는 토픽"), FixedClassifier(), examples)
+    result = summarizer.summarize_content("제목", "본문")
+    assert (result["category"], result["topic"]) == ("경제/시사", "금융/재테크")
+    # 분류 체계에 없는 Gemini 결과는 학습 예시로 남기지 않음
+    assert examples.rows == []
+
+
+def test_valid_gemini_result_is_kept_and_recorded_once():
+    examples = RecordingLog()
+    client = PromptRecorder()
+    summarizer = make_summarizer(client, FixedClassifier(), examples)
+    for _ in range(2):
+        result = summarizer.summarize_content("제목", "본문")
+        assert (result["category"], result["topic"]) == ("IT/과학", "인공지능")
+    # 두 번째는 공유 캐시 적중 → 새 예시 없음
+    assert client.calls == 1
+    assert examples.rows == [("제목", "IT/과학", "인공지능")]
+
+
+def test_preclassify_shrinks_prompt_and_uses_prediction():
+    full = PromptRecorder()
+    make_summarizer(full).summarize_cards("제목", "본문")
+
+    with classifier_mode(classifier.PRECLASSIFY, threshold=0.9):
+        pre = PromptRecorder()
+        examples = RecordingLog()
+        result = make_summarizer(pre, FixedClassifier(), examples).summarize_cards("제목", "본문")
+        assert (result["category"], result["topic"]) == ("경제/시사", "금융/재테크")
+        assert len(pre.prompts[0]) < len(full.prompts[0])
+        assert "인공지능" not in pre.prompts[0]
+        assert examples.rows == []
+
+        # 확신도가 임계값보다 낮으면 전체 분류 체계로 Gemini가 분류
+        low = PromptRecorder()
+        result = make_summarizer(low, FixedClassifier(confidence=0.5)).summarize_cards("제목", "본문")
+        assert (result["category"], result["topic"]) == ("IT/과학", "인공지능")
+        assert low.prompts == full.prompts
+
+
+def test_memo_skips_local_classifier():
+    local = FixedClassifier()
+    examples = RecordingLog()
+    with classifier_mode(classifier.PRECLASSIFY):
+        summarizer = make_summarizer(PromptRecorder(topic="없는 토픽"), local, examples)
+        result = summarizer.summarize_content("제목", f"{MEMO_PREFIX} 경제 관점으로]\n\n본문")
+    assert local.calls == 0 and examples.rows == []
+    assert result["topic"] == "없는 토픽"
+
+
+def test_artifact_store_scan():
+    with tempfile.TemporaryDirectory() as tmp:
+        store = ArtifactStore(tmp)
+        store.put("a.example/1", "https://a.example/1", "generic", "article", {"title": "a", "content": "A"})
+        store.put("a.example/2", "https://a.example/2", "generic", "article", {"title": "b", "content": "B"})
+        assert sorted(artifact.data["title"] for artifact in store.scan()) == ["a", "b"]
+
+
+if __name__ == "__main__":
+    for name, fn in list(globals().items()):
+        if name.startswith("test_"):
+            fn()
+            print(f"✅ {name}")
@@ -0,0 +1,95 @@
+"""
+컬렉션 요약 입력 준비(services.collection) 테스트 - 압축 인코딩, 표본 추출, 계층 요약 묶음
+
+사용법: python -m pytest tests/collection_test.py  (또는 python tests/collection_test.py)
+"""
+import json
+import os
+import random
+import sys
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+os.environ.setdefault("GEMINI_API_KEY", "test")
+
+from benchmarks.stubs import FakeGeminiClient
+from services import collection
+from services.cache import Cache, MemoryBackend
+from services.summarizer import GeminiSummarizer
+
+TOPICS = ["생산성 도구", "백엔드 성능", "금리와 부동산", "OTT 신작", "리더십과 조직 문화", "AI 반도체"]
+
+
+def newsletters(count, seed=0):
+    rng = random.Random(seed)
+    return [
+        f"뉴스레터 {i}: {rng.choice(TOPICS)} - " + " ".join(rng.choice(TOPICS) for _ in range(rng.randint(5, 30)))
+        for i in range(count)
+    ]
+
+
+def test_compact_encoding_is_smaller_than_indented_json():
+    items = newsletters(40)
+    encoded = collection.encode(collection.prepare(items))
+    assert len(encoded) < len(json.dumps(items, ensure_ascii=False, indent=2))
+    assert collection.compact("  a \n\n b  ") == "a b"
+    assert collection.compact("가" * 500, limit=10) == "가" * 9 + "…"
+
+
+def test_prepare_drops_empty_and_duplicate_items():
+    items = ["생산성 도구 세 가지를 소개합니다", "  ", "생산성  도구 세 가지를 소개합니다 ", "금리 인상과 부동산 시장"]
+    assert collection.prepare(items) == ["생산성 도구 세 가지를 소개합니다", "금리 인상과 부동산 시장"]
+
+
+def test_fit_samples_evenly_within_budget():
+    items = collection.prepare(newsletters(200))
+    sample = collection.fit(items, budget=2000)
+    assert not collection.over_budget(sample, 2000)
+    assert len(sample) > 1 and sample[0] == items[0]
+    assert [items.index(item) for item in sample] == sorted(items.index(item) for item in sample)
+
+
+def test_chunks_cover_all_items_and_shrink_each_level():
+    items = collection.prepare(newsletters(300))
+    chunks = collection.chunk(items, target=8, budget=3000)
+    assert sorted(item for chunk in chunks for item in chunk) == sorted(items)
+    assert all(len(chunk) >= 2 and not collection.over_budget(chunk, 3000) for chunk in chunks)
+    assert len(chunks) < len(items) / 2
+
+
+def test_adding_item_changes_few_chunks():
+    items = collection.prepare(newsletters(300))
+    added = items + ["새로 추가한 뉴스레터: 사내 해커톤 후기와 배운 점"]
+    before = {tuple(chunk) for chunk in collection.chunk(items, target=8)}
+    after = {tuple(chunk) for chunk in collection.chunk(added, target=8)}
+    assert len(after - before) <= 3
+
+
+def test_partial_items_carry_counts():
+    item = collection.partial_item(["a", "[5개 묶음] b"], "요약")
+    assert item == "[6개 묶음] 요약" and collection.item_count(item) == 6
+
+
+def test_incremental_reduce_reuses_partials():
+    summarizer = GeminiSummarizer(cache=Cache(MemoryBackend(), "summary", ttl=60))
+    summarizer.client = FakeGeminiClient(latency=0.0, jitter=0.0)
+
+    def reduce(items):
+        items = collection.prepare(items)
+        while collection.over_budget(items, 3000):
+            chunks = collection.chunk(items, target=8, budget=3000)
+            items = [collection.partial_item(c, summarizer.summarize_collection_chunk(c)["summary"]) for c in chunks]
+        return summarizer.summarize_collection(items)
+
+    items = newsletters(300)
+    assert "small_card_summary" in reduce(items)
+    first = summarizer.client.calls
+    assert "small_card_summary" in reduce(items + ["새로 추가한 뉴스레터: 사내 해커톤 후기와 배운 점"])
+    # 바뀐 묶음(+ 그 위 단계)과 최종 요약만 다시 호출
+    assert summarizer.client.calls - first <= 5 < first
+
+
+if __name__ == "__main__":
+    for name, fn in list(globals().items()):
+        if name.startswith("test_"):
+            fn()
+            print(f"✅ {name}")
@@ -0,0 +1,75 @@
+"""
+유사 중복 탐지(services.dedup) 테스트
+
+사용법: python -m pytest tests/dedup_test.py  (또는 python tests/dedup_test.py)
+"""
+import os
+import random
+import sys
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from prometheus_client import REGISTRY
+
+from benchmarks.dedup_bench import make_article, make_variant
+from services.dedup import NearDuplicateIndex, simhash
+
+
+def test_variant_reuses_analysis():
+    rng = random.Random(0)
+    article = make_article(rng)
+    index = NearDuplicateIndex()
+    index.add("naver:001:0000000001", article, {"category": "경제"})
+
+    match = index.lookup(make_variant(rng, article, edits=2))
+    assert match is not None
+    assert match.key == "naver:001:0000000001"
+    assert match.analysis == {"category": "경제"}
+    assert index.hit_rate == 1.0
+
+
+def test_unrelated_and_memo_mismatch_miss():
+    rng = random.Random(1)
+    article = make_article(rng)
+    index = NearDuplicateIndex()
+    index.add("a", article, {"category": "경제"}, memo="삼성전자")
+
+    assert index.lookup(make_article(rng), memo="삼성전자") is None
+    assert index.lookup(article, memo=None) is None
+    assert index.lookup(article, memo="삼성전자") is not None
+    assert index.stats()["lookups"] == 3
+
+
+def test_lru_limit():
+    rng = random.Random(2)
+    index = NearDuplicateIndex(max_entries=2)
+    articles = [make_article(rng) for _ in range(3)]
+    for i, article in enumerate(articles):
+        index.add(str(i), article, {"id": i})
+    assert index.lookup(articles[0]) is None
+    assert index.lookup(articles[2]).analysis == {"id": 2}
+
+
+def test_precomputed_fingerprint_and_metrics():
+    rng = random.Random(0)
+    article = make_article(rng)
+    variant = make_variant(rng, article, edits=2)
+    index = NearDuplicateIndex()
+    index.add("a", article, {"category": "경제"}, fingerprint=simhash(article))
+    before = REGISTRY.get_sample_value("archiveat_dedup_similarity_count") or 0
+
+    assert index.lookup(variant, fingerprint=simhash(variant)).key == "a"
+    assert REGISTRY.get_sample_value("archiveat_dedup_hit_rate") == 1.0
+    # 후보가 있었지만 메모가 달라 재사용하지 않은 조회 / 후보가 없는 조회
+    assert index.lookup(variant, memo="다른 메모") is None
+    assert index.lookup("무관한 본문 " * 50) is None
+    assert REGISTRY.get_sample_value("archiveat_dedup_hit_rate") == index.hit_rate == 1 / 3
+    # 최고 유사도는 재사용할 후보가 있었던 조회만 기록
+    assert REGISTRY.get_sample_value("archiveat_dedup_similarity_count") == before + 1
+
+
+if __name__ == "__main__":
+    for name, fn in list(globals().items()):
+        if name.startswith("test_"):
+            fn()
+            print(f"✅ {name}")
@@ -0,0 +1,146 @@
+"""
+작업 종류별 전용 실행기(services.executors) 테스트 - 동시 실행 상한, 취소된 작업 거절, 종료
+
+사용법: python -m pytest tests/executors_test.py  (또는 python tests/executors_test.py)
+"""
+import asyncio
+import os
+import sys
+import threading
+from concurrent.futures import ThreadPoolExecutor
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from services import cancellation, executors
+from services.cancellation import DISCONNECT, PipelineCancelled
+from services.executors import BoundedExecutor
+
+
+def bounded(name: str, workers: int) -> BoundedExecutor:
+    return BoundedExecutor(name, ThreadPoolExecutor(max_workers=workers, thread_name_prefix=name), workers)
+
+
+class Gate:
+    """release() 전까지 막혀 있는 작업 + 동시에 실행된 최대 개수 기록"""
+
+    def __init__(self):
+        self.release = threading.Event()
+        self.started = []
+        self.running = 0
+        self.peak = 0
+        self._lock = threading.Lock()
+
+    def work(self, n):
+        with self._lock:
+            self.started.append(n)
+            self.running += 1
+            self.peak = max(self.peak, self.running)
+        self.release.wait(5)
+        with self._lock:
+            self.running -= 1
+        return n
+
+
+def test_running_work_is_bounded():
+    pool, gate = bounded("test-bounded", 2), Gate()
+
+    async def scenario():
+        tasks = [asyncio.ensure_future(pool.run(gate.work, n)) for n in range(5)]
+        await asyncio.sleep(0.05)
+        # 워커 2개만 실행, 나머지는 스케줄러 대기열에서 기다림 (실행기 안에는 쌓이지 않음)
+        assert (pool.active, pool.queue_length) == (2, 3)
+        assert len(gate.started) == 2
+        assert pool.stats()["waiting_by_priority"]["normal"] == 3
+        gate.release.set()
+        return await asyncio.gather(*tasks)
+
+    try:
+        assert asyncio.run(scenario()) == [0, 1, 2, 3, 4]
+        assert gate.peak == 2
+        assert (pool.active, pool.queue_length) == (0, 0)
+    finally:
+        pool.shutdown()
+
+
+def test_cancelled_work_is_rejected():
+    pool, gate = bounded("test-cancelled", 1), Gate()
+
+    async def scenario():
+        # 이미 취소된 요청의 작업은 제출하지 않음
+        cancellation.start().cancel(DISCONNECT)
+        try:
+            await pool.run(gate.work, "cancelled")
+        except PipelineCancelled as e:
+            assert e.stage == pool.name
+        else:
+            raise AssertionError("cancelled request should not be submitted")
+        cancellation.bind(None)
+
+        blocker = asyncio.ensure_future(pool.run(gate.work, "blocker"))
+        await asyncio.sleep(0.02)
+
+        # 대기열에서 기다리는 동안 요청이 취소되면 워커를 받기 전에 빠짐
+        async def queued():
+            token = cancellation.start()
+            task = asyncio.ensure_future(pool.run(gate.work, "queued"))
+            await asyncio.sleep(0.02)
+            token.cancel(DISCONNECT)
+            return await task
+
+        waiting = asyncio.ensure_future(queued())
+        try:
+            await waiting
+        except PipelineCancelled:
+            pass
+        else:
+            raise AssertionError("queued work should be cancelled")
+        gate.release.set()
+        return await blocker
+
+    try:
+        assert asyncio.run(scenario()) == "blocker"
+        assert gate.started == ["blocker"]
+        assert (pool.active, pool.queue_length) == (0, 0)
+    finally:
+        pool.shutdown()
+
+
+def test_shutdown_finishes_running_and_rejects_the_rest():
+    pool, gate = bounded("test-shutdown", 1), Gate()
+
+    async def scenario():
+        running = asyncio.ensure_future(pool.run(gate.work, "running"))
+        queued = asyncio.ensure_future(pool.run(gate.work, "queued"))
+        await asyncio.sleep(0.02)
+        pool.shutdown()
+        gate.release.set()
+        results = await asyncio.gather(running, queued, return_exceptions=True)
+        # 종료 후 새 작업은 바로 실패
+        try:
+            await pool.run(gate.work, "late")
+        except RuntimeError:
+            pass
+        else:
+            raise AssertionError("shut down executor should reject work")
+        return results
+
+    running, queued = asyncio.run(scenario())
+    assert running == "running"
+    assert isinstance(queued, RuntimeError)
+    assert gate.started == ["running"]
+    assert (pool.active, pool.queue_length) == (0, 0)
+    assert pool.scheduler.in_use == 0
+
+
+def test_default_pools():
+    stats = executors.stats()
+    assert set(stats) == {executors.CRAWL, executors.MEDIA, executors.LLM, executors.TRANSCRIPTION}
+    assert stats[executors.CRAWL]["max_workers"] == executors.CRAWL_WORKERS
+    assert executors.get(executors.LLM).max_workers == executors.LLM_WORKERS
+
+
+if __name__ == "__main__":
+    for name, fn in list(globals().items()):
+        if name.startswith("test_"):
+            fn()
+            print(f"✅ {name}")
@@ -0,0 +1,64 @@
+"""
+추출기 레지스트리(services.extractors) 테스트 - 라우팅 + 비용 등급별 실행기/수락 제어 등급
+
+사용법: python -m pytest tests/extractors_test.py  (또는 python tests/extractors_test.py)
+"""
+import asyncio
+import os
+import sys
+import threading
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from services import admission, executors
+from services.canonical import YOUTUBE
+from services.extractors import ARTICLE, CHEAP_HTML, EXPENSIVE_AUDIO, VIDEO, Extractor, ExtractorRegistry
+
+
+def registry() -> ExtractorRegistry:
+    reg = ExtractorRegistry()
+    reg.register(Extractor(name="youtube", cost_class=EXPENSIVE_AUDIO, kind=VIDEO, process=dict,
+                           canonical_kinds=frozenset({YOUTUBE})))
+    reg.register(Extractor(name="tistory", cost_class=CHEAP_HTML, kind=ARTICLE, process=dict,
+                           domains=frozenset({"tistory.com"})))
+    reg.register(Extractor(name="readability", cost_class=CHEAP_HTML, kind=ARTICLE, process=dict), fallback=True)
+    return reg
+
+
+def test_cost_class_selects_executor_and_admission():
+    reg = registry()
+    video = reg.resolve("https://youtu.be/7nvUzO_-P0I")
+    assert video.name == "youtube"
+    assert video.executor == executors.MEDIA and video.admission_class == admission.CAPTIONS
+
+    for url, name in [("https://blog.tistory.com/12", "tistory"), ("https://example.com/post", "readability")]:
+        extractor = reg.resolve(url)
+        assert extractor.name == name
+        assert extractor.executor == executors.CRAWL and extractor.admission_class == admission.ARTICLE
+
+
+def test_busy_media_executor_does_not_block_crawl():
+    release = threading.Event()
+
+    async def scenario():
+        # media 워커를 모두 오래 걸리는 다운로드로 채워도 html 크롤링은 바로 실행됨
+        downloads = [asyncio.ensure_future(executors.run(executors.MEDIA, release.wait, 5))
+                     for _ in range(executors.MEDIA_WORKERS + 1)]
+        await asyncio.sleep(0.05)
+        assert executors.get(executors.MEDIA).queue_length == 1
+        start = time.perf_counter()
+        assert await executors.run(executors.CRAWL, sum, [1, 2]) == 3
+        elapsed = time.perf_counter() - start
+        release.set()
+        await asyncio.gather(*downloads)
+        return elapsed
+
+    assert asyncio.run(scenario()) < 1.0
+
+
+if __name__ == "__main__":
+    for name, fn in list(globals().items()):
+        if name.startswith("test_"):
+            fn()
+            print(f"✅ {name}")
@@ -0,0 +1,235 @@
+"""
+크롤러 HTTP 캐시(services.http_cache) 테스트
+
+로컬 HTML 서버(검증자를 주고 조건부 요청에 304로 응답)를 띄우고 NaverNewsProcessor로 크롤링하여
+- ETag / Last-Modified 조건부 재검증
+- 304 응답 시 캐시 본문(과 파싱 결과) 재사용, 본문이 바뀌면 파싱 결과 무효화
+- 크기(max_bytes) / 나이(max_age) 기준 eviction
+을 확인합니다.
+
+사용법: python -m pytest tests/http_cache_test.py  (또는 python tests/http_cache_test.py)
+"""
+import os
+import sys
+import tempfile
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from services.canonical import canonicalize
+from services.http_cache import HttpCache
+from services.naver_news import NaverNewsProcessor
+from services.tistory import TistoryProcessor
+
+LAST_MODIFIED = "Mon, 05 Oct 2026 09:00:00 GMT"
+
+
+def article(number: str, version: int) -> bytes:
+    paragraphs = "".join(
+        f"<p>기사 {number}번 {version}판의 {i}번째 문단입니다. 캐시 테스트용 본문 marker-{number}-v{version}.</p>"
+        for i in range(20)
+    )
+    return (
+        f"<html><head><title>Article {number} v{version}</title></head>"
+        f"<body><article><h1>Article {number}</h1>{paragraphs}</article></body></html>"
+    ).encode("utf-8")
+
+
+class _ValidatorHandler(BaseHTTPRequestHandler):
+    """
+    /etag/<n>: ETag로 재검증, /modified/<n>: Last-Modified로 재검증, /plain/<n>: 검증자 없음
+    versions[n]을 올리면 본문과 ETag가 바뀜 (Last-Modified는 그대로)
+    """
+    protocol_version = "HTTP/1.1"
+    versions = {}
+    # (경로, If-None-Match, If-Modified-Since, 응답 코드)
+    seen = []
+    lock = threading.Lock()
+
+    def do_GET(self):
+        kind, number = self.path.strip("/").split("/")
+        version = self.versions.get(number, 1)
+        etag = f'"{number}-v{version}"'
+        if_none_match = self.headers.get("If-None-Match")
+        if_modified_since = self.headers.get("If-Modified-Since")
+
+        not_modified = ((kind == "etag" and if_none_match == etag)
+                        or (kind == "modified" and if_modified_since == LAST_MODIFIED))
+        status = 304 if not_modified else 200
+        with self.lock:
+            self.seen.append((self.path, if_none_match, if_modified_since, status))
+
+        body = b"" if not_modified else article(number, version)
+        self.send_response(status)
+        if kind == "etag":
+            self.send_header("ETag", etag)
+        elif kind == "modified":
+            self.send_header("Last-Modified", LAST_MODIFIED)
+        self.send_header("Content-Type", "text/html; charset=utf-8")
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, format, *args):
+        pass
+
+
+def _start_server():
+    server = ThreadingHTTPServer(("127.0.0.1", 0), _ValidatorHandler)
+    server.daemon_threads = True
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return server
+
+
+def cache_key(processor_class, url: str) -> str:
+    return f"{processor_class.CACHE_NAMESPACE}|{canonicalize(url).key}"
+
+
+def _requests_for(path: str):
+    with _ValidatorHandler.lock:
+        return [entry[1:] for entry in _ValidatorHandler.seen if entry[0] == path]
+
+
+def test_etag_revalidation_reuses_cached_extraction():
+    server = _start_server()
+    try:
+        url = f"http://127.0.0.1:{server.server_address[1]}/etag/1"
+        with tempfile.TemporaryDirectory() as tmpdir:
+            processor = NaverNewsProcessor(http_cache=HttpCache(tmpdir))
+            first = processor.process(url)
+            assert first["title"] == "Article 1 v1" and "marker-1-v1" in first["content"]
+
+            second = processor.process(url)
+            assert second == first
+            assert _requests_for("/etag/1") == [(None, None, 200), ('"1-v1"', None, 304)]
+
+            # 본문이 바뀌면 ETag가 달라 200 → 새 본문으로 다시 파싱
+            _ValidatorHandler.versions["1"] = 2
+            third = processor.process(url)
+            assert third["title"] == "Article 1 v2" and "marker-1-v2" in third["content"]
+            assert _requests_for("/etag/1")[-1] == ('"1-v1"', None, 200)
+            assert processor.http_cache.get(cache_key(NaverNewsProcessor, url)).etag == '"1-v2"'
+    finally:
+        server.shutdown()
+
+
+def test_not_modified_reuses_cached_body():
+    server = _start_server()
+    try:
+        url = f"http://127.0.0.1:{server.server_address[1]}/modified/2"
+        key = cache_key(NaverNewsProcessor, url)
+        with tempfile.TemporaryDirectory() as tmpdir:
+            cache = HttpCache(tmpdir)
+            # 파싱 결과 없이 본문만 캐시된 상태 (서버의 현재 본문과 다른 판)
+            cache.store(key, url, article("2", 7), last_modified=LAST_MODIFIED, charset="utf-8")
+            fetched_at = cache.get(key).fetched_at
+            time.sleep(0.01)
+
+            result = NaverNewsProcessor(http_cache=cache).process(url)
+            # 304 → 빈 응답 본문 대신 캐시 본문을 파싱
+            assert _requests_for("/modified/2") == [(None, LAST_MODIFIED, 304)]
+            assert result["title"] == "Article 2 v7" and "marker-2-v7" in result["content"]
+
+            entry = cache.get(key)
+            assert entry.body == article("2", 7)
+            assert entry.fetched_at > fetched_at
+            assert entry.extracted == result
+    finally:
+        server.shutdown()
+
+
+def test_unchanged_body_without_validators_skips_parse():
+    server = _start_server()
+    try:
+        url = f"http://127.0.0.1:{server.server_address[1]}/plain/3"
+        key = cache_key(NaverNewsProcessor, url)
+        with tempfile.TemporaryDirectory() as tmpdir:
+            cache = HttpCache(tmpdir)
+            processor = NaverNewsProcessor(http_cache=cache)
+            first = processor.process(url)
+            # 검증자가 없으면 조건부 요청도 없지만, 본문 해시가 같으면 파싱 결과 재사용
+            assert cache.store(key, url, article("3", 1)) == first
+            assert cache.store(key, url, article("3", 2)) is None
+            assert cache.get(key).extracted is None
+            assert _requests_for("/plain/3") == [(None, None, 200)]
+    finally:
+        server.shutdown()
+
+
+def test_processors_keep_separate_extractions():
+    server = _start_server()
+    try:
+        url = f"http://127.0.0.1:{server.server_address[1]}/etag/30"
+        with tempfile.TemporaryDirectory() as tmpdir:
+            cache = HttpCache(tmpdir)
+            naver, tistory = NaverNewsProcessor(http_cache=cache), TistoryProcessor(http_cache=cache)
+            naver_result = naver.process(url)
+            # 같은 URL이라도 다른 처리기는 네이버/readability 파싱 결과를 재사용하지 않음
+            tistory_result = tistory.process(url)
+            assert "type" in naver_result and "type" not in tistory_result
+            assert "published_time" in tistory_result and "published_time" not in naver_result
+            assert _requests_for("/etag/30") == [(None, None, 200), (None, None, 200)]
+
+            # 이후 304 재검증에서도 각자 자기 파싱 결과
+            assert tistory.process(url) == tistory_result
+            assert naver.process(url) == naver_result
+            assert [status for *_, status in _requests_for("/etag/30")] == [200, 200, 304, 304]
+            assert cache.get(cache_key(NaverNewsProcessor, url)).extracted == naver_result
+            assert cache.get(cache_key(TistoryProcessor, url)).extracted == tistory_result
+    finally:
+        server.shutdown()
+
+
+def test_size_eviction_drops_least_recently_used():
+    server = _start_server()
+    try:
+        base_url = f"http://127.0.0.1:{server.server_address[1]}/etag"
+        keys = {n: cache_key(NaverNewsProcessor, f"{base_url}/{n}") for n in ("10", "11", "12")}
+        page_size = len(article("10", 1))
+        with tempfile.TemporaryDirectory() as tmpdir:
+            cache = HttpCache(tmpdir, max_bytes=int(page_size * 2.5))
+            processor = NaverNewsProcessor(http_cache=cache)
+            processor.process(f"{base_url}/10")
+            time.sleep(0.01)
+            processor.process(f"{base_url}/11")
+            time.sleep(0.01)
+            # 10을 다시 읽으면 11이 가장 오래 안 쓴 항목
+            assert cache.get(keys["10"]) is not None
+            time.sleep(0.01)
+            processor.process(f"{base_url}/12")
+
+            assert cache.get(keys["11"]) is None
+            assert cache.get(keys["10"]) is not None and cache.get(keys["12"]) is not None
+            assert len(os.listdir(cache.body_dir)) == 2
+    finally:
+        server.shutdown()
+
+
+def test_age_eviction_refetches_without_validators():
+    server = _start_server()
+    try:
+        url = f"http://127.0.0.1:{server.server_address[1]}/etag/20"
+        key = cache_key(NaverNewsProcessor, url)
+        with tempfile.TemporaryDirectory() as tmpdir:
+            cache = HttpCache(tmpdir, max_age=0.05)
+            processor = NaverNewsProcessor(http_cache=cache)
+            processor.process(url)
+            assert cache.get(key) is not None
+            time.sleep(0.1)
+
+            # 나이 초과 항목은 삭제되고 조건부 요청 없이 새로 받음
+            assert cache.get(key) is None
+            assert os.listdir(cache.body_dir) == []
+            processor.process(url)
+            assert _requests_for("/etag/20") == [(None, None, 200), (None, None, 200)]
+    finally:
+        server.shutdown()
+
+
+if __name__ == "__main__":
+    for name, fn in list(globals().items()):
+        if name.startswith("test_"):
+            fn()
+            print(f"✅ {name}")
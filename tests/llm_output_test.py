@@ -0,0 +1,152 @@
+"""
+Gemini 구조화 출력 검증(services.llm_output) / 응답 직렬화(services.serialization) 테스트
+
+사용법: python -m pytest tests/llm_output_test.py  (또는 python tests/llm_output_test.py)
+"""
+import json
+import os
+import sys
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+os.environ.setdefault("GEMINI_API_KEY", "test")
+
+from benchmarks.serialization_bench import make_response
+from benchmarks.stubs import FakeGeminiClient
+from models import Analysis, CardSummary
+from services import llm_output, serialization
+from services.summarizer import GeminiSummarizer
+
+FULL = {
+    "category": "IT/과학",
+    "topic": "인공지능",
+    "small_card_summary": "짧은 요약",
+    "medium_card_summary": "중간 요약입니다.",
+    "newsletter_summary": [{"title": f"소제목{i}", "content": f"문단{i}"} for i in range(3)],
+}
+TEXT = json.dumps(FULL, ensure_ascii=False)
+
+
+class ScriptedCall:
+    """순서대로 정해진 응답 텍스트를 돌려주는 call(prompt, schema) 대역"""
+
+    def __init__(self, *texts):
+        self.texts = list(texts)
+        self.requests = []
+
+    def __call__(self, prompt, schema):
+        self.requests.append((prompt, schema))
+        return self.texts.pop(0)
+
+
+def test_parse_valid_and_code_block():
+    assert llm_output.parse(Analysis, TEXT) == (FULL, [], llm_output.VALID)
+    result, missing, outcome = llm_output.parse(Analysis, f"다음은 결과입니다.\n```json\n{TEXT}\n```")
+    assert (result, missing, outcome) == (FULL, [], llm_output.REPAIRED)
+
+
+def test_parse_truncated_output_keeps_complete_values():
+    # 마지막 뉴스레터 문단 중간에서 잘림 → 완결된 블록 2개만 남김
+    truncated = TEXT[:TEXT.index("소제목2") + 8]
+    result, missing, outcome = llm_output.parse(Analysis, truncated)
+    assert outcome == llm_output.REPAIRED and missing == []
+    assert result["newsletter_summary"] == FULL["newsletter_summary"][:2]
+
+    # 최상위 필드 중간에서 잘림 → 앞 필드는 살리고 나머지만 다시 요청
+    truncated = TEXT[:TEXT.index("medium_card_summary") + 10]
+    result, missing, outcome = llm_output.parse(Analysis, truncated)
+    assert outcome == llm_output.INVALID
+    assert missing == ["medium_card_summary", "newsletter_summary"]
+    assert result == {key: FULL[key] for key in ("category", "topic", "small_card_summary")}
+
+    assert llm_output.parse(CardSummary, "요약할 수 없습니다.")[1] == list(CardSummary.model_fields)
+
+
+def test_generate_re_requests_only_missing_fields():
+    call = ScriptedCall(
+        json.dumps({key: FULL[key] for key in ("category", "topic", "small_card_summary")}, ensure_ascii=False),
+        json.dumps({key: FULL[key] for key in ("medium_card_summary", "newsletter_summary")}, ensure_ascii=False),
+    )
+    assert llm_output.generate(Analysis, "프롬프트", call) == FULL
+    (first, schema), (repair, repair_schema) = call.requests
+    assert schema is Analysis
+    assert list(repair_schema.model_fields) == ["medium_card_summary", "newsletter_summary"]
+    assert repair.startswith("프롬프트") and "medium_card_summary, newsletter_summary" in repair
+
+
+def test_generate_raises_after_retries():
+    call = ScriptedCall('{"category": "IT/과학"', '{"topic": 3}')
+    try:
+        llm_output.generate(CardSummary, "프롬프트", call, retries=1)
+    except llm_output.InvalidOutput as e:
+        assert e.fields == ["topic", "small_card_summary", "medium_card_summary"]
+    else:
+        raise AssertionError("expected InvalidOutput")
+    assert len(call.requests) == 2
+
+
+class SchemaRecorder(FakeGeminiClient):
+    def __init__(self):
+        super().__init__(latency=0.0, jitter=0.0)
+        self.schemas = []
+
+    def generate_content(self, model, contents, config=None):
+        self.schemas.append((config or {}).get("response_schema"))
+        return super().generate_content(model, contents, config)
+
+
+class DictCache:
+    def __init__(self):
+        self.data = {}
+
+    def get(self, key):
+        return self.data.get(key)
+
+    def set(self, key, value):
+        self.data[key] = value
+
+
+def test_summarizer_sends_schema_and_regenerates_stale_cache():
+    cache = DictCache()
+    summarizer = GeminiSummarizer(cache=cache)
+    summarizer.client = SchemaRecorder()
+    result = summarizer.summarize_content("제목", "본문")
+    assert set(result) == set(Analysis.model_fields)
+    assert summarizer.client.schemas == [Analysis]
+
+    summarizer.summarize_content("제목", "본문")
+    assert summarizer.client.calls == 1
+
+    # 스키마 도입 전 형식(필드 누락)의 캐시 결과는 무시하고 다시 생성
+    (key, value), = cache.data.items()
+    cache.data[key] = {k: v for k, v in value.items() if k != "newsletter_summary"}
+    assert set(summarizer.summarize_content("제목", "본문")) == set(Analysis.model_fields)
+    assert summarizer.client.calls == 2 and "newsletter_summary" in cache.data[key]
+
+
+def test_invalid_output_becomes_error_result():
+    class Truncating(FakeGeminiClient):
+        def generate_content(self, model, contents, config=None):
+            response = super().generate_content(model, contents, config)
+            response.text = response.text[:20]
+            return response
+
+    summarizer = GeminiSummarizer()
+    summarizer.client = Truncating(latency=0.0, jitter=0.0)
+    result = summarizer.summarize_content("제목", "본문")
+    assert result["kind"] == llm_output.INVALID_OUTPUT and "error" in result
+    # 첫 호출 + 빠진 필드 재요청 1회
+    assert summarizer.client.calls == 2
+
+
+def test_serializers_produce_same_json():
+    response = make_response(3, 8)
+    assert json.loads(serialization.dumps_pydantic(response)) == json.loads(serialization.dumps(response))
+    if serialization.orjson is not None:
+        assert json.loads(serialization.dumps_orjson(response)) == json.loads(response.model_dump_json())
+
+
+if __name__ == "__main__":
+    for name, fn in list(globals().items()):
+        if name.startswith("test_"):
+            fn()
+            print(f"✅ {name}")
@@ -0,0 +1,144 @@
+"""
+Gemini 모델 라우팅(services.model_router) 테스트 - 가짜 Gemini 클라이언트(benchmarks.stubs) 사용
+
+사용법: python -m pytest tests/model_router_test.py  (또는 python tests/model_router_test.py)
+"""
+import os
+import sys
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+os.environ.setdefault("GEMINI_API_KEY", "test")
+
+from benchmarks.stubs import FakeGeminiClient, FakeThrottled
+from services import cancellation
+from services.model_router import ARTICLE, COLLECTION, CONTENT, VIDEO, ModelRouter, Route, default_routes
+from services.summarizer import GeminiSummarizer
+
+FLASH, LITE = "flash", "lite"
+
+
+def make_router(**kwargs):
+    routes = {
+        COLLECTION: Route(COLLECTION, [LITE, FLASH]),
+        "short": Route("short", [LITE, FLASH]),
+        "standard": Route("standard", [FLASH, LITE]),
+        "long": Route("long", [FLASH, LITE]),
+    }
+    return ModelRouter(routes, short_chars=1000, long_chars=50000, **kwargs)
+
+
+def make_summarizer(router, **client_kwargs):
+    summarizer = GeminiSummarizer(router=router)
+    summarizer.client = FakeGeminiClient(latency=0.0, jitter=0.0, **client_kwargs)
+    return summarizer
+
+
+def test_route_by_task_length_and_content_type():
+    router = make_router()
+    assert router.choose(COLLECTION, 10).name == COLLECTION
+    assert router.choose(CONTENT, 500, ARTICLE).name == "short"
+    assert router.choose(CONTENT, 500, VIDEO).name == "standard"
+    assert router.choose(CONTENT, 5000, ARTICLE).name == "standard"
+    assert router.choose(CONTENT, 80000, VIDEO).name == "long"
+
+
+class ConfigRecorder(FakeGeminiClient):
+    def __init__(self):
+        super().__init__(latency=0.0, jitter=0.0)
+        self.configs = []
+
+    def generate_content(self, model, contents, config=None):
+        self.configs.append(config or {})
+        return super().generate_content(model, contents, config)
+
+
+def test_routes_choose_generation_config():
+    router = ModelRouter(default_routes(), short_chars=1000, long_chars=50000)
+    short = router.choose(CONTENT, 500, ARTICLE).config
+    collection = router.choose(COLLECTION, 10).config
+    standard = router.choose(CONTENT, 5000, ARTICLE).config
+    assert short["max_output_tokens"] < standard["max_output_tokens"]
+    assert collection["max_output_tokens"] < short["max_output_tokens"]
+    assert short["thinking_config"] == collection["thinking_config"] == {"thinking_budget": 0}
+    assert "thinking_config" not in standard
+    assert all(route.config["response_mime_type"] == "application/json" for route in router.routes.values())
+
+    # 경로의 생성 설정이 그대로 Gemini 호출에 전달됨 (+ 출력 스키마)
+    summarizer = GeminiSummarizer(router=router)
+    summarizer.client = ConfigRecorder()
+    summarizer.summarize_content("짧은 글", "본문 " * 50, content_type=ARTICLE)
+    (config,) = summarizer.client.configs
+    assert config["max_output_tokens"] == short["max_output_tokens"] and config["thinking_config"] == {"thinking_budget": 0}
+    assert config["response_schema"] is not None
+
+
+def test_short_article_and_collection_use_lite_model():
+    summarizer = make_summarizer(make_router())
+    assert "error" not in summarizer.summarize_content("짧은 글", "본문 " * 50, content_type=ARTICLE)
+    assert "error" not in summarizer.summarize_collection(["뉴스레터 1", "뉴스레터 2"])
+    assert "error" not in summarizer.summarize_content("영상", "자막 " * 5000, content_type=VIDEO)
+    assert summarizer.client.calls_by_model == {LITE: 2, FLASH: 1}
+
+
+def test_throttled_primary_falls_back_and_cools_down():
+    router = make_router(throttle_cooldown=60)
+    summarizer = make_summarizer(router, throttled={FLASH})
+    for i in range(2):
+        result = summarizer.summarize_content(f"영상 {i}", "자막 " * 5000, content_type=VIDEO)
+        assert "error" not in result
+    # 첫 호출만 flash에서 429, 이후로는 쿨다운 동안 lite 먼저
+    assert summarizer.client.calls_by_model == {FLASH: 1, LITE: 2}
+    stats = router.stats()["standard"]
+    assert stats[FLASH]["errors"] == 1 and stats[LITE]["calls"] == 2
+
+
+def test_other_errors_are_not_retried():
+    router = make_router()
+
+    def fail(model, config):
+        raise ValueError("invalid prompt")
+
+    try:
+        router.call(router.routes["standard"], fail)
+    except ValueError:
+        pass
+    else:
+        raise AssertionError("non-throttle errors should propagate")
+    assert router.stats()["standard"][LITE]["errors"] == 0
+
+
+def test_slow_primary_skipped_when_deadline_is_short():
+    router = make_router()
+    route = router.routes["standard"]
+    router.record_success(route, FLASH, 20.0)
+    router.record_success(route, LITE, 1.0)
+    assert router.candidates(route) == [FLASH, LITE]
+
+    cancellation.start(5.0)
+    try:
+        assert router.candidates(route) == [LITE, FLASH]
+    finally:
+        cancellation.bind(None)
+
+
+def test_all_throttled_still_tries_in_order():
+    router = make_router(throttle_cooldown=60)
+    calls = []
+
+    def throttled(model, config):
+        calls.append(model)
+        raise FakeThrottled(model)
+
+    for _ in range(2):
+        try:
+            router.call(router.routes["short"], throttled)
+        except FakeThrottled:
+            pass
+    assert calls == [LITE, FLASH, LITE, FLASH]
+
+
+if __name__ == "__main__":
+    for name, fn in list(globals().items()):
+        if name.startswith("test_"):
+            fn()
+            print(f"✅ {name}")
@@ -0,0 +1,106 @@
+"""
+NaverNewsProcessor 동시 크롤링 스트레스 테스트
+
+로컬 HTML 서버(실제 네이버 대신)를 띄우고 1/8/32/128개 동시 크롤링을 실행하여
+- 모든 응답이 요청한 페이지와 일치하는지 (스레드 간 세션/헤더 경합 없음)
+- 요청 헤더가 요청 단위로 올바르게 붙는지
+- 동시성별 처리량(req/s)
+을 확인합니다.
+
+사용법: python tests/naver_session_stress_test.py  (pytest로도 실행 가능)
+"""
+import os
+import sys
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from services.naver_news import _USER_AGENTS, NaverNewsProcessor
+
+CONCURRENCY_LEVELS = (1, 8, 32, 128)
+
+
+class _ArticleHandler(BaseHTTPRequestHandler):
+    """/article/<n> 요청마다 번호가 박힌 기사 HTML 반환"""
+    protocol_version = "HTTP/1.1"  # keep-alive (커넥션 재사용 확인)
+    seen_headers = []
+    lock = threading.Lock()
+
+    def do_GET(self):
+        number = self.path.rstrip("/").rsplit("/", 1)[-1]
+        with self.lock:
+            self.seen_headers.append((self.headers.get("User-Agent"), self.headers.get("Referer")))
+
+        paragraphs = "".join(
+            f"<p>기사 {number}번의 {i}번째 문단입니다. 동시 크롤링 테스트용 본문 marker-{number}.</p>"
+            for i in range(20)
+        )
+        body = (
+            f"<html><head><title>Article {number}</title></head>"
+            f"<body><article><h1>Article {number}</h1>{paragraphs}</article></body></html>"
+        ).encode("utf-8")
+
+        self.send_response(200)
+        self.send_header("Content-Type", "text/html; charset=utf-8")
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, format, *args):
+        pass
+
+
+def _start_server():
+    server = ThreadingHTTPServer(("127.0.0.1", 0), _ArticleHandler)
+    server.daemon_threads = True
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return server
+
+
+def run_level(processor: NaverNewsProcessor, base_url: str, concurrency: int) -> float:
+    """concurrency개 스레드로 크롤링하고 결과 검증 후 처리량(req/s) 반환"""
+    total = max(concurrency * 4, 64)
+
+    def crawl(n):
+        result = processor.process(f"{base_url}/article/{n}")
+        assert result.get("type") != "ERROR", result
+        assert result["title"] == f"Article {n}", (n, result["title"])
+        assert f"marker-{n}" in result["content"], n
+        return n
+
+    start = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=concurrency) as pool:
+        done = list(pool.map(crawl, range(total)))
+    elapsed = time.perf_counter() - start
+
+    assert done == list(range(total))
+    return total / elapsed
+
+
+def test_concurrent_crawls_are_correct():
+    server = _start_server()
+    try:
+        base_url = f"http://127.0.0.1:{server.server_address[1]}"
+        processor = NaverNewsProcessor(http_cache=None)
+        for concurrency in CONCURRENCY_LEVELS:
+            run_level(processor, base_url, concurrency)
+
+        # 요청마다 목록의 User-Agent가 붙고, 네이버가 아니므로 Referer는 없어야 함
+        assert all(ua in _USER_AGENTS and referer is None for ua, referer in _ArticleHandler.seen_headers)
+    finally:
+        server.shutdown()
+
+
+if __name__ == "__main__":
+    server = _start_server()
+    base_url = f"http://127.0.0.1:{server.server_address[1]}"
+    processor = NaverNewsProcessor(http_cache=None)
+
+    print(f"{'concurrency':>11} {'req/s':>9}")
+    for level in CONCURRENCY_LEVELS:
+        print(f"{level:>11} {run_level(processor, base_url, level):>9.1f}")
+    server.shutdown()
+    print("✅ 모든 응답 검증 완료")
@@ -0,0 +1,128 @@
+"""
+2단계 요약(카드 먼저, 뉴스레터 본문은 services.newsletter_jobs 백그라운드 작업) 테스트
+
+사용법: python -m pytest tests/newsletter_jobs_test.py  (또는 python tests/newsletter_jobs_test.py)
+"""
+import asyncio
+import os
+import sys
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+os.environ.setdefault("GEMINI_API_KEY", "test")
+
+from benchmarks.stubs import FakeGeminiClient
+from services import cancellation, scheduler
+from services.cache import Cache, MemoryBackend
+from services.newsletter_jobs import DONE, FAILED, PENDING, NewsletterJobs
+from services.summarizer import GeminiSummarizer
+
+BLOCKS = [{"title": "소제목", "content": "문단"}]
+
+
+def test_job_runs_detached_from_request():
+    seen = {}
+
+    async def scenario():
+        jobs = NewsletterJobs()
+        release = asyncio.Event()
+
+        async def generate():
+            await release.wait()
+            seen["priority"] = scheduler.current()
+            seen["token"] = cancellation.current()
+            return BLOCKS
+
+        # 요청이 끝나며(연결 종료) 취소 토큰이 취소되어도 작업은 계속
+        token = cancellation.start()
+        scheduler.set_priority(scheduler.INTERACTIVE)
+        job = jobs.submit(generate)
+        token.cancel(cancellation.DISCONNECT)
+        assert job.status == PENDING and jobs.pending() == 1
+        assert not await job.wait(0.01)
+
+        release.set()
+        assert await job.wait(1)
+        return await jobs.lookup(job.id)
+
+    snapshot = asyncio.run(scenario())
+    assert snapshot["status"] == DONE and snapshot["newsletter_summary"] == BLOCKS
+    assert seen == {"priority": scheduler.BACKGROUND, "token": None}
+
+
+def test_failed_job_reports_error():
+    async def scenario():
+        jobs = NewsletterJobs()
+
+        async def generate():
+            raise RuntimeError("quota exceeded")
+
+        job = jobs.submit(generate)
+        await job.wait(1)
+        return job.snapshot()
+
+    snapshot = asyncio.run(scenario())
+    assert snapshot["status"] == FAILED and snapshot["error"] == "quota exceeded"
+
+
+def test_finished_jobs_are_shared_through_cache():
+    backend = MemoryBackend()
+
+    async def produce():
+        jobs = NewsletterJobs(cache=Cache(backend, "newsletter", ttl=60))
+
+        async def generate():
+            return BLOCKS
+
+        job = jobs.submit(generate)
+        await job.task
+        return job.id
+
+    job_id = asyncio.run(produce())
+    # 다른 워커 (이 프로세스에는 작업이 없음)
+    other = NewsletterJobs(cache=Cache(backend, "newsletter", ttl=60))
+    assert other.get(job_id) is None
+    snapshot = asyncio.run(other.lookup(job_id))
+    assert snapshot["status"] == DONE and snapshot["newsletter_summary"] == BLOCKS
+    assert asyncio.run(other.lookup("missing")) is None
+
+
+def test_evicts_oldest_finished_jobs():
+    async def scenario():
+        jobs = NewsletterJobs(max_jobs=3)
+
+        async def generate():
+            return BLOCKS
+
+        ids = []
+        for _ in range(5):
+            job = jobs.submit(generate)
+            await job.wait(1)
+            ids.append(job.id)
+        return jobs, ids
+
+    jobs, ids = asyncio.run(scenario())
+    assert [jobs.get(i) is not None for i in ids] == [False, False, True, True, True]
+
+
+def test_card_and_newsletter_prompts():
+    summarizer = GeminiSummarizer()
+    summarizer.client = FakeGeminiClient(latency=0.0, jitter=0.0)
+    prompts = []
+    generate = summarizer._generate
+    summarizer._generate = lambda prompt, model, config: prompts.append(prompt.full) or generate(prompt, model, config)
+
+    cards = summarizer.summarize_cards("제목", "본문 " * 100)
+    assert cards["category"] and cards["small_card_summary"]
+    newsletter = summarizer.summarize_newsletter("제목", "본문 " * 100, {"category": "경제", "topic": "부동산"})
+    assert newsletter["newsletter_summary"]
+
+    assert "newsletter_summary" not in prompts[0]
+    assert "newsletter_summary" in prompts[1] and "경제 / 부동산" in prompts[1]
+    assert "error" in summarizer.summarize_cards("제목", "본문", prompt_version="v0")
+
+
+if __name__ == "__main__":
+    for name, fn in list(globals().items()):
+        if name.startswith("test_"):
+            fn()
+            print(f"✅ {name}")
@@ -0,0 +1,89 @@
+"""
+요청 단위 프로파일링(services.profiling) 테스트
+
+사용법: python -m pytest tests/profiling_test.py  (또는 python tests/profiling_test.py)
+"""
+import contextvars
+import os
+import sys
+import tempfile
+import threading
+import time
+import tracemalloc
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from services import profiling
+from services.metrics import stage_timer
+
+
+def busy_parse(seconds):
+    data = []
+    end = time.perf_counter() + seconds
+    while time.perf_counter() < end:
+        data.append("x" * 1000)
+    return len(data)
+
+
+def run_profiled_job(headers, seconds=0.1):
+    """요청 하나처럼: 컨텍스트에서 프로파일 시작 → 워커 스레드에서 단계 실행 → 종료"""
+    ctx = contextvars.Context()
+    profile = ctx.run(profiling.maybe_start, "/api/v1/summarize/naver-news", headers)
+    if profile is None:
+        return None
+
+    def job():
+        with profile.attach(), stage_timer("parse"):
+            busy_parse(seconds)
+
+    worker = threading.Thread(target=ctx.copy().run, args=(job,))
+    worker.start()
+    worker.join()
+    return ctx.run(profiling.finish, profile)
+
+
+def test_header_requires_admin_token():
+    original = profiling.PROFILE_ADMIN_TOKEN
+    try:
+        profiling.PROFILE_ADMIN_TOKEN = ""
+        assert run_profiled_job({"x-profile": "1", "x-admin-token": ""}) is None
+        profiling.PROFILE_ADMIN_TOKEN = "secret"
+        assert run_profiled_job({"x-profile": "1", "x-admin-token": "wrong"}) is None
+    finally:
+        profiling.PROFILE_ADMIN_TOKEN = original
+
+
+def test_profile_artifact_has_stacks_and_stage_memory():
+    original = (profiling.PROFILE_ADMIN_TOKEN, profiling.PROFILE_DIR)
+    with tempfile.TemporaryDirectory() as tmpdir:
+        try:
+            profiling.PROFILE_ADMIN_TOKEN, profiling.PROFILE_DIR = "secret", tmpdir
+            artifact = run_profiled_job({"x-profile": "1", "x-admin-token": "secret"}, seconds=0.2)
+
+            assert artifact["samples"] > 5
+            assert artifact["stages"]["parse"]["samples"] == artifact["samples"]
+            assert artifact["stages"]["parse"]["peak_memory_bytes"] > 100_000
+            assert artifact["top_functions"][0]["function"].startswith("busy_parse")
+            assert all(stack.startswith("parse;") for stack in artifact["stacks"])
+
+            # 저장 → 조회
+            assert profiling.load(artifact["id"])["samples"] == artifact["samples"]
+            assert profiling.list_profiles()[0]["id"] == artifact["id"]
+            assert "busy_parse" in profiling.folded_stacks(artifact)
+            assert profiling.load("../etc/passwd") is None
+        finally:
+            profiling.PROFILE_ADMIN_TOKEN, profiling.PROFILE_DIR = original
+    # 프로파일링이 끝나면 tracemalloc도 꺼짐
+    assert not tracemalloc.is_tracing()
+
+
+def test_disabled_by_default():
+    assert profiling.current() is None
+    assert run_profiled_job({}) is None
+
+
+if __name__ == "__main__":
+    for name, fn in list(globals().items()):
+        if name.startswith("test_"):
+            fn()
+            print(f"✅ {name}")
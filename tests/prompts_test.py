@@ -0,0 +1,132 @@
+"""
+프롬프트 템플릿(services.prompts) 테스트 - 미리 렌더링한 지시문, 지시문 전송 방식(inline / system / explicit), 지표
+
+사용법: python -m pytest tests/prompts_test.py  (또는 python tests/prompts_test.py)
+"""
+import os
+import sys
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+os.environ.setdefault("GEMINI_API_KEY", "test")
+
+from prometheus_client import REGISTRY
+
+from benchmarks.stubs import FakeGeminiClient
+from services import cassette, prompts
+from services.prompts import CARD_PROMPTS, CATEGORY_MAP, CONTENT_PROMPTS, NEWSLETTER_PROMPTS, PrefixCache, PromptTemplate
+from services.summarizer import GeminiSummarizer
+
+
+def make_summarizer(mode, client=None):
+    summarizer = GeminiSummarizer(prefix_cache=PrefixCache(mode))
+    summarizer.client = client or FakeGeminiClient(latency=0.0, jitter=0.0)
+    return summarizer
+
+
+def test_instruction_is_rendered_once():
+    template = CONTENT_PROMPTS["v1"]
+    first = template.render(title="제목", content="본문")
+    second = template.render(title="다른 제목", content="다른 본문")
+    assert first.instruction is second.instruction is template.instruction
+    assert str(CATEGORY_MAP) in template.instruction and "{content}" not in template.instruction
+    assert first.text.strip().endswith("[콘텐츠 원문]: 본문")
+
+    # 분류 선택지가 다른 지시문도 선택지별로 한 번만 렌더링
+    narrowed = {"경제": ["부동산"]}
+    a = template.render(narrowed, title="t", content="c")
+    b = template.render(narrowed, title="t2", content="c2")
+    assert a.instruction is b.instruction and "인공지능" not in a.instruction
+
+
+def test_body_renders_like_str_format():
+    body = "제목 {title}\n본문 {content} ({title})"
+    template = PromptTemplate("test", "v1", "지시문 {categories}", body)
+    assert template.render(title="a", content="b").text == body.format(title="a", content="b")
+    assert template.fields == {"title", "content"}
+    try:
+        PromptTemplate("test", "v1", "지시문", "{count:>5}")
+    except ValueError:
+        pass
+    else:
+        raise AssertionError("expected ValueError for format spec")
+
+
+def test_prompt_digest_is_independent_of_prefix_mode():
+    prompt = NEWSLETTER_PROMPTS["v1"].render(title="t", content="c", category="경제", topic="부동산", medium_card_summary="요약")
+    assert "경제 / 부동산" in prompt.text and "경제 / 부동산" not in prompt.instruction
+    assert prompt.digest("m") == cassette.digest("m", prompt.full)
+
+
+def test_prefix_modes_build_requests():
+    client = FakeGeminiClient(latency=0.0, jitter=0.0)
+    prompt = CARD_PROMPTS["v1"].render(title="t", content="c")
+
+    contents, config, prefix = PrefixCache(prompts.INLINE).request(client, "m", prompt, {"a": 1})
+    assert (contents, config, prefix) == (prompt.full, {"a": 1}, prompts.INLINE)
+
+    contents, config, prefix = PrefixCache(prompts.SYSTEM).request(client, "m", prompt, {"a": 1})
+    assert contents == prompt.text and config["system_instruction"] is prompt.instruction and prefix == prompts.SYSTEM
+
+    cache = PrefixCache(prompts.EXPLICIT)
+    requests = [cache.request(client, model, prompt, {}) for model in ("m", "m", "other")]
+    assert [prefix for _, _, prefix in requests] == [prompts.EXPLICIT] * 3
+    assert requests[0][1]["cached_content"] == requests[1][1]["cached_content"] != requests[2][1]["cached_content"]
+    assert len(client.cached_contents) == 2
+
+
+def test_explicit_falls_back_when_prefix_too_small():
+    client = FakeGeminiClient(latency=0.0, jitter=0.0, min_cache_chars=10 ** 6)
+    cache = PrefixCache(prompts.EXPLICIT)
+    prompt = CARD_PROMPTS["v1"].render(title="t", content="c")
+    for _ in range(2):
+        contents, config, prefix = cache.request(client, "m", prompt, {})
+        assert prefix == prompts.SYSTEM and "cached_content" not in config
+    # 실패도 TTL 동안 기억 (매 요청마다 다시 만들지 않음)
+    assert client.cached_contents == {}
+
+
+def test_explicit_prefix_reduces_uncached_tokens():
+    summaries = {}
+    for mode in prompts.PREFIX_MODES:
+        summarizer = make_summarizer(mode)
+        for i in range(3):
+            result = summarizer.summarize_cards(f"제목 {i}", f"본문 {i} " * 20)
+            assert result["category"] and result["small_card_summary"]
+        summaries[mode] = (summarizer.client.prompt_tokens, summarizer.client.cached_tokens)
+    # 같은 프롬프트 → 입력 토큰은 같고, 캐시된 토큰만 다름
+    assert len({total for total, _ in summaries.values()}) == 1
+    assert summaries[prompts.INLINE][1] == 0
+    assert 0 < summaries[prompts.SYSTEM][1] < summaries[prompts.EXPLICIT][1]
+
+
+def test_expired_cached_content_retries_with_system_instruction():
+    summarizer = make_summarizer(prompts.EXPLICIT)
+    summarizer.summarize_cards("제목", "본문")
+    # 서버에서 CachedContent가 사라짐
+    summarizer.client.cached_contents.clear()
+    result = summarizer.summarize_cards("다른 제목", "다른 본문")
+    assert result["category"]
+    assert summarizer.client.calls == 3
+    # 다음 요청에서는 새로 만듦
+    summarizer.summarize_cards("세 번째", "본문")
+    assert len(summarizer.client.cached_contents) == 1
+
+
+def test_prompt_metrics_by_version():
+    labels = {"template": prompts.CARDS, "version": "v1", "kind": "cached"}
+    before = REGISTRY.get_sample_value("archiveat_prompt_tokens_total", labels) or 0
+    calls = {"template": prompts.CARDS, "version": "v1", "prefix": prompts.EXPLICIT}
+    calls_before = REGISTRY.get_sample_value("archiveat_prompt_duration_seconds_count", calls) or 0
+
+    summarizer = make_summarizer(prompts.EXPLICIT)
+    summarizer.summarize_cards("제목", "본문")
+    summarizer.summarize_cards("제목2", "본문2")
+    assert REGISTRY.get_sample_value("archiveat_prompt_tokens_total", labels) > before
+    assert REGISTRY.get_sample_value("archiveat_prompt_duration_seconds_count", calls) == calls_before + 2
+
+
+if __name__ == "__main__":
+    for name, fn in list(globals().items()):
+        if name.startswith("test_"):
+            fn()
+            print(f"✅ {name}")
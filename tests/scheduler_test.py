@@ -0,0 +1,93 @@
+"""
+우선순위 스케줄러(services.scheduler) 테스트
+
+사용법: python -m pytest tests/scheduler_test.py  (또는 python tests/scheduler_test.py)
+"""
+import asyncio
+import os
+import sys
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from services import cancellation
+from services.cancellation import PipelineCancelled
+from services.scheduler import BACKGROUND, INTERACTIVE, NORMAL, PriorityScheduler
+
+
+async def grant_order(scheduler, waiters):
+    """자리 하나를 잡아 둔 상태에서 waiters 순서로 대기시킨 뒤 하나씩 풀어 배정 순서 기록"""
+    await scheduler.acquire(NORMAL)
+    order = []
+
+    async def job(priority):
+        await scheduler.acquire(priority)
+        order.append(priority)
+        scheduler.release()
+
+    tasks = []
+    for priority in waiters:
+        tasks.append(asyncio.create_task(job(priority)))
+        await asyncio.sleep(0)
+    scheduler.release()
+    await asyncio.gather(*tasks)
+    return order
+
+
+def test_weighted_fair_share():
+    scheduler = PriorityScheduler("llm", 1, weights={INTERACTIVE: 8, NORMAL: 4, BACKGROUND: 1}, max_wait=60)
+    order = asyncio.run(grant_order(scheduler, [BACKGROUND] * 8 + [INTERACTIVE] * 8))
+    # 배경 작업이 먼저 줄을 섰어도 대화형 작업이 8:1 비율로 앞서고, 배경 작업도 굶지 않음
+    assert order[:9].count(INTERACTIVE) == 8 and order[:9].count(BACKGROUND) == 1
+    assert sorted(order) == sorted([BACKGROUND] * 8 + [INTERACTIVE] * 8)
+
+
+def test_long_wait_is_served_first():
+    async def scenario():
+        scheduler = PriorityScheduler("transcription", 1, weights={INTERACTIVE: 1000, NORMAL: 4, BACKGROUND: 0.001},
+                                      max_wait=0.05)
+        # 배경 등급의 가상 시간을 크게 만들어 둠
+        await scheduler.acquire(BACKGROUND)
+        scheduler.release()
+        await scheduler.acquire(NORMAL)
+
+        order = []
+
+        async def job(priority):
+            await scheduler.acquire(priority)
+            order.append(priority)
+            scheduler.release()
+
+        background = asyncio.create_task(job(BACKGROUND))
+        await asyncio.sleep(0.1)
+        interactive = asyncio.create_task(job(INTERACTIVE))
+        await asyncio.sleep(0)
+        scheduler.release()
+        await asyncio.gather(background, interactive)
+        return order
+
+    assert asyncio.run(scenario()) == [BACKGROUND, INTERACTIVE]
+
+
+def test_cancelled_waiter_leaves_queue():
+    async def scenario():
+        scheduler = PriorityScheduler("llm", 1)
+        await scheduler.acquire(NORMAL)
+        cancellation.start(0.1)
+        try:
+            await scheduler.acquire(INTERACTIVE)
+        except PipelineCancelled:
+            pass
+        else:
+            raise AssertionError("should be cancelled while waiting")
+        assert scheduler.waiting()[INTERACTIVE] == 0
+        scheduler.release()
+        assert scheduler.in_use == 0
+
+    asyncio.run(scenario())
+
+
+if __name__ == "__main__":
+    for name, fn in list(globals().items()):
+        if name.startswith("test_"):
+            fn()
+            print(f"✅ {name}")
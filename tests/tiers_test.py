@@ -0,0 +1,74 @@
+"""
+YouTube 요약 단계(services.tiers) 테스트
+
+사용법: python -m pytest tests/tiers_test.py  (또는 python tests/tiers_test.py)
+"""
+import os
+import sys
+import tempfile
+import types
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import services.youtube as youtube
+from benchmarks.stubs import FakeYoutubeDL, make_wav
+from services.tiers import (
+    FULL, METADATA, PARTIAL, PARTIAL_TRANSCRIPTION_SECONDS,
+    candidate_tiers, metadata_text, transcription_seconds,
+)
+
+
+def test_auto_candidates():
+    assert candidate_tiers(None, 3600, allow_downgrade=True) == [FULL, PARTIAL, METADATA]
+    # 짧은 영상은 partial 생략
+    assert candidate_tiers(None, PARTIAL_TRANSCRIPTION_SECONDS, allow_downgrade=True) == [FULL, METADATA]
+    assert candidate_tiers(None, 3600, allow_downgrade=False) == [FULL]
+
+
+def test_requested_tier_is_not_downgraded():
+    assert candidate_tiers(PARTIAL, 3600, allow_downgrade=True) == [PARTIAL]
+
+
+def test_transcription_cost():
+    assert transcription_seconds(FULL, 3600) == 3600
+    assert transcription_seconds(PARTIAL, 3600) == PARTIAL_TRANSCRIPTION_SECONDS
+    assert transcription_seconds(PARTIAL, 60) == 60
+    assert transcription_seconds(METADATA, 3600) == 0
+
+
+def test_metadata_text_includes_chapters():
+    text = metadata_text({
+        "description": "영상 설명",
+        "chapters": [{"start_time": 0, "title": "인트로"}, {"start_time": 3725, "title": "결론"}],
+    })
+    assert text == "영상 설명\n\n[챕터]\n- 0:00 인트로\n- 1:02:05 결론"
+    assert metadata_text({"description": None, "chapters": []}) == ""
+
+
+def test_full_and_partial_audio_use_separate_files():
+    original = youtube.yt_dlp
+    youtube.yt_dlp = types.SimpleNamespace(YoutubeDL=FakeYoutubeDL)
+    try:
+        with tempfile.TemporaryDirectory() as tmpdir:
+            FakeYoutubeDL.audio_fixture = os.path.join(tmpdir, "fixture.wav")
+            make_wav(FakeYoutubeDL.audio_fixture, 1)
+            processor = youtube.YouTubeProcessor(load_model=False)
+            processor.download_dir = tmpdir
+            url = "https://www.youtube.com/watch?v=7nvUzO_-P0I"
+
+            full = processor.download_audio(url, "7nvUzO_-P0I")
+            partial = processor.download_audio(url, "7nvUzO_-P0I", max_seconds=PARTIAL_TRANSCRIPTION_SECONDS)
+            # 같은 영상의 두 단계가 동시에 실행되어도 한쪽의 인식 후 삭제가 다른 쪽 파일을 지우지 않음
+            assert full != partial and os.path.dirname(full) == os.path.dirname(partial)
+            os.remove(partial)
+            assert os.path.exists(full)
+            assert processor.download_audio(url, "7nvUzO_-P0I") == full
+    finally:
+        youtube.yt_dlp = original
+
+
+if __name__ == "__main__":
+    for name, fn in list(globals().items()):
+        if name.startswith("test_"):
+            fn()
+            print(f"✅ {name}")
@@ -0,0 +1,122 @@
+"""
+로컬 토큰 수 추정 / 입력 예산 계획(services.tokens) 테스트
+
+사용법: python -m pytest tests/tokens_test.py  (또는 python tests/tokens_test.py)
+"""
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+os.environ.setdefault("GEMINI_API_KEY", "test")
+
+from prometheus_client import REGISTRY
+
+from benchmarks.stubs import FakeGeminiClient
+from services import tokens
+from services.summarizer import GeminiSummarizer
+
+KOREAN = "노션, 슬랙, 그리고 최근에는 리니어를 활용하여 프로젝트를 관리합니다."
+ENGLISH = "We manage projects with Notion, Slack and, more recently, Linear."
+
+
+def transcript(lines, seed_line="{i}번째 줄: 생산성 도구와 협업 습관에 대한 자막입니다."):
+    return "\n".join(seed_line.format(i=i) for i in range(lines))
+
+
+def test_estimate_korean_and_english():
+    assert tokens.estimate("") == 0
+    # 영문은 약 4자당 1토큰, 한글은 음절마다 토큰에 가까움
+    assert 12 <= tokens.estimate(ENGLISH) <= 25
+    assert 20 <= tokens.estimate(KOREAN) <= 45
+    assert tokens.estimate(KOREAN) / len(KOREAN) > tokens.estimate(ENGLISH) / len(ENGLISH)
+    # 숫자는 자릿수마다
+    assert tokens.estimate("2024") == 4
+    # 대략 더할 수 있어야 조각 나누기가 예산을 지킴
+    assert abs(tokens.estimate(KOREAN + " " + ENGLISH) - tokens.estimate(KOREAN) - tokens.estimate(ENGLISH)) <= 2
+    assert tokens.fits("가" * 100, budget=100) and not tokens.fits("가" * 1000, budget=100)
+
+
+def test_compact_drops_blank_and_repeated_lines():
+    text = "첫 줄   입니다\n\n\n첫 줄 입니다\n  둘째\t줄\n둘째 줄\n첫 줄 입니다"
+    assert tokens.compact(text) == "첫 줄 입니다\n둘째 줄\n첫 줄 입니다"
+
+
+def test_plan_actions_by_size():
+    budget = 1000
+    short = transcript(10)
+    assert tokens.plan(short, budget).action == tokens.AS_IS
+
+    # 자동 자막처럼 같은 줄이 반복되면 정리만으로 예산 안
+    repeated = "\n".join(line for line in transcript(40).splitlines() for _ in range(3))
+    plan = tokens.plan(repeated, budget)
+    assert plan.action == tokens.COMPACT and plan.text == transcript(40)
+    assert plan.tokens == tokens.estimate(repeated)
+
+    # 조금 넘으면 앞뒤만 남김
+    over = transcript(55)
+    assert budget < tokens.estimate(over) <= budget * tokens.TOKEN_TRUNCATE_RATIO
+    plan = tokens.plan(over, budget)
+    assert plan.action == tokens.TRUNCATE and tokens.estimate(plan.text) <= budget
+    assert plan.text.startswith("0번째 줄") and plan.text.endswith("54번째 줄: 생산성 도구와 협업 습관에 대한 자막입니다.")
+    assert tokens.TRUNCATION_MARK in plan.text
+    # 조각별 요약을 할 수 없으면 훨씬 길어도 truncate
+    long = transcript(500)
+    assert tokens.plan(long, budget, allow_chunked=False).action == tokens.TRUNCATE
+
+    # 훨씬 길면 예산 크기 조각으로 (순서/내용 유지)
+    plan = tokens.plan(long, budget)
+    assert plan.action == tokens.CHUNKED and len(plan.chunks) > 1
+    assert all(tokens.estimate(chunk) <= budget for chunk in plan.chunks)
+    assert "\n".join(plan.chunks) == long
+
+
+def test_split_cuts_long_line_at_word_boundary():
+    line = " ".join(f"단어{i}" for i in range(2000))
+    chunks = tokens.split(line, budget=500)
+    assert len(chunks) > 1 and all(tokens.estimate(chunk) <= 500 for chunk in chunks)
+    assert "".join(chunks) == line
+    assert all(chunk.endswith(" ") for chunk in chunks[:-1])
+
+
+def test_plan_long_single_line_stays_linear():
+    # 줄바꿈 없는 100만 자 자막: 조각마다 예산 근처 길이만 다시 셈
+    line = "생산성 도구와 협업 습관에 대한 자막입니다 notion slack 2024 " * 25000
+    start = time.perf_counter()
+    plan = tokens.plan(line)
+    elapsed = time.perf_counter() - start
+    assert plan.action == tokens.CHUNKED
+    assert "".join(plan.chunks) == tokens.compact(line)
+    assert all(tokens.estimate(chunk) <= tokens.LLM_INPUT_TOKEN_BUDGET for chunk in plan.chunks)
+    assert elapsed < 2.0, elapsed
+
+
+def test_summarizer_truncates_oversized_direct_calls():
+    summarizer = GeminiSummarizer()
+    summarizer.client = FakeGeminiClient(latency=0.0, jitter=0.0)
+    labels = {"plan": tokens.TRUNCATE}
+    before = REGISTRY.get_sample_value("archiveat_llm_input_tokens_count", labels) or 0
+
+    line_tokens = tokens.estimate(transcript(1))
+    content = transcript(int(tokens.LLM_INPUT_TOKEN_BUDGET * 2 / line_tokens))
+    assert not tokens.fits(content)
+    result = summarizer.summarize_content("긴 영상", content)
+    assert "error" not in result
+    assert tokens.TRUNCATION_MARK in summarizer.client.last_prompt
+    assert REGISTRY.get_sample_value("archiveat_llm_input_tokens_count", labels) == before + 1
+    assert REGISTRY.get_sample_value("archiveat_token_estimate_ratio_count", {"template": "content"}) >= 1
+
+
+def test_content_chunk_summary():
+    summarizer = GeminiSummarizer()
+    summarizer.client = FakeGeminiClient(latency=0.0, jitter=0.0)
+    result = summarizer.summarize_content_chunk("긴 영상", transcript(20), 2, 5)
+    assert set(result) == {"summary"}
+    assert "2/5번째 조각" in summarizer.client.last_prompt
+
+
+if __name__ == "__main__":
+    for name, fn in list(globals().items()):
+        if name.startswith("test_"):
+            fn()
+            print(f"✅ {name}")
@@ -0,0 +1,145 @@
+"""
+공유 Whisper 모델 서버(services.transcription_server) 테스트 - 실제 모델 대신 가짜 모델 사용
+
+사용법: python -m pytest tests/transcription_server_test.py  (또는 python tests/transcription_server_test.py)
+"""
+import os
+import sys
+import tempfile
+import threading
+import time
+import types
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from services.transcription_server import RemoteTranscriber, TranscriptionServer, TranscriptionServerUnavailable
+
+
+class FakeModel:
+    def __init__(self, segment_delay=0.0):
+        self.segment_delay = segment_delay
+        self.calls = []
+
+    def transcribe(self, audio_path, **kwargs):
+        self.calls.append(kwargs)
+        def segments():
+            for i, word in enumerate(("안녕하세요", "테스트", "입니다")):
+                time.sleep(self.segment_delay)
+                yield types.SimpleNamespace(text=word, start=float(i))
+        return segments(), types.SimpleNamespace(language="ko", language_probability=0.99, duration=3.0)
+
+
+def start_server(tmpdir, replicas=1, segment_delay=0.0):
+    socket_path = os.path.join(tmpdir, "whisper.sock")
+    models = []
+
+    def model_factory():
+        models.append(FakeModel(segment_delay))
+        return models[-1]
+
+    server = TranscriptionServer(socket_path, replicas=replicas, model_factory=model_factory, audio_dir=tmpdir)
+    server.models = models
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return server
+
+
+def make_audio(tmpdir, name="a.mp3"):
+    path = os.path.join(tmpdir, name)
+    with open(path, "wb") as f:
+        f.write(b"fake")
+    return path
+
+
+def test_transcribe_over_socket():
+    with tempfile.TemporaryDirectory() as tmpdir:
+        server = start_server(tmpdir)
+        try:
+            client = RemoteTranscriber(server.socket_path)
+            audio = make_audio(tmpdir)
+            result = client.transcribe(audio)
+            assert result["text"] == "안녕하세요 테스트 입니다"
+            assert result["duration"] == 3.0
+            assert not os.path.exists(audio)  # 인식 후 삭제
+            assert client.stats()["completed"] == 1
+        finally:
+            server.shutdown()
+            server.server_close()
+
+
+def test_partial_transcription_stops_early():
+    with tempfile.TemporaryDirectory() as tmpdir:
+        server = start_server(tmpdir)
+        try:
+            result = RemoteTranscriber(server.socket_path).transcribe(make_audio(tmpdir), max_seconds=2)
+            assert result["text"] == "안녕하세요 테스트"
+            assert result["duration"] == 2
+            # 모델에는 앞 2초 구간만 인식하도록 클립 지정 (전체 디코딩/VAD 없음)
+            assert server.models[0].calls[-1]["clip_timestamps"] == [0, 2]
+            RemoteTranscriber(server.socket_path).transcribe(make_audio(tmpdir))
+            assert "clip_timestamps" not in server.models[0].calls[-1]
+        finally:
+            server.shutdown()
+            server.server_close()
+
+
+def test_global_queue_with_replicas():
+    with tempfile.TemporaryDirectory() as tmpdir:
+        server = start_server(tmpdir, replicas=2, segment_delay=0.05)
+        try:
+            client = RemoteTranscriber(server.socket_path)
+            results = []
+            threads = [
+                threading.Thread(target=lambda i=i: results.append(client.transcribe(make_audio(tmpdir, f"{i}.mp3"))))
+                for i in range(4)
+            ]
+            for t in threads:
+                t.start()
+            for t in threads:
+                t.join()
+            assert len(results) == 4
+            # 복제본 2개 → 4건 중 최소 2건은 대기열에서 기다림
+            assert sum(1 for r in results if r["queued"] > 0.05) >= 2
+        finally:
+            server.shutdown()
+            server.server_close()
+
+
+def test_rejects_paths_outside_download_dir():
+    with tempfile.TemporaryDirectory() as tmpdir, tempfile.TemporaryDirectory() as outside:
+        server = start_server(tmpdir)
+        try:
+            assert os.stat(server.socket_path).st_mode & 0o777 == 0o600
+            client = RemoteTranscriber(server.socket_path)
+            victim = make_audio(outside, "victim.txt")
+            # 바깥 경로, ../ 우회, 다운로드 폴더 안의 심볼릭 링크 모두 거절 (파일은 삭제되지 않음)
+            link = os.path.join(tmpdir, "link.mp3")
+            os.symlink(victim, link)
+            for path in (victim, os.path.join(tmpdir, "..", os.path.basename(outside), "victim.txt"), link, tmpdir):
+                try:
+                    client.transcribe(path)
+                except RuntimeError as e:
+                    assert "download directory" in str(e)
+                else:
+                    raise AssertionError(f"should reject {path}")
+            assert os.path.exists(victim)
+            assert client.stats()["completed"] == 0
+        finally:
+            server.shutdown()
+            server.server_close()
+
+
+def test_unavailable_server():
+    client = RemoteTranscriber("/nonexistent/whisper.sock")
+    try:
+        client.transcribe("/tmp/a.mp3")
+    except TranscriptionServerUnavailable:
+        pass
+    else:
+        raise AssertionError("should raise TranscriptionServerUnavailable")
+
+
+if __name__ == "__main__":
+    for name, fn in list(globals().items()):
+        if name.startswith("test_"):
+            fn()
+            print(f"✅ {name}")